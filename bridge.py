@@ -1,16 +1,39 @@
 import os
+import shutil
+import tempfile
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from PySide6.QtCore import QObject, Signal, Slot, Property
+from config.constants import PREVIEW_ROWS
 from utils.data_analysis import AdvancedNormalizer, analyze_dependencies
 from utils.file_utils import get_data
 from utils.data_connectors import DataConnector, ConnectionManager
 from utils.etl_engine import ETLPipeline, PipelineManager, TransformRule, DataQualityChecker
+from utils.etl_backends import PANDAS_BACKEND, available_backends, to_pandas
+from utils.etl_cache import CheckpointCache, estimated_bytes
+from utils.performance_optimizer import CancellationToken, MemoryMonitor, OperationCancelledError
+
+# Share of the loaded rows a dry run samples (capped by the estimator)
+DRY_RUN_FRACTION = 0.05
+
+# Checkpoints kept in memory, in frames the size of the loaded data (more spill to disk)
+CHECKPOINT_FRAMES = 3
+
 
 class DataBridge(QObject):
     dataChanged = Signal()
     statsChanged = Signal()
     erdChanged = Signal()
     statusChanged = Signal(str, str) # message, color
+    pipelineProgress = Signal(float, str) # fraction, current step
+    pipelineRunningChanged = Signal()
+    pipelineBackendChanged = Signal()
+    # Worker-thread callbacks are re-emitted through these so slots run on the GUI thread
+    _progressReported = Signal(object)
+    _pipelineFinished = Signal(object)
+    _previewFinished = Signal(object)
+    _dryRunFinished = Signal(object)
 
     def __init__(self):
         super().__init__()
@@ -23,12 +46,37 @@ class DataBridge(QObject):
         self._connector = DataConnector()
         self._connection_manager = ConnectionManager()
         self._saved_connections = []
-        self._pipeline_manager = PipelineManager()
+        self._pipeline_manager = PipelineManager(history_file="etl_history.db")
         self._current_pipeline = None
         self._data_quality_profile = {}
         self._transform_rules = []
+        self._checkpoint_cache = CheckpointCache(spill_dir=tempfile.mkdtemp(prefix="etl-checkpoints-"))
+        self._fingerprinted_df = None  # weakref to the DataFrame _df_fingerprint belongs to
+        self._df_fingerprint = None
+        self._execution_profile = []  # Per-step timings of the last pipeline run
+        self._dry_run_estimate = {}  # Estimates of the last dry run
+        self._pipeline_future = None
+        self._pipeline_token = None
+        self._pipeline_backend = PANDAS_BACKEND
+        self._preview_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="etl-preview")
+        self._preview_generation = 0  # Bumped whenever a pending pipeline preview goes stale
+        self._progressReported.connect(self._on_pipeline_progress)
+        self._pipelineFinished.connect(self._on_pipeline_finished)
+        self._previewFinished.connect(self._on_preview_finished)
+        self._dryRunFinished.connect(self._on_dry_run_finished)
         self._update_connections_list()
 
+    @Slot()
+    def shutdown(self):
+        """On exit: drop checkpoint spill files, stop pipeline workers, fold the journal into etl_pipelines.json"""
+        self._preview_generation += 1
+        self._preview_executor.shutdown(wait=False, cancel_futures=True)
+        self._checkpoint_cache.clear()
+        shutil.rmtree(self._checkpoint_cache.spill_dir, ignore_errors=True)
+        for pipeline in self._pipeline_manager.pipelines.values():
+            pipeline.shutdown()
+        self._pipeline_manager.save_pipelines()
+
     @Property(str, notify=dataChanged)
     def filePath(self):
         return self._file_path
@@ -49,6 +97,18 @@ class DataBridge(QObject):
     def tables(self):
         return self._tables
 
+    @Property(bool, notify=pipelineRunningChanged)
+    def pipelineRunning(self):
+        return self._pipeline_future is not None
+
+    @Property(list, constant=True)
+    def pipelineBackends(self):
+        return available_backends()
+
+    @Property(str, notify=pipelineBackendChanged)
+    def pipelineBackend(self):
+        return self._pipeline_backend
+
     @Slot(str)
     def load_csv(self, file_url):
         # Convert file URL to path if needed
@@ -233,6 +293,7 @@ class DataBridge(QObject):
         
         preview_df = self._df.head(15).fillna("")
         self._preview_data = preview_df.to_dict('records')
+        self._preview_generation += 1
         
         self.dataChanged.emit()
         self.statsChanged.emit()
@@ -379,6 +440,16 @@ class DataBridge(QObject):
         """Get data quality profile"""
         return self._data_quality_profile
     
+    @Property(list, notify=dataChanged)
+    def executionProfile(self):
+        """Per-step timings of the last pipeline run"""
+        return self._execution_profile
+    
+    @Property(dict, notify=dataChanged)
+    def dryRunEstimate(self):
+        """Output size and runtime estimated by the last dry run"""
+        return self._dry_run_estimate
+    
     @Slot(str)
     def create_pipeline(self, name):
         """Create new ETL pipeline"""
@@ -398,6 +469,7 @@ class DataBridge(QObject):
             if pipeline:
                 self._current_pipeline = pipeline
                 self._update_transform_rules_list()
+                self._show_pipeline_preview()
                 self.dataChanged.emit()
                 self.statusChanged.emit(f"✅ Đã load pipeline: {name}", "green")
             else:
@@ -429,8 +501,9 @@ class DataBridge(QObject):
             config = json.loads(config_json)
             rule = TransformRule(rule_name, rule_type, config)
             self._current_pipeline.add_rule(rule)
-            self._pipeline_manager.save_pipelines()
+            self._pipeline_manager.save_pipeline(self._current_pipeline.name)
             self._update_transform_rules_list()
+            self._show_pipeline_preview()
             self.dataChanged.emit()
             self.statusChanged.emit(f"✅ Đã thêm rule: {rule_name}", "green")
         except Exception as e:
@@ -444,8 +517,9 @@ class DataBridge(QObject):
         
         try:
             self._current_pipeline.remove_rule(rule_name)
-            self._pipeline_manager.save_pipelines()
+            self._pipeline_manager.save_pipeline(self._current_pipeline.name)
             self._update_transform_rules_list()
+            self._show_pipeline_preview()
             self.dataChanged.emit()
             self.statusChanged.emit(f"✅ Đã xóa rule: {rule_name}", "green")
         except Exception as e:
@@ -453,7 +527,7 @@ class DataBridge(QObject):
     
     @Slot()
     def execute_pipeline(self):
-        """Execute current pipeline on loaded data"""
+        """Start the current pipeline on loaded data in the background"""
         if self._df is None:
             self.statusChanged.emit("⚠ Chưa có dữ liệu", "orange")
             return
@@ -462,24 +536,226 @@ class DataBridge(QObject):
             self.statusChanged.emit("⚠ Chưa chọn pipeline", "orange")
             return
         
+        if self._pipeline_future is not None:
+            self.statusChanged.emit("⚠ Pipeline đang chạy", "orange")
+            return
+        
         try:
             self.statusChanged.emit("⏳ Đang thực thi pipeline...", "blue")
-            self._df_transformed, stats = self._current_pipeline.execute(self._df)
-            
-            # Update preview with transformed data
-            preview_df = self._df_transformed.head(15).fillna("")
-            self._preview_data = preview_df.to_dict('records')
-            
-            # Update stats
-            self._update_stats_and_preview()
-            
-            self.dataChanged.emit()
-            self.statusChanged.emit(
-                f"✅ Pipeline hoàn tất: {stats['final_rows']} rows, {len(stats['rules_applied'])} rules", 
-                "green"
-            )
+            self._pipeline_token = CancellationToken()
+            if self._pipeline_backend == PANDAS_BACKEND:
+                future = self._current_pipeline.execute_async(
+                    self._df,
+                    progress_callback=self._progressReported.emit,
+                    cancellation_token=self._pipeline_token,
+                    checkpoint_cache=self._checkpoint_cache,
+                    input_fingerprint=self._current_fingerprint(),
+                    source=self._file_path or None
+                )
+            else:
+                future = self._current_pipeline.execute_async(
+                    self._df,
+                    progress_callback=self._progressReported.emit,
+                    cancellation_token=self._pipeline_token,
+                    backend=self._pipeline_backend
+                )
+            source_df = self._df
+            self._pipeline_future = future
+            self.pipelineRunningChanged.emit()
+            self.pipelineProgress.emit(0.0, "")
+            future.add_done_callback(lambda f: self._pipelineFinished.emit((f, source_df)))
+        except Exception as e:
+            self.statusChanged.emit(f"❌ Lỗi thực thi: {str(e)}", "red")
+    
+    @Slot()
+    def dry_run_pipeline(self):
+        """Estimate output size and runtime of the current pipeline from a sample of the loaded data"""
+        if self._df is None:
+            self.statusChanged.emit("⚠ Chưa có dữ liệu", "orange")
+            return
+        
+        if not self._current_pipeline:
+            self.statusChanged.emit("⚠ Chưa chọn pipeline", "orange")
+            return
+        
+        self.statusChanged.emit("⏳ Đang ước tính...", "blue")
+        source_df = self._df
+        # On the preview worker, with a copy the GUI can keep editing
+        future = self._preview_executor.submit(self._current_pipeline.snapshot().dry_run,
+                                               source_df, sample_fraction=DRY_RUN_FRACTION)
+        future.add_done_callback(lambda f: self._dryRunFinished.emit((f, source_df)))
+    
+    def _on_dry_run_finished(self, finished):
+        future, source_df = finished
+        if source_df is not self._df:
+            return  # Other data was loaded meanwhile
+        
+        try:
+            estimate = future.result()
+        except Exception as e:
+            self.statusChanged.emit(f"❌ Lỗi ước tính: {str(e)}", "red")
+            return
+        self._dry_run_estimate = self._build_dry_run_estimate(estimate)
+        self.dataChanged.emit()
+        self.statusChanged.emit(
+            f"✅ Ước tính: {estimate['output_rows']} rows, {self._dry_run_estimate['runtime_s']} s",
+            "green"
+        )
+    
+    def _build_dry_run_estimate(self, estimate):
+        """Flatten dry-run estimates for the ETL tab"""
+        mb = 1024 * 1024
+        return {
+            'sample_rows': estimate['sample_rows'],
+            'output_rows': estimate['output_rows'],
+            'output_mb': round(estimate['output_bytes'] / mb, 1),
+            'peak_mb': round(estimate['peak_bytes'] / mb, 1),
+            'budget_mb': round(estimate['memory_budget'] / mb, 1),
+            'runtime_s': round(estimate['runtime'], 2),
+            'fits_in_memory': estimate['fits_in_memory'],
+            'recommended_mode': estimate['recommended_mode'],
+            'steps': [
+                {
+                    'name': step['rule'],
+                    'type': step['type'],
+                    'rows_after': step['rows_after'],
+                    'selectivity': round(step['selectivity'] * 100, 1),
+                    'wall_s': step['wall_time'],
+                    'approximate': step['sample_sensitive'],
+                }
+                for step in estimate['steps']
+            ],
+        }
+    
+    @Slot(str)
+    def set_pipeline_backend(self, name):
+        """Choose the engine the next pipeline runs on"""
+        if name not in available_backends():
+            self.statusChanged.emit(f"⚠ Backend không khả dụng: {name}", "orange")
+            return
+        if name != self._pipeline_backend:
+            self._pipeline_backend = name
+            self.pipelineBackendChanged.emit()
+    
+    @Slot()
+    def cancel_pipeline(self):
+        """Stop the running pipeline at its next step boundary"""
+        if self._pipeline_token is not None:
+            self._pipeline_token.cancel()
+            self.statusChanged.emit("⏳ Đang hủy pipeline...", "orange")
+    
+    def _on_pipeline_progress(self, event):
+        self.pipelineProgress.emit(event['fraction'], event['rule'])
+    
+    def _on_pipeline_finished(self, finished):
+        future, source_df = finished
+        self._pipeline_future = None
+        self._pipeline_token = None
+        self.pipelineRunningChanged.emit()
+        
+        try:
+            result_df, stats = future.result()
+        except OperationCancelledError:
+            self.statusChanged.emit("⛔ Đã hủy pipeline", "orange")
+            return
         except Exception as e:
             self.statusChanged.emit(f"❌ Lỗi thực thi: {str(e)}", "red")
+            return
+        
+        if source_df is not self._df:
+            # Other data was loaded while the pipeline ran
+            self.statusChanged.emit("⚠ Dữ liệu đã thay đổi, bỏ qua kết quả pipeline", "orange")
+            return
+        
+        if self._df_fingerprint is None:
+            self._df_fingerprint = stats.get('input_fingerprint')
+        
+        # Other backends return their own frames; the rest of the app works on pandas
+        self._df_transformed = to_pandas(result_df)
+        self._execution_profile = self._build_execution_profile(stats)
+        
+        # Update stats, then show the transformed data in the preview
+        self._update_stats_and_preview()
+        self._preview_data = self._preview_records(self._df_transformed.head(PREVIEW_ROWS))
+        
+        self.dataChanged.emit()
+        self.pipelineProgress.emit(1.0, "")
+        rules_count = sum(len(step['rules']) for step in stats['rules_applied'])
+        self.statusChanged.emit(
+            f"✅ Pipeline hoàn tất: {stats['final_rows']} rows, {rules_count} rules", 
+            "green"
+        )
+    
+    @staticmethod
+    def _preview_records(preview_df):
+        # As object, so nullable dtypes (e.g. Int64 from convert_type) accept the "" filler
+        return preview_df.astype(object).where(preview_df.notna(), "").to_dict('records')
+    
+    def _show_pipeline_preview(self):
+        """Preview the current pipeline's first output rows on the preview worker thread"""
+        self._preview_generation += 1
+        if self._df is None or not self._current_pipeline:
+            return
+        
+        generation = self._preview_generation
+        source_df = self._df
+        # A copy, so the worker never sees rules the GUI edits meanwhile
+        pipeline = self._current_pipeline.snapshot()
+        future = self._preview_executor.submit(self._run_preview, pipeline, source_df, generation)
+        future.add_done_callback(lambda f: self._previewFinished.emit((f, source_df, generation)))
+    
+    def _run_preview(self, pipeline, df, generation):
+        if generation != self._preview_generation:
+            return None  # Superseded while queued
+        preview_df, _ = pipeline.execute_preview(df, PREVIEW_ROWS)
+        return self._preview_records(preview_df)
+    
+    def _on_preview_finished(self, finished):
+        future, source_df, generation = finished
+        if generation != self._preview_generation or source_df is not self._df:
+            # A later rule change, pipeline run or data load replaced this preview
+            return
+        
+        try:
+            self._preview_data = future.result()
+        except Exception as e:
+            self.statusChanged.emit(f"❌ Lỗi xem trước pipeline: {str(e)}", "red")
+            return
+        self.dataChanged.emit()
+    
+    @Slot(str, str)
+    def export_execution_profile(self, folder_url, fmt):
+        """Export the last run's per-step profile as Chrome trace or speedscope JSON"""
+        if not self._current_pipeline or not self._current_pipeline.execution_log:
+            self.statusChanged.emit("⚠ Chưa thực thi pipeline", "orange")
+            return
+        
+        folder = folder_url.replace("file:///", "").replace("/", os.sep)
+        fmt = fmt or "chrome"
+        try:
+            file_path = os.path.join(folder, f"{self._current_pipeline.name}_{fmt}_profile.json")
+            self._current_pipeline.export_profile(file_path, fmt=fmt)
+            self.statusChanged.emit(f"✅ Đã xuất profile tại: {file_path}", "green")
+        except Exception as e:
+            self.statusChanged.emit(f"❌ Lỗi xuất profile: {str(e)}", "red")
+    
+    def _build_execution_profile(self, stats):
+        """Flatten per-step stats into rows for the ETL tab"""
+        total = sum(entry.get('wall_time') or 0 for entry in stats['rules_applied'] if not entry.get('cached'))
+        profile = []
+        for entry in stats['rules_applied']:
+            wall = entry.get('wall_time') or 0
+            profile.append({
+                'name': entry['rule'],
+                'type': entry['type'],
+                'cached': bool(entry.get('cached')),
+                'wall_ms': round(wall * 1000, 1),
+                'cpu_ms': round((entry.get('cpu_time') or 0) * 1000, 1),
+                'rows_per_sec': round(entry.get('rows_per_sec') or 0),
+                'memory_mb': entry.get('memory_delta_mb') or 0,
+                'share': round(100 * wall / total, 1) if total and not entry.get('cached') else 0
+            })
+        return profile
     
     @Slot()
     def analyze_data_quality(self):
@@ -520,6 +796,7 @@ class DataBridge(QObject):
         if self._df is not None:
             preview_df = self._df.head(15).fillna("")
             self._preview_data = preview_df.to_dict('records')
+            self._preview_generation += 1
             self.dataChanged.emit()
             self.statusChanged.emit("✅ Đã reset về dữ liệu gốc", "green")
     
@@ -527,10 +804,26 @@ class DataBridge(QObject):
     def apply_transformations_permanently(self):
         """Apply transformations permanently (replace original data)"""
         if self._df_transformed is not None:
-            self._df = self._df_transformed.copy()
+            # execute() already returns a new frame; nothing else holds it
+            self._df = self._df_transformed
             self._df_transformed = None
             self.statusChanged.emit("✅ Đã áp dụng transformations", "green")
     
+    def _current_fingerprint(self):
+        """
+        Fingerprint of _df from an earlier run, or None when _df changed since
+        (old checkpoints are dropped, the checkpoint budget is resized to the
+        new data, and the worker thread computes the fingerprint)
+        """
+        if self._fingerprinted_df is None or self._fingerprinted_df() is not self._df:
+            self._checkpoint_cache.clear()
+            # Sized to the data, within half of the memory the machine can spare
+            self._checkpoint_cache.memory_budget = min(CHECKPOINT_FRAMES * estimated_bytes(self._df),
+                                                       MemoryMonitor().get_memory_budget() // 2)
+            self._df_fingerprint = None
+            self._fingerprinted_df = weakref.ref(self._df)
+        return self._df_fingerprint
+    
     def _update_transform_rules_list(self):
         """Update transform rules list for QML"""
         if self._current_pipeline:
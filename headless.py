@@ -0,0 +1,171 @@
+"""
+Headless entry point: run pipelines and 3NF normalization without Qt.
+
+Only the standard library is imported at start-up; pandas and the engine
+modules are imported by the command that needs them, so `--help` and
+`list` return at once and the other commands start on their data I/O
+without paying for PySide6.
+
+    python headless.py list
+    python headless.py run clean_orders data/orders.csv -o exports/orders.csv
+    python headless.py normalize data/orders.csv -o exports/orders_3nf --pipeline clean_orders
+    python headless.py batch clean_orders "data/*.csv" -o exports/
+"""
+import argparse
+import os
+import sys
+import time
+
+DEFAULT_CONFIG = 'etl_pipelines.json'
+
+# Output file extension -> batch_runner output format
+OUTPUT_EXTENSIONS = {'.csv': 'csv', '.json': 'json', '.xlsx': 'excel'}
+
+
+def _load_pipeline(name, config_file):
+    from utils.etl_engine import PipelineManager
+
+    pipeline = PipelineManager(config_file).get_pipeline(name)
+    if pipeline is None:
+        raise ValueError(f"Pipeline '{name}' not found in {config_file}")
+    return pipeline
+
+
+def _output_format(path):
+    fmt = OUTPUT_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported output file {path} (use {', '.join(OUTPUT_EXTENSIONS)})")
+    return fmt
+
+
+def cmd_list(args):
+    """Saved pipelines and their rules (journal included), read without importing pandas"""
+    from utils.pipeline_store import read_pipeline_data
+
+    pipelines, _ = read_pipeline_data(args.config)
+    if not pipelines:
+        print(f"No pipelines in {args.config}")
+    for data in pipelines.values():
+        rules = data.get('rules', [])
+        print(f"{data['name']}: {len(rules)} rules")
+        for rule in rules:
+            state = '' if rule.get('enabled', True) else ' (disabled)'
+            print(f"  - {rule['name']} [{rule['type']}]{state}")
+    return 0
+
+
+def cmd_run(args):
+    """Load one file, run a pipeline on it and export the result"""
+    output_format = _output_format(args.output)
+    pipeline = _load_pipeline(args.pipeline, args.config)
+
+    from utils.batch_runner import read_input, write_output
+
+    columns = pipeline.required_columns()
+    if args.cache_dir:
+        from utils.result_cache import ResultCache, execute_cached
+
+        cache = ResultCache(args.cache_dir, quota_mb=args.cache_quota)
+        result, stats = execute_cached(pipeline, args.input, lambda p: read_input(p, args.table, columns),
+                                       cache, args.table)
+    else:
+        result, stats = pipeline.execute(read_input(args.input, args.table, columns))
+    write_output(result, args.output, output_format)
+
+    if stats.get('result_cache') == 'hit':
+        took = f"{stats['load_time']:.2f}s (cached)"
+    else:
+        took = f"{stats['duration']:.2f}s"
+    print(f"{args.pipeline}: {stats['initial_rows']} -> {stats['final_rows']} rows "
+          f"in {took} -> {args.output}")
+    for error in stats['errors']:
+        print(f"  error in {error['rule']}: {error['error']}", file=sys.stderr)
+    return 0 if not stats['errors'] else 1
+
+
+def cmd_normalize(args):
+    """Split one file into 3NF Dim_/Fact_ tables, optionally after a pipeline"""
+    pipeline = _load_pipeline(args.pipeline, args.config) if args.pipeline else None
+
+    from utils.batch_runner import OUTPUT_FORMATS, read_input, write_output
+    from utils.data_analysis import AdvancedNormalizer
+
+    df = read_input(args.input, args.table, pipeline.required_columns() if pipeline is not None else None)
+    if pipeline is not None:
+        df, _ = pipeline.execute(df)
+    normalizer = AdvancedNormalizer(df)
+    tables = normalizer.normalize_to_3nf()
+    for message in normalizer.error_log:
+        print(message, file=sys.stderr)
+    if not tables:
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for name, table in tables.items():
+        path = os.path.join(args.output_dir, name + OUTPUT_FORMATS[args.format])
+        write_output(table, path, args.format)
+        print(f"{name}: {len(table)} rows x {len(table.columns)} columns -> {path}")
+    return 0
+
+
+def cmd_batch(args):
+    from utils.batch_runner import main as batch_main
+
+    return batch_main(['-c', args.config] + args.batch_args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run ETL pipelines and 3NF normalization without the GUI")
+    parser.add_argument('-c', '--config', default=DEFAULT_CONFIG, help="pipelines file (default: %(default)s)")
+    parser.add_argument('--timing', action='store_true', help="print how long the command took")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = commands.add_parser('list', help="list saved pipelines")
+    list_parser.set_defaults(handler=cmd_list)
+
+    run_parser = commands.add_parser('run', help="run a saved pipeline on one file")
+    run_parser.add_argument('pipeline')
+    run_parser.add_argument('input', help="CSV, Excel, JSON or SQLite file")
+    run_parser.add_argument('-o', '--output', required=True, help="output file (.csv, .json or .xlsx)")
+    run_parser.add_argument('--table', default=None, help="table to read from a SQLite input")
+    run_parser.add_argument('--cache-dir', default=None, help="reuse the result of an identical earlier run")
+    run_parser.add_argument('--cache-quota', type=float, default=2048,
+                            help="result cache size limit in MB (default: %(default)s)")
+    run_parser.set_defaults(handler=cmd_run)
+
+    normalize_parser = commands.add_parser('normalize', help="normalize one file into 3NF tables")
+    normalize_parser.add_argument('input', help="CSV, Excel, JSON or SQLite file")
+    normalize_parser.add_argument('-o', '--output-dir', required=True, help="directory for the Dim_/Fact_ tables")
+    normalize_parser.add_argument('-p', '--pipeline', default=None, help="saved pipeline to run first")
+    normalize_parser.add_argument('-f', '--format', choices=['csv', 'json', 'excel'], default='csv')
+    normalize_parser.add_argument('--table', default=None, help="table to read from a SQLite input")
+    normalize_parser.set_defaults(handler=cmd_normalize)
+
+    # Options after 'batch' belong to utils.batch_runner (see: batch --help)
+    batch_parser = commands.add_parser('batch', add_help=False,
+                                       help="run a saved pipeline on many files in parallel")
+    batch_parser.add_argument('batch_args', nargs=argparse.REMAINDER)
+    batch_parser.set_defaults(handler=cmd_batch)
+    return parser
+
+
+def main(argv=None):
+    started = time.perf_counter()
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['batch']:
+        # argparse cannot hand a leading option such as --help through REMAINDER
+        from utils.batch_runner import main as batch_main
+        return batch_main(argv[1:])
+    args = build_parser().parse_args(argv)
+    try:
+        code = args.handler(args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        code = 2
+    if args.timing:
+        print(f"[{args.command} took {time.perf_counter() - started:.3f}s]", file=sys.stderr)
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
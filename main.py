@@ -1,5 +1,6 @@
 import sys
 import os
+import pandas as pd
 from PySide6.QtGui import QGuiApplication
 from PySide6.QtQml import QQmlApplicationEngine
 from PySide6.QtCore import Qt
@@ -9,12 +10,16 @@ def main():
     # Set environment variables for better scaling on high DPI
     os.environ["QT_QUICK_CONTROLS_STYLE"] = "Basic"
     
+    # Transformed frames share unchanged columns with their source
+    pd.set_option("mode.copy_on_write", True)
+    
     app = QGuiApplication(sys.argv)
     engine = QQmlApplicationEngine()
 
     # Create and register the bridge
     bridge = DataBridge()
     engine.rootContext().setContextProperty("bridge", bridge)
+    app.aboutToQuit.connect(bridge.shutdown)
 
     # Load main QML
     qml_file = os.path.join(os.path.dirname(__file__), "qml", "Main.qml")
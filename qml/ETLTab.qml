@@ -162,13 +162,94 @@ Item {
                     onClicked: bridge.analyze_data_quality()
                 }
                 
+                RowLayout {
+                    Layout.fillWidth: true
+                    spacing: Theme.spacingSmall
+                    
+                    Text {
+                        text: "Engine:"
+                        font.pixelSize: Theme.fontSizeSmall
+                        font.family: Theme.fontFamily
+                        color: Theme.textPrimary
+                    }
+                    
+                    ComboBox {
+                        id: backendSelector
+                        Layout.fillWidth: true
+                        Layout.preferredHeight: Theme.inputHeight
+                        model: bridge ? bridge.pipelineBackends : []
+                        currentIndex: bridge ? Math.max(0, bridge.pipelineBackends.indexOf(bridge.pipelineBackend)) : 0
+                        enabled: bridge && !bridge.pipelineRunning
+                        font.pixelSize: Theme.fontSizeSmall
+                        font.family: Theme.fontFamily
+                        
+                        onActivated: bridge.set_pipeline_backend(currentText)
+                    }
+                }
+                
                 PrimaryButton {
-                    text: "Thực thi"
+                    text: bridge.pipelineRunning ? "Hủy" : "Thực thi"
                     Layout.fillWidth: true
                     Layout.preferredHeight: Theme.inputHeight
-                    buttonColor: Theme.successColor
-                    buttonHoverColor: "#388E3C"
-                    onClicked: bridge.execute_pipeline()
+                    buttonColor: bridge.pipelineRunning ? Theme.errorColor : Theme.successColor
+                    buttonHoverColor: bridge.pipelineRunning ? "#B71C1C" : "#388E3C"
+                    onClicked: bridge.pipelineRunning ? bridge.cancel_pipeline() : bridge.execute_pipeline()
+                }
+                
+                Button {
+                    text: "Ước tính (dry run)"
+                    Layout.fillWidth: true
+                    Layout.preferredHeight: Theme.buttonHeightMedium
+                    font.pixelSize: Theme.fontSizeMedium
+                    font.family: Theme.fontFamily
+                    enabled: bridge && !bridge.pipelineRunning
+                    
+                    onClicked: {
+                        bridge.dry_run_pipeline()
+                        etlTabs.currentIndex = 2
+                    }
+                    
+                    background: Rectangle {
+                        color: parent.hovered ? Theme.backgroundHover : Theme.backgroundSecondary
+                        radius: Theme.radiusMedium
+                        border.color: Theme.borderColor
+                        border.width: 1
+                    }
+                    
+                    contentItem: Text {
+                        text: parent.text
+                        color: parent.enabled ? Theme.textPrimary : Theme.textSecondary
+                        font: parent.font
+                        horizontalAlignment: Text.AlignHCenter
+                        verticalAlignment: Text.AlignVCenter
+                    }
+                }
+                
+                ProgressBar {
+                    id: pipelineProgressBar
+                    Layout.fillWidth: true
+                    visible: bridge.pipelineRunning
+                    from: 0
+                    to: 1
+                    value: 0
+                }
+                
+                Text {
+                    id: pipelineStepLabel
+                    Layout.fillWidth: true
+                    visible: bridge.pipelineRunning
+                    elide: Text.ElideRight
+                    font.pixelSize: Theme.fontSizeSmall
+                    font.family: Theme.fontFamily
+                    color: Theme.textSecondary
+                }
+                
+                Connections {
+                    target: bridge
+                    function onPipelineProgress(fraction, step) {
+                        pipelineProgressBar.value = fraction
+                        pipelineStepLabel.text = step
+                    }
                 }
                 
                 Button {
@@ -269,6 +350,33 @@ Item {
                         }
                     }
                 }
+                
+                TabButton {
+                    text: "Profile"
+                    font.pixelSize: Theme.fontSizeMedium
+                    font.weight: Font.DemiBold
+                    font.family: Theme.fontFamily
+                    
+                    contentItem: Text {
+                        text: parent.text
+                        font: parent.font
+                        color: parent.checked ? Theme.successColor : Theme.textSecondary
+                        horizontalAlignment: Text.AlignHCenter
+                        verticalAlignment: Text.AlignVCenter
+                    }
+                    
+                    background: Rectangle {
+                        color: "transparent"
+                        
+                        Rectangle {
+                            anchors.bottom: parent.bottom
+                            width: parent.width
+                            height: 2
+                            color: Theme.successColor
+                            visible: parent.parent.checked
+                        }
+                    }
+                }
             }
             
             StackLayout {
@@ -285,6 +393,11 @@ Item {
                 DataQualityPanel {
                     id: qualityPanel
                 }
+                
+                // Execution Profile Tab
+                ExecutionProfilePanel {
+                    id: profilePanel
+                }
             }
         }
     }
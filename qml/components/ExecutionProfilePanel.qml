@@ -0,0 +1,217 @@
+import QtQuick
+import QtQuick.Controls
+import QtQuick.Layouts
+import QtQuick.Dialogs
+import ".."
+
+Item {
+    id: root
+
+    property string exportFormat: "chrome"
+
+    FolderDialog {
+        id: profileFolderDialog
+        onAccepted: bridge.export_execution_profile(selectedFolder.toString(), root.exportFormat)
+    }
+
+    ColumnLayout {
+        anchors.fill: parent
+        anchors.margins: Theme.paddingLarge
+        spacing: Theme.spacingLarge
+
+        // Header
+        RowLayout {
+            Layout.fillWidth: true
+            spacing: Theme.spacingMedium
+
+            Text {
+                text: "⏱️ Execution Profile"
+                font.pixelSize: Theme.fontSizeXLarge + 2
+                font.weight: Font.Bold
+                font.family: Theme.fontFamily
+                color: Theme.textPrimary
+            }
+
+            Item { Layout.fillWidth: true }
+
+            Repeater {
+                model: [
+                    { label: "Chrome trace", format: "chrome" },
+                    { label: "Speedscope", format: "speedscope" }
+                ]
+
+                delegate: Button {
+                    text: modelData.label
+                    font.pixelSize: Theme.fontSizeMedium
+                    font.family: Theme.fontFamily
+                    enabled: bridge && bridge.executionProfile.length > 0
+
+                    onClicked: {
+                        root.exportFormat = modelData.format
+                        profileFolderDialog.open()
+                    }
+
+                    background: Rectangle {
+                        color: parent.hovered ? Theme.backgroundHover : Theme.backgroundSecondary
+                        radius: Theme.radiusMedium
+                        border.color: Theme.borderColor
+                        border.width: 1
+                    }
+
+                    contentItem: Text {
+                        text: parent.text
+                        color: parent.enabled ? Theme.textPrimary : Theme.textSecondary
+                        font: parent.font
+                        horizontalAlignment: Text.AlignHCenter
+                        verticalAlignment: Text.AlignVCenter
+                    }
+                }
+            }
+        }
+
+        // Estimates of the last dry run
+        Rectangle {
+            Layout.fillWidth: true
+            Layout.preferredHeight: estimateColumn.implicitHeight + 2 * Theme.paddingMedium
+            visible: bridge && bridge.dryRunEstimate.steps !== undefined
+            color: Theme.cardBackground
+            radius: Theme.radiusMedium
+            border.color: bridge && bridge.dryRunEstimate.fits_in_memory ? Theme.borderColor : Theme.warningColor
+            border.width: Theme.borderWidthThin
+
+            ColumnLayout {
+                id: estimateColumn
+                anchors.fill: parent
+                anchors.margins: Theme.paddingMedium
+                spacing: 2
+
+                Text {
+                    text: bridge && bridge.dryRunEstimate.steps !== undefined
+                          ? "🔮 Ước tính: " + bridge.dryRunEstimate.output_rows.toLocaleString(Qt.locale(), 'f', 0) +
+                            " rows · " + bridge.dryRunEstimate.output_mb + " MB · ~" +
+                            bridge.dryRunEstimate.runtime_s + " s"
+                          : ""
+                    font.pixelSize: Theme.fontSizeLarge
+                    font.weight: Font.DemiBold
+                    font.family: Theme.fontFamily
+                    color: Theme.textPrimary
+                }
+
+                Text {
+                    text: bridge && bridge.dryRunEstimate.steps !== undefined
+                          ? "Bộ nhớ đỉnh " + bridge.dryRunEstimate.peak_mb + " / " + bridge.dryRunEstimate.budget_mb +
+                            " MB → " + (bridge.dryRunEstimate.fits_in_memory ? "chạy trong RAM" : "nên chạy streaming") +
+                            " · mẫu " + bridge.dryRunEstimate.sample_rows + " rows"
+                          : ""
+                    font.pixelSize: Theme.fontSizeSmall
+                    font.family: Theme.fontFamily
+                    color: bridge && bridge.dryRunEstimate.fits_in_memory ? Theme.textSecondary : Theme.warningColor
+                }
+
+                Repeater {
+                    model: bridge && bridge.dryRunEstimate.steps !== undefined ? bridge.dryRunEstimate.steps : []
+
+                    delegate: Text {
+                        Layout.fillWidth: true
+                        text: modelData.name + " (" + modelData.type + "): " +
+                              modelData.rows_after.toLocaleString(Qt.locale(), 'f', 0) + " rows (" +
+                              modelData.selectivity + "%) · ~" + modelData.wall_s + " s" +
+                              (modelData.approximate ? "  ≈" : "")
+                        elide: Text.ElideRight
+                        font.pixelSize: Theme.fontSizeSmall
+                        font.family: Theme.fontFamily
+                        color: Theme.textSecondary
+                    }
+                }
+            }
+        }
+
+        // Per-step timings, slowest share shown as a bar
+        ScrollView {
+            Layout.fillWidth: true
+            Layout.fillHeight: true
+            clip: true
+
+            ColumnLayout {
+                width: parent.width
+                spacing: Theme.spacingSmall
+
+                Repeater {
+                    model: bridge ? bridge.executionProfile : []
+
+                    delegate: Rectangle {
+                        Layout.fillWidth: true
+                        height: 52
+                        color: Theme.cardBackground
+                        radius: Theme.radiusMedium
+                        border.color: Theme.borderColor
+                        border.width: Theme.borderWidthThin
+
+                        Rectangle {
+                            anchors.left: parent.left
+                            anchors.top: parent.top
+                            anchors.bottom: parent.bottom
+                            width: parent.width * modelData.share / 100
+                            radius: Theme.radiusMedium
+                            color: modelData.share >= 50 ? Theme.warningColor : Theme.primaryColor
+                            opacity: 0.15
+                        }
+
+                        RowLayout {
+                            anchors.fill: parent
+                            anchors.margins: Theme.paddingMedium
+                            spacing: Theme.spacingMedium
+
+                            ColumnLayout {
+                                Layout.fillWidth: true
+                                spacing: 2
+
+                                Text {
+                                    text: modelData.name + (modelData.cached ? "  (checkpoint)" : "")
+                                    font.pixelSize: Theme.fontSizeLarge
+                                    font.weight: Font.DemiBold
+                                    font.family: Theme.fontFamily
+                                    color: Theme.textPrimary
+                                    elide: Text.ElideRight
+                                    Layout.fillWidth: true
+                                }
+
+                                Text {
+                                    text: modelData.type
+                                    font.pixelSize: Theme.fontSizeSmall
+                                    font.family: Theme.fontFamily
+                                    color: Theme.textSecondary
+                                }
+                            }
+
+                            Text {
+                                text: modelData.wall_ms + " ms (" + modelData.share + "%)"
+                                font.pixelSize: Theme.fontSizeMedium
+                                font.weight: Font.Bold
+                                font.family: Theme.fontFamily
+                                color: Theme.textPrimary
+                            }
+
+                            Text {
+                                text: "CPU " + modelData.cpu_ms + " ms · " +
+                                      modelData.rows_per_sec.toLocaleString(Qt.locale(), 'f', 0) + " rows/s · " +
+                                      modelData.memory_mb + " MB"
+                                font.pixelSize: Theme.fontSizeSmall
+                                font.family: Theme.fontFamily
+                                color: Theme.textSecondary
+                            }
+                        }
+                    }
+                }
+
+                Text {
+                    visible: !bridge || bridge.executionProfile.length === 0
+                    text: "Chưa có dữ liệu profile. Hãy thực thi pipeline."
+                    font.pixelSize: Theme.fontSizeMedium
+                    font.family: Theme.fontFamily
+                    color: Theme.textSecondary
+                }
+            }
+        }
+    }
+}
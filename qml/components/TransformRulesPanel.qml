@@ -320,6 +320,7 @@ Item {
             case "trim_strings": return "✂️"
             case "normalize_text": return "📄"
             case "filter_rows": return "🔍"
+            case "filter_expr": return "🔎"
             default: return "⚙️"
         }
     }
@@ -333,6 +334,7 @@ Item {
             case "trim_strings": return "#8B5CF6"
             case "normalize_text": return "#06B6D4"
             case "filter_rows": return "#EC4899"
+            case "filter_expr": return "#DB2777"
             default: return "#64748B"
         }
     }
@@ -346,6 +348,7 @@ Item {
             case "trim_strings": return "Loại bỏ khoảng trắng"
             case "normalize_text": return "Chuẩn hóa text"
             case "filter_rows": return "Lọc dòng theo điều kiện"
+            case "filter_expr": return "Lọc dòng theo biểu thức nhiều điều kiện"
             default: return "Transformation rule"
         }
     }
@@ -0,0 +1,203 @@
+"""
+Benchmark harness for the ETL rule engine.
+
+Every case is a list of rules. Single-rule cases time TransformRule.apply
+on a fresh copy of the data, pipeline cases time ETLPipeline.execute end
+to end. Throughput comes from the median of several rounds; peak memory
+is the tracemalloc peak of one extra round, so tracing does not skew the
+timings. The copy is made before the clock and tracemalloc start, so
+neither counts it.
+"""
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Any, Optional
+
+import pandas as pd
+
+from utils import arrow_strings
+from utils.etl_engine import ETLPipeline, TransformRule
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+# Allowed slowdown / memory growth before a case counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+_MB = 1024 * 1024
+
+RULE_CASES = {
+    'remove_duplicates': [('dedup', 'remove_duplicates', {'columns': ['customer', 'email']})],
+    'fill_missing': [('fill', 'fill_missing', {'columns': ['amount', 'score'], 'method': 'constant', 'value': 0})],
+    'drop_missing': [('drop', 'drop_missing', {'columns': ['amount', 'customer']})],
+    'convert_type': [('dates', 'convert_type', {'columns': ['created'], 'target_type': 'datetime'})],
+    'rename_column': [('rename', 'rename_column', {'mapping': {'amount': 'total', 'created': 'created_at'}})],
+    'filter_rows': [('big', 'filter_rows', {'column': 'amount', 'operator': '>', 'value': 100})],
+    'filter_expr': [('expr', 'filter_expr', {'expression': {'and': [
+        {'column': 'amount', 'op': 'between', 'value': [20, 500]},
+        {'column': 'status', 'op': 'in', 'value': ['paid', 'shipped']},
+        {'column': 'notes', 'op': 'contains', 'value': 'dolor'},
+    ]}})],
+    'trim_strings': [('trim', 'trim_strings', {'columns': ['country', 'customer']})],
+    'replace_values': [('status', 'replace_values', {'column': 'status', 'mapping': {'new': 'open', 'cancelled': 'void'}})],
+    'normalize_text': [('lower', 'normalize_text', {'columns': ['country', 'notes'], 'case': 'lower'})],
+    'extract_pattern': [('domain', 'extract_pattern', {'column': 'email', 'pattern': r'@(.+)$', 'new_column': 'domain'})],
+    'select_columns': [('select', 'select_columns', {'columns': ['id', 'customer', 'amount', 'status']})],
+    # Half of the 50k customers have a code; the rest are reported as unmatched
+    'lookup_map': [('codes', 'lookup_map', {'column': 'customer', 'new_column': 'customer_code', 'mapping': {
+        f"Customer {i:06d}": f"C{i}" for i in range(0, 50_000, 2)}})],
+}
+
+PIPELINE_CASES = {
+    'pipeline_cleaning': [
+        ('trim', 'trim_strings', {'columns': ['country', 'customer', 'email']}),
+        ('upper', 'normalize_text', {'columns': ['country'], 'case': 'upper'}),
+        ('fill', 'fill_missing', {'columns': ['score'], 'method': 'mean'}),
+        ('dates', 'convert_type', {'columns': ['created'], 'target_type': 'datetime'}),
+        ('dedup', 'remove_duplicates', {'columns': ['customer', 'email']}),
+        ('valid', 'filter_rows', {'column': 'quantity', 'operator': '>', 'value': 0}),
+    ],
+    'pipeline_reporting': [
+        ('paid', 'filter_expr', {'expression': {'or': [
+            {'column': 'status', 'op': '==', 'value': 'paid'},
+            {'column': 'amount', 'op': '>', 'value': 1000},
+        ]}}),
+        ('domain', 'extract_pattern', {'column': 'email', 'pattern': r'@(.+)$', 'new_column': 'domain'}),
+        ('status', 'replace_values', {'column': 'status', 'mapping': {'paid': 'PAID'}}),
+        ('rename', 'rename_column', {'mapping': {'amount': 'total'}}),
+        ('select', 'select_columns', {'columns': ['id', 'customer', 'domain', 'status', 'total']}),
+    ],
+    'pipeline_text_arrow': [
+        ('trim', 'trim_strings', {'columns': ['country', 'customer'], 'string_engine': 'arrow'}),
+        ('lower', 'normalize_text', {'columns': ['notes'], 'case': 'lower', 'string_engine': 'arrow'}),
+        ('domain', 'extract_pattern', {'column': 'email', 'pattern': r'@(.+)$', 'new_column': 'domain',
+                                       'string_engine': 'arrow'}),
+    ],
+}
+
+CASES = {**RULE_CASES, **PIPELINE_CASES}
+
+
+def case_available(case: str) -> Optional[str]:
+    """Why a case cannot run here, or None"""
+    if case.endswith('_arrow') and not arrow_strings.HAS_PYARROW:
+        return 'pyarrow is not installed'
+    return None
+
+
+def _build_rules(case: str) -> List[TransformRule]:
+    return [TransformRule(name, rule_type, dict(config)) for name, rule_type, config in CASES[case]]
+
+
+def _prepare(case: str, df: pd.DataFrame) -> Callable[[], Any]:
+    """One run of the case, ready to call; the input copy is made here, outside timing and tracing"""
+    rules = _build_rules(case)
+    if case in PIPELINE_CASES:
+        pipeline = ETLPipeline(case)
+        for rule in rules:
+            pipeline.add_rule(rule)
+        return lambda: pipeline.execute(df)[1]
+
+    data = df.copy()
+    return lambda: rules[0].apply(data)
+
+
+def _check(case: str, outcome: Any):
+    if isinstance(outcome, dict) and outcome['errors']:
+        raise RuntimeError(f"Benchmark case {case} failed: {outcome['errors']}")
+
+
+def _run_once(case: str, df: pd.DataFrame) -> float:
+    """Wall time of one run of the case"""
+    run = _prepare(case, df)
+    started = time.perf_counter()
+    outcome = run()
+    elapsed = time.perf_counter() - started
+    _check(case, outcome)
+    return elapsed
+
+
+def _peak_memory_mb(case: str, df: pd.DataFrame) -> float:
+    run = _prepare(case, df)
+    tracemalloc.start()
+    try:
+        outcome = run()
+        peak = tracemalloc.get_traced_memory()[1] / _MB
+    finally:
+        tracemalloc.stop()
+    _check(case, outcome)
+    return peak
+
+
+def measure(case: str, df: pd.DataFrame, rounds: int = 3, trace_memory: bool = True) -> Dict[str, Any]:
+    """rows/sec (median of rounds) and tracemalloc peak MB of a case on df"""
+    seconds = statistics.median(_run_once(case, df) for _ in range(max(1, rounds)))
+    return {
+        'rows': len(df),
+        'seconds': round(seconds, 4),
+        'rows_per_sec': round(len(df) / seconds, 1) if seconds > 0 else None,
+        'peak_mb': round(_peak_memory_mb(case, df), 2) if trace_memory else None,
+    }
+
+
+def check_regression(result: Dict[str, Any], baseline: Dict[str, Any],
+                     tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Regressions of result against baseline past tolerance (empty list: none)"""
+    problems = []
+    if result.get('rows_per_sec') and baseline.get('rows_per_sec'):
+        floor = baseline['rows_per_sec'] * (1 - tolerance)
+        if result['rows_per_sec'] < floor:
+            problems.append(
+                f"throughput {result['rows_per_sec']:,.0f} rows/s is below "
+                f"{floor:,.0f} (baseline {baseline['rows_per_sec']:,.0f})")
+    if result.get('peak_mb') is not None and baseline.get('peak_mb') is not None:
+        ceiling = baseline['peak_mb'] * (1 + tolerance)
+        if result['peak_mb'] > ceiling:
+            problems.append(
+                f"peak memory {result['peak_mb']:.1f} MB is above "
+                f"{ceiling:.1f} MB (baseline {baseline['peak_mb']:.1f} MB)")
+    return problems
+
+
+def load_baselines(path: str = BASELINE_FILE) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {'environment': {}, 'results': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def environment() -> Dict[str, str]:
+    """What the baselines were recorded on"""
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpus': str(os.cpu_count()),
+    }
+
+
+def comparable(baselines: Dict[str, Any]) -> bool:
+    """
+    Whether baselines were recorded on hardware like this one.
+
+    Library versions are left out on purpose: a pandas upgrade is exactly
+    the kind of change the benchmarks should judge.
+    """
+    recorded = baselines.get('environment', {})
+    current = environment()
+    return all(recorded.get(key) == current[key] for key in ('machine', 'cpus'))
+
+
+def save_baseline(scale: str, case: str, result: Dict[str, Any], path: str = BASELINE_FILE):
+    """Record result as the baseline of case at scale"""
+    baselines = load_baselines(path)
+    baselines['environment'] = environment()
+    baselines.setdefault('results', {}).setdefault(scale, {})[case] = {
+        'rows_per_sec': result['rows_per_sec'],
+        'peak_mb': result['peak_mb'],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,97 @@
+"""
+Deterministic synthetic data for the ETL benchmarks.
+
+The same seed and row count always produce the same frame. Columns cover
+the shapes the rule engine meets in practice: integers and floats with
+nulls, skewed low and high cardinality text, noisy whitespace and case,
+ISO date strings, e-mail addresses and long free-text notes.
+"""
+import numpy as np
+import pandas as pd
+
+SCALES = {
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+    '50m': 50_000_000,
+}
+
+COUNTRIES = [
+    'VN', 'US', 'JP', 'KR', 'CN', 'DE', 'FR', 'GB', 'SG', 'TH',
+    'ID', 'MY', 'PH', 'IN', 'AU', 'CA', 'BR', 'MX', 'ES', 'IT',
+]
+STATUSES = ['new', 'paid', 'shipped', 'delivered', 'cancelled']
+DOMAINS = ['example.com', 'mail.vn', 'corp.co.jp', 'shop.io', 'post.de']
+
+_WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod '
+    'tempor incididunt ut labore et dolore magna aliqua ut enim ad minim '
+    'veniam quis nostrud exercitation ullamco laboris nisi aliquip'
+).split()
+
+
+def parse_scales(text: str) -> list:
+    """'100k,1m' -> ['100k', '1m']; unknown names raise ValueError"""
+    names = [name.strip().lower() for name in text.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCALES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark scale(s): {', '.join(unknown)} (choose from {', '.join(SCALES)})")
+    return names
+
+
+def _with_nulls(values: np.ndarray, rng: np.random.Generator, fraction: float) -> np.ndarray:
+    values = values.astype(object)
+    values[rng.random(len(values)) < fraction] = None
+    return values
+
+
+def _skewed_codes(rng: np.random.Generator, n_rows: int, cardinality: int, a: float = 1.3) -> np.ndarray:
+    """Zipf-distributed codes in [0, cardinality): a few hot values, a long tail"""
+    return (rng.zipf(a, n_rows) - 1) % cardinality
+
+
+def _noisy_countries() -> np.ndarray:
+    """Each country in several spellings: padded, lower, title case"""
+    variants = []
+    for code in COUNTRIES:
+        variants += [code, code.lower(), f"  {code} ", f"{code.title()} "]
+    return np.array(variants, dtype=object)
+
+
+def _long_notes(rng: np.random.Generator, count: int) -> np.ndarray:
+    lengths = rng.integers(20, 60, count)
+    return np.array([
+        ' '.join(rng.choice(_WORDS, length)) for length in lengths
+    ], dtype=object)
+
+
+def generate_dataset(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Mixed-dtype benchmark frame of n_rows rows"""
+    rng = np.random.default_rng(seed)
+
+    customer_pool = np.array([f"Customer {i:06d}" for i in range(50_000)], dtype=object)
+    email_pool = np.array([
+        f"user{i}@{DOMAINS[i % len(DOMAINS)]}" for i in range(200_000)
+    ], dtype=object)
+    country_pool = _noisy_countries()
+    note_pool = _long_notes(rng, 2_000)
+    date_pool = pd.date_range('2022-01-01', periods=1_095, freq='D').strftime('%Y-%m-%d').to_numpy(dtype=object)
+
+    amount = rng.lognormal(4.0, 1.2, n_rows).round(2)
+    amount[rng.random(n_rows) < 0.10] = np.nan
+    score = rng.normal(50.0, 15.0, n_rows)
+    score[rng.random(n_rows) < 0.30] = np.nan
+
+    return pd.DataFrame({
+        'id': np.arange(n_rows, dtype=np.int64),
+        'customer': _with_nulls(customer_pool[_skewed_codes(rng, n_rows, len(customer_pool))], rng, 0.05),
+        'email': email_pool[_skewed_codes(rng, n_rows, len(email_pool), a=1.1)],
+        'country': _with_nulls(country_pool[_skewed_codes(rng, n_rows, len(country_pool), a=1.5)], rng, 0.02),
+        'status': np.array(STATUSES, dtype=object)[rng.integers(0, len(STATUSES), n_rows)],
+        'amount': amount,
+        'quantity': rng.integers(0, 100, n_rows, dtype=np.int32),
+        'score': score,
+        'created': _with_nulls(date_pool[rng.integers(0, len(date_pool), n_rows)], rng, 0.01),
+        'notes': _with_nulls(note_pool[rng.integers(0, len(note_pool), n_rows)], rng, 0.20),
+        'is_active': rng.random(n_rows) < 0.8,
+    })
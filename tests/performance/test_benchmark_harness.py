@@ -0,0 +1,70 @@
+"""
+Unit tests for the benchmark harness itself.
+
+These run in the normal suite so the generator and the regression check
+stay correct even when nobody runs the benchmarks.
+"""
+
+import pandas as pd
+import pytest
+
+from tests.performance.benchmark import check_regression, load_baselines, measure, save_baseline
+from tests.performance.data_generator import generate_dataset, parse_scales
+
+
+class TestDataGenerator:
+    """Unit tests for generate_dataset."""
+
+    def test_same_seed_same_frame(self):
+        pd.testing.assert_frame_equal(generate_dataset(2_000), generate_dataset(2_000))
+        assert not generate_dataset(2_000, seed=1).equals(generate_dataset(2_000))
+
+    def test_mixed_dtypes_and_nulls(self):
+        df = generate_dataset(5_000)
+
+        assert df["id"].is_unique
+        assert df["amount"].isna().mean() == pytest.approx(0.10, abs=0.03)
+        assert df["notes"].isna().mean() == pytest.approx(0.20, abs=0.03)
+        assert df["notes"].dropna().str.len().mean() > 100
+        # Skewed: the hottest customer is far above the uniform share
+        assert df["customer"].value_counts(normalize=True).iloc[0] > 0.05
+
+    def test_parse_scales(self):
+        assert parse_scales("100k, 1M") == ["100k", "1m"]
+        with pytest.raises(ValueError, match="5m"):
+            parse_scales("5m")
+
+
+class TestRegressionCheck:
+    """Unit tests for check_regression and baseline storage."""
+
+    def test_within_tolerance_passes(self):
+        baseline = {"rows_per_sec": 1000.0, "peak_mb": 100.0}
+
+        assert check_regression({"rows_per_sec": 800.0, "peak_mb": 120.0}, baseline, 0.25) == []
+
+    def test_slower_and_bigger_fails(self):
+        baseline = {"rows_per_sec": 1000.0, "peak_mb": 100.0}
+
+        problems = check_regression({"rows_per_sec": 700.0, "peak_mb": 130.0}, baseline, 0.25)
+
+        assert len(problems) == 2
+        assert "throughput" in problems[0]
+        assert "peak memory" in problems[1]
+
+    def test_measure_and_save_round_trip(self, temp_dir):
+        path = str(temp_dir / "baselines.json")
+        result = measure("pipeline_cleaning", generate_dataset(1_000), rounds=1)
+
+        save_baseline("1k", "pipeline_cleaning", result, path)
+
+        stored = load_baselines(path)["results"]["1k"]["pipeline_cleaning"]
+        assert stored == {"rows_per_sec": result["rows_per_sec"], "peak_mb": result["peak_mb"]}
+        assert result["peak_mb"] > 0
+
+    def test_single_rule_peak_excludes_the_input_copy(self):
+        df = generate_dataset(20_000)
+
+        result = measure("select_columns", df, rounds=1)
+
+        assert result["peak_mb"] < df.memory_usage().sum() / 2**20
@@ -0,0 +1,73 @@
+"""
+Throughput and peak memory benchmarks for the ETL rule engine.
+
+Opt-in: these only run with ETL_BENCHMARK=1.
+
+    ETL_BENCHMARK=1 pytest tests/performance -m performance
+    ETL_BENCHMARK=1 ETL_BENCHMARK_SCALES=100k,1m,10m pytest tests/performance
+    ETL_BENCHMARK=1 ETL_BENCHMARK_UPDATE=1 pytest tests/performance   # re-record baselines
+
+A case fails when its throughput drops or its peak memory grows by more
+than ETL_BENCHMARK_TOLERANCE (default 0.25) against baselines.json, on a
+re-measurement as well as the first run. Baselines recorded on a machine
+with a different architecture or CPU count are not compared against.
+"""
+
+import os
+
+import pytest
+
+from tests.performance.benchmark import (
+    CASES,
+    DEFAULT_TOLERANCE,
+    case_available,
+    check_regression,
+    comparable,
+    load_baselines,
+    measure,
+    save_baseline,
+)
+from tests.performance.data_generator import SCALES, generate_dataset, parse_scales
+
+pytestmark = [
+    pytest.mark.performance,
+    pytest.mark.skipif(os.environ.get("ETL_BENCHMARK") != "1", reason="set ETL_BENCHMARK=1 to run benchmarks"),
+]
+
+SELECTED_SCALES = parse_scales(os.environ.get("ETL_BENCHMARK_SCALES", "100k"))
+UPDATE_BASELINES = os.environ.get("ETL_BENCHMARK_UPDATE") == "1"
+TOLERANCE = float(os.environ.get("ETL_BENCHMARK_TOLERANCE", DEFAULT_TOLERANCE))
+
+
+@pytest.fixture(scope="module", params=SELECTED_SCALES)
+def scaled_data(request):
+    """(scale name, frame); generated once per scale"""
+    return request.param, generate_dataset(SCALES[request.param])
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_benchmark(scaled_data, case):
+    reason = case_available(case)
+    if reason:
+        pytest.skip(reason)
+    scale, df = scaled_data
+    # Big scales take long enough per run that one timed round is representative
+    rounds = 5 if len(df) <= 1_000_000 else 1
+
+    result = measure(case, df, rounds=rounds)
+    print(f"\n{scale} {case}: {result['rows_per_sec']:,.0f} rows/s, {result['peak_mb']:.1f} MB peak")
+
+    if UPDATE_BASELINES:
+        save_baseline(scale, case, result)
+        return
+    baselines = load_baselines()
+    if not comparable(baselines):
+        pytest.skip("baselines were recorded on different hardware; re-record with ETL_BENCHMARK_UPDATE=1")
+    baseline = baselines["results"].get(scale, {}).get(case)
+    if baseline is None:
+        pytest.skip(f"no baseline for {case} at {scale}; record one with ETL_BENCHMARK_UPDATE=1")
+    problems = check_regression(result, baseline, TOLERANCE)
+    if problems:
+        # Confirm before failing: one noisy run on a busy machine is not a regression
+        problems = check_regression(measure(case, df, rounds=rounds), baseline, TOLERANCE)
+    assert not problems, f"{case} at {scale} regressed: " + "; ".join(problems)
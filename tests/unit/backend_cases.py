@@ -0,0 +1,77 @@
+"""
+Rule cases and helpers shared by the tests of the non-pandas backends.
+
+Each case is a list of (rule_type, config) run through the pandas engine
+and a backend over write_orders(); results are compared as text so dtype
+differences between engines do not count.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.etl_engine import ETLPipeline, TransformRule
+
+ARROW = {"string_engine": "arrow"}
+
+PARITY_CASES = {
+    "filter_compare": [("filter_rows", {"column": "id", "operator": ">=", "value": 3})],
+    "filter_not_equal_keeps_missing": [("filter_rows", {"column": "city", "operator": "!=", "value": "Vinh"})],
+    "filter_contains": [("filter_rows", {"column": "code", "operator": "contains", "value": r"\d{2}", **ARROW})],
+    "filter_not_contains": [("filter_rows", {"column": "code", "operator": "not_contains", "value": "B", **ARROW})],
+    "dedup_rows": [("remove_duplicates", {})],
+    "dedup_rows_none": [("remove_duplicates", {"keep": False})],
+    "dedup_subset_last": [("remove_duplicates", {"columns": ["id"], "keep": "last"})],
+    "fill_constant": [("fill_missing", {"columns": ["amount"], "value": 0.0})],
+    "fill_mean": [("fill_missing", {"columns": ["amount"], "method": "mean"})],
+    "fill_median": [("fill_missing", {"columns": ["amount"], "method": "median"})],
+    "fill_mode": [("fill_missing", {"columns": ["city"], "method": "mode"})],
+    "fill_forward": [("fill_missing", {"columns": ["amount", "city"], "method": "forward"})],
+    "fill_backward": [("fill_missing", {"columns": ["amount"], "method": "backward"})],
+    "drop_missing": [("drop_missing", {"columns": ["amount", "city"]})],
+    "drop_missing_threshold": [("drop_missing", {"threshold": 5})],
+    "convert_integer": [("convert_type", {"columns": ["amount"], "target_type": "integer"})],
+    "convert_datetime": [("convert_type", {"columns": ["when"], "target_type": "datetime"})],
+    "convert_datetime_format": [("convert_type", {"columns": ["when"], "target_type": "datetime",
+                                                  "format": "%Y-%m-%d"})],
+    "convert_boolean": [("convert_type", {"columns": ["amount", "code"], "target_type": "boolean"})],
+    "rename": [("rename_column", {"mapping": {"id": "ident", "absent": "x"}})],
+    "trim_default_columns": [("trim_strings", dict(ARROW))],
+    "upper": [("normalize_text", {"columns": ["city"], "case": "upper", **ARROW})],
+    "replace": [("replace_values", {"column": "code", "mapping": {"x": "X", "B-7": "B-07"}})],
+    "replace_numbers": [("replace_values", {"column": "id", "mapping": {2: 20, "a": 1}})],
+    "extract": [("extract_pattern", {"column": "code", "pattern": r"-(\d+)", "new_column": "num", **ARROW})],
+    "select": [("select_columns", {"columns": ["code", "id"]})],
+    "chain": [
+        ("trim_strings", dict(ARROW)),
+        ("remove_duplicates", {}),
+        ("fill_missing", {"columns": ["amount"], "method": "forward"}),
+        ("filter_rows", {"column": "amount", "operator": ">", "value": 2.5}),
+        ("rename_column", {"mapping": {"city": "town"}}),
+    ],
+}
+
+
+def make_pipeline(rules) -> ETLPipeline:
+    pipeline = ETLPipeline("parity")
+    for i, (rule_type, config) in enumerate(rules):
+        pipeline.add_rule(TransformRule(f"r{i}", rule_type, config))
+    return pipeline
+
+
+def as_text(df: pd.DataFrame) -> pd.DataFrame:
+    """Values as text, missing as None, so dtype differences between engines do not count"""
+    df = df.reset_index(drop=True)
+    return pd.DataFrame({
+        col: [None if pd.isna(value) else str(value) for value in df[col]] for col in df.columns
+    })
+
+
+def write_orders(path):
+    pd.DataFrame({
+        "id": [1, 2, 2, 3, 4, 5, 5, 6],
+        "city": [" Hanoi", "Hue ", "Hue ", None, "Da Nang", "hanoi\t", "hanoi\t", "Vinh"],
+        "amount": [10.0, np.nan, np.nan, 3.0, 7.0, np.nan, np.nan, 2.0],
+        "code": ["A-12", "B-7", "B-7", "x", "C-99", None, None, "D-1"],
+        "when": ["2024-01-02", "2024-02-03", "2024-02-03", "bad", "2024-03-04", None, None, "2024-05-06"],
+    }).to_csv(path, index=False)
+    return path
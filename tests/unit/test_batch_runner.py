@@ -0,0 +1,188 @@
+"""
+Unit tests for the batch runner.
+
+Tests running a saved pipeline over many files, the memory gate that
+bounds concurrency, and the command line entry point.
+"""
+
+import json
+import multiprocessing
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from utils import batch_runner
+from utils.batch_runner import BatchRunner, MemoryGate, main, output_names, read_input, run_batch
+from utils.etl_engine import PipelineManager, TransformRule
+
+real_run_file = batch_runner.run_file
+
+
+def run_file_killed_on_day1(pipeline_data, path, *args):
+    """run_file whose worker process dies on day1, as if killed for memory."""
+    if os.path.basename(path).startswith("day1"):
+        os._exit(1)
+    return real_run_file(pipeline_data, path, *args)
+
+
+class OneAtATime:
+    """Memory monitor whose budget admits a single file at a time."""
+
+    def get_memory_budget(self):
+        return 1
+
+
+@pytest.fixture
+def pipeline_config(temp_dir):
+    """Pipelines file with a 'clean' pipeline, saved the way the GUI saves it."""
+    config = temp_dir / "pipelines.json"
+    manager = PipelineManager(str(config))
+    pipeline = manager.create_pipeline("clean")
+    pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["name"]}))
+    pipeline.add_rule(TransformRule("dedup", "remove_duplicates", {}))
+    manager.save_pipelines()
+    return config
+
+
+@pytest.fixture
+def input_files(temp_dir):
+    inputs = temp_dir / "in"
+    inputs.mkdir()
+    frame = pd.DataFrame({"id": [1, 1, 2], "name": [" a", " a", "b "]})
+    frame.to_csv(inputs / "day1.csv", index=False)
+    frame.to_csv(inputs / "day2.csv", index=False)
+    frame.to_json(inputs / "day3.json", orient="records")
+    with sqlite3.connect(inputs / "day4.db") as conn:
+        frame.to_sql("orders", conn, index=False)
+    (inputs / "broken.csv").write_text('id,name\n1,"unterminated\n', encoding="utf-8")
+    return inputs
+
+
+class TestBatchRunner:
+    """Unit tests for run_batch and BatchRunner."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_every_file_is_transformed_with_stats(self, pipeline_config, input_files, temp_dir, workers):
+        out = temp_dir / "out"
+
+        summary = run_batch("clean", [str(input_files / "day*")], str(out),
+                            config_file=str(pipeline_config), max_workers=workers)
+
+        assert summary["succeeded"] == 4 and summary["failed"] == 0
+        for name in ["day1", "day2", "day3", "day4"]:
+            result = pd.read_csv(out / f"{name}.csv")
+            assert result["name"].tolist() == ["a", "b"]
+            stats = json.loads((out / f"{name}.stats.json").read_text(encoding="utf-8"))
+            assert stats["rows_in"] == 3 and stats["rows_out"] == 2
+        saved = json.loads((out / "batch_summary.json").read_text(encoding="utf-8"))
+        assert [entry["status"] for entry in saved["files"]] == ["ok"] * 4
+
+    def test_failing_file_is_reported_without_stopping_the_batch(self, pipeline_config, input_files, temp_dir):
+        out = temp_dir / "out"
+
+        summary = run_batch("clean", [str(input_files / "*.csv")], str(out),
+                            config_file=str(pipeline_config), max_workers=2)
+
+        statuses = {entry["file"].rsplit("/", 1)[-1]: entry["status"] for entry in summary["files"]}
+        assert statuses == {"broken.csv": "failed", "day1.csv": "ok", "day2.csv": "ok"}
+        assert summary["files"][0]["errors"]
+
+    @pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                        reason="patched run_file reaches workers only when they fork")
+    def test_dead_worker_fails_its_file_and_the_batch_goes_on(self, pipeline_config, input_files,
+                                                               temp_dir, monkeypatch):
+        monkeypatch.setattr(batch_runner, "run_file", run_file_killed_on_day1)
+        pipeline = PipelineManager(str(pipeline_config)).get_pipeline("clean")
+        paths = sorted(str(path) for path in input_files.glob("day[123].*"))
+        out = temp_dir / "out"
+
+        summary = BatchRunner(pipeline, str(out), max_workers=2, memory_monitor=OneAtATime()).run(paths)
+
+        assert [entry["status"] for entry in summary["files"]] == ["failed", "ok", "ok"]
+        assert summary["files"][0]["errors"]
+        saved = json.loads((out / "batch_summary.json").read_text(encoding="utf-8"))
+        assert saved["succeeded"] == 2 and saved["failed"] == 1
+
+    def test_result_cache_reuses_unchanged_files(self, pipeline_config, input_files, temp_dir):
+        cache_dir = str(temp_dir / "cache")
+        patterns = [str(input_files / "day[14].*")]
+
+        first = run_batch("clean", patterns, str(temp_dir / "out1"), config_file=str(pipeline_config),
+                          max_workers=1, cache_dir=cache_dir, sqlite_table="orders")
+        second = run_batch("clean", patterns, str(temp_dir / "out2"), config_file=str(pipeline_config),
+                           max_workers=2, cache_dir=cache_dir, sqlite_table="orders")
+
+        assert [entry["result_cache"] for entry in first["files"]] == ["miss", "miss"]
+        assert [entry["result_cache"] for entry in second["files"]] == ["hit", "hit"]
+        assert pd.read_csv(temp_dir / "out2" / "day4.csv")["name"].tolist() == ["a", "b"]
+
+    def test_unknown_pipeline_and_empty_glob(self, pipeline_config, temp_dir):
+        with pytest.raises(ValueError, match="not found"):
+            run_batch("nope", ["*.csv"], str(temp_dir), config_file=str(pipeline_config))
+        with pytest.raises(ValueError, match="No input files"):
+            run_batch("clean", [str(temp_dir / "*.parquet")], str(temp_dir), config_file=str(pipeline_config))
+
+    def test_rejects_unknown_output_format(self, pipeline_config, temp_dir):
+        pipeline = PipelineManager(str(pipeline_config)).get_pipeline("clean")
+
+        with pytest.raises(ValueError, match="output format"):
+            BatchRunner(pipeline, str(temp_dir), output_format="parquet")
+
+    def test_only_the_columns_the_pipeline_needs_are_read(self, input_files, temp_dir, monkeypatch):
+        pipeline = PipelineManager(str(temp_dir / "pipelines.json")).create_pipeline("names")
+        pipeline.add_rule(TransformRule("keep", "select_columns", {"columns": ["name"]}))
+        read = []
+        monkeypatch.setattr(batch_runner, "read_input",
+                            lambda *args: read.append(args[2]) or read_input(*args))
+
+        summary = BatchRunner(pipeline, str(temp_dir / "out"), max_workers=1).run([str(input_files / "day1.csv")])
+
+        assert summary["succeeded"] == 1
+        assert read == [["name"]]
+        assert pd.read_csv(temp_dir / "out" / "day1.csv").columns.tolist() == ["name"]
+
+    @pytest.mark.parametrize("name", ["day1.csv", "day3.json", "day4.db"])
+    def test_read_input_skips_unwanted_and_missing_columns(self, input_files, name):
+        df = read_input(str(input_files / name), columns=["name", "missing"])
+
+        assert df.columns.tolist() == ["name"]
+
+    def test_same_file_names_get_distinct_outputs(self):
+        assert output_names(["a/x.csv", "b/x.csv", "x.json"]) == {"a/x.csv": "x", "b/x.csv": "x_2", "x.json": "x_3"}
+
+
+class TestMemoryGate:
+    """Unit tests for MemoryGate."""
+
+    def test_admits_while_budget_allows(self):
+        gate = MemoryGate(budget=100)
+
+        assert gate.try_acquire(60)
+        assert not gate.try_acquire(60)
+        gate.release(60)
+        assert gate.try_acquire(60)
+        assert gate.try_acquire(40)
+
+    def test_oversized_item_runs_alone(self):
+        gate = MemoryGate(budget=10)
+
+        assert gate.try_acquire(500)
+        assert not gate.try_acquire(1)
+
+
+class TestCommandLine:
+    """Unit tests for the batch CLI."""
+
+    def test_cli_exit_codes(self, pipeline_config, input_files, temp_dir, capsys):
+        args = ["clean", str(input_files / "day1.csv"), "-o", str(temp_dir / "out"),
+                "-c", str(pipeline_config), "-w", "1", "-f", "json"]
+
+        assert main(args) == 0
+        assert "1/1 files succeeded" in capsys.readouterr().out
+        assert pd.read_json(temp_dir / "out" / "day1.json")["id"].tolist() == [1, 2]
+
+        assert main(["clean", str(input_files / "broken.csv"), "-o", str(temp_dir / "out"),
+                     "-c", str(pipeline_config)]) == 1
+        assert main(["missing", "x", "-o", str(temp_dir / "out"), "-c", str(pipeline_config)]) == 2
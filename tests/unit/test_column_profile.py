@@ -0,0 +1,113 @@
+"""
+Unit tests for single-pass column profiling.
+
+Tests DataQualityChecker.profile_data against the per-metric pandas
+expressions it replaces, over numeric, nullable, text, categorical and
+datetime columns.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.column_profile import profile_column
+from utils.etl_engine import DataQualityChecker
+
+
+def reference_profile(series: pd.Series) -> dict:
+    """One pandas expression per metric, as profile_data used to compute them."""
+    profile = {
+        "dtype": str(series.dtype),
+        "missing_count": int(series.isna().sum()),
+        "missing_percent": float(series.isna().sum() / len(series) * 100),
+        "unique_count": int(series.nunique()),
+        "unique_percent": float(series.nunique() / len(series) * 100),
+    }
+    if pd.api.types.is_numeric_dtype(series):
+        empty = series.isna().all()
+        for stat in ("min", "max", "mean", "median", "std"):
+            profile[stat] = None if empty else float(getattr(series, stat)())
+    elif pd.api.types.is_string_dtype(series) or series.dtype == "object":
+        lengths = series.astype(str).str.len()
+        profile.update({
+            "avg_length": float(lengths.mean()),
+            "max_length": int(lengths.max()),
+            "min_length": int(lengths.min()),
+        })
+    return profile
+
+
+def assert_same_profile(actual: dict, expected: dict):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert actual[key] == pytest.approx(value, rel=1e-9, nan_ok=True), key
+        else:
+            assert actual[key] == value, key
+            assert type(actual[key]) is type(value), key
+
+
+@pytest.fixture
+def mixed_frame() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    n = 5_000
+    floats = rng.normal(size=n)
+    floats[::7] = np.nan
+    return pd.DataFrame({
+        "flag": rng.random(n) < 0.3,
+        "count": rng.integers(-50, 50, n),
+        "amount": floats,
+        "empty": np.full(n, np.nan),
+        "nullable": pd.array(np.where(rng.random(n) < 0.2, None, rng.integers(0, 9, n)), dtype="Int64"),
+        "city": rng.choice(["Hanoi", "Huế", "Da Nang", None, np.nan], n).astype(object),
+        "mixed": rng.choice(np.array([1, 1.0, True, "1", None, "x"], dtype=object), n),
+        "category": pd.Categorical(rng.choice(["a", "bb", None], n), categories=["a", "bb", "unused"]),
+        "text": pd.array(rng.choice(["x", "yyy", None], n), dtype="string"),
+        "when": pd.to_datetime(rng.choice(["2024-01-01", "2024-02-01", None], n)),
+    })
+
+
+class TestProfileData:
+    """DataQualityChecker.profile_data against the reference expressions."""
+
+    def test_columns_match_reference(self, mixed_frame):
+        profile = DataQualityChecker.profile_data(mixed_frame)
+
+        for col in mixed_frame.columns:
+            assert_same_profile(profile["columns"][col], reference_profile(mixed_frame[col]))
+
+    def test_frame_totals_match_reference(self, mixed_frame):
+        profile = DataQualityChecker.profile_data(mixed_frame)
+
+        assert profile["total_rows"] == len(mixed_frame)
+        assert profile["total_columns"] == len(mixed_frame.columns)
+        assert math.isclose(profile["memory_usage"], mixed_frame.memory_usage(deep=True).sum() / 1024**2)
+
+    def test_empty_frame(self):
+        profile = DataQualityChecker.profile_data(pd.DataFrame({"n": pd.Series([], dtype=float),
+                                                                "s": pd.Series([], dtype=object)}))
+
+        assert profile["columns"]["n"]["missing_percent"] == 0.0
+        assert profile["columns"]["n"]["mean"] is None
+        assert profile["columns"]["s"]["avg_length"] is None
+
+
+class TestProfileColumn:
+    """Unit tests for profile_column."""
+
+    def test_large_integers_are_not_merged(self):
+        series = pd.Series(pd.array([2**53, 2**53 + 1, None], dtype="Int64"))
+
+        profile, _ = profile_column(series)
+
+        assert profile["unique_count"] == 2
+        assert profile["missing_count"] == 1
+
+    def test_single_value_has_no_spread(self):
+        profile, memory = profile_column(pd.Series([4.0, np.nan]))
+
+        assert profile["median"] == 4.0
+        assert math.isnan(profile["std"])
+        assert memory == 16
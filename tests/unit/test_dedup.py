@@ -0,0 +1,95 @@
+"""
+Unit tests for hash-based duplicate detection.
+
+Tests that duplicate_mask and PartitionedDeduplicator agree with
+DataFrame.duplicated, including on hash collisions.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.dedup as dedup
+from utils.dedup import PartitionedDeduplicator, PositionFilter, duplicate_mask, row_hashes
+
+
+@pytest.fixture
+def frame_with_duplicates() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "id": rng.integers(0, 40, size=300),
+        "score": rng.choice([1.5, 2.0, np.nan], size=300),
+        "tag": rng.choice(["a", "b", None, np.nan], size=300),
+    })
+    return pd.concat([df, df.sample(60, random_state=4)], ignore_index=True)
+
+
+class TestDuplicateMask:
+    """Unit tests for duplicate_mask."""
+
+    @pytest.mark.parametrize("keep", ["first", "last", False])
+    @pytest.mark.parametrize("subset", [None, ["id"], ["score", "tag"]])
+    def test_matches_pandas(self, frame_with_duplicates, monkeypatch, keep, subset):
+        monkeypatch.setattr(dedup, "HASH_MIN_ROWS", 0)
+
+        mask = duplicate_mask(frame_with_duplicates, subset=subset, keep=keep)
+
+        expected = frame_with_duplicates.duplicated(subset=subset, keep=keep).to_numpy()
+        np.testing.assert_array_equal(mask, expected)
+
+    @pytest.mark.parametrize("column", [
+        pd.Series([None, np.nan, pd.NaT, "x"], dtype=object),
+        pd.Series([0.0, -0.0, 1.0, np.nan]),
+        pd.Series([0.0, -0.0, 1, "1"], dtype=object),
+    ])
+    @pytest.mark.parametrize("subset", [None, ["value"]])
+    @pytest.mark.parametrize("keep", ["first", False])
+    def test_matches_pandas_above_hash_threshold(self, column, keep, subset):
+        rows = dedup.HASH_MIN_ROWS + 4
+        df = pd.DataFrame({
+            "id": np.arange(rows) % 3,
+            "value": np.resize(column.to_numpy(), rows),
+        }).astype({"value": column.dtype})
+
+        mask = duplicate_mask(df, subset=subset, keep=keep)
+
+        np.testing.assert_array_equal(mask, df.duplicated(subset=subset, keep=keep).to_numpy())
+
+    def test_int_and_float_chunks_hash_alike(self):
+        ints = pd.DataFrame({"id": [1, 2], "name": ["x", None]})
+        floats = pd.DataFrame({"id": [1.0, 2.0], "name": ["x", np.nan]})
+
+        np.testing.assert_array_equal(row_hashes(ints), row_hashes(floats))
+
+    def test_hash_collision_does_not_drop_distinct_rows(self):
+        keys = pd.DataFrame({"a": [1, 2, 3, 3]})
+        colliding = np.array([7, 7, 9, 9], dtype=np.uint64)
+
+        mask = dedup._duplicates_by_hash(keys, colliding, "first")
+
+        assert mask.tolist() == [False, False, False, True]
+
+
+class TestPartitionedDeduplicator:
+    """Unit tests for the out-of-core deduplicator."""
+
+    @pytest.mark.parametrize("keep", ["first", "last", False])
+    def test_chunked_positions_match_pandas(self, frame_with_duplicates, temp_dir, keep):
+        deduplicator = PartitionedDeduplicator(subset=["id", "tag"], keep=keep,
+                                               n_partitions=4, spill_dir=str(temp_dir))
+        for start in range(0, len(frame_with_duplicates), 50):
+            deduplicator.update(frame_with_duplicates.iloc[start:start + 50])
+
+        drops = deduplicator.finalize()
+
+        expected = frame_with_duplicates.duplicated(subset=["id", "tag"], keep=keep).to_numpy()
+        np.testing.assert_array_equal(drops, np.flatnonzero(expected))
+        assert list(temp_dir.iterdir()) == []
+
+    def test_position_filter_spans_chunks(self):
+        position_filter = PositionFilter(np.array([1, 3]))
+
+        first = position_filter(pd.DataFrame({"v": [10, 11]}))
+        second = position_filter(pd.DataFrame({"v": [12, 13]}))
+
+        assert first["v"].tolist() + second["v"].tolist() == [10, 12]
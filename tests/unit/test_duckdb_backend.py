@@ -0,0 +1,85 @@
+"""
+Unit tests for the DuckDB backend.
+
+Tests that pipelines run through execute_duckdb give the same result as
+the pandas engine, over files and DataFrames, and that rules without a
+SQL translation are rejected before anything runs.
+"""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+from tests.unit.backend_cases import PARITY_CASES, as_text, make_pipeline, write_orders
+
+
+@pytest.fixture
+def orders_csv(temp_dir):
+    return write_orders(temp_dir / "orders.csv")
+
+
+class TestParity:
+    """The DuckDB backend against the pandas reference implementation."""
+
+    @pytest.mark.parametrize("case", sorted(PARITY_CASES))
+    def test_same_result_as_pandas(self, case, orders_csv):
+        pipeline = make_pipeline(PARITY_CASES[case])
+        expected, _ = pipeline.execute(pd.read_csv(orders_csv))
+
+        from_file, stats = pipeline.execute_duckdb(str(orders_csv))
+        from_frame, _ = pipeline.execute_duckdb(pd.read_csv(orders_csv))
+
+        pd.testing.assert_frame_equal(as_text(from_file), as_text(expected))
+        pd.testing.assert_frame_equal(as_text(from_frame), as_text(expected))
+        assert stats["initial_rows"] is None
+        assert stats["final_rows"] == len(expected)
+
+
+class TestExecuteDuckDB:
+    """Unit tests for execute_duckdb."""
+
+    def test_writes_output_file_without_returning_frame(self, orders_csv, temp_dir):
+        pipeline = make_pipeline(PARITY_CASES["chain"])
+        output = temp_dir / "out.csv"
+
+        result, stats = pipeline.execute_duckdb(str(orders_csv), output_path=str(output),
+                                                threads=1, memory_limit="256MB",
+                                                temp_directory=str(temp_dir / "spill"))
+
+        assert result is None
+        assert stats["mode"] == "duckdb"
+        assert stats["final_rows"] == 5
+        assert pd.read_csv(output)["town"].fillna("").tolist() == ["Hanoi", "Hue", "", "Da Nang", "hanoi"]
+        assert pipeline.execution_log[-1] is stats
+
+    def test_input_rows_are_counted_only_when_free_or_asked(self, orders_csv, temp_dir):
+        pipeline = make_pipeline(PARITY_CASES["chain"])
+        orders_parquet = temp_dir / "orders.parquet"
+        pd.read_csv(orders_csv).to_parquet(orders_parquet)
+
+        _, csv_stats = pipeline.execute_duckdb(str(orders_csv))
+        _, counted_stats = pipeline.execute_duckdb(str(orders_csv), count_input_rows=True)
+        _, parquet_stats = pipeline.execute_duckdb(str(orders_parquet))
+        _, frame_stats = pipeline.execute_duckdb(pd.read_csv(orders_csv))
+
+        assert csv_stats["initial_rows"] is None
+        assert [counted_stats["initial_rows"], parquet_stats["initial_rows"], frame_stats["initial_rows"]] == [8, 8, 8]
+
+    def test_untranslatable_rules_are_rejected(self, orders_csv):
+        expression = make_pipeline([("filter_expr", {"expression": {"column": "id", "op": ">", "value": 2}})])
+        title = make_pipeline([("normalize_text", {"columns": ["city"], "case": "title"})])
+        mistyped = make_pipeline([("fill_missing", {"columns": ["amount"], "value": "n/a"})])
+
+        for pipeline in (expression, title, mistyped):
+            with pytest.raises(ValueError, match="Rule r0"):
+                pipeline.execute_duckdb(str(orders_csv))
+        assert not expression.execution_log
+
+    def test_noop_rules_are_skipped_by_the_plan(self, orders_csv):
+        pipeline = make_pipeline([("rename_column", {"mapping": {}}), ("select_columns", {"columns": ["id"]})])
+
+        result, stats = pipeline.execute_duckdb(str(orders_csv))
+
+        assert list(result.columns) == ["id"]
+        assert [entry["rule"] for entry in stats["rules_skipped"]] == ["r0"]
@@ -0,0 +1,154 @@
+"""
+Unit tests for ETL checkpoint cache.
+
+Tests incremental re-execution of ETLPipeline from per-step checkpoints.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.column_kernels import with_columns
+from utils.etl_cache import CheckpointCache, dataframe_fingerprint, estimated_bytes
+from utils.etl_engine import ETLPipeline, TransformRule
+
+
+@pytest.fixture
+def pipeline() -> ETLPipeline:
+    pipeline = ETLPipeline("incremental")
+    pipeline.add_rule(TransformRule("dedup", "remove_duplicates", {}))
+    pipeline.add_rule(TransformRule("fill", "fill_missing", {"columns": ["grade"], "value": "F"}))
+    pipeline.add_rule(TransformRule("keep", "filter_rows", {"column": "course_id", "operator": "!=", "value": 103}))
+    return pipeline
+
+
+class TestDataframeFingerprint:
+    """Unit tests for dataframe_fingerprint."""
+
+    def test_fingerprint_is_content_based(self, sample_dataframe):
+        assert dataframe_fingerprint(sample_dataframe) == dataframe_fingerprint(sample_dataframe.copy())
+
+        changed = sample_dataframe.copy()
+        changed.loc[0, "grade"] = "B"
+        assert dataframe_fingerprint(changed) != dataframe_fingerprint(sample_dataframe)
+
+    def test_nested_json_values(self):
+        df = pd.DataFrame({"payload": [{"a": 1}, [1, 2], "text"], "n": [1, 2, 3]})
+        changed = df.copy()
+        changed.at[0, "payload"] = {"a": 2}
+
+        assert dataframe_fingerprint(df) == dataframe_fingerprint(df.copy())
+        assert dataframe_fingerprint(changed) != dataframe_fingerprint(df)
+
+
+class TestIncrementalExecution:
+    """Unit tests for ETLPipeline.execute with a CheckpointCache."""
+
+    def test_rerun_resumes_from_last_unchanged_step(self, pipeline, sample_dataframe):
+        cache = CheckpointCache()
+        first, _ = pipeline.execute(sample_dataframe, checkpoint_cache=cache)
+
+        pipeline.add_rule(TransformRule("upper", "normalize_text", {"columns": ["student_name"], "case": "upper"}))
+        second, stats = pipeline.execute(sample_dataframe, checkpoint_cache=cache)
+
+        assert stats["resumed_from_step"] == 3
+        assert [entry.get("cached", False) for entry in stats["rules_applied"]] == [True, True, True, False]
+        expected, _ = pipeline.execute(sample_dataframe)
+        pd.testing.assert_frame_equal(second, expected)
+
+    def test_editing_a_rule_invalidates_later_checkpoints(self, pipeline, sample_dataframe):
+        cache = CheckpointCache()
+        pipeline.execute(sample_dataframe, checkpoint_cache=cache)
+
+        pipeline.rules[1].config["value"] = "Z"
+        _, stats = pipeline.execute(sample_dataframe, checkpoint_cache=cache)
+
+        assert stats["resumed_from_step"] == 1
+
+    def test_nested_values_run_with_checkpoints(self):
+        pipeline = ETLPipeline("json")
+        pipeline.add_rule(TransformRule("keep", "filter_rows", {"column": "n", "operator": ">", "value": 1}))
+        df = pd.DataFrame({"payload": [{"a": 1}, [1, 2], {"b": None}], "n": [1, 2, 3]})
+        cache = CheckpointCache()
+
+        first, stats = pipeline.execute(df, checkpoint_cache=cache)
+        _, rerun = pipeline.execute(df, checkpoint_cache=cache, input_fingerprint=stats["input_fingerprint"])
+
+        assert first["payload"].tolist() == [[1, 2], {"b": None}]
+        assert rerun["resumed_from_step"] == 1
+
+    def test_frame_larger_than_the_budget_resumes_from_spill(self, pipeline, sample_dataframe, temp_dir):
+        cache = CheckpointCache(memory_budget_mb=estimated_bytes(sample_dataframe) / 2 / (1024 * 1024),
+                                spill_dir=str(temp_dir))
+        pipeline.execute(sample_dataframe, checkpoint_cache=cache)
+
+        pipeline.add_rule(TransformRule("upper", "normalize_text", {"columns": ["student_name"], "case": "upper"}))
+        second, stats = pipeline.execute(sample_dataframe, checkpoint_cache=cache)
+
+        assert cache.stats["spills"] >= 3
+        assert stats["resumed_from_step"] == 3
+        expected, _ = pipeline.execute(sample_dataframe)
+        pd.testing.assert_frame_equal(second, expected)
+
+    def test_checkpoints_are_not_mutated_by_later_runs(self, pipeline, sample_dataframe):
+        cache = CheckpointCache()
+        first, _ = pipeline.execute(sample_dataframe, checkpoint_cache=cache)
+        first["grade"] = "mutated"
+
+        second, _ = pipeline.execute(sample_dataframe, checkpoint_cache=cache)
+
+        assert "mutated" not in second["grade"].tolist()
+
+
+class TestCheckpointCache:
+    """Unit tests for CheckpointCache eviction and spilling."""
+
+    def test_eviction_respects_memory_budget(self, sample_dataframe):
+        size = int(sample_dataframe.memory_usage(index=True, deep=True).sum())
+        cache = CheckpointCache(memory_budget_mb=(size * 2.5) / (1024 * 1024))
+
+        for key in ["a", "b", "c"]:
+            cache.put(key, sample_dataframe.copy(), [])
+
+        assert "a" not in cache
+        assert "b" in cache and "c" in cache
+        assert cache.memory_used <= cache.memory_budget
+        assert cache.stats["evictions"] == 1
+
+    def test_shared_columns_count_once(self):
+        df = pd.DataFrame(np.random.default_rng(0).random((10_000, 8)), columns=list("abcdefgh"))
+        df["text"] = "value"
+        changed = with_columns(df, {"b": df["b"] * 2})
+        cache = CheckpointCache()
+
+        cache.put("first", df, [])
+        cache.put("second", changed, [])
+
+        assert cache.memory_used == estimated_bytes(df) + changed["b"].memory_usage(index=False)
+        assert cache.stats["evictions"] == 0
+        cache.put("first", df.copy(), [])
+        assert cache.memory_used == estimated_bytes(df) * 2
+
+    def test_large_checkpoints_are_sized_from_a_sample(self):
+        df = pd.DataFrame({"text": ["short", "a much longer value" * 3, None] * 20_000, "n": range(60_000)})
+
+        cache = CheckpointCache()
+        cache.put("a", df, [])
+
+        assert cache.memory_used == pytest.approx(df.memory_usage(index=True, deep=True).sum(), rel=0.05)
+
+    def test_evicted_checkpoints_spill_to_disk(self, sample_dataframe, temp_dir):
+        size = int(sample_dataframe.memory_usage(index=True, deep=True).sum())
+        cache = CheckpointCache(memory_budget_mb=(size * 1.5) / (1024 * 1024), spill_dir=str(temp_dir))
+
+        cache.put("a", sample_dataframe.copy(), [{"rule": "x"}])
+        cache.put("b", sample_dataframe.copy(), [])
+
+        assert cache.stats["spills"] == 1
+        df, step_stats = cache.get("a")
+        pd.testing.assert_frame_equal(df, sample_dataframe)
+        assert step_stats == [{"rule": "x"}]
+
+        cache.clear()
+        assert len(cache) == 0
+        assert list(temp_dir.iterdir()) == []
@@ -0,0 +1,586 @@
+"""
+Unit tests for ETL Engine module.
+
+Tests TransformRule behaviour and ETLPipeline planning and execution.
+"""
+
+import asyncio
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import column_kernels
+from utils.column_kernels import map_unique_values, parse_datetimes
+from utils.etl_engine import ETLPipeline, TransformRule
+from utils.etl_cache import CheckpointCache
+from utils.etl_planner import RuleContext
+from utils.etl_scheduler import ColumnScheduler
+from utils.performance_optimizer import CancellationToken, OperationCancelledError
+
+
+def apply_sequentially(rules, df):
+    """Reference execution: apply each enabled rule in order, unplanned."""
+    result = df.copy()
+    for rule in rules:
+        result = rule.apply(result)
+    return result
+
+
+@pytest.fixture
+def messy_dataframe() -> pd.DataFrame:
+    return pd.DataFrame({
+        "name": ["  Alice ", "BOB", None, " carol", "Dave  "],
+        "city": [" Hanoi", "hue ", "Hanoi", np.nan, "Da Nang"],
+        "status": ["A", "B", "A", "C", "B"],
+        "score": [1.5, np.nan, 3.0, 4.5, 2.0],
+    })
+
+
+class TestPlanCompiler:
+    """Unit tests for ETLPipeline.compile and explain."""
+
+    def test_consecutive_column_rules_are_fused(self):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["name"]}))
+        pipeline.add_rule(TransformRule("lower", "normalize_text", {"columns": ["name"], "case": "lower"}))
+        pipeline.add_rule(TransformRule("map", "replace_values", {"column": "name", "mapping": {"bob": "robert"}}))
+
+        plan = pipeline.compile()
+
+        assert len(plan.steps) == 1
+        assert plan.steps[0].kind == "fused_column"
+        assert plan.steps[0].chains["name"] == [
+            ("strip",), ("case", "lower"), ("replace", {"bob": "robert"})
+        ]
+
+    def test_non_fusable_rule_breaks_run(self):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["name"]}))
+        pipeline.add_rule(TransformRule("dedup", "remove_duplicates", {}))
+        pipeline.add_rule(TransformRule("lower", "normalize_text", {"columns": ["name"]}))
+
+        kinds = [step.kind for step in pipeline.compile().steps]
+
+        assert kinds == ["fused_column", "rule", "fused_column"]
+
+    def test_noop_rules_are_dropped(self):
+        disabled = TransformRule("off", "trim_strings", {"columns": ["name"]})
+        disabled.enabled = False
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(disabled)
+        pipeline.add_rule(TransformRule("rename", "rename_column", {"mapping": {}}))
+        pipeline.add_rule(TransformRule("convert", "convert_type", {"columns": []}))
+        pipeline.add_rule(TransformRule("dedup", "remove_duplicates", {}))
+        pipeline.add_rule(TransformRule("dedup_again", "remove_duplicates", {}))
+        pipeline.add_rule(TransformRule("mystery", "no_such_rule", {}))
+
+        plan = pipeline.compile()
+
+        assert [step.name for step in plan.steps] == ["dedup"]
+        dropped = {entry["rule"]: entry["reason"] for entry in plan.dropped}
+        assert dropped["off"] == "disabled"
+        assert dropped["rename"] == "empty mapping"
+        assert dropped["convert"] == "no columns"
+        assert dropped["dedup_again"] == "repeats 'dedup'"
+        assert "unknown rule type" in dropped["mystery"]
+
+    def test_explain_lists_steps_and_dropped_rules(self):
+        pipeline = ETLPipeline("orders")
+        pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["name", "city"]}))
+        pipeline.add_rule(TransformRule("upper", "normalize_text", {"columns": ["city"], "case": "upper"}))
+        pipeline.add_rule(TransformRule("noop", "replace_values", {"column": "city", "mapping": {}}))
+
+        text = pipeline.explain()
+
+        assert "pipeline 'orders': 3 rules -> 1 steps" in text
+        assert "city: strip -> upper" in text
+        assert "'noop' (empty mapping)" in text
+
+
+class TestPipelineExecution:
+    """Unit tests for ETLPipeline.execute."""
+
+    def test_fused_execution_matches_sequential_rules(self, messy_dataframe):
+        rules = [
+            TransformRule("map_raw", "replace_values", {"column": "status", "mapping": {"A": "Active"}}),
+            TransformRule("trim", "trim_strings", {"columns": ["name", "city", "status"]}),
+            TransformRule("title", "normalize_text", {"columns": ["city"], "case": "title"}),
+            TransformRule("lower", "normalize_text", {"columns": ["name"], "case": "lower"}),
+            TransformRule("map", "replace_values", {"column": "name", "mapping": {"bob": "robert", "robert": "x"}}),
+        ]
+        pipeline = ETLPipeline("p")
+        for rule in rules:
+            pipeline.add_rule(rule)
+
+        result, stats = pipeline.execute(messy_dataframe)
+
+        pd.testing.assert_frame_equal(result, apply_sequentially(rules, messy_dataframe))
+        assert len(stats["rules_applied"]) == 1
+        assert stats["rules_applied"][0]["rules"] == ["map_raw", "trim", "title", "lower", "map"]
+
+    def test_failing_column_is_skipped_alone_fused_or_not(self):
+        df = pd.DataFrame({
+            "grade": pd.Categorical(["a", None, "b"]),
+            "note": [None, " x ", None],
+            "qty": ["1", None, "3"],
+        })
+        rules = [
+            # "n/a" is not a grade category, so filling grade fails
+            TransformRule("fill", "fill_missing", {"columns": ["grade", "note"], "value": "n/a"}),
+            TransformRule("trim", "trim_strings", {"columns": ["note"]}),
+            TransformRule("int", "convert_type", {"columns": ["qty"], "target_type": "integer"}),
+        ]
+        pipeline = ETLPipeline("p")
+        for rule in rules:
+            pipeline.add_rule(rule)
+
+        result, _ = pipeline.execute(df)
+        sequential = apply_sequentially(rules, df)
+
+        pd.testing.assert_frame_equal(result, sequential)
+        assert result["note"].tolist() == ["n/a", "x", "n/a"]
+        assert result["grade"].isna().sum() == 1
+        assert result["qty"].dtype == "Int64"
+
+    def test_snapshot_is_independent_of_later_edits(self):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("fill", "fill_missing", {"columns": ["a"], "value": "x"}))
+
+        snapshot = pipeline.snapshot()
+        pipeline.rules[0].config["value"] = "y"
+        pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["a"]}))
+
+        assert [rule.name for rule in snapshot.rules] == ["fill"]
+        assert snapshot.rules[0].config["value"] == "x"
+
+    def test_execute_does_not_modify_input(self, messy_dataframe):
+        original = messy_dataframe.copy()
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["name"]}))
+        pipeline.add_rule(TransformRule("fill", "fill_missing", {"columns": ["score"], "method": "mean"}))
+
+        pipeline.execute(messy_dataframe)
+
+        pd.testing.assert_frame_equal(messy_dataframe, original)
+
+    def test_rules_return_new_frames_without_mutating_input(self, messy_dataframe):
+        original = messy_dataframe.copy()
+
+        for rule in [
+            TransformRule("fill", "fill_missing", {"columns": ["score"], "value": 0}),
+            TransformRule("text", "convert_type", {"columns": ["score"], "target_type": "string"}),
+            TransformRule("trim", "trim_strings", {"columns": ["name"]}),
+            TransformRule("map", "replace_values", {"column": "status", "mapping": {"A": "X"}}),
+            TransformRule("domain", "extract_pattern", {"column": "city", "pattern": r"(\w+)", "new_column": "word"}),
+        ]:
+            assert rule.apply(messy_dataframe) is not messy_dataframe
+
+        pd.testing.assert_frame_equal(messy_dataframe, original)
+
+    def test_execute_shares_untouched_columns_instead_of_copying(self):
+        df = pd.DataFrame({f"c{i}": np.arange(200_000, dtype=float) for i in range(8)})
+        df.loc[::3, "c0"] = np.nan
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("fill", "fill_missing", {"columns": ["c0"], "value": -1.0}))
+        pipeline.add_rule(TransformRule("rename", "rename_column", {"mapping": {"c1": "first"}}))
+
+        tracemalloc.start()
+        result, _ = pipeline.execute(df)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        assert peak < df.memory_usage().sum() / 2
+        assert np.shares_memory(result["first"].to_numpy(), df["c1"].to_numpy())
+        assert df["c0"].isna().sum() == len(df["c0"][::3])
+        assert result["c0"].min() == -1.0
+
+    def test_skipped_rules_are_reported(self, messy_dataframe):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("empty", "normalize_text", {"columns": []}))
+
+        result, stats = pipeline.execute(messy_dataframe)
+
+        pd.testing.assert_frame_equal(result, messy_dataframe)
+        assert stats["rules_applied"] == []
+        assert stats["rules_skipped"] == [{"rule": "empty", "reason": "no columns"}]
+
+    def test_drop_missing_with_and_without_threshold(self, messy_dataframe):
+        by_how = TransformRule("drop", "drop_missing", {"columns": ["name", "score"]})
+        by_threshold = TransformRule("drop", "drop_missing", {"columns": ["name", "city", "score"], "threshold": 3})
+
+        assert by_how.apply(messy_dataframe.copy()).index.tolist() == [0, 3, 4]
+        assert by_threshold.apply(messy_dataframe.copy()).index.tolist() == [0, 4]
+
+
+class TestPreviewExecution:
+    """Unit tests for ETLPipeline.execute_preview."""
+
+    @pytest.fixture
+    def orders(self) -> pd.DataFrame:
+        rng = np.random.default_rng(5)
+        n = 20_000
+        return pd.DataFrame({
+            "customer": rng.integers(0, 2_000, n),
+            "city": rng.choice([" Hanoi", "Hue ", None], n),
+            "amount": np.where(rng.random(n) < 0.1, np.nan, rng.random(n) * 100),
+        })
+
+    @pytest.mark.parametrize("rules, full_steps", [
+        ([("dedup", "remove_duplicates", {"columns": ["customer"]}),
+          ("trim", "trim_strings", {"columns": ["city"]})], 0),
+        ([("rare", "filter_rows", {"column": "amount", "operator": ">", "value": 99.5}),
+          ("ffill", "fill_missing", {"columns": ["city"], "method": "forward"})], 0),
+        ([("last", "remove_duplicates", {"columns": ["customer"], "keep": "last"}),
+          ("upper", "normalize_text", {"columns": ["city"], "case": "upper"})], 1),
+        ([("trim", "trim_strings", {"columns": ["city"]}),
+          ("mean", "fill_missing", {"columns": ["amount"], "method": "mean"}),
+          ("rare", "filter_rows", {"column": "amount", "operator": ">", "value": 99.5})], 1),
+    ], ids=["dedup_first", "selective_filter", "dedup_last", "mean_fill"])
+    def test_preview_is_head_of_full_result(self, orders, rules, full_steps):
+        pipeline = ETLPipeline("p")
+        for name, rule_type, config in rules:
+            pipeline.add_rule(TransformRule(name, rule_type, config))
+
+        preview, stats = pipeline.execute_preview(orders, limit=15)
+        expected, _ = pipeline.execute(orders)
+
+        pd.testing.assert_frame_equal(preview, expected.head(15))
+        assert stats["full_steps"] == full_steps
+        assert len(pipeline.execution_log) == 1
+
+    def test_only_a_prefix_is_transformed(self, orders):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["city"]}))
+        pipeline.add_rule(TransformRule("rare", "filter_rows", {"column": "amount", "operator": ">", "value": 99.5}))
+
+        preview, stats = pipeline.execute_preview(orders, limit=15)
+
+        assert len(preview) == 15
+        assert stats["rounds"] > 1
+        assert stats["input_rows"] < len(orders)
+
+    def test_short_result_reads_everything(self, orders):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("none", "filter_rows", {"column": "amount", "operator": ">", "value": 1000}))
+
+        preview, stats = pipeline.execute_preview(orders)
+
+        assert preview.empty
+        assert stats["input_rows"] == len(orders)
+
+
+class TestAsyncExecution:
+    """Unit tests for progress reporting, cancellation and execute_async."""
+
+    @pytest.fixture
+    def pipeline(self):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["name"]}))
+        pipeline.add_rule(TransformRule("keep", "filter_rows", {"column": "status", "operator": "!=", "value": "C"}))
+        pipeline.add_rule(TransformRule("dedup", "remove_duplicates", {"columns": ["status"]}))
+        return pipeline
+
+    def test_progress_is_reported_after_every_step(self, pipeline, messy_dataframe):
+        events = []
+
+        pipeline.execute(messy_dataframe, progress_callback=events.append)
+
+        total = len(pipeline.compile().steps)
+        assert total > 1
+        assert [e["step"] for e in events] == list(range(1, total + 1))
+        assert all(e["total_steps"] == total for e in events)
+        assert events[-1]["fraction"] == 1.0
+        assert events[-1]["rows"] == 2
+
+    def test_cancellation_stops_between_steps_and_keeps_checkpoints(self, pipeline, messy_dataframe):
+        token = CancellationToken()
+        cache = CheckpointCache()
+        events = []
+
+        def cancel_after_first_step(event):
+            events.append(event)
+            token.cancel()
+
+        with pytest.raises(OperationCancelledError):
+            pipeline.execute(messy_dataframe, checkpoint_cache=cache,
+                             progress_callback=cancel_after_first_step, cancellation_token=token)
+
+        assert len(events) == 1
+        assert not pipeline.execution_log
+        _, stats = pipeline.execute(messy_dataframe, checkpoint_cache=cache)
+        assert stats["resumed_from_step"] == 1
+
+    def test_execute_async_returns_awaitable_future(self, pipeline, messy_dataframe):
+        async def run():
+            return await asyncio.wrap_future(pipeline.execute_async(messy_dataframe))
+
+        result, stats = asyncio.run(run())
+
+        expected, _ = pipeline.execute(messy_dataframe)
+        pd.testing.assert_frame_equal(result, expected)
+        assert stats["final_rows"] == 2
+
+    def test_execute_async_cancelled_future_raises(self, pipeline, messy_dataframe):
+        token = CancellationToken()
+        token.cancel()
+
+        future = pipeline.execute_async(messy_dataframe, cancellation_token=token)
+
+        with pytest.raises(OperationCancelledError):
+            future.result(timeout=10)
+
+
+class TestColumnParallelExecution:
+    """Unit tests for dependency-aware fusion and the ColumnScheduler."""
+
+    @pytest.fixture
+    def wide_rules(self):
+        return [
+            TransformRule("trim", "trim_strings", {"columns": ["name", "city"]}),
+            TransformRule("extract", "extract_pattern", {"column": "status", "pattern": "(A)", "new_column": "flag"}),
+            TransformRule("lower", "normalize_text", {"columns": ["name"]}),
+            TransformRule("fill", "fill_missing", {"columns": ["score"], "method": "median"}),
+            TransformRule("to_str", "convert_type", {"columns": ["score"], "target_type": "string"}),
+        ]
+
+    def test_independent_column_rules_join_one_step(self, wide_rules):
+        pipeline = ETLPipeline("p")
+        for rule in wide_rules:
+            pipeline.add_rule(rule)
+
+        plan = pipeline.compile()
+
+        assert [step.name for step in plan.steps] == ["trim+lower+fill+to_str", "extract"]
+        assert plan.steps[0].chains["score"] == [("fill", "median", ""), ("convert", "string")]
+
+    def test_rule_reading_chain_column_is_not_hoisted(self):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["name"]}))
+        pipeline.add_rule(TransformRule("extract", "extract_pattern", {"column": "name", "pattern": "(a)", "new_column": "x"}))
+        pipeline.add_rule(TransformRule("lower", "normalize_text", {"columns": ["name"]}))
+
+        assert [step.name for step in pipeline.compile().steps] == ["trim", "extract", "lower"]
+
+    @pytest.mark.parametrize("mode", ["thread", "process"])
+    def test_parallel_modes_match_serial(self, messy_dataframe, wide_rules, mode):
+        serial = ETLPipeline("serial")
+        parallel = ETLPipeline("parallel")
+        parallel.scheduler = ColumnScheduler(max_workers=2, mode=mode, parallel_threshold=0)
+        for rule in wide_rules:
+            serial.add_rule(rule)
+            parallel.add_rule(rule)
+
+        expected, _ = serial.execute(messy_dataframe)
+        try:
+            result, _ = parallel.execute(messy_dataframe)
+        finally:
+            parallel.shutdown()
+
+        pd.testing.assert_frame_equal(result, expected)
+        pd.testing.assert_frame_equal(expected, apply_sequentially(wide_rules, messy_dataframe))
+
+    def test_process_pool_is_reused_and_never_forked(self, messy_dataframe):
+        scheduler = ColumnScheduler(max_workers=2, mode="process", parallel_threshold=0)
+        chains = {"name": [("strip",)], "city": [("case", "upper")]}
+        try:
+            first = scheduler.run(messy_dataframe, chains)
+            pool = scheduler._pool
+            second = scheduler.run(messy_dataframe, chains)
+
+            assert scheduler._pool is pool
+            assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+            pd.testing.assert_series_equal(first["city"], second["city"])
+        finally:
+            scheduler.shutdown()
+        assert scheduler._pool is None
+
+    def test_auto_mode_sends_python_heavy_chains_to_processes(self):
+        scheduler = ColumnScheduler(max_workers=4, parallel_threshold=100, process_threshold=300)
+        chains = {
+            "a": [("strip",)],
+            "b": [("case", "upper")],
+            "c": [("convert", "float")],
+        }
+
+        assert scheduler.assign(20, chains) == {"a": "inline", "b": "inline", "c": "inline"}
+        assert scheduler.assign(100, chains) == {"a": "thread", "b": "thread", "c": "thread"}
+        assert scheduler.assign(200, chains) == {"a": "process", "b": "process", "c": "thread"}
+        assert ColumnScheduler(max_workers=4, mode="serial").assign(10**6, chains)["a"] == "inline"
+
+
+class TestArrowStringEngine:
+    """Unit tests for text rules with string_engine='arrow'."""
+
+    def test_text_rules_keep_missing_values(self, messy_dataframe):
+        trim = TransformRule("trim", "trim_strings", {"columns": ["name"], "string_engine": "arrow"})
+        upper = TransformRule("upper", "normalize_text", {"columns": ["name"], "case": "upper", "string_engine": "arrow"})
+
+        result = upper.apply(trim.apply(messy_dataframe.copy()))
+
+        assert result["name"].tolist()[:2] == ["ALICE", "BOB"]
+        assert result["name"].isna().tolist() == [False, False, True, False, False]
+
+    def test_extract_and_contains(self, messy_dataframe):
+        extract = TransformRule("first", "extract_pattern", {
+            "column": "city", "pattern": r"^\s*(\w)", "new_column": "initial", "string_engine": "arrow"})
+        keep = TransformRule("keep", "filter_rows", {
+            "column": "city", "operator": "contains", "value": "an", "string_engine": "arrow"})
+
+        extracted = extract.apply(messy_dataframe.copy())
+        filtered = keep.apply(messy_dataframe.copy())
+
+        assert extracted["initial"].tolist()[:3] == ["H", "h", "H"]
+        assert pd.isna(extracted["initial"].iloc[3])
+        assert filtered["city"].tolist() == [" Hanoi", "Hanoi", "Da Nang"]
+
+    def test_pattern_unsupported_by_re2_falls_back(self, messy_dataframe):
+        rule = TransformRule("lookahead", "extract_pattern", {
+            "column": "status", "pattern": r"(\w)(?=$)", "new_column": "last", "string_engine": "arrow"})
+
+        result = rule.apply(messy_dataframe.copy())
+
+        assert result["last"].tolist() == ["A", "B", "A", "C", "B"]
+
+    def test_fused_arrow_rules_match_sequential(self, messy_dataframe):
+        rules = [
+            TransformRule("trim", "trim_strings", {"columns": ["name", "city"], "string_engine": "arrow"}),
+            TransformRule("title", "normalize_text", {"columns": ["city"], "case": "title", "string_engine": "arrow"}),
+            TransformRule("map", "replace_values", {"column": "city", "mapping": {"Hue": "Huế"}}),
+        ]
+        pipeline = ETLPipeline("p")
+        for rule in rules:
+            pipeline.add_rule(rule)
+
+        result, stats = pipeline.execute(messy_dataframe)
+
+        assert len(stats["rules_applied"]) == 1
+        assert "city: strip[arrow] -> title[arrow] -> replace(1)" in pipeline.explain()
+        pd.testing.assert_frame_equal(result, apply_sequentially(rules, messy_dataframe))
+
+
+class TestUniqueValueTransforms:
+    """Unit tests for text rules that transform each distinct value once."""
+
+    @pytest.fixture
+    def status_column(self):
+        return pd.Series([" Active", "closed ", None, " Active", np.nan, "closed "] * 5, name="status")
+
+    def test_low_cardinality_column_matches_elementwise_result(self, status_column):
+        df = pd.DataFrame({"status": status_column})
+        trim = TransformRule("trim", "trim_strings", {"columns": ["status"]})
+        code = TransformRule("code", "extract_pattern", {"column": "status", "pattern": r"^(\w)", "new_column": "code"})
+
+        result = code.apply(trim.apply(df.copy()))
+
+        expected = status_column.astype(str).str.strip()
+        pd.testing.assert_series_equal(result["status"], expected)
+        pd.testing.assert_series_equal(
+            result["code"], expected.str.extract(r"^(\w)", expand=False).rename("code"))
+
+    def test_categorical_column_stays_categorical(self, status_column):
+        df = pd.DataFrame({"status": status_column.astype("category")})
+        rules = [
+            TransformRule("trim", "trim_strings", {"columns": ["status"]}),
+            TransformRule("upper", "normalize_text", {"columns": ["status"], "case": "upper"}),
+            TransformRule("map", "replace_values", {"column": "status", "mapping": {"CLOSED": "DONE"}}),
+        ]
+
+        pipeline = ETLPipeline("p")
+        for rule in rules:
+            pipeline.add_rule(rule)
+
+        result, _ = pipeline.execute(df)
+
+        assert isinstance(result["status"].dtype, pd.CategoricalDtype)
+        assert sorted(result["status"].cat.categories) == ["ACTIVE", "DONE", "NAN"]
+        assert result["status"].tolist()[:3] == ["ACTIVE", "DONE", "NAN"]
+        pd.testing.assert_frame_equal(result, apply_sequentially(rules, df))
+
+    def test_high_cardinality_column_is_left_to_elementwise_path(self):
+        series = pd.Series([f"id-{i}" for i in range(10)])
+
+        assert map_unique_values(series, lambda text: text.str.upper()) is None
+
+
+class TestDatetimeParsing:
+    """Unit tests for convert_type to datetime with format inference."""
+
+    def test_repeated_dates_match_pandas_and_report_format(self):
+        series = pd.Series(["2024-03-01", "2024-03-02", None, "2024-03-01"] * 50)
+
+        parsed = parse_datetimes(series)
+
+        pd.testing.assert_series_equal(parsed.series, pd.to_datetime(series, errors="coerce"))
+        assert parsed.format == "%Y-%m-%d"
+        assert (parsed.values, parsed.failures) == (150, 0)
+
+    def test_values_outside_the_format_count_as_failures(self):
+        series = pd.Series(["2024-03-01", "2024-03-02", "2024-03-03", "03/04/2024", "soon", ""])
+
+        parsed = parse_datetimes(series)
+
+        assert parsed.series.isna().tolist() == [False, False, False, True, True, True]
+        assert parsed.failure_rate == pytest.approx(3 / 6)
+
+    def test_day_first_and_month_first_are_never_mixed(self):
+        series = pd.Series(["05/01/2024", "13/01/2024", "06/01/2024"])
+
+        parsed = parse_datetimes(series)
+
+        pd.testing.assert_series_equal(parsed.series, pd.to_datetime(series, errors="coerce"))
+        assert parsed.series.dt.month.tolist()[::2] == [5, 6]
+        assert parsed.failures == 1
+
+    def test_rule_reuses_inferred_format_and_reports_failures(self):
+        rule = TransformRule("dates", "convert_type", {"columns": ["day"], "target_type": "datetime"})
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(rule)
+
+        _, stats = pipeline.execute(pd.DataFrame({"day": ["01/02/2024 10:30", "02/02/2024 11:00", "n/a"]}))
+        assert stats["rules_applied"][0]["parse_failures"] == 1
+        assert stats["rules_applied"][0]["parse_failure_rate"] == pytest.approx(1 / 3, abs=1e-4)
+
+        context = RuleContext()
+        rule.apply(pd.DataFrame({"day": ["01/02/2024 10:30"]}), context)
+        assert context.datetime_formats == {(None, "day"): "%m/%d/%Y %H:%M"}
+        # A chunk in another format makes the reused one fail, so it is inferred again
+        result = rule.apply(pd.DataFrame({"day": ["2024-05-06", "2024-05-07"]}), context)
+        assert context.datetime_formats == {(None, "day"): "%Y-%m-%d"}
+        assert result["day"].dt.day.tolist() == [6, 7]
+
+    def test_inferred_format_is_reused_across_runs_of_one_source(self, temp_dir, monkeypatch):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("dates", "convert_type", {"columns": ["day"], "target_type": "datetime"}))
+        df = pd.DataFrame({"day": ["25/12/2024", "26/12/2024"]})
+        source = str(temp_dir / "days.csv")
+        pipeline.execute(df, source=source)
+        inferred = []
+        monkeypatch.setattr(column_kernels, "infer_datetime_format",
+                            lambda uniques: inferred.append(len(uniques)) or "%d/%m/%Y")
+
+        again, _ = pipeline.execute(df, source=source)
+        other, _ = pipeline.execute(df, source=str(temp_dir / "other.csv"))
+
+        assert again["day"].dt.month.tolist() == [12, 12]
+        assert other["day"].dt.month.tolist() == [12, 12]
+        assert inferred == [2]
+
+    def test_day_first_format_is_inferred_without_warnings(self):
+        parsed = parse_datetimes(pd.Series(["25/12/2024", "26/12/2024", "25/12/2024"]))
+
+        assert parsed.format == "%d/%m/%Y"
+        assert parsed.series.dt.month.tolist() == [12, 12, 12]
+
+    def test_explicit_format_is_strict(self):
+        rule = TransformRule("dates", "convert_type", {
+            "columns": ["day"], "target_type": "datetime", "format": "%d/%m/%Y"})
+
+        context = RuleContext()
+        result = rule.apply(pd.DataFrame({"day": ["01/02/2024", "2024-02-03"]}), context)
+
+        assert result["day"].tolist()[0] == pd.Timestamp("2024-02-01")
+        assert pd.isna(result["day"].iloc[1])
+        assert context.metrics["parse_failures"] == 1
+
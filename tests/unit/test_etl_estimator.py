@@ -0,0 +1,122 @@
+"""
+Unit tests for dry runs.
+
+Tests uniform, stratified and streamed sampling, the distinct count
+estimate behind remove_duplicates, and the extrapolated row, memory and
+runtime estimates and recommended mode of ETLPipeline.dry_run.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.etl_engine import ETLPipeline, TransformRule
+from utils.etl_estimator import estimate_distinct, estimate_plan, sample_chunks, sample_frame
+
+
+@pytest.fixture
+def orders() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    n = 50_000
+    return pd.DataFrame({
+        "id": np.arange(n),
+        "customer": rng.integers(0, 5_000, n),
+        "region": np.where(np.arange(n) < 100, "rare", "common"),
+        "amount": rng.random(n) * 100,
+    })
+
+
+class TestSampling:
+    """Unit tests for sample_frame and sample_chunks."""
+
+    def test_uniform_sample_keeps_row_order(self, orders):
+        sample = sample_frame(orders, 0.1, seed=1)
+
+        assert 4_500 < len(sample) < 5_500
+        assert sample["id"].is_monotonic_increasing
+
+    def test_stratified_sample_keeps_each_stratum_share(self, orders):
+        sample = sample_frame(orders, 0.005, stratify_by="region", seed=1)
+
+        assert (sample["region"] == "rare").sum() == 1
+        assert (sample["region"] == "common").sum() == round(49_900 * 0.005)
+
+    def test_streamed_sample_is_capped(self, orders):
+        chunks = (orders.iloc[i:i + 1_000] for i in range(0, len(orders), 1_000))
+
+        sample, total_rows = sample_chunks(chunks, 0.5, max_rows=2_000, seed=1)
+
+        assert total_rows == len(orders)
+        assert len(sample) == 2_000
+        assert sample["id"].is_monotonic_increasing
+        # Drawn from the whole stream, not just its first chunks
+        assert sample["id"].max() > 45_000
+
+    def test_invalid_fraction(self, orders):
+        with pytest.raises(ValueError, match="sample_fraction"):
+            sample_frame(orders, 0)
+
+
+class TestEstimateDistinct:
+    """Unit tests for estimate_distinct."""
+
+    @pytest.mark.parametrize("population", [
+        np.arange(200_000),
+        np.concatenate([np.zeros(100_000, dtype=int), np.arange(1, 100_001)]),
+        np.random.default_rng(0).integers(0, 50, 200_000),
+    ], ids=["unique", "skewed", "few_values"])
+    def test_close_to_true_count(self, population):
+        sample = np.random.default_rng(1).choice(population, 10_000, replace=False)
+
+        estimate = estimate_distinct(sample, len(population))
+
+        assert estimate == pytest.approx(len(np.unique(population)), rel=0.05)
+
+    def test_full_sample_is_exact(self):
+        values = np.array([1, 1, 2, 3, 3, 3])
+
+        assert estimate_distinct(values, len(values)) == 3
+
+
+class TestDryRun:
+    """Unit tests for ETLPipeline.dry_run."""
+
+    @pytest.fixture
+    def pipeline(self) -> ETLPipeline:
+        pipeline = ETLPipeline("orders")
+        pipeline.add_rule(TransformRule("big", "filter_rows", {"column": "amount", "operator": ">", "value": 75}))
+        pipeline.add_rule(TransformRule("dedup", "remove_duplicates", {"columns": ["customer"]}))
+        return pipeline
+
+    def test_estimates_match_full_run(self, pipeline, orders):
+        estimate = pipeline.dry_run(orders, sample_fraction=0.2, seed=3)
+        assert not pipeline.execution_log
+        result, _ = pipeline.execute(orders)
+
+        assert estimate["total_rows"] == len(orders)
+        assert [step["rule"] for step in estimate["steps"]] == ["big", "dedup"]
+        assert estimate["steps"][0]["selectivity"] == pytest.approx(0.25, abs=0.02)
+        assert estimate["steps"][1]["sample_sensitive"]
+        assert estimate["output_rows"] == pytest.approx(len(result), rel=0.1)
+        assert estimate["output_bytes"] == pytest.approx(result.memory_usage(index=False, deep=True).sum(), rel=0.1)
+        assert estimate["runtime"] > 0
+        assert estimate["recommended_mode"] == "memory"
+
+    def test_file_source_is_sampled_in_one_pass(self, pipeline, orders, temp_dir):
+        path = temp_dir / "orders.csv"
+        orders.to_csv(path, index=False)
+
+        estimate = pipeline.dry_run(str(path), sample_fraction=0.1, max_sample_rows=1_000, seed=3)
+
+        assert estimate["total_rows"] == len(orders)
+        assert estimate["sample_rows"] == 1_000
+        assert estimate["read_time"] > 0
+        assert estimate["input_bytes"] > 0
+
+    def test_streaming_is_recommended_over_budget(self, pipeline, orders):
+        estimate = estimate_plan(pipeline.compile(), sample_frame(orders, 0.1, seed=3), len(orders),
+                                 memory_budget=1024)
+
+        assert estimate["peak_bytes"] > 1024
+        assert not estimate["fits_in_memory"]
+        assert estimate["recommended_mode"] == "stream"
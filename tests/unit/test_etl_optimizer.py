@@ -0,0 +1,126 @@
+"""
+Unit tests for ETL Optimizer module.
+
+Tests predicate pushdown of row filters and projection pushdown of
+source columns.
+"""
+
+import pandas as pd
+import pytest
+
+from utils.data_connectors import DataConnector
+from utils.etl_engine import ETLPipeline, TransformRule
+from utils.etl_optimizer import pushdown_filters, required_source_columns
+
+
+def names(rules):
+    return [rule.name for rule in rules]
+
+
+class TestPushdownFilters:
+    """Unit tests for pushdown_filters."""
+
+    def test_filter_moves_before_unrelated_string_rules(self):
+        rules = [
+            TransformRule("trim", "trim_strings", {"columns": ["student_name"]}),
+            TransformRule("lower", "normalize_text", {"columns": ["course_name"]}),
+            TransformRule("keep", "filter_rows", {"column": "grade", "operator": "!=", "value": "C"}),
+        ]
+
+        ordered, moves = pushdown_filters(rules)
+
+        assert names(ordered) == ["keep", "trim", "lower"]
+        assert moves == [{"rule": "keep", "before": "trim"}]
+
+    def test_filter_stops_at_rule_writing_its_column(self):
+        rules = [
+            TransformRule("trim", "trim_strings", {"columns": ["student_name"]}),
+            TransformRule("upper", "normalize_text", {"columns": ["grade"], "case": "upper"}),
+            TransformRule("keep", "filter_rows", {"column": "grade", "value": "A"}),
+        ]
+
+        ordered, _ = pushdown_filters(rules)
+
+        assert names(ordered) == ["trim", "upper", "keep"]
+
+    @pytest.mark.parametrize("barrier", [
+        TransformRule("dedup", "remove_duplicates", {}),
+        TransformRule("fill", "fill_missing", {"columns": ["course_name"], "method": "mode"}),
+        TransformRule("trim_all", "trim_strings", {}),
+        TransformRule("to_int", "convert_type", {"columns": ["course_name"], "target_type": "integer"}),
+    ])
+    def test_filter_does_not_cross_unsafe_rules(self, barrier):
+        rules = [barrier, TransformRule("keep", "filter_rows", {"column": "grade", "value": "A"})]
+
+        ordered, moves = pushdown_filters(rules)
+
+        assert names(ordered) == [barrier.name, "keep"]
+        assert moves == []
+
+    def test_drop_missing_without_subset_only_crosses_non_writers(self):
+        rules = [
+            TransformRule("rename", "rename_column", {"mapping": {"grade": "score"}}),
+            TransformRule("drop", "drop_missing", {}),
+        ]
+
+        ordered, _ = pushdown_filters(rules)
+
+        assert names(ordered) == ["rename", "drop"]
+
+    def test_reordered_pipeline_gives_same_result(self, sample_dataframe):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["student_name"]}))
+        pipeline.add_rule(TransformRule("extract", "extract_pattern", {
+            "column": "student_name", "pattern": r"^(\w)", "new_column": "initial"}))
+        pipeline.add_rule(TransformRule("keep", "filter_rows", {"column": "course_id", "operator": ">", "value": 101}))
+
+        result, _ = pipeline.execute(sample_dataframe)
+
+        assert "'keep' pushed before 'trim'" in pipeline.explain()
+        expected = sample_dataframe.copy()
+        for rule in pipeline.rules:
+            expected = rule.apply(expected)
+        pd.testing.assert_frame_equal(result, expected)
+
+
+class TestRequiredColumns:
+    """Unit tests for projection pushdown."""
+
+    def test_all_columns_needed_without_projection(self):
+        rules = [TransformRule("trim", "trim_strings", {"columns": ["a"]})]
+
+        assert required_source_columns(rules) is None
+
+    def test_select_columns_limits_source_columns(self):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("keep", "filter_rows", {"column": "status", "value": "A"}))
+        pipeline.add_rule(TransformRule("rename", "rename_column", {"mapping": {"nm": "name"}}))
+        pipeline.add_rule(TransformRule("extract", "extract_pattern", {
+            "column": "email", "pattern": "@(.*)", "new_column": "domain"}))
+        pipeline.add_rule(TransformRule("lower", "normalize_text", {"columns": ["name"]}))
+        pipeline.add_rule(TransformRule("select", "select_columns", {"columns": ["name", "domain"]}))
+
+        assert pipeline.required_columns() == ["email", "nm", "status"]
+
+    def test_output_columns_drive_requirements(self):
+        rules = [TransformRule("dedup", "remove_duplicates", {"columns": ["id"]})]
+
+        assert required_source_columns(rules, output_columns=["name"]) == ["id", "name"]
+
+
+class TestColumnPrunedImport:
+    """Unit tests for DataConnector column selection."""
+
+    def test_import_csv_reads_only_requested_columns(self, temp_csv_file):
+        df = DataConnector.import_csv(str(temp_csv_file), columns=["name", "city", "missing"])
+
+        assert list(df.columns) == ["name", "city"]
+
+    def test_import_sqlite_selects_requested_columns(self, temp_dir, sample_dataframe):
+        db_path = str(temp_dir / "data.db")
+        DataConnector.export_sqlite(sample_dataframe, db_path, "students")
+
+        df = DataConnector.import_sqlite(db_path, "students", columns=["grade", "student_id"])
+
+        assert list(df.columns) == ["grade", "student_id"]
+        assert len(df) == len(sample_dataframe)
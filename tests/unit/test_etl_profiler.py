@@ -0,0 +1,93 @@
+"""
+Unit tests for per-step pipeline profiling.
+
+Tests the timing/memory metrics in execution stats and the Chrome trace
+and speedscope exports.
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from utils.etl_engine import ETLPipeline, TransformRule
+from utils.etl_profiler import slowest_steps, to_chrome_trace, to_speedscope
+
+
+@pytest.fixture
+def profiled_pipeline() -> ETLPipeline:
+    pipeline = ETLPipeline("profiled")
+    pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["name"]}))
+    pipeline.add_rule(TransformRule("dedup", "remove_duplicates", {}))
+    return pipeline
+
+
+@pytest.fixture
+def names() -> pd.DataFrame:
+    return pd.DataFrame({"name": [" a", "b ", " a", "c"], "n": [1, 2, 1, 3]})
+
+
+class TestStepMetrics:
+    """Unit tests for metrics recorded by ETLPipeline.execute."""
+
+    def test_every_step_is_timed(self, profiled_pipeline, names):
+        _, stats = profiled_pipeline.execute(names)
+
+        for entry in stats["rules_applied"]:
+            assert entry["wall_time"] >= 0
+            assert entry["cpu_time"] >= 0
+            assert entry["start_offset"] >= 0
+            assert entry["memory_source"] == "rss"
+            assert "rows_per_sec" in entry and "bytes_per_sec" in entry
+        assert stats["rules_applied"][1]["start_offset"] >= stats["rules_applied"][0]["start_offset"]
+
+    def test_profile_memory_uses_tracemalloc(self, profiled_pipeline, names):
+        _, stats = profiled_pipeline.execute(names, profile_memory=True)
+
+        assert {entry["memory_source"] for entry in stats["rules_applied"]} == {"tracemalloc_peak"}
+        assert all(entry["memory_delta_mb"] >= 0 for entry in stats["rules_applied"])
+
+    def test_stream_steps_accumulate_time(self, profiled_pipeline, names):
+        chunks = [names.iloc[:2], names.iloc[2:]]
+
+        stats = profiled_pipeline.execute_stream(lambda: iter(chunks), lambda chunk: None)
+
+        assert all(entry["wall_time"] > 0 for entry in stats["rules_applied"])
+        assert all("bytes_in" not in entry for entry in stats["rules_applied"])
+
+
+class TestProfileExport:
+    """Unit tests for trace exports."""
+
+    def test_chrome_trace_has_one_event_per_step(self, profiled_pipeline, names):
+        _, stats = profiled_pipeline.execute(names)
+
+        trace = to_chrome_trace(stats, "profiled")
+
+        events = trace["traceEvents"]
+        assert [event["name"] for event in events] == ["profiled", "trim", "dedup"]
+        assert all(event["ph"] == "X" for event in events)
+        assert events[1]["args"]["rows_before"] == 4
+
+    def test_speedscope_events_are_balanced(self, profiled_pipeline, names):
+        _, stats = profiled_pipeline.execute(names)
+
+        document = to_speedscope(stats, "profiled")
+
+        profile = document["profiles"][0]
+        assert [frame["name"] for frame in document["shared"]["frames"]] == ["profiled", "trim", "dedup"]
+        opens = [event for event in profile["events"] if event["type"] == "O"]
+        closes = [event for event in profile["events"] if event["type"] == "C"]
+        assert len(opens) == len(closes) == 3
+        assert profile["events"][-1] == {"type": "C", "frame": 0, "at": profile["endValue"]}
+
+    def test_export_profile_writes_last_run(self, profiled_pipeline, names, temp_dir):
+        with pytest.raises(ValueError, match="not been executed"):
+            profiled_pipeline.export_profile(str(temp_dir / "none.json"))
+        profiled_pipeline.execute(names)
+
+        path = profiled_pipeline.export_profile(str(temp_dir / "trace.json"))
+
+        with open(path, encoding="utf-8") as f:
+            assert len(json.load(f)["traceEvents"]) == 3
+        assert slowest_steps(profiled_pipeline.execution_log[-1], limit=1)[0]["rule"] in ("trim", "dedup")
@@ -0,0 +1,216 @@
+"""
+Unit tests for streaming ETL execution.
+
+Tests that ETLPipeline.execute_stream matches in-memory execution,
+including rules whose semantics span chunks.
+"""
+
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import etl_stream
+from utils.etl_engine import ETLPipeline, TransformRule
+from utils.lazy_loader import LazyDataLoader
+from utils.performance_optimizer import CancellationToken, OperationCancelledError
+
+
+@pytest.fixture
+def stream_csv(temp_dir):
+    """CSV whose duplicates and missing values are spread over several chunks."""
+    csv_path = temp_dir / "stream_input.csv"
+    df = pd.DataFrame({
+        "id": [1, 2, 3, 1, 4, 2, 5, 6, 3, 7],
+        "name": [" a", "b ", None, " a", "d", "b ", "e", None, None, "g"],
+        "score": [1.0, np.nan, 3.0, 1.0, np.nan, np.nan, 7.0, 8.0, 3.0, np.nan],
+    })
+    df.to_csv(csv_path, index=False)
+    return csv_path
+
+
+def build_pipeline(*rules):
+    pipeline = ETLPipeline("stream")
+    for rule in rules:
+        pipeline.add_rule(rule)
+    return pipeline
+
+
+def expected_output(pipeline, csv_path, temp_dir):
+    """Run the in-memory path and round-trip it through CSV for comparison."""
+    result, _ = pipeline.execute(pd.read_csv(csv_path))
+    expected_path = temp_dir / "expected.csv"
+    result.to_csv(expected_path, index=False)
+    return pd.read_csv(expected_path)
+
+
+class TestExecuteStream:
+    """Unit tests for ETLPipeline.execute_stream."""
+
+    def test_stream_matches_in_memory_execution(self, stream_csv, temp_dir):
+        pipeline = build_pipeline(
+            TransformRule("dedup", "remove_duplicates", {"columns": ["id"]}),
+            TransformRule("trim", "trim_strings", {"columns": ["name"]}),
+            TransformRule("fill", "fill_missing", {"columns": ["score"], "method": "mean"}),
+            TransformRule("keep", "filter_rows", {"column": "score", "operator": ">", "value": 2}),
+        )
+        output_path = temp_dir / "out.csv"
+
+        stats = pipeline.execute_stream(LazyDataLoader(str(stream_csv), chunk_size=3), str(output_path))
+
+        actual = pd.read_csv(output_path)
+        pd.testing.assert_frame_equal(actual, expected_output(pipeline, stream_csv, temp_dir))
+        assert stats["chunks"] == 4
+        assert stats["passes"] == 3
+        assert stats["initial_rows"] == 10
+        assert stats["final_rows"] == len(actual)
+
+    @pytest.mark.parametrize("method", ["median", "mode", "forward"])
+    def test_stateful_fill_methods(self, stream_csv, temp_dir, method):
+        pipeline = build_pipeline(
+            TransformRule("fill", "fill_missing", {"columns": ["score"], "method": method}),
+        )
+        output_path = temp_dir / "out.csv"
+
+        pipeline.execute_stream(LazyDataLoader(str(stream_csv), chunk_size=4), str(output_path))
+
+        pd.testing.assert_frame_equal(
+            pd.read_csv(output_path), expected_output(pipeline, stream_csv, temp_dir)
+        )
+
+    def test_median_fill_of_all_columns_skips_text_columns(self, stream_csv, temp_dir):
+        pipeline = build_pipeline(TransformRule("fill", "fill_missing", {"method": "median"}))
+        output_path = temp_dir / "out.csv"
+
+        pipeline.execute_stream(LazyDataLoader(str(stream_csv), chunk_size=4), str(output_path))
+
+        actual = pd.read_csv(output_path)
+        source = pd.read_csv(stream_csv)
+        assert actual["score"].tolist() == source["score"].fillna(source["score"].median()).tolist()
+        assert actual["name"].isna().sum() == source["name"].isna().sum()
+
+    def test_median_fill_switches_to_sketch_on_large_columns(self, monkeypatch):
+        monkeypatch.setattr(etl_stream, "MEDIAN_EXACT_VALUES", 1_000)
+        values = np.random.default_rng(5).exponential(size=20_000)
+        values[::10] = np.nan
+        frames = [pd.DataFrame({"x": part}) for part in np.array_split(values, 8)]
+        pipeline = build_pipeline(TransformRule("fill", "fill_missing", {"method": "median"}))
+        received = []
+
+        pipeline.execute_stream(lambda: iter(frames), received.append)
+
+        filled = pd.concat(received)["x"].to_numpy()[::10]
+        assert filled == pytest.approx(np.full(len(filled), np.nanmedian(values)), rel=0.01)
+
+    def test_stream_to_callable_sink_from_chunk_factory(self):
+        frames = [
+            pd.DataFrame({"k": ["x", "y"]}),
+            pd.DataFrame({"k": ["y", "z"]}),
+        ]
+        pipeline = build_pipeline(TransformRule("dedup", "remove_duplicates", {}))
+        received = []
+
+        pipeline.execute_stream(lambda: iter(frames), received.append)
+
+        assert pd.concat(received)["k"].tolist() == ["x", "y", "z"]
+        assert frames[1]["k"].tolist() == ["y", "z"]
+
+    @pytest.mark.parametrize("one_shot", [False, True])
+    def test_one_pass_dedup_matches_drop_duplicates(self, one_shot):
+        frames = [
+            pd.DataFrame({"k": ["x", "y", "x"], "v": [0.0, 1.0, 0.0]}),
+            pd.DataFrame({"k": ["y", "z", "z"], "v": [1.0, 2.0, -0.0]}),
+        ]
+        config = {} if one_shot else {"partitioned": False}
+        pipeline = build_pipeline(TransformRule("dedup", "remove_duplicates", config))
+        received = []
+
+        stats = pipeline.execute_stream(iter(frames) if one_shot else lambda: iter(frames), received.append)
+
+        expected = pd.concat(frames, ignore_index=True).drop_duplicates()
+        assert pd.concat(received).values.tolist() == expected.values.tolist()
+        assert stats["passes"] == 1
+
+    def test_streaming_deduplicator_keeps_only_row_hashes(self):
+        deduplicator = etl_stream.StreamingDeduplicator(TransformRule("dedup", "remove_duplicates", {}))
+
+        deduplicator(pd.DataFrame({"k": ["x", "y", "x"]}))
+        second = deduplicator(pd.DataFrame({"k": ["y", "z"]}))
+
+        assert second["k"].tolist() == ["z"]
+        assert deduplicator.seen.dtype == np.uint64
+        assert len(deduplicator.seen) == 3
+
+    @pytest.mark.parametrize("keep", ["last", False])
+    def test_dedup_keep_last_or_none_uses_partitioned_prepass(self, stream_csv, temp_dir, keep):
+        pipeline = build_pipeline(
+            TransformRule("trim", "trim_strings", {"columns": ["name"]}),
+            TransformRule("dedup", "remove_duplicates", {"columns": ["id", "name"], "keep": keep}),
+        )
+        output_path = temp_dir / "out.csv"
+
+        stats = pipeline.execute_stream(LazyDataLoader(str(stream_csv), chunk_size=3), str(output_path))
+
+        pd.testing.assert_frame_equal(
+            pd.read_csv(output_path), expected_output(pipeline, stream_csv, temp_dir)
+        )
+        assert stats["passes"] == 2
+
+    def test_unstreamable_rule_is_rejected_before_writing(self, stream_csv, temp_dir):
+        pipeline = build_pipeline(TransformRule("fill", "fill_missing", {"columns": ["score"], "method": "backward"}))
+        output_path = temp_dir / "out.csv"
+
+        with pytest.raises(ValueError, match="cannot be streamed"):
+            pipeline.execute_stream(str(stream_csv), str(output_path))
+
+        assert not output_path.exists()
+
+    def test_progress_per_chunk_and_cancellation(self, stream_csv, temp_dir):
+        pipeline = build_pipeline(
+            TransformRule("fill", "fill_missing", {"columns": ["score"], "method": "mean"}),
+        )
+        token = CancellationToken()
+        events = []
+
+        def cancel_on_second_stream_chunk(event):
+            events.append(event)
+            if event["phase"] == "stream" and event["chunk"] == 2:
+                token.cancel()
+
+        closed = []
+
+        class RecordingSink:
+            def write(self, chunk):
+                pass
+
+            def close(self):
+                closed.append(True)
+
+        with pytest.raises(OperationCancelledError):
+            pipeline.execute_stream(LazyDataLoader(str(stream_csv), chunk_size=3), RecordingSink(),
+                                    progress_callback=cancel_on_second_stream_chunk, cancellation_token=token)
+
+        assert [(e["phase"], e["chunk"]) for e in events] == [
+            ("prepass", 1), ("prepass", 2), ("prepass", 3), ("prepass", 4), ("stream", 1), ("stream", 2),
+        ]
+        assert events[3]["rows"] == 10
+        assert closed == [True]
+
+    def test_cancelled_dedup_prepass_removes_its_spill_files(self, stream_csv, temp_dir, monkeypatch):
+        spill_root = temp_dir / "spill"
+        spill_root.mkdir()
+        monkeypatch.setattr(tempfile, "tempdir", str(spill_root))
+        pipeline = build_pipeline(TransformRule("dedup", "remove_duplicates", {"keep": "last"}))
+        token = CancellationToken()
+
+        def cancel_during_prepass(event):
+            if event["phase"] == "prepass" and event["chunk"] == 2:
+                assert len(list(spill_root.iterdir())) == 1
+                token.cancel()
+
+        with pytest.raises(OperationCancelledError):
+            pipeline.execute_stream(LazyDataLoader(str(stream_csv), chunk_size=3), lambda chunk: None,
+                                    progress_callback=cancel_during_prepass, cancellation_token=token)
+
+        assert list(spill_root.iterdir()) == []
@@ -0,0 +1,138 @@
+"""
+Unit tests for compound filter expressions.
+
+Tests the filter_expr rule type, expression validation and the
+short-circuiting evaluator.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.filter_expr as filter_expr
+from utils.etl_engine import ETLPipeline, TransformRule
+from utils.filter_expr import evaluate_expression, expression_columns, validate_expression
+
+
+@pytest.fixture
+def orders() -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": [1, 2, 3, 4, 5, 6],
+        "amount": [10.0, 250.0, np.nan, 75.5, 1200.0, 40.0],
+        "country": ["VN", "US", "VN", None, "JP", "vn"],
+        "email": ["a@x.com", "b@y.org", None, "d@x.com", "e@z.net", "f@x.com"],
+    })
+
+
+class TestEvaluateExpression:
+    """Unit tests for evaluate_expression."""
+
+    def test_and_or_not_tree(self, orders):
+        expr = {"and": [
+            {"column": "amount", "op": "between", "value": [20, 1000]},
+            {"or": [
+                {"column": "country", "op": "in", "value": ["VN", "US"]},
+                {"not": {"column": "email", "op": "regex", "value": r"@x\.com$"}},
+            ]},
+        ]}
+
+        mask = evaluate_expression(orders, expr)
+
+        assert orders["id"][mask].tolist() == [2]
+
+    @pytest.mark.parametrize("leaf, expected_ids", [
+        ({"column": "amount", "op": ">", "value": 50}, [2, 4, 5]),
+        ({"column": "amount", "op": "!=", "value": 10.0}, [2, 4, 5, 6]),
+        ({"column": "country", "op": "not_in", "value": ["VN"]}, [2, 5, 6]),
+        ({"column": "amount", "op": "is_null"}, [3]),
+        ({"column": "country", "op": "not_null"}, [1, 2, 3, 5, 6]),
+        ({"column": "email", "op": "contains", "value": "x.c"}, [1, 4, 6]),
+        ({"column": "country", "op": "regex", "value": "^[Vv]"}, [1, 3, 6]),
+    ])
+    def test_leaf_operators_skip_missing_values(self, orders, leaf, expected_ids):
+        mask = evaluate_expression(orders, leaf)
+
+        assert orders["id"][mask].tolist() == expected_ids
+
+    def test_expensive_predicate_skipped_when_and_is_decided(self, orders, monkeypatch):
+        calls = []
+        original = filter_expr._text_mask
+        monkeypatch.setattr(filter_expr, "_text_mask",
+                            lambda series, *args: calls.append(len(series)) or original(series, *args))
+        expr = {"and": [
+            {"column": "email", "op": "regex", "value": "x"},
+            {"column": "amount", "op": ">", "value": 5000},
+        ]}
+
+        mask = evaluate_expression(orders, expr)
+
+        assert not mask.any()
+        assert calls == []
+
+    def test_numexpr_batch_matches_pandas(self, monkeypatch):
+        pytest.importorskip("numexpr")
+        monkeypatch.setattr(filter_expr, "NUMEXPR_MIN_ROWS", 0)
+        rng = np.random.default_rng(7)
+        df = pd.DataFrame({"a": rng.normal(size=500), "b": rng.integers(0, 10, size=500)})
+        df.loc[::7, "a"] = np.nan
+        expr = {"or": [
+            {"column": "a", "op": ">", "value": 0.5},
+            {"column": "b", "op": "!=", "value": 3},
+            {"column": "a", "op": "<=", "value": -1},
+        ]}
+
+        mask = evaluate_expression(df, expr)
+
+        expected = (df["a"] > 0.5) | (df["b"] != 3) | (df["a"] <= -1)
+        np.testing.assert_array_equal(mask, expected.to_numpy())
+
+    def test_validation_and_columns(self):
+        expr = {"or": [{"column": "a", "op": "in", "value": [1]}, {"not": {"column": "b", "op": "is_null"}}]}
+
+        assert validate_expression(expr) is None
+        assert expression_columns(expr) == {"a", "b"}
+        assert "unknown operator" in validate_expression({"column": "a", "op": "~"})
+        assert "[low, high]" in validate_expression({"column": "a", "op": "between", "value": 3})
+        assert "non-empty list" in validate_expression({"and": []})
+
+
+class TestFilterExprRule:
+    """Unit tests for the filter_expr rule type."""
+
+    def test_rule_filters_in_one_step(self, orders):
+        rule = TransformRule("big_vn", "filter_expr", {"expression": {"and": [
+            {"column": "country", "op": "==", "value": "VN"},
+            {"column": "amount", "op": ">=", "value": 10},
+        ]}})
+
+        result = rule.apply(orders.copy())
+
+        assert result["id"].tolist() == [1]
+
+    def test_missing_column_leaves_data_unchanged(self, orders, capsys):
+        rule = TransformRule("bad", "filter_expr", {"expression": {"column": "nope", "op": "is_null"}})
+
+        result = rule.apply(orders.copy())
+
+        pd.testing.assert_frame_equal(result, orders)
+        assert "Error applying rule bad" in capsys.readouterr().out
+
+    def test_invalid_expression_is_dropped_from_plan(self):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("bad", "filter_expr", {"expression": {"column": "a", "op": "like"}}))
+
+        plan = pipeline.compile()
+
+        assert plan.steps == []
+        assert plan.dropped[0]["reason"] == "invalid expression: unknown operator 'like'"
+
+    def test_expression_is_pushed_down(self, orders):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("lower", "normalize_text", {"columns": ["email"]}))
+        pipeline.add_rule(TransformRule("keep", "filter_expr", {"expression": {
+            "or": [{"column": "amount", "op": "<", "value": 50}, {"column": "country", "op": "is_null"}]}}))
+
+        result, _ = pipeline.execute(orders)
+
+        assert "'keep' pushed before 'lower'" in pipeline.explain()
+        assert result["id"].tolist() == [1, 4, 6]
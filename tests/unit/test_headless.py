@@ -0,0 +1,104 @@
+"""
+Unit tests for the headless entry point.
+
+Tests that start-up stays free of heavy imports and that the run and
+normalize commands work end to end without Qt.
+"""
+
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import headless
+from utils.etl_engine import PipelineManager, TransformRule
+
+
+@pytest.fixture
+def pipeline_config(temp_dir):
+    config = temp_dir / "pipelines.json"
+    manager = PipelineManager(str(config))
+    pipeline = manager.create_pipeline("clean")
+    pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["city"]}))
+    manager.save_pipelines()
+    return config
+
+
+@pytest.fixture
+def orders_csv(temp_dir):
+    path = temp_dir / "orders.csv"
+    pd.DataFrame({
+        "order_id": [1, 2, 3, 4],
+        "city": [" Hanoi", "Hue ", " Hanoi", "Hue "],
+        "region": ["North", "Central", "North", "Central"],
+        "amount": [10.0, 20.0, 30.0, 40.0],
+    }).to_csv(path, index=False)
+    return path
+
+
+class TestHeadless:
+    """Unit tests for headless.py commands."""
+
+    def test_list_starts_without_pandas_or_qt(self, pipeline_config):
+        script = (
+            "import sys, headless; "
+            f"code = headless.main(['-c', {str(pipeline_config)!r}, 'list']); "
+            "print(sorted(m for m in ('pandas', 'PySide6', 'sklearn') if m in sys.modules), code)"
+        )
+
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(headless.__file__)), check=True)
+
+        assert "clean: 1 rules" in result.stdout
+        assert result.stdout.strip().endswith("[] 0")
+
+    def test_list_includes_journaled_changes(self, pipeline_config, capsys):
+        manager = PipelineManager(str(pipeline_config))
+        manager.create_pipeline("draft")
+        manager.get_pipeline("clean").rules[0].enabled = False
+        manager.save_pipeline("clean")
+
+        assert headless.main(["-c", str(pipeline_config), "list"]) == 0
+
+        output = capsys.readouterr().out
+        assert "  - trim [trim_strings] (disabled)" in output
+        assert "draft: 0 rules" in output
+
+    def test_run_transforms_and_exports(self, pipeline_config, orders_csv, temp_dir, capsys):
+        output = temp_dir / "clean.json"
+
+        code = headless.main(["-c", str(pipeline_config), "run", "clean", str(orders_csv), "-o", str(output)])
+
+        assert code == 0
+        assert "4 -> 4 rows" in capsys.readouterr().out
+        assert pd.read_json(output)["city"].tolist() == ["Hanoi", "Hue", "Hanoi", "Hue"]
+
+    def test_run_reuses_cached_result(self, pipeline_config, orders_csv, temp_dir, capsys):
+        args = ["-c", str(pipeline_config), "run", "clean", str(orders_csv),
+                "-o", str(temp_dir / "clean.csv"), "--cache-dir", str(temp_dir / "cache")]
+
+        assert headless.main(args) == 0
+        assert "(cached)" not in capsys.readouterr().out
+        assert headless.main(args) == 0
+        assert "(cached)" in capsys.readouterr().out
+        assert pd.read_csv(temp_dir / "clean.csv")["city"].tolist() == ["Hanoi", "Hue", "Hanoi", "Hue"]
+
+    def test_normalize_writes_3nf_tables(self, pipeline_config, orders_csv, temp_dir):
+        out = temp_dir / "3nf"
+
+        code = headless.main(["-c", str(pipeline_config), "normalize", str(orders_csv),
+                              "-o", str(out), "--pipeline", "clean"])
+
+        assert code == 0
+        written = sorted(path.name for path in out.iterdir())
+        assert written and all(name.startswith(("Dim_", "Fact_")) for name in written)
+        assert pd.read_csv(out / "Dim_order_id.csv")["city"].tolist() == ["Hanoi", "Hue", "Hanoi", "Hue"]
+
+    def test_errors_exit_with_code_2(self, pipeline_config, orders_csv, temp_dir, capsys):
+        assert headless.main(["-c", str(pipeline_config), "run", "nope", str(orders_csv),
+                              "-o", str(temp_dir / "x.csv")]) == 2
+        assert headless.main(["-c", str(pipeline_config), "run", "clean", str(orders_csv),
+                              "-o", str(temp_dir / "x.parquet")]) == 2
+        assert "Unsupported output file" in capsys.readouterr().err
@@ -0,0 +1,168 @@
+"""
+Unit tests for the lookup_map rule.
+
+Tests LookupTable matching and unmatched counts, mapping tables loaded
+from CSV and SQLite, and the rule inside pipelines.
+"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import lookup_map
+from utils.etl_engine import ETLPipeline, TransformRule
+from utils.etl_planner import RuleContext
+from utils.lookup_map import LookupTable, load_table
+
+
+@pytest.fixture
+def codes_csv(temp_dir):
+    path = temp_dir / "codes.csv"
+    pd.DataFrame({"code": ["VN", "JP", "FR", "VN"], "label": ["Vietnam", "Japan", "France", "Viet Nam"]}).to_csv(
+        path, index=False)
+    return path
+
+
+class TestLookupTable:
+    """Unit tests for LookupTable."""
+
+    def test_maps_and_counts_unmatched(self):
+        table = LookupTable.from_dict({"a": "A", "b": "B"})
+        series = pd.Series(["a", "x", None, "b", "x"])
+
+        kept, unmatched = table.map(series)
+        defaulted, _ = table.map(series, keep_unmatched=False, default="?")
+
+        assert unmatched == 2
+        assert kept.tolist() == ["A", "x", None, "B", "x"]
+        assert defaulted.tolist()[:2] == ["A", "?"] and pd.isna(defaulted[2])
+
+    def test_exact_match_does_not_mix_types_but_text_match_does(self):
+        series = pd.Series([1, 2, 3])
+
+        exact, exact_unmatched = LookupTable.from_dict({"1": "one", 2: "two"}).map(series)
+        text, text_unmatched = LookupTable.from_dict({"1": "one", 2: "two"}, match="text").map(series)
+
+        assert exact.tolist() == [1, "two", 3] and exact_unmatched == 2
+        assert text.tolist() == ["one", "two", 3] and text_unmatched == 1
+
+    def test_numeric_values_keep_their_dtype_when_all_match(self):
+        mapped, unmatched = LookupTable.from_dict({"x": 1, "y": 2}).map(pd.Series(["y", "x", "y"]))
+
+        assert unmatched == 0
+        assert mapped.dtype == np.int64
+        assert mapped.tolist() == [2, 1, 2]
+
+    def test_categorical_column_maps_categories_only(self):
+        series = pd.Series(["a", "b", None, "c", "a"], dtype="category")
+
+        mapped, unmatched = LookupTable.from_dict({"a": "A", "b": "B"}).map(series)
+
+        assert isinstance(mapped.dtype, pd.CategoricalDtype)
+        assert mapped.astype(object).where(mapped.notna(), None).tolist() == ["A", "B", None, "c", "A"]
+        assert unmatched == 1
+
+
+class TestMappingFiles:
+    """Unit tests for load_table."""
+
+    def test_csv_table_is_cached_until_the_file_changes(self, codes_csv):
+        lookup_map.clear_table_cache()
+
+        first = load_table(str(codes_csv), "code", "label")
+        assert load_table(str(codes_csv), "code", "label") is first
+        assert first.map(pd.Series(["VN"]))[0].tolist() == ["Viet Nam"]
+
+        pd.DataFrame({"code": ["VN"], "label": ["Việt Nam"]}).to_csv(codes_csv, index=False)
+        assert load_table(str(codes_csv), "code", "label").map(pd.Series(["VN"]))[0].tolist() == ["Việt Nam"]
+
+    @pytest.mark.parametrize("match", ["exact", "text"])
+    def test_csv_codes_keep_leading_zeros(self, temp_dir, match):
+        path = temp_dir / "zeros.csv"
+        path.write_text("code,label\n007,Bond\n010,Ten\nNA,Not applicable\n", encoding="utf-8")
+        lookup_map.clear_table_cache()
+
+        table = load_table(str(path), "code", "label", match=match)
+        mapped, unmatched = table.map(pd.Series(["007", "010", "NA", "7"]))
+
+        assert mapped.tolist() == ["Bond", "Ten", "Not applicable", "7"]
+        assert unmatched == 1
+
+    def test_sqlite_text_match_reads_keys_as_stored(self, temp_dir):
+        db = temp_dir / "zeros.db"
+        with sqlite3.connect(db) as conn:
+            conn.execute("CREATE TABLE codes (k, v TEXT)")
+            conn.executemany("INSERT INTO codes VALUES (?, ?)", [("007", "Bond"), (10, "Ten")])
+
+        table = load_table(str(db), "k", "v", table="codes", match="text")
+
+        assert table.map(pd.Series(["007", 10, "7"]))[0].tolist() == ["Bond", "Ten", "7"]
+
+    def test_sqlite_table(self, temp_dir):
+        db = temp_dir / "codes.db"
+        with sqlite3.connect(db) as conn:
+            pd.DataFrame({"k": [1, 2], "v": ["one", "two"]}).to_sql("codes", conn, index=False)
+
+        table = load_table(str(db), "k", "v", table="codes")
+
+        assert table.map(pd.Series([2, 1, 5]))[0].tolist() == ["two", "one", 5]
+        with pytest.raises(ValueError, match="mapping_table"):
+            load_table(str(db), "k", "v")
+
+
+class TestLookupMapRule:
+    """Unit tests for the lookup_map TransformRule."""
+
+    def test_rule_from_file_reports_unmatched_in_stats(self, codes_csv):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("country", "lookup_map", {
+            "column": "country", "new_column": "country_name", "mapping_file": str(codes_csv),
+            "key_column": "code", "value_column": "label", "keep_unmatched": False,
+        }))
+        df = pd.DataFrame({"country": ["JP", "XX", "FR"]})
+
+        result, stats = pipeline.execute(df)
+
+        assert result["country"].tolist() == ["JP", "XX", "FR"]
+        assert result["country_name"].tolist()[::2] == ["Japan", "France"]
+        assert stats["rules_applied"][0]["unmatched"] == 1
+        assert pipeline.required_columns(["country_name"]) == ["country"]
+
+    def test_inline_mapping_is_compiled_once_and_rebuilt_on_edit(self):
+        rule = TransformRule("m", "lookup_map", {"column": "k", "mapping": {"a": 1}})
+        df = pd.DataFrame({"k": ["a", "b"]})
+
+        assert rule._lookup_table() is rule._lookup_table()
+
+        compiled = rule._lookup_table()
+        rule.config["mapping"]["b"] = 2
+        assert rule._lookup_table() is not compiled
+        context = RuleContext()
+        assert rule.apply(df, context)["k"].tolist() == [1, 2]
+        assert context.metrics == {"unmatched": 0}
+
+    def test_metrics_stay_with_each_application(self):
+        rule = TransformRule("m", "lookup_map", {"column": "k", "mapping": {"a": "A"}})
+        first, second = RuleContext(), RuleContext()
+
+        rule.apply(pd.DataFrame({"k": ["x", "y", "a"]}), first)
+        rule.apply(pd.DataFrame({"k": ["a"]}), second)
+
+        assert first.metrics == {"unmatched": 2}
+        assert second.metrics == {"unmatched": 0}
+        assert not hasattr(rule, "metrics")
+
+    def test_empty_mapping_is_skipped_and_stream_sums_unmatched(self):
+        pipeline = ETLPipeline("p")
+        pipeline.add_rule(TransformRule("none", "lookup_map", {"column": "k"}))
+        pipeline.add_rule(TransformRule("m", "lookup_map", {"column": "k", "mapping": {"a": "A"}}))
+        frames = [pd.DataFrame({"k": ["a", "b"]}), pd.DataFrame({"k": ["c", "a"]})]
+        received = []
+
+        stats = pipeline.execute_stream(lambda: iter(frames), received.append)
+
+        assert stats["rules_skipped"] == [{"rule": "none", "reason": "empty mapping"}]
+        assert stats["rules_applied"][0]["unmatched"] == 2
+        assert pd.concat(received)["k"].tolist() == ["A", "b", "c", "A"]
@@ -0,0 +1,132 @@
+"""
+Unit tests for the polars backend and the backend registry.
+
+Tests that pipelines run through execute_on('polars') give the same
+result as the pandas engine, conversion of results to pandas, and
+choosing backends for asynchronous runs.
+"""
+
+import pandas as pd
+import pytest
+
+pl = pytest.importorskip("polars")
+
+from tests.unit.backend_cases import ARROW, PARITY_CASES, as_text, make_pipeline, write_orders
+from utils.etl_backends import available_backends, create_executor
+from utils.etl_backends import to_pandas
+
+POLARS_CASES = dict(PARITY_CASES, **{
+    "title": [("normalize_text", {"columns": ["city"], "case": "title", **ARROW})],
+    "filter_expr_tree": [("filter_expr", {"expression": {"or": [
+        {"column": "amount", "op": "between", "value": [3, 8]},
+        {"not": {"column": "code", "op": "regex", "value": "^B"}},
+    ]}, **ARROW})],
+    "filter_expr_missing_never_matches": [("filter_expr", {"expression": {"and": [
+        {"column": "city", "op": "!=", "value": "Vinh"},
+        {"column": "id", "op": "not_in", "value": [4]},
+    ]}})],
+    "lookup": [("lookup_map", {"column": "code", "new_column": "label", "mapping": {"A-12": "a", "x": "ex"}})],
+    "lookup_default": [("lookup_map", {"column": "code", "mapping": {"A-12": "a", "x": "ex"},
+                                       "keep_unmatched": False, "default": "?"})],
+    "lookup_text_match": [("lookup_map", {"column": "id", "mapping": {"1": "one", "2": "two"},
+                                          "match": "text", "keep_unmatched": False})],
+})
+
+
+@pytest.fixture
+def orders_csv(temp_dir):
+    return write_orders(temp_dir / "orders.csv")
+
+
+class TestParity:
+    """The polars backend against the pandas reference implementation."""
+
+    @pytest.mark.parametrize("case", sorted(POLARS_CASES))
+    def test_same_result_as_pandas(self, case, orders_csv):
+        pipeline = make_pipeline(POLARS_CASES[case])
+        expected, _ = pipeline.execute(pd.read_csv(orders_csv))
+
+        from_file, stats = pipeline.execute_on("polars", str(orders_csv))
+        from_frame, _ = pipeline.execute_on("polars", pd.read_csv(orders_csv))
+
+        assert isinstance(from_file, pl.DataFrame)
+        pd.testing.assert_frame_equal(as_text(to_pandas(from_file)), as_text(expected))
+        pd.testing.assert_frame_equal(as_text(to_pandas(from_frame)), as_text(expected))
+        assert (stats["initial_rows"], stats["final_rows"]) == (None, len(expected))
+
+
+class TestPolarsBackend:
+    """Unit tests for running on polars."""
+
+    def test_to_pandas_keeps_integers_with_missing_values(self):
+        frame = pl.DataFrame({"n": [1, None, 3], "s": ["a", None, "c"]})
+
+        result = to_pandas(frame)
+
+        assert str(result["n"].dtype) == "Int64"
+        assert result["n"].tolist()[::2] == [1, 3] and result["n"].isna().tolist() == [False, True, False]
+        assert to_pandas(result) is result
+
+    def test_streams_to_output_file(self, orders_csv, temp_dir):
+        pipeline = make_pipeline(PARITY_CASES["chain"])
+        output = temp_dir / "out.parquet"
+
+        result, stats = pipeline.execute_on("polars", str(orders_csv), output_path=str(output))
+
+        assert result is None
+        assert stats["mode"] == "polars" and stats["final_rows"] == 5
+        assert pd.read_parquet(output)["town"].tolist()[:2] == ["Hanoi", "Hue"]
+
+    @pytest.mark.parametrize("output_name", [None, "out.csv"])
+    def test_row_counts_come_from_the_query_or_metadata(self, orders_csv, temp_dir, output_name):
+        pipeline = make_pipeline(PARITY_CASES["chain"])
+        orders_parquet = temp_dir / "orders.parquet"
+        pd.read_csv(orders_csv).to_parquet(orders_parquet)
+        output = str(temp_dir / output_name) if output_name else None
+
+        _, csv_stats = pipeline.execute_on("polars", str(orders_csv), output_path=output)
+        _, counted_stats = pipeline.execute_on("polars", str(orders_csv), output_path=output,
+                                               count_input_rows=True)
+        _, parquet_stats = pipeline.execute_on("polars", str(orders_parquet), output_path=output)
+
+        assert csv_stats["initial_rows"] is None
+        assert counted_stats["initial_rows"] == parquet_stats["initial_rows"] == 8
+        assert csv_stats["final_rows"] == counted_stats["final_rows"] == parquet_stats["final_rows"] == 5
+
+    def test_mixed_type_lookup_keys_are_rejected(self, orders_csv):
+        pipeline = make_pipeline([("lookup_map", {"column": "id", "mapping": {1: "one", "2": "two"}})])
+
+        with pytest.raises(ValueError, match="Rule r0"):
+            pipeline.execute_on("polars", str(orders_csv))
+
+
+class TestBackendRegistry:
+    """Unit tests for choosing a backend."""
+
+    def test_available_backends_start_with_pandas(self):
+        backends = available_backends()
+
+        assert backends[0] == "pandas" and "polars" in backends
+        with pytest.raises(ValueError, match="Unknown backend"):
+            create_executor("spark", make_pipeline([]).compile())
+
+    def test_async_run_on_backend_reports_progress_once(self, orders_csv):
+        pipeline = make_pipeline(PARITY_CASES["chain"])
+        events = []
+
+        result, stats = pipeline.execute_async(pd.read_csv(orders_csv), progress_callback=events.append,
+                                               backend="polars").result(timeout=30)
+
+        assert result.height == stats["final_rows"] == 5
+        assert events == [{"phase": "step", "step": 1, "total_steps": 1, "rule": "polars",
+                           "fraction": 1.0, "rows": 5}]
+
+    def test_pandas_backend_is_execute(self, orders_csv):
+        pipeline = make_pipeline(PARITY_CASES["chain"])
+        df = pd.read_csv(orders_csv)
+
+        result, stats = pipeline.execute_on("pandas", df)
+
+        pd.testing.assert_frame_equal(result, pipeline.execute(df)[0])
+        with pytest.raises(ValueError, match="DataFrame"):
+            pipeline.execute_on("pandas", str(orders_csv))
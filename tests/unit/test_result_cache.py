@@ -0,0 +1,165 @@
+"""
+Unit tests for the persistent result cache.
+
+Tests fingerprinting of source files and pipelines, round-tripping
+results through the cache, LRU eviction under the disk quota, and
+execute_cached hits and misses.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.etl_engine import ETLPipeline, TransformRule
+from utils.result_cache import ResultCache, execute_cached, file_fingerprint, result_key
+
+
+@pytest.fixture
+def pipeline() -> ETLPipeline:
+    pipeline = ETLPipeline("orders")
+    pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["city"]}))
+    pipeline.add_rule(TransformRule("fill", "fill_missing", {"columns": ["amount"], "value": 0.0}))
+    return pipeline
+
+
+@pytest.fixture
+def orders_csv(temp_dir):
+    path = temp_dir / "orders.csv"
+    pd.DataFrame({
+        "id": [3, 1, 2],
+        "city": [" Hanoi", "Hue ", None],
+        "amount": [10.5, np.nan, 3.0],
+    }).to_csv(path, index=False)
+    return path
+
+
+def read_counting(calls):
+    def read(path):
+        calls.append(path)
+        return pd.read_csv(path)
+    return read
+
+
+class TestFingerprints:
+    """Unit tests for file_fingerprint and result_key."""
+
+    def test_file_fingerprint_follows_content_and_mtime(self, orders_csv):
+        first = file_fingerprint(str(orders_csv))
+        assert file_fingerprint(str(orders_csv)) == first
+
+        stat = os.stat(orders_csv)
+        os.utime(orders_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert file_fingerprint(str(orders_csv)) != first
+
+    def test_result_key_depends_on_rules_not_name(self, pipeline):
+        key = result_key("source", pipeline)
+        renamed = ETLPipeline.from_dict(dict(pipeline.to_dict(), name="other"))
+        assert result_key("source", renamed) == key
+        assert result_key("source", pipeline, "table") != key
+
+        pipeline.rules[1].config["value"] = -1.0
+        assert result_key("source", pipeline) != key
+
+
+class TestResultCache:
+    """Unit tests for ResultCache storage and eviction."""
+
+    def test_round_trip_keeps_index_and_dtypes(self, temp_dir):
+        cache = ResultCache(str(temp_dir / "cache"))
+        df = pd.DataFrame({
+            "n": np.arange(4, dtype="int32"),
+            "x": [1.5, np.nan, 2.0, 0.0],
+            "s": ["a", None, "c", "d"],
+            "when": pd.to_datetime(["2024-01-01", "2024-01-02", None, "2024-01-04"]),
+            "cat": pd.Categorical(["u", "v", "u", "v"]),
+        }, index=[10, 20, 30, 40])
+
+        assert cache.put("k", df, {"final_rows": 4})
+        loaded, stats = cache.get("k")
+
+        pd.testing.assert_frame_equal(loaded, df)
+        assert stats == {"final_rows": 4}
+        assert cache.get("missing") is None
+        assert cache.stats == {"hits": 1, "misses": 1, "evictions": 0}
+
+    def test_numeric_columns_load_without_copying(self, temp_dir):
+        pa = pytest.importorskip("pyarrow")
+        cache = ResultCache(str(temp_dir / "cache"))
+        df = pd.DataFrame(np.random.default_rng(0).random((500_000, 4)), columns=list("abcd"))
+        cache.put("k", df, {})
+
+        allocated = pa.total_allocated_bytes()
+        loaded, _ = cache.get("k")
+
+        pd.testing.assert_frame_equal(loaded, df)
+        assert pa.total_allocated_bytes() - allocated < df.memory_usage().sum() / 10
+
+    def test_least_recently_used_entries_are_evicted_over_quota(self, temp_dir):
+        df = pd.DataFrame({"x": np.arange(20_000, dtype="float64")})
+        cache = ResultCache(str(temp_dir / "cache"))
+        cache.put("a", df, {})
+        cache.quota = int(cache.disk_usage() * 2.5)
+
+        cache.put("b", df, {})
+        past = os.path.getmtime(temp_dir / "cache" / "a.arrow") - 10
+        os.utime(temp_dir / "cache" / "a.arrow", (past, past))
+        os.utime(temp_dir / "cache" / "b.arrow", (past - 5, past - 5))
+        cache.get("a")
+        cache.put("c", df, {})
+
+        assert sorted(key for key, _, _ in cache.entries()) == ["a", "c"]
+        assert cache.disk_usage() <= cache.quota
+        assert cache.stats["evictions"] == 1
+
+
+class TestExecuteCached:
+    """Unit tests for execute_cached."""
+
+    def test_second_run_loads_result_without_reading_source(self, pipeline, orders_csv, temp_dir):
+        cache = ResultCache(str(temp_dir / "cache"))
+        calls = []
+
+        first, first_stats = execute_cached(pipeline, str(orders_csv), read_counting(calls), cache)
+        # A new session: fresh pipeline object and cache instance over the same directory
+        again = ETLPipeline.from_dict(pipeline.to_dict())
+        second, second_stats = execute_cached(again, str(orders_csv), read_counting(calls),
+                                              ResultCache(str(temp_dir / "cache")))
+
+        assert len(calls) == 1
+        assert (first_stats["result_cache"], second_stats["result_cache"]) == ("miss", "hit")
+        pd.testing.assert_frame_equal(second, first)
+        assert second_stats["final_rows"] == 3
+
+    def test_changed_rules_or_file_miss(self, pipeline, orders_csv, temp_dir):
+        cache = ResultCache(str(temp_dir / "cache"))
+        calls = []
+        execute_cached(pipeline, str(orders_csv), read_counting(calls), cache)
+
+        pipeline.add_rule(TransformRule("keep", "filter_rows", {"column": "id", "operator": ">", "value": 1}))
+        _, stats = execute_cached(pipeline, str(orders_csv), read_counting(calls), cache)
+        assert stats["result_cache"] == "miss"
+
+        pd.DataFrame({"id": [9], "city": ["Vinh"], "amount": [1.0]}).to_csv(orders_csv, index=False)
+        result, stats = execute_cached(pipeline, str(orders_csv), read_counting(calls), cache)
+        assert stats["result_cache"] == "miss"
+        assert result["id"].tolist() == [9]
+        assert len(calls) == 3
+
+    def test_edited_mapping_file_misses(self, orders_csv, temp_dir):
+        mapping = temp_dir / "cities.csv"
+        pd.DataFrame({"key": ["Hue"], "value": ["X"]}).to_csv(mapping, index=False)
+        pipeline = ETLPipeline("orders")
+        pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["city"]}))
+        pipeline.add_rule(TransformRule("map", "lookup_map", {"column": "city", "mapping_file": str(mapping)}))
+        cache = ResultCache(str(temp_dir / "cache"))
+        calls = []
+        first, _ = execute_cached(pipeline, str(orders_csv), read_counting(calls), cache)
+
+        pd.DataFrame({"key": ["Hue"], "value": ["CHANGED"]}).to_csv(mapping, index=False)
+        second, stats = execute_cached(pipeline, str(orders_csv), read_counting(calls), cache)
+
+        assert first["city"].tolist()[1] == "X"
+        assert stats["result_cache"] == "miss"
+        assert second["city"].tolist()[1] == "CHANGED"
@@ -0,0 +1,150 @@
+"""
+Unit tests for the run history store and incremental pipeline persistence.
+
+Tests recording runs and their p50/p95 aggregates, pruning old runs, the
+bounded in-memory execution log, and PipelineManager's journal of
+per-pipeline changes.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from utils import etl_engine
+from utils.etl_engine import ETLPipeline, PipelineManager, TransformRule
+from utils.run_history import RunHistory, percentiles
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    return pd.DataFrame({"city": [" Hanoi", "Hue ", "Hue "], "amount": [1.0, None, 2.0]})
+
+
+def make_stats(duration, walls, errors=0, cached=False):
+    return {
+        "start_time": pd.Timestamp("2026-01-01").to_pydatetime(),
+        "duration": duration,
+        "initial_rows": 10,
+        "final_rows": 8,
+        "errors": [{"rule": "x", "error": "boom"}] * errors,
+        "rules_applied": [{"rule": rule, "type": "trim_strings", "wall_time": wall, "cached": cached}
+                          for rule, wall in walls.items()],
+    }
+
+
+class TestRunHistory:
+    """Unit tests for RunHistory."""
+
+    def test_aggregates_over_recorded_runs(self, temp_dir):
+        history = RunHistory(str(temp_dir / "history.db"))
+        for i in range(1, 21):
+            history.record("orders", make_stats(float(i), {"trim": i / 10, "fill": 0.5}, errors=int(i == 20)))
+        history.record("orders", make_stats(99.0, {"trim": 99.0}, cached=True))
+        history.record("other", make_stats(1000.0, {"trim": 1000.0}))
+
+        summary = history.summary("orders", window=20)
+        rules = history.rule_summary("orders", window=21)
+
+        assert summary["runs"] == 20
+        assert summary["failed_runs"] == 1
+        assert summary["duration"] == percentiles([99.0] + [float(i) for i in range(2, 21)])
+        assert [entry["rule"] for entry in rules] == ["trim", "fill"]
+        assert rules[0]["runs"] == 20
+        assert rules[0]["wall_time"]["p50"] == pytest.approx(1.05)
+        assert history.runs("orders", limit=1)[0]["duration"] == 99.0
+
+    def test_fused_step_time_is_split_between_its_rules(self, temp_dir):
+        history = RunHistory(str(temp_dir / "history.db"))
+        fused = make_stats(2.0, {})
+        fused["rules_applied"] = [{"rule": "trim+lower", "type": "fused_column", "rules": ["trim", "lower"],
+                                   "wall_time": 2.0}]
+        history.record("orders", fused, {"trim": "trim_strings", "lower": "normalize_text"})
+        history.record("orders", make_stats(2.0, {"trim": 1.0}))
+        history.record("orders", make_stats(2.0, {"lower": 3.0}), {"lower": "normalize_text"})
+
+        rules = {entry["rule"]: entry for entry in history.rule_summary("orders")}
+
+        assert set(rules) == {"trim", "lower"}
+        assert (rules["trim"]["type"], rules["trim"]["runs"]) == ("trim_strings", 2)
+        assert rules["trim"]["wall_time"]["p50"] == pytest.approx(1.0)
+        assert (rules["lower"]["type"], rules["lower"]["runs"]) == ("normalize_text", 2)
+        assert rules["lower"]["wall_time"]["p50"] == pytest.approx(2.0)
+
+    def test_old_runs_are_pruned(self, temp_dir):
+        history = RunHistory(str(temp_dir / "history.db"), max_runs=5)
+        for i in range(12):
+            history.record("orders", make_stats(float(i), {"trim": float(i)}))
+
+        assert [run["duration"] for run in history.runs("orders")] == [11.0, 10.0, 9.0, 8.0, 7.0]
+        assert history.rule_summary("orders")[0]["runs"] == 5
+
+    def test_empty_history(self, temp_dir):
+        history = RunHistory(str(temp_dir / "history.db"))
+
+        assert history.summary("orders") == {"runs": 0, "failed_runs": 0, "last_run": None,
+                                             "duration": {"p50": None, "p95": None}}
+        assert history.rule_summary("orders") == []
+
+
+class TestPipelineRunLog:
+    """The bounded execution log and run recording of ETLPipeline."""
+
+    def test_execution_log_is_bounded(self, frame, monkeypatch):
+        monkeypatch.setattr(etl_engine, "EXECUTION_LOG_SIZE", 3)
+        pipeline = ETLPipeline("orders")
+        pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["city"]}))
+
+        for _ in range(5):
+            _, stats = pipeline.execute(frame)
+
+        assert len(pipeline.execution_log) == 3
+        assert pipeline.execution_log[-1] is stats
+
+    def test_async_runs_are_recorded(self, frame, temp_dir):
+        manager = PipelineManager(str(temp_dir / "pipelines.json"), history_file=str(temp_dir / "history.db"))
+        pipeline = manager.create_pipeline("orders")
+        pipeline.add_rule(TransformRule("trim", "trim_strings", {"columns": ["city"]}))
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pipeline.execute_async(frame, executor=pool) for _ in range(8)]
+            for future in futures:
+                future.result()
+
+        assert manager.history.summary("orders")["runs"] == 8
+        assert manager.history.rule_summary("orders")[0]["runs"] == 8
+
+
+class TestPipelineJournal:
+    """Incremental persistence of PipelineManager."""
+
+    def test_changes_are_journaled_and_replayed(self, temp_dir):
+        config = temp_dir / "pipelines.json"
+        manager = PipelineManager(str(config))
+        manager.create_pipeline("keep")
+        manager.create_pipeline("drop")
+        manager.save_pipelines()
+
+        manager.get_pipeline("keep").add_rule(TransformRule("trim", "trim_strings", {"columns": ["city"]}))
+        manager.save_pipeline("keep")
+        manager.delete_pipeline("drop")
+
+        assert [p["name"] for p in json.loads(config.read_text())["pipelines"]] == ["keep", "drop"]
+        with open(manager.journal_file, "a", encoding="utf-8") as f:
+            f.write('{"op": "put", "pipel')  # interrupted write
+
+        reloaded = PipelineManager(str(config))
+        assert reloaded.list_pipelines() == ["keep"]
+        assert [rule.name for rule in reloaded.get_pipeline("keep").rules] == ["trim"]
+
+    def test_journal_is_compacted(self, temp_dir, monkeypatch):
+        monkeypatch.setattr(etl_engine, "JOURNAL_COMPACT_SIZE", 3)
+        config = temp_dir / "pipelines.json"
+        manager = PipelineManager(str(config))
+
+        for name in ("a", "b", "c"):
+            manager.create_pipeline(name)
+
+        assert not (temp_dir / "pipelines.json.journal").exists()
+        assert [p["name"] for p in json.loads(config.read_text())["pipelines"]] == ["a", "b", "c"]
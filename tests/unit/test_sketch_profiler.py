@@ -0,0 +1,137 @@
+"""
+Unit tests for sketch-based streaming profiles.
+
+Tests the HyperLogLog and t-digest sketches, merging partial profiles of
+chunks, and the approximate profile_data / detect_anomalies output of
+DataQualityChecker.profile_stream against the exact in-memory results.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.etl_engine import DataQualityChecker
+from utils.sketch_profiler import HyperLogLog, SketchProfile, TDigest, profile_stream
+
+
+@pytest.fixture
+def orders() -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    n = 200_000
+    amount = rng.normal(100, 15, n)
+    amount[::1_000] = np.nan
+    return pd.DataFrame({
+        "id": np.arange(n),
+        "amount": amount,
+        "store": rng.integers(0, 500, n),
+        "city": rng.choice(["Hanoi", "Huế", "Da Nang", None], n),
+        "country": "VN",
+    })
+
+
+def chunks_of(df: pd.DataFrame, size: int = 20_000):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+class TestSketches:
+    """Unit tests for HyperLogLog and TDigest."""
+
+    @pytest.mark.parametrize("distinct", [0, 1, 50, 5_000, 500_000])
+    def test_distinct_count(self, distinct):
+        sketch = HyperLogLog()
+        sketch.add(pd.util.hash_array(np.arange(distinct)))
+        sketch.add(pd.util.hash_array(np.arange(distinct)))
+
+        assert sketch.count() == pytest.approx(distinct, rel=0.03, abs=0.5)
+
+    def test_merged_digests_give_quantiles(self):
+        values = np.random.default_rng(0).exponential(size=300_000)
+        digests = []
+        for part in np.array_split(values, 7):
+            digests.append(TDigest())
+            digests[-1].update(part)
+        merged = TDigest()
+        for digest in digests:
+            merged.merge(digest)
+
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            # Rank error, which is what t-digest bounds
+            assert merged.cdf(np.quantile(values, q)) == pytest.approx(q, abs=0.005)
+        assert merged.quantile(0) == values.min()
+        assert merged.quantile(1) == values.max()
+
+    def test_small_digest_is_exact(self):
+        digest = TDigest()
+        digest.update(np.array([4.0, 1.0, 3.0, 2.0]))
+
+        assert digest.quantile(0.5) == 2.5
+
+
+class TestSketchProfile:
+    """Streamed profiles against DataQualityChecker's exact results."""
+
+    def test_profile_matches_exact(self, orders):
+        exact = DataQualityChecker.profile_data(orders)
+
+        profile = profile_stream(chunks_of(orders)).profile()
+
+        assert profile["total_rows"] == exact["total_rows"]
+        assert profile["memory_usage"] == pytest.approx(exact["memory_usage"], rel=0.01)
+        for col, expected in exact["columns"].items():
+            actual = profile["columns"][col]
+            assert actual.keys() == expected.keys()
+            assert actual["dtype"] == expected["dtype"]
+            assert actual["missing_count"] == expected["missing_count"]
+            assert actual["unique_count"] == pytest.approx(expected["unique_count"], rel=0.03)
+            for key in ("min", "max", "mean", "std", "avg_length", "max_length", "min_length"):
+                if key in expected:
+                    assert actual[key] == pytest.approx(expected[key], rel=1e-9)
+        assert profile["columns"]["amount"]["median"] == pytest.approx(exact["columns"]["amount"]["median"], abs=0.2)
+
+    def test_merged_partial_profiles_equal_one_pass(self, orders):
+        parts = [SketchProfile().update(chunk) for chunk in chunks_of(orders)]
+        merged = SketchProfile()
+        for part in reversed(parts):
+            merged.merge(part)
+
+        single = profile_stream(chunks_of(orders)).profile()
+        parallel = profile_stream(chunks_of(orders), max_workers=3).profile()
+
+        for profile in (merged.profile(), parallel):
+            for col in orders.columns:
+                for key in ("missing_count", "unique_count", "min", "max", "avg_length"):
+                    assert profile["columns"][col].get(key) == single["columns"][col].get(key)
+                assert profile["columns"][col].get("mean") == pytest.approx(single["columns"][col].get("mean"))
+
+    def test_anomalies(self, orders):
+        orders = pd.concat([orders, orders.iloc[:5_000]], ignore_index=True)
+        orders.loc[:9, "amount"] = 10_000.0
+        orders["notes"] = None
+
+        anomalies = profile_stream(chunks_of(orders)).anomalies()
+
+        assert anomalies["high_missing"] == ["notes (100.0% missing)"]
+        assert anomalies["low_variance"] == ["country (constant value)"]
+        assert len(anomalies["potential_duplicates"]) == 1
+        assert [issue.split(" ")[0] for issue in anomalies["outliers"]] == ["amount"]
+
+    def test_type_changes_across_chunks(self):
+        profile = SketchProfile()
+        profile.update(pd.DataFrame({"code": [1, 2], "qty": [1, 2]}))
+        profile.update(pd.DataFrame({"code": ["A1", None], "qty": [1.5, None]}))
+
+        columns = profile.profile()["columns"]
+
+        assert columns["code"]["dtype"] == "object"
+        assert columns["qty"]["dtype"] == "float64"
+        assert profile.anomalies()["inconsistent_types"] == ["code (int64, object across chunks)"]
+
+    def test_file_source(self, orders, temp_dir):
+        path = temp_dir / "orders.csv"
+        orders.to_csv(path, index=False)
+
+        result = DataQualityChecker.profile_stream(str(path))
+
+        assert result["profile"]["total_rows"] == len(orders)
+        assert result["profile"]["columns"]["city"]["missing_count"] == orders["city"].isna().sum()
+        assert "low_variance" in result["anomalies"]
@@ -0,0 +1,131 @@
+"""
+Arrow Strings - vectorized string kernels for text TransformRules
+
+Used by rules configured with string_engine='arrow'. Columns are cast to
+Arrow-backed strings once and processed with pyarrow.compute, so missing
+values stay missing instead of turning into the text 'nan'. Without pyarrow
+the same semantics are kept on pandas' own 'string' dtype, only slower.
+"""
+import re
+import pandas as pd
+from typing import Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    HAS_PYARROW = True
+except ImportError:
+    pa = None
+    pc = None
+    HAS_PYARROW = False
+
+
+STRING_ENGINES = {'python', 'arrow'}
+
+_CASE_KERNELS = {
+    'lower': 'utf8_lower',
+    'upper': 'utf8_upper',
+    'title': 'utf8_title',
+}
+
+_EXTRACT_GROUP = '_extract'
+
+
+def string_dtype() -> pd.StringDtype:
+    """The string dtype used by the arrow engine"""
+    return pd.StringDtype('pyarrow' if HAS_PYARROW else 'python')
+
+
+def to_strings(series: pd.Series) -> pd.Series:
+    """Cast a column to the engine's string dtype, keeping missing values as <NA>"""
+    dtype = string_dtype()
+    if series.dtype == dtype:
+        return series
+    return series.astype(dtype)
+
+
+def _arrow(series: pd.Series):
+    return pa.array(series.array)
+
+
+def _from_arrow(result, like: pd.Series) -> pd.Series:
+    return pd.Series(pd.arrays.ArrowStringArray(result), index=like.index, name=like.name)
+
+
+def strip(series: pd.Series) -> pd.Series:
+    """Trim surrounding whitespace"""
+    series = to_strings(series)
+    if HAS_PYARROW:
+        return _from_arrow(pc.utf8_trim_whitespace(_arrow(series)), series)
+    return series.str.strip()
+
+
+def change_case(series: pd.Series, case: str) -> pd.Series:
+    """Convert to 'lower', 'upper' or 'title' case"""
+    series = to_strings(series)
+    if HAS_PYARROW:
+        kernel = getattr(pc, _CASE_KERNELS[case])
+        return _from_arrow(kernel(_arrow(series)), series)
+    return getattr(series.str, case)()
+
+
+def _name_first_group(pattern: str) -> Optional[str]:
+    """
+    Rewrite pattern so its first capturing group is named, as extract_regex needs.
+
+    Returns None if the pattern has no capturing group.
+    """
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+            if pattern[i + 1:i + 2] == ']':
+                i += 1
+        elif char == '(':
+            if pattern[i + 1:i + 2] != '?':
+                return f"{pattern[:i + 1]}?P<{_EXTRACT_GROUP}>{pattern[i + 1:]}"
+            if pattern[i + 1:i + 4] == '?P<':
+                end = pattern.index('>', i)
+                return f"{pattern[:i + 4]}{_EXTRACT_GROUP}{pattern[end:]}"
+        i += 1
+    return None
+
+
+def extract(series: pd.Series, pattern: str) -> pd.Series:
+    """
+    First capture group of the first match, <NA> where nothing matches.
+
+    Patterns RE2 cannot compile (backreferences, lookaround) fall back to
+    Python's re module.
+    """
+    series = to_strings(series)
+    if HAS_PYARROW and re.compile(pattern).groups:
+        named = _name_first_group(pattern)
+        try:
+            matches = pc.extract_regex(_arrow(series), pattern=named)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+        else:
+            return _from_arrow(pc.struct_field(matches, [0]), series)
+    return series.str.extract(pattern, expand=False)
+
+
+def contains(series: pd.Series, pattern: str) -> pd.Series:
+    """Boolean mask of values matching the regex pattern; missing values are False"""
+    series = to_strings(series)
+    if HAS_PYARROW:
+        try:
+            mask = pc.match_substring_regex(_arrow(series), pattern=pattern)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+        else:
+            return pd.Series(pc.fill_null(mask, False).to_numpy(zero_copy_only=False),
+                             index=series.index, name=series.name)
+    return series.str.contains(pattern, na=False).astype(bool)
@@ -0,0 +1,360 @@
+"""
+Batch Runner - apply a saved pipeline to many files in a process pool
+
+Each input file (CSV, Excel, JSON or SQLite) is read, transformed and
+written in a worker process. Files are only started while their estimated
+memory fits in the budget reported by MemoryMonitor, so a batch of large
+files runs fewer at a time than a batch of small ones. With a cache_dir,
+files whose content and pipeline rules are unchanged since an earlier run
+reuse that run's result from a ResultCache instead of being recomputed.
+Only the source columns the pipeline needs (see required_columns) are read.
+
+    python -m utils.batch_runner clean_orders "incoming/*.csv" -o out/ --workers 4
+"""
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from utils.data_connectors import DataConnector
+from utils.etl_engine import ETLPipeline, PipelineManager
+from utils.performance_optimizer import MemoryMonitor
+from utils.result_cache import ResultCache, execute_cached
+
+INPUT_FORMATS = {
+    '.csv': 'csv',
+    '.xlsx': 'excel',
+    '.xls': 'excel',
+    '.json': 'json',
+    '.db': 'sqlite',
+    '.sqlite': 'sqlite',
+    '.sqlite3': 'sqlite',
+}
+
+OUTPUT_FORMATS = {'csv': '.csv', 'json': '.json', 'excel': '.xlsx'}
+
+# A loaded frame plus one transformed copy, relative to the size on disk
+MEMORY_PER_FILE_BYTE = {'csv': 6, 'excel': 10, 'json': 6, 'sqlite': 4}
+
+SUMMARY_FILE = 'batch_summary.json'
+
+
+def estimate_memory(path: str) -> int:
+    """Rough peak memory in bytes for running a pipeline on one file"""
+    fmt = INPUT_FORMATS.get(os.path.splitext(path)[1].lower(), 'csv')
+    return os.path.getsize(path) * MEMORY_PER_FILE_BYTE[fmt]
+
+
+def _only_table(db_path: str) -> str:
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    finally:
+        conn.close()
+    if len(tables) != 1:
+        raise ValueError(f"{os.path.basename(db_path)} has {len(tables)} tables; choose one with sqlite_table")
+    return tables[0]
+
+
+def _table_columns(db_path: str, table: str) -> List[str]:
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[1] for row in conn.execute("SELECT * FROM pragma_table_info(?)", (table,))]
+    finally:
+        conn.close()
+
+
+def read_input(path: str, sqlite_table: Optional[str] = None, columns: Optional[List[str]] = None):
+    """Load one input file by its extension (columns=[...] reads only those columns, if present)"""
+    fmt = INPUT_FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt == 'csv':
+        return DataConnector.import_csv(path, columns=columns)
+    if fmt == 'excel':
+        return DataConnector.import_excel(path, columns=columns)
+    if fmt == 'json':
+        return DataConnector.import_json(path, columns=columns)
+    if fmt == 'sqlite':
+        table = sqlite_table or _only_table(path)
+        if columns is not None:
+            # A SELECT of a missing column fails; leave it to the rule that uses it
+            present = set(_table_columns(path, table))
+            columns = [col for col in columns if col in present]
+        return DataConnector.import_sqlite(path, table, columns=columns)
+    raise ValueError(f"Unsupported input file: {path}")
+
+
+def write_output(df, path: str, output_format: str):
+    """Write a result frame; raises on failure so the file is reported as failed"""
+    if output_format == 'csv':
+        written = DataConnector.export_csv(df, path)
+    elif output_format == 'json':
+        written = DataConnector.export_json(df, path)
+    elif output_format == 'excel':
+        written = DataConnector.export_excel(df, path)
+    else:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    if not written:
+        raise IOError(f"Could not write {path}")
+
+
+def output_names(paths: List[str]) -> Dict[str, str]:
+    """Output base name per input path; inputs sharing a file name get a numeric suffix"""
+    names = {}
+    taken = set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, n = stem, 1
+        while name in taken:
+            n += 1
+            name = f"{stem}_{n}"
+        taken.add(name)
+        names[path] = name
+    return names
+
+
+def run_file(pipeline_data: Dict[str, Any], path: str, output_dir: str, output_name: str,
+             output_format: str = 'csv', sqlite_table: Optional[str] = None,
+             cache_dir: Optional[str] = None, cache_quota_mb: float = 2048) -> Dict[str, Any]:
+    """
+    Run a pipeline on one file and write its result and stats.
+
+    Runs in a worker process, so the pipeline arrives as its to_dict() form.
+    Never raises: failures are reported in the returned stats.
+    """
+    started = time.perf_counter()
+    stats = {
+        'file': path,
+        'output': None,
+        'status': 'failed',
+        'rows_in': None,
+        'rows_out': None,
+        'duration': None,
+        'errors': [],
+    }
+    pipeline = None
+    try:
+        pipeline = ETLPipeline.from_dict(pipeline_data)
+        columns = pipeline.required_columns()
+        if cache_dir:
+            cache = ResultCache(cache_dir, quota_mb=cache_quota_mb)
+            result, execution_stats = execute_cached(
+                pipeline, path, lambda p: read_input(p, sqlite_table, columns), cache, sqlite_table,
+                source=os.path.abspath(path))
+            stats['result_cache'] = execution_stats['result_cache']
+        else:
+            result, execution_stats = pipeline.execute(read_input(path, sqlite_table, columns),
+                                                       source=os.path.abspath(path))
+        output = os.path.join(output_dir, output_name + OUTPUT_FORMATS[output_format])
+        write_output(result, output, output_format)
+        stats.update({
+            'output': output,
+            'status': 'ok' if not execution_stats['errors'] else 'errors',
+            'rows_in': execution_stats['initial_rows'],
+            'rows_out': execution_stats['final_rows'],
+            'errors': execution_stats['errors'],
+            'rules_applied': execution_stats['rules_applied'],
+            'rules_skipped': execution_stats['rules_skipped'],
+        })
+    except Exception as e:
+        stats['errors'].append({'error': str(e)})
+    finally:
+        if pipeline is not None:
+            pipeline.shutdown()
+    stats['duration'] = round(time.perf_counter() - started, 4)
+
+    with open(os.path.join(output_dir, output_name + '.stats.json'), 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2, ensure_ascii=False, default=str)
+    return stats
+
+
+class MemoryGate:
+    """
+    Admit work while its estimated memory fits in a budget.
+
+    One item is always admitted when nothing else is running, so a file
+    larger than the whole budget still runs, alone.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.in_use = 0
+        self.running = 0
+
+    def try_acquire(self, amount: int) -> bool:
+        if self.running and self.in_use + amount > self.budget:
+            return False
+        self.in_use += amount
+        self.running += 1
+        return True
+
+    def release(self, amount: int):
+        self.in_use -= amount
+        self.running -= 1
+
+
+class BatchRunner:
+    """Run one pipeline over many files with memory-bounded process parallelism"""
+
+    def __init__(self, pipeline: ETLPipeline, output_dir: str, max_workers: Optional[int] = None,
+                 output_format: str = 'csv', sqlite_table: Optional[str] = None,
+                 memory_monitor: Optional[MemoryMonitor] = None, cache_dir: Optional[str] = None,
+                 cache_quota_mb: float = 2048):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format: {output_format}")
+        self.pipeline = pipeline
+        self.output_dir = output_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.output_format = output_format
+        self.sqlite_table = sqlite_table
+        self.memory_monitor = memory_monitor or MemoryMonitor()
+        self.cache_dir = cache_dir
+        self.cache_quota_mb = cache_quota_mb
+
+    def run(self, paths: List[str]) -> Dict[str, Any]:
+        """Process paths; returns the batch summary, also written to batch_summary.json"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        summary = {
+            'pipeline': self.pipeline.name,
+            'start_time': datetime.now(),
+            'output_dir': self.output_dir,
+            'memory_budget': self.memory_monitor.get_memory_budget(),
+            'max_workers': self.max_workers,
+            'files': [],
+        }
+        names = output_names(paths)
+        args = (self.output_format, self.sqlite_table, self.cache_dir, self.cache_quota_mb)
+        pipeline_data = self.pipeline.to_dict()
+
+        results: Dict[str, Dict[str, Any]] = {}
+        try:
+            if self.max_workers == 1:
+                for path in paths:
+                    results[path] = run_file(pipeline_data, path, self.output_dir, names[path], *args)
+            else:
+                self._run_pool(paths, names, pipeline_data, args, summary['memory_budget'], results)
+        finally:
+            # Written even when the batch is interrupted, with the files finished so far
+            summary['files'] = [results[path] for path in paths if path in results]
+            summary['end_time'] = datetime.now()
+            summary['duration'] = (summary['end_time'] - summary['start_time']).total_seconds()
+            summary['succeeded'] = sum(1 for entry in summary['files'] if entry['status'] == 'ok')
+            summary['failed'] = len(summary['files']) - summary['succeeded']
+
+            with open(os.path.join(self.output_dir, SUMMARY_FILE), 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
+        return summary
+
+    def _run_pool(self, paths: List[str], names: Dict[str, str], pipeline_data: Dict[str, Any],
+                  args: tuple, budget: int, results: Dict[str, Dict[str, Any]]):
+        gate = MemoryGate(budget)
+        pending = [(path, estimate_memory(path)) for path in paths]
+
+        # A worker that dies (e.g. killed for memory) breaks the whole pool:
+        # the files it was running fail and the rest go to a fresh pool
+        while pending:
+            self._run_until_broken(pending, names, pipeline_data, args, gate, results)
+
+    def _run_until_broken(self, pending: List[tuple], names: Dict[str, str], pipeline_data: Dict[str, Any],
+                          args: tuple, gate: MemoryGate, results: Dict[str, Dict[str, Any]]):
+        running = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            broken = False
+            while (pending and not broken) or running:
+                while not broken and pending and len(running) < self.max_workers \
+                        and gate.try_acquire(pending[0][1]):
+                    path, estimate = pending.pop(0)
+                    try:
+                        future = pool.submit(run_file, pipeline_data, path, self.output_dir, names[path], *args)
+                    except BrokenProcessPool:
+                        # Broke since the last wait; this file never started
+                        gate.release(estimate)
+                        pending.insert(0, (path, estimate))
+                        broken = True
+                        break
+                    running[future] = (path, estimate)
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, estimate = running.pop(future)
+                    gate.release(estimate)
+                    try:
+                        results[path] = future.result()
+                    except BrokenProcessPool as e:
+                        broken = True
+                        results[path] = _failed_entry(path, e)
+                    except Exception as e:
+                        results[path] = _failed_entry(path, e)
+
+
+def _failed_entry(path: str, error: Exception) -> Dict[str, Any]:
+    """Summary entry for a file whose worker process died"""
+    return {'file': path, 'output': None, 'status': 'failed',
+            'errors': [{'error': str(error) or type(error).__name__}]}
+
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """Sorted, de-duplicated files matching the glob patterns (** recurses)"""
+    paths = set()
+    for pattern in patterns:
+        paths.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(paths)
+
+
+def run_batch(pipeline_name: str, patterns: List[str], output_dir: str,
+              config_file: str = 'etl_pipelines.json', **kwargs) -> Dict[str, Any]:
+    """Run a pipeline saved by PipelineManager over every file matching patterns"""
+    pipeline = PipelineManager(config_file).get_pipeline(pipeline_name)
+    if pipeline is None:
+        raise ValueError(f"Pipeline '{pipeline_name}' not found in {config_file}")
+    paths = expand_inputs(patterns)
+    if not paths:
+        raise ValueError(f"No input files match {', '.join(patterns)}")
+    return BatchRunner(pipeline, output_dir, **kwargs).run(paths)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply a saved ETL pipeline to many files in parallel")
+    parser.add_argument('pipeline', help="pipeline name in the config file")
+    parser.add_argument('inputs', nargs='+', help="input files or glob patterns (CSV, Excel, JSON, SQLite)")
+    parser.add_argument('-o', '--output-dir', required=True, help="directory for results and per-file stats")
+    parser.add_argument('-c', '--config', default='etl_pipelines.json', help="pipelines file (default: %(default)s)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="max worker processes (default: CPU count)")
+    parser.add_argument('-f', '--format', choices=sorted(OUTPUT_FORMATS), default='csv', help="output format")
+    parser.add_argument('--table', default=None, help="table to read from SQLite inputs")
+    parser.add_argument('--memory-threshold', type=float, default=0.8,
+                        help="share of system memory the batch may fill (default: %(default)s)")
+    parser.add_argument('--cache-dir', default=None, help="reuse results of unchanged files from this directory")
+    parser.add_argument('--cache-quota', type=float, default=2048,
+                        help="result cache size limit in MB (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = run_batch(
+            args.pipeline, args.inputs, args.output_dir, config_file=args.config,
+            max_workers=args.workers, output_format=args.format, sqlite_table=args.table,
+            memory_monitor=MemoryMonitor(threshold_percent=args.memory_threshold),
+            cache_dir=args.cache_dir, cache_quota_mb=args.cache_quota,
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    print(f"{summary['succeeded']}/{len(summary['files'])} files succeeded in {summary['duration']:.1f}s; "
+          f"summary: {os.path.join(args.output_dir, SUMMARY_FILE)}")
+    for entry in summary['files']:
+        if entry['status'] != 'ok':
+            print(f"  {entry['status']}: {entry['file']}: {entry['errors']}", file=sys.stderr)
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+Column kernels - per-column operations shared by TransformRules and fused plan steps
+
+Ops are plain tuples so chains of them can be sent to worker processes:
+    ('strip',)                 trim surrounding whitespace (as text)
+    ('case', 'lower')          lower / upper / title case (as text)
+    ('replace', {old: new})    exact value replacement
+    ('convert', 'float')       convert_type target
+    ('fill', 'mean', value)    fill_missing method and fallback value
+    ('arrow_strip',)           strip on Arrow strings (missing values kept)
+    ('arrow_case', 'lower')    case change on Arrow strings (missing values kept)
+"""
+import warnings
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+from typing import Dict, List, Any, Callable, Optional
+
+from utils import arrow_strings
+
+
+CASE_FUNCTIONS: Dict[str, Callable[[str], str]] = {
+    'lower': str.lower,
+    'upper': str.upper,
+    'title': str.title,
+}
+
+# Ops that work on text one element at a time and can be composed into one pass
+ELEMENT_OPS = {'strip', 'case', 'replace'}
+
+# Text columns with at most this share of distinct values are transformed per unique value
+UNIQUE_VALUE_RATIO = 0.5
+
+# Distinct values a cached datetime format is checked against
+DATETIME_SAMPLE_SIZE = 200
+
+# Distinct values a datetime format is guessed from (each guess costs ~0.5ms)
+DATETIME_GUESS_SIZE = 20
+
+# A cached datetime format is re-inferred when it fails on more of the sample than this
+DATETIME_FORMAT_MAX_FAILURES = 0.5
+
+
+def copy_on_write():
+    """Context running pandas with Copy-on-Write: data is only copied when written"""
+    return pd.option_context('mode.copy_on_write', True)
+
+
+def with_columns(df: pd.DataFrame, updates: Dict[Any, Any]) -> pd.DataFrame:
+    """
+    New frame with the given columns replaced or added.
+
+    df itself is left untouched and the other columns are shared with it,
+    not copied.
+    """
+    if not updates:
+        return df
+    result = df.copy(deep=False)
+    for col, values in updates.items():
+        result[col] = values
+    return result
+
+
+def convert_series(series: pd.Series, target_type: str) -> pd.Series:
+    """Convert a column the way the convert_type rule does"""
+    if target_type == 'string':
+        return series.astype(str)
+    elif target_type == 'integer':
+        return pd.to_numeric(series, errors='coerce').astype('Int64')
+    elif target_type == 'float':
+        return pd.to_numeric(series, errors='coerce')
+    elif target_type == 'datetime':
+        return parse_datetimes(series).series
+    elif target_type == 'boolean':
+        return series.astype(bool)
+    return series
+
+
+@dataclass
+class DatetimeParse:
+    """Result of parse_datetimes: the column plus how its text was parsed"""
+    series: pd.Series
+    format: Optional[str]
+    values: int  # non-missing inputs
+    failures: int  # non-missing inputs that became NaT
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.values if self.values else 0.0
+
+
+def _datetime_sample(uniques: np.ndarray, size: int = DATETIME_SAMPLE_SIZE) -> np.ndarray:
+    """Evenly spaced distinct values, so a sorted column shows its whole range"""
+    if len(uniques) <= size:
+        return uniques
+    return uniques[np.linspace(0, len(uniques) - 1, size).astype(int)]
+
+
+def _to_datetime(values: np.ndarray, datetime_format: Optional[str]) -> pd.Series:
+    with warnings.catch_warnings():
+        # Unparseable and mixed-offset values are coerced to NaT or rejected below
+        warnings.simplefilter('ignore')
+        return pd.to_datetime(pd.Series(values, dtype=object), format=datetime_format, errors='coerce')
+
+
+def infer_datetime_format(uniques: np.ndarray) -> Optional[str]:
+    """Most common format guessed over a sample of distinct text values"""
+    with warnings.catch_warnings():
+        # Day-first guesses warn that dayfirst was not passed; the format already says so
+        warnings.simplefilter('ignore')
+        guesses = Counter(guess_datetime_format(value)
+                          for value in _datetime_sample(uniques, DATETIME_GUESS_SIZE)
+                          if isinstance(value, str))
+    guesses.pop(None, None)
+    return guesses.most_common(1)[0][0] if guesses else None
+
+
+def parse_datetimes(series: pd.Series, datetime_format: Optional[str] = None,
+                    infer: bool = True) -> DatetimeParse:
+    """
+    Convert a column to datetimes the way convert_type does, parsing each distinct value once.
+
+    Text is parsed with datetime_format, or a format inferred from a sample
+    of the distinct values (also when the given format fails on most of the
+    sample). Values the format does not fit become NaT and count as
+    failures, like pd.to_datetime does, so a column never mixes day-first
+    and month-first readings. With infer=False, datetime_format is used
+    as-is. Non-text columns go straight to pd.to_datetime.
+    """
+    if not (series.dtype == object or isinstance(series.dtype, pd.StringDtype)):
+        result = pd.to_datetime(series, errors='coerce')
+        values = int(series.notna().sum())
+        return DatetimeParse(result, None, values, values - int(result.notna().sum()))
+
+    codes, uniques = pd.factorize(series)
+    uniques = np.asarray(uniques, dtype=object)
+    if infer and (datetime_format is None
+                  or _to_datetime(_datetime_sample(uniques), datetime_format).isna().mean()
+                  > DATETIME_FORMAT_MAX_FAILURES):
+        datetime_format = infer_datetime_format(uniques) or datetime_format
+
+    parsed = _to_datetime(uniques, datetime_format)
+
+    # Mixed UTC offsets parse to an object column of Timestamps, as with pd.to_datetime
+    result = pd.Series(parsed.array.take(codes, allow_fill=True, fill_value=pd.NaT),
+                       index=series.index, name=series.name)
+    missing = int(np.count_nonzero(codes == -1))
+    return DatetimeParse(result, datetime_format, len(codes) - missing, int(result.isna().sum()) - missing)
+
+
+def fill_series(series: pd.Series, method: str, value: Any = '') -> pd.Series:
+    """Fill missing values in a column the way the fill_missing rule does"""
+    if method == 'constant':
+        return series.fillna(value)
+    elif method == 'mean':
+        return series.fillna(series.mean())
+    elif method == 'median':
+        return series.fillna(series.median())
+    elif method == 'mode':
+        mode = series.mode()
+        return series.fillna(mode[0] if not mode.empty else value)
+    elif method == 'forward':
+        return series.ffill()
+    elif method == 'backward':
+        return series.bfill()
+    return series
+
+
+def map_unique_values(series: pd.Series, transform: Callable[[pd.Series], pd.Series],
+                      as_text: bool = True) -> Optional[pd.Series]:
+    """
+    Run transform on the distinct values of a column and map the results back.
+
+    Works on categoricals and on low-cardinality object columns of strings:
+    transform sees one entry per distinct value (as text when as_text, like
+    Series.astype(str)) and the results are gathered back through the integer
+    codes with a single take. Categorical input gives categorical output.
+    Returns None when the column is not suited, so the caller can transform
+    it element by element instead.
+    """
+    categorical = isinstance(series.dtype, pd.CategoricalDtype)
+    if categorical:
+        codes = series.cat.codes.to_numpy()
+        uniques = pd.Series(series.cat.categories, dtype=object)
+    elif series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == 'string':
+        codes, values = pd.factorize(series)
+        if len(values) > UNIQUE_VALUE_RATIO * len(series):
+            return None
+        uniques = pd.Series(values, dtype=object)
+    else:
+        return None
+
+    if as_text:
+        uniques = uniques.astype(str)
+        missing = codes == -1
+        if missing.any():
+            # astype(str) spells missing values out ('nan', 'None'), so they get entries too
+            missing_codes, missing_text = pd.factorize(series[missing].astype(str))
+            codes = codes.copy()
+            codes[missing] = missing_codes + len(uniques)
+            uniques = pd.concat([uniques, pd.Series(missing_text, dtype=object)], ignore_index=True)
+
+    results = pd.Series(transform(uniques.reset_index(drop=True)), dtype=object).to_numpy()
+    results = np.append(results, np.nan)  # code -1 picks missing
+
+    if categorical:
+        result_codes, categories = pd.factorize(results)
+        return pd.Series(pd.Categorical.from_codes(result_codes[codes], categories=categories),
+                         index=series.index, name=series.name)
+    return pd.Series(results[codes], index=series.index, name=series.name, dtype=object)
+
+
+def transform_text(series: pd.Series, transform: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """Apply a transform to a column as text, once per distinct value where possible"""
+    result = map_unique_values(series, transform)
+    if result is None:
+        result = transform(series.astype(str))
+    return result
+
+
+def replace_series(series: pd.Series, mapping: Dict[Any, Any]) -> pd.Series:
+    """Replace values the way the replace_values rule does, renaming categories in place"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return map_unique_values(series, lambda uniques: uniques.replace(mapping), as_text=False)
+    return series.replace(mapping)
+
+
+def _as_text(value: Any) -> str:
+    """Coerce a value to text the same way Series.astype(str) does"""
+    return value if type(value) is str else str(value)
+
+
+def _element_function(op: tuple) -> Callable[[Any], Any]:
+    """Build the per-element function for an element op"""
+    kind = op[0]
+    if kind == 'strip':
+        return lambda v: _as_text(v).strip()
+    if kind == 'case':
+        case_func = CASE_FUNCTIONS[op[1]]
+        return lambda v: case_func(_as_text(v))
+    if kind == 'replace':
+        mapping = op[1]
+        return lambda v: mapping.get(v, v)
+    raise ValueError(f"Unknown element op: {kind}")
+
+
+def _map_text(series: pd.Series, funcs: List[Callable[[Any], Any]]) -> pd.Series:
+    """Convert to str once and run all element functions in a single pass"""
+    def compose(value):
+        for func in funcs:
+            value = func(value)
+        return value
+
+    def compose_all(values: pd.Series) -> pd.Series:
+        return pd.Series([compose(v) for v in values], index=values.index,
+                         name=values.name, dtype=object)
+
+    return transform_text(series, compose_all)
+
+
+def _apply_series_op(series: pd.Series, op: tuple) -> pd.Series:
+    kind = op[0]
+    if kind == 'replace':
+        return replace_series(series, op[1])
+    if kind == 'convert':
+        return convert_series(series, op[1])
+    if kind == 'fill':
+        return fill_series(series, op[1], op[2])
+    if kind == 'arrow_strip':
+        return arrow_strings.strip(series)
+    if kind == 'arrow_case':
+        return arrow_strings.change_case(series, op[1])
+    raise ValueError(f"Unknown column op: {kind}")
+
+
+def apply_column_ops(series: pd.Series, ops: List[tuple]) -> pd.Series:
+    """
+    Apply a chain of column ops to a Series.
+
+    Consecutive text ops are composed and run in one pass over a single
+    astype(str) of the column. Replace ops that are not preceded by a text
+    op, conversions and fills run as whole-Series operations.
+    """
+    pending: List[Callable[[Any], Any]] = []
+    for op in ops:
+        if op[0] in ELEMENT_OPS and (op[0] != 'replace' or pending):
+            pending.append(_element_function(op))
+            continue
+        if pending:
+            series = _map_text(series, pending)
+            pending = []
+        series = _apply_series_op(series, op)
+
+    if pending:
+        series = _map_text(series, pending)
+    return series
+
+
+def is_python_heavy(ops: List[tuple]) -> bool:
+    """Whether a chain spends its time in per-element Python code (holding the GIL)"""
+    return any(op[0] in ('strip', 'case') for op in ops)
+
+
+def describe_op(op: tuple) -> str:
+    if op[0] == 'case':
+        return op[1]
+    if op[0] == 'arrow_strip':
+        return 'strip[arrow]'
+    if op[0] == 'arrow_case':
+        return f"{op[1]}[arrow]"
+    if op[0] == 'replace':
+        return f"replace({len(op[1])})"
+    if op[0] in ('convert', 'fill'):
+        return f"{op[0]}:{op[1]}"
+    return op[0]
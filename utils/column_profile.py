@@ -0,0 +1,155 @@
+"""
+Column Profile - single-pass column statistics for DataQualityChecker
+
+Each column is scanned once: numeric columns reduce their valid values
+with numpy (one NA mask shared by every statistic), and text, categorical
+and other columns are factorized once, which gives the missing count,
+the distinct count and the value counts together. Text lengths and the
+deep memory size of object columns are then computed per distinct value
+and weighted by its count instead of per row.
+
+Results match the pandas expressions DataQualityChecker used to
+evaluate one by one (str lengths are those of astype(str), so a missing
+value counts as 'nan', 'None' or '<NA>').
+"""
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+
+
+def _is_text(series: pd.Series) -> bool:
+    return pd.api.types.is_string_dtype(series) or series.dtype == 'object'
+
+
+def _numeric_stats(values: np.ndarray) -> Dict[str, Optional[float]]:
+    """min/max/mean/median/std (ddof=1) of the valid values of a numeric column"""
+    if len(values) == 0:
+        return {'min': None, 'max': None, 'mean': None, 'median': None, 'std': None}
+    if values.dtype == bool:
+        values = values.view(np.uint8)
+    return {
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'mean': float(values.mean(dtype=np.float64)),
+        'median': float(np.median(values)),
+        'std': float(values.std(dtype=np.float64, ddof=1)) if len(values) > 1 else float('nan'),
+    }
+
+
+def _profile_numeric(series: pd.Series) -> Tuple[int, int, Dict[str, Optional[float]]]:
+    """(missing count, distinct count, stats) of a numeric column"""
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()
+        if values.dtype.kind == 'f':
+            missing = np.isnan(values)
+            count = int(np.count_nonzero(missing))
+            if count:
+                values = values[~missing]
+        else:
+            count = 0
+        return count, len(pd.unique(values)), _numeric_stats(values)
+
+    # Extension dtypes (Int64, Float64, boolean, Arrow): distinct values on
+    # the original values, so large integers are not merged as floats
+    missing = series.isna().to_numpy()
+    valid = series[~missing]
+    return int(np.count_nonzero(missing)), int(valid.nunique()), _numeric_stats(valid.to_numpy(dtype=np.float64))
+
+
+def _length_stats(lengths: np.ndarray, counts: np.ndarray, rows: int) -> Dict[str, Any]:
+    present = counts > 0
+    lengths, counts = lengths[present], counts[present]
+    return {
+        'avg_length': float(np.dot(lengths, counts) / rows),
+        'max_length': int(lengths.max()),
+        'min_length': int(lengths.min()),
+    }
+
+
+def _factorize(series: pd.Series) -> Tuple[np.ndarray, Any]:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    return pd.factorize(series)
+
+
+def profile_column(series: pd.Series) -> Tuple[Dict[str, Any], int]:
+    """
+    Profile one column; returns (profile entry, deep memory size in bytes).
+
+    The entry has dtype, missing/unique counts and percents, plus
+    min/max/mean/median/std for numeric columns or avg/max/min length for
+    text columns.
+    """
+    rows = len(series)
+    percent = (lambda count: float(count / rows * 100)) if rows else (lambda count: 0.0)
+    col_profile = {'dtype': str(series.dtype)}
+
+    if pd.api.types.is_numeric_dtype(series):
+        missing, unique, stats = _profile_numeric(series)
+        col_profile.update({
+            'missing_count': missing,
+            'missing_percent': percent(missing),
+            'unique_count': unique,
+            'unique_percent': percent(unique),
+        })
+        col_profile.update(stats)
+        return col_profile, int(series.memory_usage(index=False, deep=True))
+
+    codes, uniques = _factorize(series)
+    na = codes == -1
+    missing = int(np.count_nonzero(na))
+    counts = np.bincount(codes[~na] if missing else codes, minlength=len(uniques))
+    unique = int(np.count_nonzero(counts))
+    col_profile.update({
+        'missing_count': missing,
+        'missing_percent': percent(missing),
+        'unique_count': unique,
+        'unique_percent': percent(unique),
+    })
+
+    # Equal values of different types (1, 1.0, True) share one code but not one str()
+    inferred = pd.api.types.infer_dtype(uniques, skipna=False)
+    text_uniques = series.dtype != 'object' or inferred in ('string', 'empty')
+    missing_values = series[na] if missing else None
+    if series.dtype == 'object' and text_uniques:
+        memory = int(series.array.nbytes + np.dot(counts, [value.__sizeof__() for value in uniques]))
+        if missing:
+            memory += int(missing_values.memory_usage(index=False, deep=True) - missing_values.array.nbytes)
+    else:
+        memory = int(series.memory_usage(index=False, deep=True))
+
+    if not _is_text(series):
+        return col_profile, memory
+    if rows == 0:
+        col_profile.update({'avg_length': None, 'max_length': None, 'min_length': None})
+        return col_profile, memory
+
+    if text_uniques:
+        names = pd.Index(uniques)
+        lengths = (names if inferred == 'string' else names.astype(str)).str.len().to_numpy()
+        if missing:
+            missing_lengths = missing_values.astype(str).str.len().to_numpy()
+            lengths = np.concatenate([lengths, missing_lengths])
+            counts = np.concatenate([counts, np.ones(len(missing_lengths), dtype=counts.dtype)])
+    else:
+        lengths = series.astype(str).str.len().to_numpy()
+        counts = np.ones(rows, dtype=np.int64)
+    col_profile.update(_length_stats(lengths, counts, rows))
+    return col_profile, memory
+
+
+def profile_frame(df: pd.DataFrame) -> Dict[str, Any]:
+    """Data quality profile of every column of df (see DataQualityChecker.profile_data)"""
+    profile = {
+        'total_rows': len(df),
+        'total_columns': len(df.columns),
+        'memory_usage': 0.0,
+        'columns': {}
+    }
+    memory = int(df.index.memory_usage(deep=True))
+    for i, col in enumerate(df.columns):
+        col_profile, col_memory = profile_column(df.iloc[:, i])
+        profile['columns'][col] = col_profile
+        memory += col_memory
+    profile['memory_usage'] = memory / 1024**2  # MB
+    return profile
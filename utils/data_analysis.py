@@ -1,7 +1,6 @@
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Set
-from sklearn.preprocessing import LabelEncoder
 
 class AdvancedNormalizer:
     def __init__(self, df: pd.DataFrame):
@@ -12,18 +12,36 @@ import sqlite3
 class DataConnector:
     """Base class for data connectors"""
     
+    @staticmethod
+    def _column_filter(columns: Optional[List[str]]):
+        """usecols callable keeping only the wanted columns (None keeps all)"""
+        if columns is None:
+            return None
+        wanted = set(columns)
+        return lambda col: col in wanted
+    
+    @staticmethod
+    def _select_query(table_name: str, columns: Optional[List[str]], quote: str = '"') -> str:
+        """SELECT statement reading only the wanted columns (None reads all)"""
+        if columns is None:
+            return f"SELECT * FROM {table_name}"
+        column_list = ", ".join(quote + col.replace(quote, quote * 2) + quote for col in columns)
+        return f"SELECT {column_list} FROM {table_name}"
+    
     @staticmethod
     def import_csv(file_path: str, **kwargs) -> pd.DataFrame:
-        """Import data from CSV file"""
+        """Import data from CSV file (columns=[...] reads only those columns)"""
         encoding = kwargs.get('encoding', 'utf-8')
         delimiter = kwargs.get('delimiter', ',')
-        return pd.read_csv(file_path, encoding=encoding, delimiter=delimiter)
+        usecols = DataConnector._column_filter(kwargs.get('columns'))
+        return pd.read_csv(file_path, encoding=encoding, delimiter=delimiter, usecols=usecols)
     
     @staticmethod
     def import_excel(file_path: str, **kwargs) -> pd.DataFrame:
-        """Import data from Excel file"""
+        """Import data from Excel file (columns=[...] reads only those columns)"""
         sheet_name = kwargs.get('sheet_name', 0)
-        return pd.read_excel(file_path, sheet_name=sheet_name)
+        usecols = DataConnector._column_filter(kwargs.get('columns'))
+        return pd.read_excel(file_path, sheet_name=sheet_name, usecols=usecols)
     
     @staticmethod
     def import_json(file_path: str, **kwargs) -> pd.DataFrame:
@@ -33,16 +51,21 @@ class DataConnector:
             data = json.load(f)
         
         if isinstance(data, list):
-            return pd.DataFrame(data)
+            df = pd.DataFrame(data)
         elif isinstance(data, dict):
-            return pd.DataFrame([data])
+            df = pd.DataFrame([data])
         else:
             raise ValueError("Unsupported JSON format")
+        
+        columns = kwargs.get('columns')
+        if columns is not None:
+            df = df[[col for col in df.columns if col in set(columns)]]
+        return df
     
     @staticmethod
     def import_sqlite(db_path: str, table_name: str, **kwargs) -> pd.DataFrame:
-        """Import data from SQLite database"""
-        query = kwargs.get('query', f"SELECT * FROM {table_name}")
+        """Import data from SQLite database (columns=[...] selects only those columns)"""
+        query = kwargs.get('query', DataConnector._select_query(table_name, kwargs.get('columns')))
         conn = sqlite3.connect(db_path)
         try:
             df = pd.read_sql_query(query, conn)
@@ -66,7 +89,7 @@ class DataConnector:
     @staticmethod
     def import_mysql(host: str, user: str, password: str, database: str, 
                      table_name: str, **kwargs) -> pd.DataFrame:
-        """Import data from MySQL (requires pymysql)"""
+        """Import data from MySQL (requires pymysql; columns=[...] selects only those columns)"""
         try:
             import pymysql
             conn = pymysql.connect(
@@ -76,7 +99,7 @@ class DataConnector:
                 database=database
             )
             try:
-                query = kwargs.get('query', f"SELECT * FROM {table_name}")
+                query = kwargs.get('query', DataConnector._select_query(table_name, kwargs.get('columns'), quote='`'))
                 return pd.read_sql_query(query, conn)
             finally:
                 conn.close()
@@ -86,7 +109,7 @@ class DataConnector:
     @staticmethod
     def import_postgresql(host: str, user: str, password: str, database: str,
                           table_name: str, **kwargs) -> pd.DataFrame:
-        """Import data from PostgreSQL (requires psycopg2)"""
+        """Import data from PostgreSQL (requires psycopg2; columns=[...] selects only those columns)"""
         try:
             import psycopg2
             conn = psycopg2.connect(
@@ -96,7 +119,7 @@ class DataConnector:
                 database=database
             )
             try:
-                query = kwargs.get('query', f"SELECT * FROM {table_name}")
+                query = kwargs.get('query', DataConnector._select_query(table_name, kwargs.get('columns')))
                 return pd.read_sql_query(query, conn)
             finally:
                 conn.close()
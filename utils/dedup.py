@@ -0,0 +1,196 @@
+"""
+Dedup - hash-based duplicate detection, in memory or partitioned on disk
+
+Rows are reduced to 64-bit hashes of their key columns, duplicates are
+found on the hashes, and only rows that share a hash are compared value
+by value, so hash collisions can never drop a distinct row.
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Union
+
+# Frames smaller than this are handed straight to pandas
+HASH_MIN_ROWS = 100_000
+
+_NULL_HASH = np.uint64(np.iinfo(np.uint64).max)
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+
+_POSITION = '__position'
+_HASH = '__hash'
+
+
+def _key_frame(df: pd.DataFrame, subset: Optional[Union[str, List[str]]]) -> pd.DataFrame:
+    if subset is None:
+        return df
+    if isinstance(subset, str):
+        subset = [subset]
+    return df[list(subset)]
+
+
+def _column_hash(series: pd.Series) -> np.ndarray:
+    if series.dtype.kind in 'iufb':
+        # Same value, same hash whether a chunk read it as int or float;
+        # adding 0.0 folds -0.0 into 0.0, which pandas treats as equal
+        hashed = pd.util.hash_array(series.to_numpy(dtype='float64', na_value=np.nan) + 0.0)
+        hashed[series.isna().to_numpy()] = _NULL_HASH
+        return hashed
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+def row_hashes(df: pd.DataFrame, subset: Optional[Union[str, List[str]]] = None) -> np.ndarray:
+    """64-bit hash of each row over the subset columns; missing values hash alike"""
+    keys = _key_frame(df, subset)
+    combined = np.zeros(len(keys), dtype=np.uint64)
+    for i in range(keys.shape[1]):
+        combined = combined * _HASH_MULTIPLIER ^ _column_hash(keys.iloc[:, i])
+    return combined
+
+
+def _same_nulls(left: pd.Series, right: pd.Series, by_type: bool) -> np.ndarray:
+    """Where both sides are missing and pandas counts them as equal"""
+    both = (left.isna() & right.isna()).to_numpy()
+    if not by_type or left.dtype != object or not both.any():
+        return both
+    # On a single object key pandas keeps None, NaN, NaT and pd.NA apart;
+    # across several keys it factorizes and every missing value is alike
+    rows = np.flatnonzero(both)
+    both[rows] = [type(a) is type(b) for a, b in zip(left.to_numpy()[rows], right.to_numpy()[rows])]
+    return both
+
+
+def _hash_groups_are_exact(keys: pd.DataFrame, hashes: np.ndarray, candidates: np.ndarray) -> bool:
+    """Whether every candidate row equals the first row with the same hash"""
+    positions = np.flatnonzero(candidates)
+    codes, _ = pd.factorize(hashes[positions])
+    _, first = np.unique(codes, return_index=True)
+    representatives = positions[first][codes]
+    by_type = keys.shape[1] == 1
+    for i in range(keys.shape[1]):
+        column = keys.iloc[:, i]
+        left = column.iloc[positions].reset_index(drop=True)
+        right = column.iloc[representatives].reset_index(drop=True)
+        same = (left == right).to_numpy(dtype=bool, na_value=False) | _same_nulls(left, right, by_type)
+        if not same.all():
+            return False
+    return True
+
+
+def _duplicates_by_hash(keys: pd.DataFrame, hashes: np.ndarray, keep: Union[str, bool]) -> np.ndarray:
+    candidates = pd.Series(hashes).duplicated(keep=False).to_numpy()
+    if not candidates.any():
+        return candidates
+    if _hash_groups_are_exact(keys, hashes, candidates):
+        return pd.Series(hashes).duplicated(keep=keep).to_numpy()
+    # A real collision: settle the colliding rows on their values
+    mask = np.zeros(len(keys), dtype=bool)
+    mask[candidates] = keys[candidates].duplicated(keep=keep).to_numpy()
+    return mask
+
+
+def duplicate_mask(df: pd.DataFrame, subset: Optional[Union[str, List[str]]] = None,
+                   keep: Union[str, bool] = 'first') -> np.ndarray:
+    """Boolean mask of duplicate rows, same result as DataFrame.duplicated"""
+    keys = _key_frame(df, subset)
+    if len(keys) < HASH_MIN_ROWS or keys.shape[1] == 0:
+        return df.duplicated(subset=subset, keep=keep).to_numpy()
+    return _duplicates_by_hash(keys, row_hashes(keys), keep)
+
+
+def drop_duplicates(df: pd.DataFrame, subset: Optional[Union[str, List[str]]] = None,
+                    keep: Union[str, bool] = 'first') -> pd.DataFrame:
+    """Same result as DataFrame.drop_duplicates, found through row hashes"""
+    return df[~duplicate_mask(df, subset, keep)]
+
+
+class PartitionedDeduplicator:
+    """
+    Out-of-core duplicate detection for inputs larger than memory.
+
+    update() hashes each chunk and spills (row position, hash, key values)
+    into hash partitions on disk. finalize() resolves one partition at a
+    time, since equal rows always land in the same partition, and returns
+    the sorted positions of the rows to drop. close() releases the spill
+    files of a deduplicator that is not finalized (e.g. a cancelled pass).
+    """
+
+    def __init__(self, subset: Optional[Union[str, List[str]]] = None, keep: Union[str, bool] = 'first',
+                 n_partitions: int = 64, spill_dir: Optional[str] = None):
+        self.subset = subset
+        self.keep = keep
+        self.n_partitions = n_partitions
+        self.spill_dir = tempfile.mkdtemp(prefix='etl_dedup_', dir=spill_dir)
+        self._files = []
+        try:
+            for i in range(n_partitions):
+                self._files.append(open(os.path.join(self.spill_dir, f"part-{i}.pkl"), 'wb'))
+        except Exception:
+            self.close()
+            raise
+        self.rows = 0
+
+    def update(self, chunk: pd.DataFrame):
+        keys = _key_frame(chunk, self.subset).reset_index(drop=True)
+        hashes = row_hashes(keys)
+        spill = keys.copy()
+        spill.columns = range(keys.shape[1])
+        spill[_POSITION] = np.arange(self.rows, self.rows + len(keys))
+        spill[_HASH] = hashes
+        self.rows += len(keys)
+
+        partitions = hashes % np.uint64(self.n_partitions)
+        for part, group in spill.groupby(partitions, sort=False):
+            pickle.dump(group, self._files[int(part)], protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _read_partition(self, index: int) -> Optional[pd.DataFrame]:
+        frames = []
+        with open(os.path.join(self.spill_dir, f"part-{index}.pkl"), 'rb') as f:
+            while True:
+                try:
+                    frames.append(pickle.load(f))
+                except EOFError:
+                    break
+        if not frames:
+            return None
+        return pd.concat(frames, ignore_index=True)
+
+    def finalize(self) -> np.ndarray:
+        """Sorted input positions of the duplicate rows"""
+        for f in self._files:
+            f.close()
+        drops = []
+        try:
+            for index in range(self.n_partitions):
+                part = self._read_partition(index)
+                if part is None:
+                    continue
+                keys = part.drop(columns=[_POSITION, _HASH])
+                mask = _duplicates_by_hash(keys, part[_HASH].to_numpy(), self.keep)
+                drops.append(part[_POSITION].to_numpy()[mask])
+        finally:
+            self.close()
+        if not drops:
+            return np.array([], dtype=np.int64)
+        return np.sort(np.concatenate(drops))
+
+    def close(self):
+        """Close the partition files and remove the spill directory (safe to call twice)"""
+        for f in self._files:
+            f.close()
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+
+class PositionFilter:
+    """Drop rows of a chunk stream by their position in the stream"""
+
+    def __init__(self, drop_positions: np.ndarray):
+        self.drop_positions = drop_positions
+        self.offset = 0
+
+    def __call__(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        positions = np.arange(self.offset, self.offset + len(chunk))
+        self.offset += len(chunk)
+        return chunk[~np.isin(positions, self.drop_positions, assume_unique=True)]
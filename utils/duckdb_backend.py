@@ -0,0 +1,423 @@
+"""
+DuckDB Backend - runs pipelines as SQL over an embedded DuckDB database
+
+The rules of a compiled plan are translated into one SQL query (a chain of
+CTEs, one per rule) that DuckDB runs straight over CSV, Parquet or JSON
+files, or over a DataFrame. DuckDB executes it on all cores and spills to
+temp_directory when the data does not fit in memory_limit, so inputs larger
+than RAM can be written to an output file without ever being loaded by
+pandas. The pandas engine stays the reference implementation.
+
+Text rules follow string_engine='arrow' semantics: missing values stay
+missing instead of becoming the text 'nan'. Patterns are RE2 regular
+expressions, datetimes without an explicit format must be ISO formatted,
+and rules that cannot be expressed in SQL (filter_expr, lookup_map,
+title case) raise ValueError before anything runs.
+"""
+import math
+import os
+import time
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import duckdb
+    HAS_DUCKDB = True
+except ImportError:
+    duckdb = None
+    HAS_DUCKDB = False
+
+
+SQL_RULE_TYPES = {
+    'filter_rows', 'remove_duplicates', 'fill_missing', 'drop_missing', 'convert_type',
+    'rename_column', 'trim_strings', 'normalize_text', 'replace_values', 'extract_pattern',
+    'select_columns',
+}
+
+# Hidden column carrying the source row order for order-dependent rules
+ROW_COLUMN = '__etl_row'
+
+# trim() only strips spaces, and is slower than this with a character list
+STRIP_PATTERN = r'^\s+|\s+$'
+
+_COMPARISONS = {'==': '=', '!=': 'IS DISTINCT FROM', '>': '>', '<': '<', '>=': '>=', '<=': '<='}
+_NUMERIC_TYPES = {'TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT',
+                  'UINTEGER', 'UBIGINT', 'FLOAT', 'DOUBLE'}
+
+_READERS = {
+    '.csv': 'read_csv', '.tsv': 'read_csv', '.txt': 'read_csv',
+    '.parquet': 'read_parquet',
+    '.json': 'read_json_auto', '.jsonl': 'read_json_auto', '.ndjson': 'read_json_auto',
+}
+
+
+def quote_identifier(name: Any) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def sql_literal(value: Any) -> str:
+    """SQL literal for a rule config value"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NULL'
+        return repr(value) if math.isfinite(value) else f"CAST('{value}' AS DOUBLE)"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _is_numeric(sql_type: str) -> bool:
+    return sql_type in _NUMERIC_TYPES or sql_type.startswith('DECIMAL')
+
+
+def _fits(value: Any, sql_type: str) -> bool:
+    """Whether a config value can be compared with or stored in a column of sql_type"""
+    if _is_missing(value):
+        return True
+    if isinstance(value, bool):
+        return sql_type == 'BOOLEAN'
+    if isinstance(value, (int, float)):
+        return _is_numeric(sql_type)
+    # Text compares with dates and timestamps, as in pandas
+    return sql_type == 'VARCHAR' or sql_type.startswith(('DATE', 'TIMESTAMP'))
+
+
+def source_query(source: Any, con) -> str:
+    """FROM-clause expression reading a file path (or glob) or a DataFrame registered on con"""
+    if isinstance(source, pd.DataFrame):
+        con.register('etl_source', source)
+        return 'etl_source'
+    extension = os.path.splitext(str(source))[1].lower()
+    if extension not in _READERS:
+        raise ValueError(f"Unsupported file format: {extension}")
+    return f"{_READERS[extension]}({sql_literal(str(source))})"
+
+
+class SQLTranslator:
+    """Builds the CTE chain for a list of rules against the schema of a source"""
+
+    def __init__(self, con, source: str, ordered: bool = False):
+        self.con = con
+        self.ordered = ordered
+        row = f", row_number() OVER () AS {ROW_COLUMN}" if ordered else ''
+        self.ctes: List[Tuple[str, str]] = [('s0', f"SELECT *{row} FROM {source}")]
+        self.schema = self._describe()
+
+    @property
+    def table(self) -> str:
+        return self.ctes[-1][0]
+
+    @property
+    def columns(self) -> List[str]:
+        return [col for col in self.schema if col != ROW_COLUMN]
+
+    def _with(self) -> str:
+        return 'WITH ' + ', '.join(f"{name} AS ({sql})" for name, sql in self.ctes)
+
+    def _describe(self) -> Dict[str, str]:
+        relation = self.con.sql(f"{self._with()} SELECT * FROM {self.table}")
+        return dict(zip(relation.columns, (str(t) for t in relation.types)))
+
+    def sql(self) -> str:
+        """The whole query, in source row order and without the hidden row column"""
+        if not self.ordered:
+            return f"{self._with()} SELECT * FROM {self.table}"
+        return f"{self._with()} SELECT * EXCLUDE ({ROW_COLUMN}) FROM {self.table} ORDER BY {ROW_COLUMN}"
+
+    def add(self, rule):
+        """Append the SQL for rule; raises ValueError if it has no SQL translation"""
+        if rule.rule_type not in SQL_RULE_TYPES:
+            raise ValueError(f"Rule {rule.name}: {rule.rule_type} has no SQL translation")
+        select = getattr(self, f"_{rule.rule_type}")(rule, rule.config)
+        if select is None:
+            return
+        self.ctes.append((f"s{len(self.ctes)}", select))
+        self.schema = self._describe()
+
+    def _replace(self, exprs: Dict[str, str]) -> Optional[str]:
+        """SELECT replacing existing columns in place and appending new ones"""
+        if not exprs:
+            return None
+        replaced = [f"{expr} AS {quote_identifier(col)}" for col, expr in exprs.items() if col in self.schema]
+        added = [f"{expr} AS {quote_identifier(col)}" for col, expr in exprs.items() if col not in self.schema]
+        select = f"* REPLACE ({', '.join(replaced)})" if replaced else '*'
+        return f"SELECT {', '.join([select] + added)} FROM {self.table}"
+
+    def _present(self, columns: Any) -> List[str]:
+        if isinstance(columns, str):
+            columns = [columns]
+        return [col for col in columns if col in self.schema and col != ROW_COLUMN]
+
+    def _filter_rows(self, rule, config) -> Optional[str]:
+        column, operator, value = config.get('column'), config.get('operator', '=='), config.get('value')
+        if column not in self.schema:
+            return None
+        col = quote_identifier(column)
+        if operator in ('contains', 'not_contains'):
+            match = f"coalesce(regexp_matches(CAST({col} AS VARCHAR), {sql_literal(str(value))}), FALSE)"
+            condition = match if operator == 'contains' else f"NOT {match}"
+        elif operator in _COMPARISONS:
+            if not _fits(value, self.schema[column]):
+                raise ValueError(f"Rule {rule.name}: {value!r} cannot be compared with {column}")
+            condition = f"{col} {_COMPARISONS[operator]} {sql_literal(value)}"
+        else:
+            return None
+        return f"SELECT * FROM {self.table} WHERE {condition}"
+
+    def _remove_duplicates(self, rule, config) -> Optional[str]:
+        subset = config.get('columns')
+        keep = config.get('keep', 'first')
+        columns = self.columns if subset is None else self._present(subset)
+        if subset is not None and len(columns) < len([subset] if isinstance(subset, str) else subset):
+            return None
+        if set(columns) == set(self.columns):
+            # Whole-row duplicates are identical, so a hash aggregate that keeps the first
+            # (or last) row position is enough, and cheaper than a window
+            position = 'max' if keep == 'last' else 'min'
+            having = ' HAVING count(*) = 1' if keep is False else ''
+            return (f"SELECT * EXCLUDE ({ROW_COLUMN}), {position}({ROW_COLUMN}) AS {ROW_COLUMN} "
+                    f"FROM {self.table} GROUP BY ALL{having}")
+        partition = ', '.join(quote_identifier(col) for col in columns)
+        if keep is False:
+            condition = f"count(*) OVER (PARTITION BY {partition}) = 1"
+        else:
+            order = 'DESC' if keep == 'last' else 'ASC'
+            condition = f"row_number() OVER (PARTITION BY {partition} ORDER BY {ROW_COLUMN} {order}) = 1"
+        return f"SELECT * FROM {self.table} QUALIFY {condition}"
+
+    def _fill_missing(self, rule, config) -> Optional[str]:
+        method = config.get('method', 'constant')
+        value = config.get('value', '')
+        exprs = {}
+        for column in self._present(config.get('columns', self.columns)):
+            col, sql_type = quote_identifier(column), self.schema[column]
+            if method == 'constant':
+                if not _fits(value, sql_type):
+                    raise ValueError(f"Rule {rule.name}: fill value {value!r} does not fit {column} ({sql_type})")
+                exprs[column] = f"coalesce({col}, {sql_literal(value)})"
+            elif method in ('mean', 'median'):
+                if not _is_numeric(sql_type):
+                    raise ValueError(f"Rule {rule.name}: {method} fill needs a numeric column, {column} is {sql_type}")
+                function = 'avg' if method == 'mean' else 'median'
+                exprs[column] = f"coalesce({col}, (SELECT {function}({col}) FROM {self.table}))"
+            elif method == 'mode':
+                fallback = sql_literal(value) if _fits(value, sql_type) else 'NULL'
+                # Ties go to the smallest value, as Series.mode() sorts them
+                mode = (f"(SELECT {col} FROM {self.table} WHERE {col} IS NOT NULL "
+                        f"GROUP BY {col} ORDER BY count(*) DESC, {col} LIMIT 1)")
+                exprs[column] = f"coalesce({col}, {mode}, {fallback})"
+            elif method == 'forward':
+                exprs[column] = (f"last_value({col} IGNORE NULLS) OVER (ORDER BY {ROW_COLUMN} "
+                                 f"ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)")
+            elif method == 'backward':
+                exprs[column] = (f"first_value({col} IGNORE NULLS) OVER (ORDER BY {ROW_COLUMN} "
+                                 f"ROWS BETWEEN CURRENT ROW AND UNBOUNDED FOLLOWING)")
+        return self._replace(exprs)
+
+    def _drop_missing(self, rule, config) -> Optional[str]:
+        subset = config.get('columns')
+        columns = self.columns if subset is None else self._present(subset)
+        if not columns:
+            return None
+        threshold = config.get('threshold')
+        if threshold is not None:
+            present = ' + '.join(f"CAST({quote_identifier(col)} IS NOT NULL AS INTEGER)" for col in columns)
+            condition = f"{present} >= {int(threshold)}"
+        else:
+            joiner = ' OR ' if config.get('how', 'any') == 'any' else ' AND '
+            condition = f"NOT ({joiner.join(f'{quote_identifier(col)} IS NULL' for col in columns)})"
+        return f"SELECT * FROM {self.table} WHERE {condition}"
+
+    def _convert_type(self, rule, config) -> Optional[str]:
+        target_type = config.get('target_type', 'string')
+        datetime_format = config.get('format')
+        exprs = {}
+        for column in self._present(config.get('columns', [])):
+            col, sql_type = quote_identifier(column), self.schema[column]
+            if target_type == 'string':
+                if sql_type == 'BOOLEAN':
+                    exprs[column] = f"CASE WHEN {col} THEN 'True' WHEN NOT {col} THEN 'False' END"
+                else:
+                    exprs[column] = f"CAST({col} AS VARCHAR)"
+            elif target_type == 'integer':
+                exprs[column] = f"TRY_CAST({col} AS BIGINT)"
+            elif target_type == 'float' and not _is_numeric(sql_type):
+                # pd.to_numeric leaves numeric columns as they are
+                exprs[column] = f"TRY_CAST({col} AS DOUBLE)"
+            elif target_type == 'datetime':
+                if datetime_format:
+                    exprs[column] = f"try_strptime(CAST({col} AS VARCHAR), {sql_literal(datetime_format)})"
+                else:
+                    exprs[column] = f"TRY_CAST({col} AS TIMESTAMP)"
+            elif target_type == 'boolean':
+                # astype(bool): zero and empty text are False, everything else (missing too) is True
+                falsy = "''" if sql_type == 'VARCHAR' else ('FALSE' if sql_type == 'BOOLEAN' else '0')
+                exprs[column] = f"coalesce({col} <> {falsy}, TRUE)"
+        return self._replace(exprs)
+
+    def _rename_column(self, rule, config) -> Optional[str]:
+        mapping = {old: new for old, new in config.get('mapping', {}).items() if old in self.schema}
+        if not mapping:
+            return None
+        select = ', '.join(
+            f"{quote_identifier(col)} AS {quote_identifier(mapping[col])}" if col in mapping else quote_identifier(col)
+            for col in self.schema
+        )
+        return f"SELECT {select} FROM {self.table}"
+
+    def _trim_strings(self, rule, config) -> Optional[str]:
+        default = [col for col in self.columns if self.schema[col] == 'VARCHAR']
+        pattern = sql_literal(STRIP_PATTERN)
+        return self._replace({
+            column: f"regexp_replace(CAST({quote_identifier(column)} AS VARCHAR), {pattern}, '', 'g')"
+            for column in self._present(config.get('columns', default))
+        })
+
+    def _normalize_text(self, rule, config) -> Optional[str]:
+        case = config.get('case', 'lower')
+        if case not in ('lower', 'upper'):
+            raise ValueError(f"Rule {rule.name}: {case} case has no SQL translation")
+        return self._replace({
+            column: f"{case}(CAST({quote_identifier(column)} AS VARCHAR))"
+            for column in self._present(config.get('columns', []))
+        })
+
+    def _replace_values(self, rule, config) -> Optional[str]:
+        column = config.get('column')
+        if column not in self.schema:
+            return None
+        col, sql_type = quote_identifier(column), self.schema[column]
+        cases = []
+        for old, new in config.get('mapping', {}).items():
+            # Keys of another type never equal a value of the column, as in Series.replace
+            if not _fits(old, sql_type):
+                continue
+            when = f"{col} IS NULL" if _is_missing(old) else f"{col} = {sql_literal(old)}"
+            cases.append(f"WHEN {when} THEN {sql_literal(new)}")
+        if not cases:
+            return None
+        return self._replace({column: f"CASE {' '.join(cases)} ELSE {col} END"})
+
+    def _extract_pattern(self, rule, config) -> Optional[str]:
+        column, pattern, new_column = config.get('column'), config.get('pattern'), config.get('new_column')
+        if column not in self.schema or not pattern or not new_column:
+            return None
+        text, regex = f"CAST({quote_identifier(column)} AS VARCHAR)", sql_literal(pattern)
+        # No match is missing, not the empty string regexp_extract returns
+        return self._replace({
+            new_column: f"CASE WHEN regexp_matches({text}, {regex}) THEN regexp_extract({text}, {regex}, 1) END"
+        })
+
+    def _select_columns(self, rule, config) -> Optional[str]:
+        columns = self._present(config.get('columns', []))
+        if not columns:
+            raise ValueError(f"Rule {rule.name}: selecting no columns has no SQL translation")
+        if self.ordered:
+            columns.append(ROW_COLUMN)
+        return f"SELECT {', '.join(quote_identifier(col) for col in columns)} FROM {self.table}"
+
+
+def _needs_order(rules) -> bool:
+    return any(
+        rule.rule_type == 'remove_duplicates'
+        or (rule.rule_type == 'fill_missing' and rule.config.get('method') in ('forward', 'backward'))
+        for rule in rules
+    )
+
+
+class DuckDBExecutor:
+    """Runs a compiled plan as a single DuckDB query"""
+
+    def __init__(self, plan, threads: Optional[int] = None, memory_limit: Optional[str] = None,
+                 temp_directory: Optional[str] = None, count_input_rows: bool = False):
+        if not HAS_DUCKDB:
+            raise ImportError("duckdb is required for the DuckDB backend")
+        self.plan = plan
+        self.count_input_rows = count_input_rows
+        self.rules = [rule for step in plan.steps for rule in step.rules]
+        self.config = {}
+        if threads:
+            self.config['threads'] = threads
+        if memory_limit:
+            self.config['memory_limit'] = memory_limit
+        if temp_directory:
+            self.config['temp_directory'] = temp_directory
+
+    def connect(self):
+        return duckdb.connect(config=self.config)
+
+    def translate(self, con, source_sql: str) -> SQLTranslator:
+        translator = SQLTranslator(con, source_sql, ordered=_needs_order(self.rules))
+        for rule in self.rules:
+            translator.add(rule)
+        return translator
+
+    def to_sql(self, source: Any) -> str:
+        """The query the pipeline runs over source"""
+        con = self.connect()
+        try:
+            return self.translate(con, source_query(source, con)).sql()
+        finally:
+            con.close()
+
+    def _input_rows(self, con, source: Any, source_sql: str) -> Optional[int]:
+        if isinstance(source, pd.DataFrame):
+            return len(source)
+        if self.count_input_rows or source_sql.startswith('read_parquet('):
+            return con.sql(f"SELECT count(*) FROM {source_sql}").fetchone()[0]
+        return None
+
+    def run(self, source: Any, output_path: Optional[str] = None) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+        """
+        Run the plan over source; returns (result, stats).
+
+        With output_path (.parquet or .csv) the result is written by DuckDB
+        and never materialized in pandas, and None is returned in its place.
+        stats['initial_rows'] comes free for DataFrames and Parquet footers;
+        counting a CSV or JSON source takes a second scan, so it is None
+        unless count_input_rows is set.
+        """
+        stats = {
+            'start_time': datetime.now(),
+            'mode': 'duckdb',
+            'rules_applied': [{'rule': rule.name, 'type': rule.rule_type, 'rules': [rule.name]}
+                              for rule in self.rules],
+            'rules_skipped': self.plan.dropped,
+            'errors': [],
+        }
+        con = self.connect()
+        try:
+            source_sql = source_query(source, con)
+            translator = self.translate(con, source_sql)
+            query = translator.sql()
+            stats['sql'] = query
+            stats['initial_rows'] = self._input_rows(con, source, source_sql)
+            stats['initial_columns'] = len(con.sql(f"SELECT * FROM {source_sql}").columns)
+            started = time.perf_counter()
+            if output_path is None:
+                result = con.sql(query).df()
+                stats['final_rows'] = len(result)
+            else:
+                extension = os.path.splitext(output_path)[1].lower()
+                if extension not in ('.parquet', '.csv'):
+                    raise ValueError(f"Unsupported output format: {extension}")
+                options = '(FORMAT PARQUET)' if extension == '.parquet' else '(FORMAT CSV, HEADER)'
+                result = None
+                stats['final_rows'] = con.execute(f"COPY ({query}) TO {sql_literal(output_path)} {options}").fetchone()[0]
+            stats['query_time'] = round(time.perf_counter() - started, 4)
+            stats['final_columns'] = len(translator.columns)
+        finally:
+            con.close()
+
+        stats['end_time'] = datetime.now()
+        stats['duration'] = (stats['end_time'] - stats['start_time']).total_seconds()
+        return result, stats
@@ -0,0 +1,67 @@
+"""
+ETL Backends - registry of the engines a pipeline can run on
+
+'pandas' is the reference engine, ETLPipeline.execute(). Every other
+backend translates the compiled plan for its own engine and is registered
+here by the module and class of its executor plus the optional package it
+needs: the executor takes (plan, **options) and its run(source,
+output_path=None) gives (result frame or None, stats). Backend modules and
+their packages are only imported when a backend is first used, so the
+engine starts as fast without them. Saved pipelines need no changes to run
+on any backend.
+"""
+import importlib
+import importlib.util
+import pandas as pd
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+
+PANDAS_BACKEND = 'pandas'
+
+
+@dataclass
+class Backend:
+    name: str
+    module: str
+    executor: str
+    requires: str
+
+    def is_available(self) -> bool:
+        return importlib.util.find_spec(self.requires) is not None
+
+
+_backends: Dict[str, Backend] = {}
+
+
+def register_backend(name: str, module: str, executor: str, requires: str):
+    """Register (or replace) a backend whose executor class is module.executor"""
+    _backends[name] = Backend(name, module, executor, requires)
+
+
+def available_backends() -> List[str]:
+    """Names of the backends that can run here, pandas first"""
+    return [PANDAS_BACKEND] + [name for name, backend in _backends.items() if backend.is_available()]
+
+
+def create_executor(name: str, plan, **options) -> Any:
+    """Executor of backend name for a compiled plan"""
+    if name not in _backends:
+        raise ValueError(f"Unknown backend '{name}'")
+    backend = _backends[name]
+    if not backend.is_available():
+        raise ImportError(f"{backend.requires} is required for the {name} backend")
+    executor = getattr(importlib.import_module(backend.module), backend.executor)
+    return executor(plan, **options)
+
+
+def to_pandas(frame: Any) -> pd.DataFrame:
+    """A backend's result as a pandas DataFrame (pandas results are returned as they are)"""
+    if frame is None or isinstance(frame, pd.DataFrame):
+        return frame
+    from utils.polars_backend import to_pandas as polars_to_pandas
+    return polars_to_pandas(frame)
+
+
+register_backend('duckdb', 'utils.duckdb_backend', 'DuckDBExecutor', 'duckdb')
+register_backend('polars', 'utils.polars_backend', 'PolarsExecutor', 'polars')
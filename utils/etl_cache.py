@@ -0,0 +1,212 @@
+"""
+ETL Cache - per-step checkpoints for incremental pipeline re-execution
+"""
+import os
+import json
+import hashlib
+import pickle
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.result_cache import input_fingerprints
+
+
+# Values of an object column whose deep size is measured to estimate a checkpoint's size
+SIZE_SAMPLE_VALUES = 1000
+
+
+def _row_hashes(df: pd.DataFrame):
+    try:
+        return pd.util.hash_pandas_object(df, index=True).to_numpy()
+    except TypeError:
+        # Unhashable values (dicts, lists imported from JSON): hash their repr instead
+        hashable = df.copy(deep=False)
+        for i in range(df.shape[1]):
+            if df.iloc[:, i].dtype == 'object':
+                hashable.isetitem(i, df.iloc[:, i].map(repr))
+        return pd.util.hash_pandas_object(hashable, index=True).to_numpy()
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame (values, index, column names and dtypes)"""
+    digest = hashlib.sha256()
+    digest.update(repr(list(df.columns)).encode('utf-8'))
+    digest.update(repr([str(dtype) for dtype in df.dtypes]).encode('utf-8'))
+    digest.update(_row_hashes(df).tobytes())
+    return digest.hexdigest()
+
+
+def _object_bytes(values) -> int:
+    """Size of the Python objects a column or index points to, extrapolated from a sample"""
+    if values.dtype != 'object' or len(values) == 0:
+        return 0
+    sample = values.to_numpy()
+    if len(sample) > SIZE_SAMPLE_VALUES:
+        # Random positions, so periodic data is not sampled at a single phase
+        sample = sample[np.random.default_rng(0).integers(0, len(sample), SIZE_SAMPLE_VALUES)]
+    sample = pd.Index(sample, dtype=object, copy=True)
+    sampled = sample.memory_usage(deep=True) - sample.memory_usage(deep=False)
+    return int(sampled / len(sample) * len(values))
+
+
+def frame_buffers(df: pd.DataFrame) -> Dict[tuple, Tuple[int, Any]]:
+    """
+    Estimated size of each block of memory behind df's index and columns.
+
+    Keyed by the identity of the memory, so frames that share columns (as
+    the output of with_columns shares them with its input) share keys.
+    Values are (size, object holding the memory); keeping the object keeps
+    the key from being reused by other memory.
+    """
+    index = df.index
+    buffers = {('index', id(index)): (int(index.memory_usage(deep=False)) + _object_bytes(index), index)}
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        size = int(column.memory_usage(index=False, deep=False)) + _object_bytes(column)
+        if isinstance(column.dtype, np.dtype):
+            values = column.to_numpy()
+            interface = values.__array_interface__
+            key = ('array', interface['data'][0], interface['strides'], values.shape, values.dtype.str)
+        else:
+            values = column.array
+            key = ('extension', id(values))
+        buffers[key] = (size, values)
+    return buffers
+
+
+def estimated_bytes(df: pd.DataFrame) -> int:
+    """In-memory size of df without scanning every string (exact up to SIZE_SAMPLE_VALUES rows)"""
+    return sum(size for size, _ in frame_buffers(df).values())
+
+
+def rule_signature(rule) -> str:
+    """Stable serialization of the parts of a rule that affect its output, files it reads included"""
+    return json.dumps({'type': rule.rule_type, 'config': rule.config,
+                       'inputs': input_fingerprints(rule.external_inputs())},
+                      sort_keys=True, default=str)
+
+
+def plan_checkpoint_keys(plan, input_fingerprint: str) -> List[str]:
+    """Checkpoint key for the output of every step: input fingerprint + rule-prefix hash"""
+    keys = []
+    digest = hashlib.sha256(input_fingerprint.encode('utf-8'))
+    for step in plan.steps:
+        digest.update(step.kind.encode('utf-8'))
+        for rule in step.rules:
+            digest.update(rule_signature(rule).encode('utf-8'))
+        keys.append(digest.copy().hexdigest())
+    return keys
+
+
+class CheckpointCache:
+    """
+    LRU cache of step outputs bounded by a memory budget.
+
+    Columns that checkpoints share (a step only replaces the columns it
+    changes) count against the budget once. Entries evicted from memory,
+    or too large for it, are pickled to spill_dir when one is set and are
+    loaded back (and promoted) on the next hit; without spill_dir they are
+    dropped.
+    """
+
+    def __init__(self, memory_budget_mb: float = 512, spill_dir: Optional[str] = None):
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.spill_dir = spill_dir
+        self._entries: 'OrderedDict[str, Tuple[pd.DataFrame, List[Dict[str, Any]], List[tuple]]]' = OrderedDict()
+        # Memory held by the entries: key -> [size, entries using it, object holding it]
+        self._buffers: Dict[tuple, list] = {}
+        self._spilled: Dict[str, str] = {}
+        self.memory_used = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'spills': 0}
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries or key in self._spilled
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._spilled)
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, List[Dict[str, Any]]]]:
+        """Return (checkpoint DataFrame, step stats up to it), or None on a miss"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            df, step_stats, _ = self._entries[key]
+            return df, step_stats
+
+        if key in self._spilled:
+            path = self._spilled.pop(key)
+            try:
+                with open(path, 'rb') as f:
+                    df, step_stats = pickle.load(f)
+                os.remove(path)
+            except Exception as e:
+                print(f"Error loading spilled checkpoint: {e}")
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            self.put(key, df, step_stats)
+            return df, step_stats
+
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, df: pd.DataFrame, step_stats: List[Dict[str, Any]]):
+        """Store a checkpoint; the cache takes ownership of df"""
+        if key in self._entries:
+            self._release(self._entries.pop(key)[2])
+
+        buffers = frame_buffers(df)
+        added = sum(size for buffer_key, (size, _) in buffers.items() if buffer_key not in self._buffers)
+        if added > self.memory_budget:
+            self._spill(key, df, step_stats)
+            return
+
+        for buffer_key, (size, holder) in buffers.items():
+            if buffer_key in self._buffers:
+                self._buffers[buffer_key][1] += 1
+            else:
+                self._buffers[buffer_key] = [size, 1, holder]
+                self.memory_used += size
+        self._entries[key] = (df, step_stats, list(buffers))
+        while self.memory_used > self.memory_budget and self._entries:
+            old_key, (old_df, old_stats, old_buffers) = self._entries.popitem(last=False)
+            self._release(old_buffers)
+            self.stats['evictions'] += 1
+            self._spill(old_key, old_df, old_stats)
+
+    def _release(self, buffer_keys: List[tuple]):
+        for buffer_key in buffer_keys:
+            buffer = self._buffers[buffer_key]
+            buffer[1] -= 1
+            if buffer[1] == 0:
+                del self._buffers[buffer_key]
+                self.memory_used -= buffer[0]
+
+    def _spill(self, key: str, df: pd.DataFrame, step_stats: List[Dict[str, Any]]):
+        if not self.spill_dir:
+            return
+        path = os.path.join(self.spill_dir, f"{key}.pkl")
+        try:
+            with open(path, 'wb') as f:
+                pickle.dump((df, step_stats), f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._spilled[key] = path
+            self.stats['spills'] += 1
+        except Exception as e:
+            print(f"Error spilling checkpoint: {e}")
+
+    def clear(self):
+        """Drop all checkpoints, including spilled files"""
+        self._entries.clear()
+        self._buffers.clear()
+        self.memory_used = 0
+        for path in self._spilled.values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._spilled.clear()
@@ -3,10 +3,47 @@ ETL Engine - Core transformation and data quality module
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Callable, Optional
+from typing import Deque, Dict, List, Any, Callable, Optional
+from collections import deque
 from datetime import datetime
+import copy
 import json
+import os
 import re
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+from config.constants import PREVIEW_ROWS
+from utils import arrow_strings
+from utils.column_profile import profile_frame
+from utils.column_kernels import (convert_series, copy_on_write, fill_series, parse_datetimes, replace_series,
+                                  transform_text, with_columns)
+from utils.etl_planner import PlanCompiler, ExecutionPlan, RuleContext, datetime_format_cache
+from utils.etl_stream import StreamExecutor, chunk_source, source_name
+from utils.etl_backends import PANDAS_BACKEND, create_executor
+from utils.etl_estimator import MAX_SAMPLE_ROWS, estimate_plan, sample_chunks, sample_frame
+from utils.etl_cache import CheckpointCache, dataframe_fingerprint, plan_checkpoint_keys
+from utils.etl_optimizer import required_source_columns
+from utils.etl_scheduler import ColumnScheduler
+from utils.dedup import drop_duplicates, duplicate_mask
+from utils.etl_profiler import StepProfiler, export_profile
+from utils.filter_expr import evaluate_expression
+from utils.lookup_map import LookupTable, inline_table, load_table
+from utils.performance_optimizer import CancellationToken
+from utils.pipeline_store import journal_path, read_pipeline_data
+from utils.run_history import RunHistory
+from utils.sketch_profiler import profile_stream
+
+
+# Runs whose full stats a pipeline keeps in memory; older runs live in its RunHistory
+EXECUTION_LOG_SIZE = 20
+
+# Input rows the first round of a preview runs on
+PREVIEW_MIN_INPUT_ROWS = 1000
+
+# Journal entries written before the pipelines file is rewritten in one piece
+JOURNAL_COMPACT_SIZE = 100
 
 
 class TransformRule:
@@ -18,11 +55,13 @@ class TransformRule:
         self.config = config
         self.enabled = True
     
-    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Apply transformation rule to DataFrame"""
+    def apply(self, df: pd.DataFrame, context: Optional[RuleContext] = None) -> pd.DataFrame:
+        """Apply transformation rule to DataFrame; counters it reports go to context.metrics"""
         if not self.enabled:
             return df
         
+        if context is None:
+            context = RuleContext()
         try:
             if self.rule_type == "remove_duplicates":
                 return self._remove_duplicates(df)
@@ -31,11 +70,13 @@ class TransformRule:
             elif self.rule_type == "drop_missing":
                 return self._drop_missing(df)
             elif self.rule_type == "convert_type":
-                return self._convert_type(df)
+                return self._convert_type(df, context)
             elif self.rule_type == "rename_column":
                 return self._rename_column(df)
             elif self.rule_type == "filter_rows":
                 return self._filter_rows(df)
+            elif self.rule_type == "filter_expr":
+                return self._filter_expr(df)
             elif self.rule_type == "trim_strings":
                 return self._trim_strings(df)
             elif self.rule_type == "replace_values":
@@ -44,71 +85,86 @@ class TransformRule:
                 return self._normalize_text(df)
             elif self.rule_type == "extract_pattern":
                 return self._extract_pattern(df)
+            elif self.rule_type == "select_columns":
+                return self._select_columns(df)
+            elif self.rule_type == "lookup_map":
+                return self._lookup_map(df, context)
             else:
                 return df
         except Exception as e:
             print(f"Error applying rule {self.name}: {e}")
             return df
     
+    def _uses_arrow(self) -> bool:
+        """Whether text operations run on Arrow strings (missing values stay missing)"""
+        return self.config.get('string_engine', 'python') == 'arrow'
+    
     def _remove_duplicates(self, df: pd.DataFrame) -> pd.DataFrame:
         subset = self.config.get('columns', None)
         keep = self.config.get('keep', 'first')
-        return df.drop_duplicates(subset=subset, keep=keep)
+        return drop_duplicates(df, subset=subset, keep=keep)
     
     def _fill_missing(self, df: pd.DataFrame) -> pd.DataFrame:
         columns = self.config.get('columns', df.columns)
         method = self.config.get('method', 'constant')
         value = self.config.get('value', '')
         
+        updates = {}
         for col in columns:
             if col not in df.columns:
                 continue
-            
-            if method == 'constant':
-                df[col] = df[col].fillna(value)
-            elif method == 'mean':
-                df[col] = df[col].fillna(df[col].mean())
-            elif method == 'median':
-                df[col] = df[col].fillna(df[col].median())
-            elif method == 'mode':
-                df[col] = df[col].fillna(df[col].mode()[0] if not df[col].mode().empty else value)
-            elif method == 'forward':
-                df[col] = df[col].fillna(method='ffill')
-            elif method == 'backward':
-                df[col] = df[col].fillna(method='bfill')
-        
-        return df
+
+            # A column that cannot take the fill is left as is, like the fused path does
+            try:
+                updates[col] = fill_series(df[col], method, value)
+            except Exception as e:
+                print(f"Error filling {col}: {e}")
+
+        return with_columns(df, updates)
     
     def _drop_missing(self, df: pd.DataFrame) -> pd.DataFrame:
         columns = self.config.get('columns', None)
         how = self.config.get('how', 'any')
         threshold = self.config.get('threshold', None)
         
-        return df.dropna(subset=columns, how=how, thresh=threshold)
+        # pandas rejects how and thresh together; a threshold takes precedence
+        if threshold is not None:
+            return df.dropna(subset=columns, thresh=threshold)
+        return df.dropna(subset=columns, how=how)
     
-    def _convert_type(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _convert_type(self, df: pd.DataFrame, context: RuleContext) -> pd.DataFrame:
         columns = self.config.get('columns', [])
         target_type = self.config.get('target_type', 'string')
         
+        updates = {}
         for col in columns:
             if col not in df.columns:
                 continue
             
             try:
-                if target_type == 'string':
-                    df[col] = df[col].astype(str)
-                elif target_type == 'integer':
-                    df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
-                elif target_type == 'float':
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                elif target_type == 'datetime':
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-                elif target_type == 'boolean':
-                    df[col] = df[col].astype(bool)
+                if target_type == 'datetime':
+                    updates[col] = self._parse_datetimes(df[col], context)
+                else:
+                    updates[col] = convert_series(df[col], target_type)
             except Exception as e:
                 print(f"Error converting {col} to {target_type}: {e}")
         
-        return df
+        return with_columns(df, updates)
+    
+    def _parse_datetimes(self, series: pd.Series, context: RuleContext) -> pd.Series:
+        """Parse with the configured format, or the one inferred for this column of the source earlier"""
+        explicit = self.config.get('format')
+        key = (context.source, series.name)
+        parsed = parse_datetimes(series, explicit or context.datetime_formats.get(key), infer=not explicit)
+        if parsed.format is not None:
+            context.datetime_formats[key] = parsed.format
+        
+        metrics = context.metrics
+        metrics['parse_values'] = metrics.get('parse_values', 0) + parsed.values
+        metrics['parse_failures'] = metrics.get('parse_failures', 0) + parsed.failures
+        values = metrics['parse_values']
+        metrics['parse_failure_rate'] = round(metrics['parse_failures'] / values, 4) if values else 0.0
+        return parsed.series
     
     def _rename_column(self, df: pd.DataFrame) -> pd.DataFrame:
         mapping = self.config.get('mapping', {})
@@ -134,45 +190,94 @@ class TransformRule:
             return df[df[column] >= value]
         elif operator == '<=':
             return df[df[column] <= value]
-        elif operator == 'contains':
-            return df[df[column].astype(str).str.contains(str(value), na=False)]
-        elif operator == 'not_contains':
-            return df[~df[column].astype(str).str.contains(str(value), na=False)]
+        elif operator in ('contains', 'not_contains'):
+            if self._uses_arrow():
+                mask = arrow_strings.contains(df[column], str(value))
+            else:
+                mask = df[column].astype(str).str.contains(str(value), na=False)
+            return df[mask] if operator == 'contains' else df[~mask]
         
         return df
     
+    def _filter_expr(self, df: pd.DataFrame) -> pd.DataFrame:
+        expression = self.config.get('expression')
+        if not expression:
+            return df
+        
+        mask = evaluate_expression(df, expression, self.config.get('string_engine', 'python'))
+        return df[mask]
+    
     def _trim_strings(self, df: pd.DataFrame) -> pd.DataFrame:
-        columns = self.config.get('columns', df.select_dtypes(include=['object']).columns)
+        text_dtypes = ['object', 'string'] if self._uses_arrow() else ['object']
+        columns = self.config.get('columns', df.select_dtypes(include=text_dtypes).columns)
         
+        updates = {}
         for col in columns:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.strip()
+            if col not in df.columns:
+                continue
+            if self._uses_arrow():
+                updates[col] = arrow_strings.strip(df[col])
+            else:
+                updates[col] = transform_text(df[col], lambda text: text.str.strip())
         
-        return df
+        return with_columns(df, updates)
     
     def _replace_values(self, df: pd.DataFrame) -> pd.DataFrame:
         column = self.config.get('column')
         mapping = self.config.get('mapping', {})
         
         if column in df.columns:
-            df[column] = df[column].replace(mapping)
+            return with_columns(df, {column: replace_series(df[column], mapping)})
         
         return df
     
+    def external_inputs(self) -> List[str]:
+        """Files the rule reads besides its input frame; their contents affect its output"""
+        if self.enabled and self.rule_type == 'lookup_map' and self.config.get('mapping_file'):
+            return [self.config['mapping_file']]
+        return []
+    
+    def _lookup_table(self) -> LookupTable:
+        """Compiled mapping: loaded from mapping_file, or built from the inline mapping (both cached)"""
+        config = self.config
+        match = config.get('match', 'exact')
+        if config.get('mapping_file'):
+            return load_table(config['mapping_file'], config.get('key_column', 'key'),
+                              config.get('value_column', 'value'), config.get('mapping_table'), match)
+        return inline_table(config.get('mapping', {}), match)
+    
+    def _lookup_map(self, df: pd.DataFrame, context: RuleContext) -> pd.DataFrame:
+        column = self.config.get('column')
+        if column not in df.columns:
+            return df
+        
+        mapped, unmatched = self._lookup_table().map(
+            df[column],
+            keep_unmatched=self.config.get('keep_unmatched', True),
+            default=self.config.get('default')
+        )
+        context.metrics['unmatched'] = unmatched
+        return with_columns(df, {self.config.get('new_column') or column: mapped})
+    
     def _normalize_text(self, df: pd.DataFrame) -> pd.DataFrame:
         columns = self.config.get('columns', [])
         case = self.config.get('case', 'lower')
         
+        updates = {}
         for col in columns:
-            if col in df.columns:
-                if case == 'lower':
-                    df[col] = df[col].astype(str).str.lower()
-                elif case == 'upper':
-                    df[col] = df[col].astype(str).str.upper()
-                elif case == 'title':
-                    df[col] = df[col].astype(str).str.title()
+            if col not in df.columns:
+                continue
+            if self._uses_arrow():
+                if case in ('lower', 'upper', 'title'):
+                    updates[col] = arrow_strings.change_case(df[col], case)
+            elif case == 'lower':
+                updates[col] = transform_text(df[col], lambda text: text.str.lower())
+            elif case == 'upper':
+                updates[col] = transform_text(df[col], lambda text: text.str.upper())
+            elif case == 'title':
+                updates[col] = transform_text(df[col], lambda text: text.str.title())
         
-        return df
+        return with_columns(df, updates)
     
     def _extract_pattern(self, df: pd.DataFrame) -> pd.DataFrame:
         column = self.config.get('column')
@@ -180,9 +285,17 @@ class TransformRule:
         new_column = self.config.get('new_column')
         
         if column in df.columns and pattern and new_column:
-            df[new_column] = df[column].astype(str).str.extract(pattern, expand=False)
+            if self._uses_arrow():
+                extracted = arrow_strings.extract(df[column], pattern)
+            else:
+                extracted = transform_text(df[column], lambda text: text.str.extract(pattern, expand=False))
+            return with_columns(df, {new_column: extracted})
         
         return df
+    
+    def _select_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        columns = self.config.get('columns', [])
+        return df[[col for col in columns if col in df.columns]]
 
 
 class DataQualityChecker:
@@ -190,44 +303,17 @@ class DataQualityChecker:
     
     @staticmethod
     def profile_data(df: pd.DataFrame) -> Dict[str, Any]:
-        """Generate comprehensive data quality profile"""
-        profile = {
-            'total_rows': len(df),
-            'total_columns': len(df.columns),
-            'memory_usage': df.memory_usage(deep=True).sum() / 1024**2,  # MB
-            'columns': {}
-        }
-        
-        for col in df.columns:
-            col_profile = {
-                'dtype': str(df[col].dtype),
-                'missing_count': int(df[col].isna().sum()),
-                'missing_percent': float(df[col].isna().sum() / len(df) * 100),
-                'unique_count': int(df[col].nunique()),
-                'unique_percent': float(df[col].nunique() / len(df) * 100),
-            }
-            
-            # Numeric columns
-            if pd.api.types.is_numeric_dtype(df[col]):
-                col_profile.update({
-                    'min': float(df[col].min()) if not df[col].isna().all() else None,
-                    'max': float(df[col].max()) if not df[col].isna().all() else None,
-                    'mean': float(df[col].mean()) if not df[col].isna().all() else None,
-                    'median': float(df[col].median()) if not df[col].isna().all() else None,
-                    'std': float(df[col].std()) if not df[col].isna().all() else None,
-                })
-            
-            # String columns
-            elif pd.api.types.is_string_dtype(df[col]) or df[col].dtype == 'object':
-                col_profile.update({
-                    'avg_length': float(df[col].astype(str).str.len().mean()),
-                    'max_length': int(df[col].astype(str).str.len().max()),
-                    'min_length': int(df[col].astype(str).str.len().min()),
-                })
-            
-            profile['columns'][col] = col_profile
-        
-        return profile
+        """Generate comprehensive data quality profile (one scan per column, see utils.column_profile)"""
+        return profile_frame(df)
+    
+    @staticmethod
+    def profile_stream(source: Any, chunk_processor=None, max_workers: int = 1) -> Dict[str, Any]:
+        """
+        Approximate profile and anomalies of a source read chunk by chunk
+        (LazyDataLoader, file path, or chunk iterator; see utils.sketch_profiler)
+        """
+        sketch = profile_stream(source, chunk_processor, max_workers=max_workers)
+        return {'profile': sketch.profile(), 'anomalies': sketch.anomalies()}
     
     @staticmethod
     def detect_anomalies(df: pd.DataFrame) -> Dict[str, List[str]]:
@@ -260,7 +346,7 @@ class DataQualityChecker:
                     issues['outliers'].append(f"{col} ({len(outliers)} outliers)")
         
         # Check for duplicate rows
-        dup_count = df.duplicated().sum()
+        dup_count = duplicate_mask(df).sum()
         if dup_count > 0:
             issues['potential_duplicates'].append(f"{dup_count} duplicate rows found")
         
@@ -275,7 +361,10 @@ class ETLPipeline:
         self.rules: List[TransformRule] = []
         self.created_at = datetime.now()
         self.last_run = None
-        self.execution_log = []
+        self.execution_log: Deque[Dict[str, Any]] = deque(maxlen=EXECUTION_LOG_SIZE)
+        self.history: Optional[RunHistory] = None
+        self.scheduler = ColumnScheduler()
+        self._executor: Optional[ThreadPoolExecutor] = None
     
     def add_rule(self, rule: TransformRule):
         """Add transformation rule to pipeline"""
@@ -285,49 +374,360 @@ class ETLPipeline:
         """Remove rule by name"""
         self.rules = [r for r in self.rules if r.name != rule_name]
     
-    def execute(self, df: pd.DataFrame) -> tuple[pd.DataFrame, Dict[str, Any]]:
-        """Execute pipeline on DataFrame"""
-        result_df = df.copy()
+    def compile(self, chunked: bool = False) -> ExecutionPlan:
+        """Compile rules into a physical plan (filters pushed down, column passes fused, no-ops dropped)"""
+        return PlanCompiler(scheduler=self.scheduler, chunked=chunked).compile(self.rules, self.name)
+    
+    def explain(self) -> str:
+        """Describe the physical plan that execute() will run"""
+        return self.compile().explain()
+    
+    def required_columns(self, output_columns: Optional[List[str]] = None) -> Optional[List[str]]:
+        """Source columns needed to produce output_columns (None: all columns are needed)"""
+        plan = self.compile()
+        rules = [rule for step in plan.steps for rule in step.rules]
+        return required_source_columns(rules, output_columns)
+    
+    def external_inputs(self) -> List[str]:
+        """Files the pipeline's rules read (e.g. lookup_map mapping files), in rule order"""
+        return list(dict.fromkeys(path for rule in self.rules for path in rule.external_inputs()))
+    
+    def execute(self, df: pd.DataFrame, checkpoint_cache: Optional[CheckpointCache] = None,
+                input_fingerprint: Optional[str] = None,
+                profile_memory: bool = False,
+                progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                cancellation_token: Optional[CancellationToken] = None,
+                source: Optional[str] = None) -> tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Execute pipeline on DataFrame.
+        
+        With a checkpoint_cache, every step's output is cached under the input
+        fingerprint plus the hash of the rules up to that step, and a re-run
+        resumes from the last checkpoint whose rule prefix is unchanged. The
+        fingerprint is computed when input_fingerprint is not given and
+        returned as stats['input_fingerprint'].
+        
+        Every executed step records wall/CPU time, memory delta, rows/sec and
+        bytes/sec. profile_memory measures the tracemalloc peak per step
+        instead of the process RSS change (precise, but slower).
+        
+        Execution runs under pandas Copy-on-Write and rules return new frames
+        instead of mutating their input, so df is never copied up front or
+        modified. Columns no rule touched are shared between df and the
+        result; enable Copy-on-Write globally (the default from pandas 3.0)
+        before writing into either one in place.
+        
+        progress_callback receives a dict (phase, step, total_steps, rule,
+        fraction, rows) after every step. cancellation_token is checked
+        before each step; a cancelled run raises OperationCancelledError,
+        keeping the checkpoints of the steps that finished.
+        
+        source names where df was read from (e.g. its file path); datetime
+        formats inferred for its columns are reused by later runs over it.
+        """
+        profiler = StepProfiler(trace_memory=profile_memory)
+        plan = self.compile()
         execution_stats = {
             'start_time': datetime.now(),
             'rules_applied': [],
+            'rules_skipped': plan.dropped,
             'errors': [],
             'initial_rows': len(df),
-            'initial_columns': len(df.columns)
+            'initial_columns': len(df.columns),
+            'resumed_from_step': 0
         }
         
-        for rule in self.rules:
-            if not rule.enabled:
-                continue
-            
-            try:
-                before_rows = len(result_df)
-                result_df = rule.apply(result_df)
-                after_rows = len(result_df)
+        result_df = None
+        start_step = 0
+        if checkpoint_cache is not None:
+            execution_stats['input_fingerprint'] = input_fingerprint or dataframe_fingerprint(df)
+            keys = plan_checkpoint_keys(plan, execution_stats['input_fingerprint'])
+            for i in range(len(plan.steps) - 1, -1, -1):
+                cached = checkpoint_cache.get(keys[i])
+                if cached is not None:
+                    cached_df, cached_stats = cached
+                    result_df = cached_df
+                    execution_stats['rules_applied'] = [dict(entry, cached=True) for entry in cached_stats]
+                    start_step = i + 1
+                    break
+        execution_stats['resumed_from_step'] = start_step
+        
+        if result_df is None:
+            result_df = df
+        
+        datetime_formats = datetime_format_cache(source)
+        with profiler, copy_on_write():
+            for i in range(start_step, len(plan.steps)):
+                step = plan.steps[i]
+                if cancellation_token is not None:
+                    cancellation_token.raise_if_cancelled(f"Pipeline {self.name} cancelled before step {step.name}")
+                try:
+                    before_rows = len(result_df)
+                    context = RuleContext(datetime_formats, source)
+                    started = profiler.start(result_df)
+                    result_df = step.apply(result_df, context)
+                    metrics = profiler.stop(started)
+                    after_rows = len(result_df)
+                    
+                    execution_stats['rules_applied'].append({
+                        'rule': step.name,
+                        'type': step.rule_type,
+                        'rules': [r.name for r in step.rules],
+                        'rows_before': before_rows,
+                        'rows_after': after_rows,
+                        'rows_changed': after_rows - before_rows,
+                        **metrics,
+                        **context.metrics
+                    })
+                except Exception as e:
+                    execution_stats['errors'].append({
+                        'rule': step.name,
+                        'error': str(e)
+                    })
                 
-                execution_stats['rules_applied'].append({
-                    'rule': rule.name,
-                    'type': rule.rule_type,
-                    'rows_before': before_rows,
-                    'rows_after': after_rows,
-                    'rows_changed': after_rows - before_rows
-                })
-            except Exception as e:
-                execution_stats['errors'].append({
-                    'rule': rule.name,
-                    'error': str(e)
-                })
+                if checkpoint_cache is not None:
+                    # Steps never write into their input, so the checkpoint can share result_df
+                    checkpoint_cache.put(keys[i], result_df, list(execution_stats['rules_applied']))
+                
+                if progress_callback is not None:
+                    progress_callback({
+                        'phase': 'step',
+                        'step': i + 1,
+                        'total_steps': len(plan.steps),
+                        'rule': step.name,
+                        'fraction': (i + 1) / len(plan.steps),
+                        'rows': len(result_df)
+                    })
+            
+            # A new frame object that shares data, but no view bookkeeping, with df and the checkpoints
+            result_df = result_df.copy(deep=False)
         
         execution_stats['end_time'] = datetime.now()
         execution_stats['final_rows'] = len(result_df)
         execution_stats['final_columns'] = len(result_df.columns)
         execution_stats['duration'] = (execution_stats['end_time'] - execution_stats['start_time']).total_seconds()
         
-        self.last_run = execution_stats['end_time']
-        self.execution_log.append(execution_stats)
+        self._log_run(execution_stats)
         
         return result_df, execution_stats
     
+    def dry_run(self, source: Any, sample_fraction: float = 0.01, stratify_by: Any = None,
+                max_sample_rows: int = MAX_SAMPLE_ROWS, seed: Optional[int] = None,
+                chunk_processor=None) -> Dict[str, Any]:
+        """
+        Estimate a run from a run on a random sample of source (see utils.etl_estimator).
+        
+        Args:
+            source: DataFrame, or any execute_stream() source (file path, LazyDataLoader, ...),
+                which is sampled in one streaming pass
+            sample_fraction: Share of rows sampled, capped at max_sample_rows rows
+            stratify_by: Column(s) whose every value keeps its share of the sample
+        
+        Returns per-step selectivity, rows and runtime estimates plus the
+        expected output rows, output/peak bytes, runtime and recommended_mode
+        ('memory' or 'stream'). Nothing is logged as a run.
+        """
+        started = time.perf_counter()
+        if isinstance(source, pd.DataFrame):
+            sample = sample_frame(source, sample_fraction, stratify_by, max_sample_rows, seed)
+            total_rows, read_time = len(source), 0.0
+        else:
+            chunks = chunk_source(source, chunk_processor)()
+            sample, total_rows = sample_chunks(chunks, sample_fraction, stratify_by, max_sample_rows, seed)
+            read_time = time.perf_counter() - started
+        return estimate_plan(self.compile(), sample, total_rows, read_time)
+    
+    def execute_preview(self, df: pd.DataFrame, limit: int = PREVIEW_ROWS) -> tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        First limit rows of execute(df)'s result, computing only what they need.
+        
+        Steps up to the last one that needs the whole frame (a mean fill, a
+        dedup keeping the last row, ...; see is_prefix_safe) run on all of
+        df. The steps after it run on growing prefixes of their input until
+        limit rows come out. Returns (preview_df, stats); nothing is logged
+        as a run.
+        """
+        started = time.perf_counter()
+        plan = self.compile()
+        split = plan.prefix_safe_start()
+        preview_stats = {
+            'limit': limit,
+            'full_steps': split,
+            'prefix_steps': len(plan.steps) - split,
+            'rounds': 0,
+            'errors': []
+        }
+        
+        with copy_on_write():
+            for step in plan.steps[:split]:
+                df = self._apply_step(step, df, preview_stats['errors'])
+            
+            rows = min(len(df), max(limit, PREVIEW_MIN_INPUT_ROWS))
+            while True:
+                preview_stats['rounds'] += 1
+                errors = list(preview_stats['errors'])
+                result_df = df.iloc[:rows]
+                for step in plan.steps[split:]:
+                    result_df = self._apply_step(step, result_df, errors)
+                if len(result_df) >= limit or rows >= len(df):
+                    break
+                # Grow by the share of rows the filters kept so far, at least fourfold
+                wanted = rows * limit / max(len(result_df), 1) * 1.5
+                rows = min(len(df), max(rows * 4, int(wanted)))
+            
+            result_df = result_df.head(limit).copy(deep=False)
+        
+        preview_stats['errors'] = errors
+        preview_stats['input_rows'] = rows
+        preview_stats['duration'] = time.perf_counter() - started
+        return result_df, preview_stats
+    
+    @staticmethod
+    def _apply_step(step, df: pd.DataFrame, errors: List[Dict[str, str]]) -> pd.DataFrame:
+        try:
+            return step.apply(df)
+        except Exception as e:
+            errors.append({'rule': step.name, 'error': str(e)})
+            return df
+    
+    def execute_async(self, df: pd.DataFrame,
+                      progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                      cancellation_token: Optional[CancellationToken] = None,
+                      executor: Optional[Executor] = None, backend: str = PANDAS_BACKEND,
+                      **kwargs) -> Future:
+        """
+        Run execute() (or execute_on() for another backend) on a worker thread and return its Future.
+        
+        Without an executor, runs go to this pipeline's own single worker
+        thread, so runs of one pipeline never overlap. The Future resolves to
+        (result_df, stats); await it with asyncio.wrap_future(). Callbacks run
+        on the worker thread, so GUI code must marshal them to its own thread.
+        """
+        if executor is None:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"etl-{self.name}")
+            executor = self._executor
+        if backend != PANDAS_BACKEND:
+            return executor.submit(self.execute_on, backend, df, progress_callback=progress_callback,
+                                   cancellation_token=cancellation_token, **kwargs)
+        return executor.submit(self.execute, df, progress_callback=progress_callback,
+                               cancellation_token=cancellation_token, **kwargs)
+    
+    def execute_stream(self, source: Any, sink: Any, chunk_processor=None,
+                       progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                       cancellation_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """
+        Execute pipeline chunk by chunk from source into sink with flat memory.
+        
+        Args:
+            source: LazyDataLoader, file path, callable returning chunks, or iterable of chunks
+            sink: Output file path (.csv or .jsonl), callable, or object with write()/close()
+            chunk_processor: ChunkProcessor used to read file path sources
+        
+        remove_duplicates finds duplicates in a pre-pass that spills row hashes
+        to disk partitions; keep='first' over a one-shot iterable (or config
+        'partitioned': False) instead keeps a set of seen row hashes in memory,
+        fill_missing mean/median/mode is resolved by a pre-pass over the source,
+        and forward fill carries the last valid value between chunks.
+        Datetime formats inferred for a file source are reused by later runs.
+        
+        progress_callback receives a dict (phase, pass, chunk, rows) after
+        every chunk of every pass; cancellation_token is checked before each
+        chunk, and a cancelled run closes the sink and raises
+        OperationCancelledError.
+        """
+        plan = self.compile(chunked=True)
+        executor = StreamExecutor(plan, chunk_source(source, chunk_processor),
+                                  progress_callback=progress_callback,
+                                  cancellation_token=cancellation_token,
+                                  source_name=source_name(source))
+        with copy_on_write():
+            execution_stats = executor.run(sink)
+        
+        self._log_run(execution_stats)
+        
+        return execution_stats
+    
+    def execute_duckdb(self, source: Any, output_path: Optional[str] = None, threads: Optional[int] = None,
+                       memory_limit: Optional[str] = None,
+                       temp_directory: Optional[str] = None,
+                       count_input_rows: bool = False) -> tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+        """
+        Execute pipeline as one SQL query on an embedded DuckDB database (requires duckdb).
+        
+        Args:
+            source: CSV, Parquet or JSON file path (globs allowed), or a DataFrame
+            output_path: .parquet or .csv file the result is written to instead of being returned
+            threads, memory_limit, temp_directory: DuckDB settings; over memory_limit
+                (e.g. '4GB') DuckDB spills to temp_directory
+            count_input_rows: Also count a CSV/JSON source for stats['initial_rows']
+                (a second scan of the file; otherwise it is None)
+        
+        Returns (result_df, stats), with result_df None when output_path is given.
+        Raises ValueError up front if a rule has no SQL translation; execute()
+        remains the reference for every rule.
+        """
+        return self.execute_on('duckdb', source, output_path, threads=threads, memory_limit=memory_limit,
+                               temp_directory=temp_directory, count_input_rows=count_input_rows)
+    
+    def execute_on(self, backend: str, source: Any, output_path: Optional[str] = None,
+                   progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                   cancellation_token: Optional[CancellationToken] = None,
+                   **options) -> tuple[Any, Dict[str, Any]]:
+        """
+        Execute pipeline on a backend from utils.etl_backends ('pandas', 'duckdb', 'polars').
+        
+        Other backends run the whole plan as one query over source (file
+        path or DataFrame) and return their own frame type (a polars
+        DataFrame for 'polars'), or None when output_path is given; options
+        go to the backend's executor. They report progress once, at the end,
+        and check cancellation_token only before starting. 'pandas' is
+        execute() on a DataFrame source.
+        """
+        if backend == PANDAS_BACKEND:
+            if not isinstance(source, pd.DataFrame) or output_path is not None:
+                raise ValueError("The pandas backend runs on a DataFrame and returns its result")
+            return self.execute(source, progress_callback=progress_callback,
+                                cancellation_token=cancellation_token, **options)
+        
+        executor = create_executor(backend, self.compile(), **options)
+        if cancellation_token is not None:
+            cancellation_token.raise_if_cancelled(f"Pipeline {self.name} cancelled before start")
+        result, execution_stats = executor.run(source, output_path)
+        
+        self._log_run(execution_stats)
+        
+        if progress_callback is not None:
+            progress_callback({
+                'phase': 'step',
+                'step': 1,
+                'total_steps': 1,
+                'rule': backend,
+                'fraction': 1.0,
+                'rows': execution_stats['final_rows']
+            })
+        
+        return result, execution_stats
+    
+    def _log_run(self, stats: Dict[str, Any]):
+        """Keep a finished run's stats in the bounded execution_log and record it in the history"""
+        self.last_run = stats['end_time']
+        self.execution_log.append(stats)
+        if self.history is not None:
+            try:
+                self.history.record(self.name, stats, {rule.name: rule.rule_type for rule in self.rules})
+            except Exception as e:
+                print(f"Error recording run of {self.name}: {e}")
+    
+    def export_profile(self, file_path: str, fmt: str = 'chrome',
+                       stats: Optional[Dict[str, Any]] = None) -> str:
+        """Export a run's per-step profile (default: the last run) as 'chrome' trace or 'speedscope' JSON"""
+        if stats is None:
+            if not self.execution_log:
+                raise ValueError(f"Pipeline {self.name} has not been executed yet")
+            stats = self.execution_log[-1]
+        return export_profile(stats, file_path, fmt=fmt, name=self.name)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Serialize pipeline to dictionary"""
         return {
@@ -345,6 +745,20 @@ class ETLPipeline:
             ]
         }
     
+    def snapshot(self) -> 'ETLPipeline':
+        """Copy of the pipeline with its own rules and configs, to run beside later edits of this one"""
+        snapshot = ETLPipeline.from_dict(copy.deepcopy(self.to_dict()))
+        # Shares the worker processes rather than starting its own
+        snapshot.scheduler = self.scheduler
+        return snapshot
+    
+    def shutdown(self):
+        """Stop the pipeline's worker thread and column worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.scheduler.shutdown()
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ETLPipeline':
         """Deserialize pipeline from dictionary"""
@@ -366,42 +780,78 @@ class ETLPipeline:
 
 
 class PipelineManager:
-    """Manage multiple ETL pipelines"""
+    """
+    Manage multiple ETL pipelines
     
-    def __init__(self, config_file: str = "etl_pipelines.json"):
+    Changes to one pipeline (save_pipeline, create_pipeline, delete_pipeline)
+    are appended to <config_file>.journal instead of rewriting every
+    pipeline; loading replays the journal over the config file, and
+    save_pipelines() folds it back in once it reaches JOURNAL_COMPACT_SIZE
+    entries. With a history_file, every pipeline records its runs there
+    (see utils.run_history).
+    """
+    
+    def __init__(self, config_file: str = "etl_pipelines.json", history_file: Optional[str] = None):
         self.config_file = config_file
+        self.journal_file = journal_path(config_file)
+        self.history = RunHistory(history_file) if history_file else None
         self.pipelines: Dict[str, ETLPipeline] = {}
+        self._journal_entries = 0
+        self._lock = threading.RLock()
         self.load_pipelines()
     
+    def _add(self, pipeline: ETLPipeline):
+        pipeline.history = self.history
+        self.pipelines[pipeline.name] = pipeline
+    
     def load_pipelines(self):
-        """Load pipelines from config file"""
-        try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for pipeline_data in data.get('pipelines', []):
-                    pipeline = ETLPipeline.from_dict(pipeline_data)
-                    self.pipelines[pipeline.name] = pipeline
-        except FileNotFoundError:
-            pass
-        except Exception as e:
-            print(f"Error loading pipelines: {e}")
+        """Load pipelines from config file, then replay the journal"""
+        pipelines, self._journal_entries = read_pipeline_data(self.config_file)
+        for data in pipelines.values():
+            try:
+                self._add(ETLPipeline.from_dict(data))
+            except Exception as e:
+                print(f"Error loading pipeline {data.get('name')}: {e}")
     
     def save_pipelines(self):
-        """Save pipelines to config file"""
+        """Save all pipelines to config file and empty the journal"""
         try:
-            data = {
-                'pipelines': [p.to_dict() for p in self.pipelines.values()]
-            }
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with self._lock:
+                data = {
+                    'pipelines': [p.to_dict() for p in self.pipelines.values()]
+                }
+                temp_file = self.config_file + '.tmp'
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                os.replace(temp_file, self.config_file)
+                if os.path.exists(self.journal_file):
+                    os.remove(self.journal_file)
+                self._journal_entries = 0
         except Exception as e:
             print(f"Error saving pipelines: {e}")
     
+    def save_pipeline(self, name: str):
+        """Save one pipeline (or its deletion) by appending it to the journal"""
+        pipeline = self.pipelines.get(name)
+        if pipeline is not None:
+            entry = {'op': 'put', 'pipeline': pipeline.to_dict()}
+        else:
+            entry = {'op': 'delete', 'name': name}
+        try:
+            with self._lock:
+                with open(self.journal_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                self._journal_entries += 1
+                if self._journal_entries >= JOURNAL_COMPACT_SIZE:
+                    self.save_pipelines()
+        except Exception as e:
+            print(f"Error saving pipeline {name}: {e}")
+    
     def create_pipeline(self, name: str) -> ETLPipeline:
         """Create new pipeline"""
         pipeline = ETLPipeline(name)
-        self.pipelines[name] = pipeline
-        self.save_pipelines()
+        self._add(pipeline)
+        self.save_pipeline(name)
         return pipeline
     
     def get_pipeline(self, name: str) -> Optional[ETLPipeline]:
@@ -412,7 +862,7 @@ class PipelineManager:
         """Delete pipeline"""
         if name in self.pipelines:
             del self.pipelines[name]
-            self.save_pipelines()
+            self.save_pipeline(name)
     
     def list_pipelines(self) -> List[str]:
         """List all pipeline names"""
@@ -0,0 +1,243 @@
+"""
+ETL Estimator - dry runs of a pipeline on a sample of its input
+
+The compiled plan runs, step by step as in execute(), on a random sample
+of the input: uniform, or stratified by some columns (every stratum keeps
+its share of rows and at least one). Each step's selectivity
+(rows out / rows in) and throughput on the sample are extrapolated to the
+full input, giving the expected output rows, output and peak memory, and
+runtime - and whether the run fits in memory or should stream.
+
+Samples of files are drawn in one streaming pass: each row gets a random
+key and the rows with the smallest keys are kept (a reservoir), so the
+whole file is never loaded. A sample under-counts duplicates, so
+remove_duplicates (keep 'first'/'last') estimates its output as the
+number of distinct keys in the full input, from how often each key
+repeats within the sample (see estimate_distinct); such steps stay
+flagged sample_sensitive.
+"""
+import math
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from utils.column_kernels import copy_on_write
+from utils.dedup import row_hashes
+from utils.performance_optimizer import MemoryMonitor
+
+
+# Largest sample drawn, whatever the sample fraction
+MAX_SAMPLE_ROWS = 100_000
+
+# Rule types whose row count on a sample does not scale to the full input
+SAMPLE_SENSITIVE_RULES = {'remove_duplicates'}
+
+
+def frame_deep_bytes(df: pd.DataFrame) -> int:
+    """In-memory size of a frame, string contents included"""
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+def _looks_uniform(counts: np.ndarray) -> bool:
+    """Chi-square test (Wilson-Hilferty approximation, 97.5%) that sample frequencies are all alike"""
+    if len(counts) < 2:
+        return True
+    expected = counts.sum() / len(counts)
+    statistic = np.sum((counts - expected) ** 2) / expected
+    dof = len(counts) - 1
+    critical = dof * (1 - 2 / (9 * dof) + 1.96 * math.sqrt(2 / (9 * dof))) ** 3
+    return statistic <= critical
+
+
+def _moments_estimate(distinct: int, sampled: int, population: float) -> float:
+    # Rows as draws from D equally likely values: solve the distinct count
+    # expected in the sample for D, then give the one expected in the population
+    expected = lambda d, rows: d * -np.expm1(rows * np.log1p(-1 / d))
+    if distinct >= sampled:
+        return population
+    low, high = float(distinct), 1e15
+    for _ in range(200):
+        middle = math.sqrt(low * high)
+        if expected(middle, sampled) < distinct:
+            low = middle
+        else:
+            high = middle
+    return expected((low + high) / 2, population)
+
+
+def _shlosser_estimate(counts: np.ndarray, fraction: float) -> float:
+    frequencies = np.bincount(counts)
+    times = np.arange(len(frequencies))
+    unseen = np.sum((1 - fraction) ** times * frequencies)
+    seen = np.sum(times * fraction * (1 - fraction) ** (times - 1) * frequencies)
+    singletons = frequencies[1] if len(frequencies) > 1 else 0
+    return len(counts) + singletons * unseen / seen if seen else len(counts)
+
+
+def estimate_distinct(hashes: np.ndarray, population: float) -> float:
+    """
+    Distinct values among population rows, estimated from the hashes of a uniform sample of them.
+
+    Hybrid estimator (Haas et al.): method of moments when the sample
+    frequencies look uniform, Shlosser's estimator when they are skewed.
+    """
+    if len(hashes) == 0:
+        return 0.0
+    _, counts = np.unique(hashes, return_counts=True)
+    fraction = min(1.0, len(hashes) / population) if population else 1.0
+    if fraction >= 1.0:
+        return float(len(counts))
+    if _looks_uniform(counts):
+        estimate = _moments_estimate(len(counts), len(hashes), population)
+    else:
+        estimate = _shlosser_estimate(counts, fraction)
+    return min(max(estimate, len(counts)), population)
+
+
+def _distinct_rows(step, df: pd.DataFrame, population: float) -> Optional[float]:
+    """Estimated output rows of a remove_duplicates step whose input sample is df"""
+    rule = getattr(step, 'rule', None)
+    if rule is None or rule.rule_type != 'remove_duplicates' or rule.config.get('keep', 'first') is False:
+        return None
+    return estimate_distinct(row_hashes(df, rule.config.get('columns', None)), population)
+
+
+def _row_bytes(df: pd.DataFrame) -> float:
+    return frame_deep_bytes(df) / len(df) if len(df) else 0.0
+
+
+def _columns(stratify_by: Union[str, Sequence[str], None]) -> List[str]:
+    if stratify_by is None:
+        return []
+    return [stratify_by] if isinstance(stratify_by, str) else list(stratify_by)
+
+
+def _sample_mask(df: pd.DataFrame, keys: np.ndarray, fraction: float, stratify_by: List[str]) -> np.ndarray:
+    if not stratify_by:
+        return keys < fraction
+    groups = [df[col] for col in stratify_by]
+    ranks = pd.Series(keys, index=df.index).groupby(groups, dropna=False, observed=True, sort=False)
+    sizes = ranks.transform('size').to_numpy()
+    # Proportional allocation, at least one row per stratum
+    quota = np.maximum(1, np.round(sizes * fraction))
+    return ranks.rank(method='first').to_numpy() <= quota
+
+
+def _smallest(keys: np.ndarray, limit: int) -> np.ndarray:
+    """Positions of the limit smallest keys, in row order"""
+    if len(keys) <= limit:
+        return np.arange(len(keys))
+    return np.sort(np.argpartition(keys, limit)[:limit])
+
+
+def sample_frame(df: pd.DataFrame, fraction: float, stratify_by: Union[str, Sequence[str], None] = None,
+                 max_rows: int = MAX_SAMPLE_ROWS, seed: Optional[int] = None) -> pd.DataFrame:
+    """Random sample of about fraction of df's rows (at most max_rows), in row order"""
+    frame, _ = sample_chunks(iter([df]), fraction, stratify_by, max_rows, seed)
+    return frame
+
+
+def sample_chunks(chunks: Iterator[pd.DataFrame], fraction: float,
+                  stratify_by: Union[str, Sequence[str], None] = None, max_rows: int = MAX_SAMPLE_ROWS,
+                  seed: Optional[int] = None) -> Tuple[pd.DataFrame, int]:
+    """Sample a stream of chunks in one pass; returns (sample in row order, total rows read)"""
+    if not 0 < fraction <= 1:
+        raise ValueError(f"sample_fraction must be in (0, 1], got {fraction}")
+    rng = np.random.default_rng(seed)
+    columns = _columns(stratify_by)
+    kept: List[pd.DataFrame] = []
+    kept_keys: List[np.ndarray] = []
+    kept_rows = 0
+    total_rows = 0
+    for chunk in chunks:
+        total_rows += len(chunk)
+        keys = rng.random(len(chunk))
+        mask = _sample_mask(chunk, keys, fraction, columns)
+        kept.append(chunk[mask])
+        kept_keys.append(keys[mask])
+        kept_rows += len(kept[-1])
+        if kept_rows > 2 * max_rows:
+            # Keep the reservoir bounded while reading
+            sample = pd.concat(kept)
+            keys = np.concatenate(kept_keys)
+            positions = _smallest(keys, max_rows)
+            kept, kept_keys, kept_rows = [sample.iloc[positions]], [keys[positions]], len(positions)
+
+    if not kept:
+        return pd.DataFrame(), 0
+    sample = pd.concat(kept) if len(kept) > 1 else kept[0]
+    positions = _smallest(np.concatenate(kept_keys), max_rows)
+    return sample.iloc[positions], total_rows
+
+
+def estimate_plan(plan, sample: pd.DataFrame, total_rows: int, read_time: float = 0.0,
+                  memory_budget: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run plan on sample and extrapolate to an input of total_rows rows.
+
+    Per step: selectivity, estimated rows in/out and wall time (rows in
+    divided by the step's throughput on the sample). read_time (seconds
+    spent reading the input) is added to the runtime. The run is expected
+    to fit in memory when the input plus the largest step output fit
+    within memory_budget (default: MemoryMonitor's budget).
+    """
+    sample_rows = len(sample)
+    input_bytes = _row_bytes(sample) * total_rows
+    estimate = {
+        'total_rows': total_rows,
+        'sample_rows': sample_rows,
+        'sample_fraction': sample_rows / total_rows if total_rows else 0.0,
+        'steps': [],
+        'rules_skipped': plan.dropped,
+        'errors': [],
+        'input_bytes': int(input_bytes),
+        'read_time': round(read_time, 3),
+    }
+
+    result_df = sample
+    rows = float(total_rows)
+    largest_output = 0.0
+    with copy_on_write():
+        for step in plan.steps:
+            before = len(result_df)
+            started = time.perf_counter()
+            try:
+                output_df = step.apply(result_df)
+            except Exception as e:
+                estimate['errors'].append({'rule': step.name, 'error': str(e)})
+                continue
+            wall = time.perf_counter() - started
+            selectivity = len(output_df) / before if before else 1.0
+            rows_after = _distinct_rows(step, result_df, rows) if before else None
+            if rows_after is None:
+                rows_after = rows * selectivity
+            result_df = output_df
+            largest_output = max(largest_output, _row_bytes(result_df) * rows_after)
+            estimate['steps'].append({
+                'rule': step.name,
+                'type': step.rule_type,
+                'rules': [r.name for r in step.rules],
+                'selectivity': round(rows_after / rows, 4) if rows else 1.0,
+                'rows_before': int(round(rows)),
+                'rows_after': int(round(rows_after)),
+                'sample_wall_time': round(wall, 6),
+                # Throughput measured on the sample, applied to the full row count
+                'wall_time': round(wall / before * rows, 3) if before else 0.0,
+                'sample_sensitive': any(r.rule_type in SAMPLE_SENSITIVE_RULES for r in step.rules),
+            })
+            rows = rows_after
+
+    if memory_budget is None:
+        memory_budget = MemoryMonitor().get_memory_budget()
+    peak_bytes = input_bytes + largest_output
+    estimate.update({
+        'output_rows': int(round(rows)),
+        'output_bytes': int(_row_bytes(result_df) * rows),
+        'peak_bytes': int(peak_bytes),
+        'runtime': round(read_time + sum(step['wall_time'] for step in estimate['steps']), 3),
+        'memory_budget': memory_budget,
+        'fits_in_memory': peak_bytes <= memory_budget,
+    })
+    estimate['recommended_mode'] = 'memory' if estimate['fits_in_memory'] else 'stream'
+    return estimate
@@ -0,0 +1,181 @@
+"""
+ETL Optimizer - column dependency analysis, predicate and projection pushdown
+"""
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from utils.filter_expr import expression_columns, validate_expression
+
+
+# Rules that drop rows based only on the values in each row
+ROW_FILTER_TYPES = {'filter_rows', 'filter_expr', 'drop_missing'}
+
+# Rules that add, remove or reorder rows
+ROW_CHANGING_TYPES = {'filter_rows', 'filter_expr', 'drop_missing', 'remove_duplicates', 'select_columns'}
+
+# Rules that rewrite each of their columns from that column alone
+COLUMNWISE_TYPES = {'fill_missing', 'trim_strings', 'convert_type', 'normalize_text', 'replace_values'}
+
+
+def _listed(value) -> Optional[Set[str]]:
+    """Column list from a config entry; None means every column"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return {value}
+    return set(value)
+
+
+def rule_columns(rule) -> Tuple[Optional[Set[str]], Optional[Set[str]]]:
+    """
+    Return (columns read, columns written) by a rule.
+
+    None stands for "all columns" (or columns only known once the data is
+    seen). Renames write both the old and the new names.
+    """
+    config = rule.config
+    rule_type = rule.rule_type
+
+    if rule_type == 'remove_duplicates':
+        return _listed(config.get('columns')), set()
+    if rule_type == 'drop_missing':
+        return _listed(config.get('columns')), set()
+    if rule_type == 'filter_rows':
+        return _listed(config.get('column')), set()
+    if rule_type == 'filter_expr':
+        expression = config.get('expression')
+        if not expression or validate_expression(expression):
+            return set(), set()
+        return expression_columns(expression), set()
+    if rule_type in ('fill_missing', 'trim_strings'):
+        columns = _listed(config.get('columns'))
+        return columns, columns
+    if rule_type in ('convert_type', 'normalize_text'):
+        columns = _listed(config.get('columns', []))
+        return columns, columns
+    if rule_type == 'replace_values':
+        columns = _listed(config.get('column'))
+        return columns, columns
+    if rule_type == 'extract_pattern':
+        return _listed(config.get('column')), _listed(config.get('new_column'))
+    if rule_type == 'lookup_map':
+        return _listed(config.get('column')), _listed(config.get('new_column') or config.get('column'))
+    if rule_type == 'rename_column':
+        mapping = config.get('mapping', {})
+        return set(mapping), set(mapping) | set(mapping.values())
+    if rule_type == 'select_columns':
+        # Dropping the unlisted columns touches every column
+        return _listed(config.get('columns', [])), None
+    return None, None
+
+
+def is_row_filter(rule) -> bool:
+    """Whether a rule removes rows using only the values inside each row"""
+    return rule.rule_type in ROW_FILTER_TYPES
+
+
+def is_row_local(rule) -> bool:
+    """
+    Whether a rule's output for a row depends only on that row.
+
+    Such rules give the same values and dtypes whether or not other rows
+    were filtered out first. Rules whose result dtype is inferred from the
+    whole column (numeric/datetime conversion, fillna upcasts, replace
+    downcasts) are left out.
+    """
+    rule_type = rule.rule_type
+    if rule_type == 'convert_type':
+        return rule.config.get('target_type', 'string') in ('string', 'boolean')
+    return rule_type in {
+        'rename_column', 'trim_strings', 'normalize_text', 'extract_pattern',
+        'filter_rows', 'filter_expr', 'drop_missing', 'select_columns',
+    }
+
+
+def can_push_before(filter_rule, rule) -> bool:
+    """Whether filter_rule can run before rule without changing the result"""
+    if not is_row_local(rule) or is_row_filter(rule):
+        return False
+    reads, _ = rule_columns(filter_rule)
+    _, writes = rule_columns(rule)
+    if writes is None:
+        return False
+    if reads is None:
+        return not writes
+    return not (reads & writes)
+
+
+def can_hoist_past(rule, other) -> bool:
+    """
+    Whether a column-wise rule can run before other without changing the result.
+
+    other must keep every row in place and touch none of the rule's columns.
+    """
+    if other.rule_type in ROW_CHANGING_TYPES:
+        return False
+    columns, _ = rule_columns(rule)
+    reads, writes = rule_columns(other)
+    if columns is None or reads is None or writes is None:
+        return False
+    return not (columns & (reads | writes))
+
+
+def pushdown_filters(rules: List[Any]) -> Tuple[List[Any], List[Dict[str, str]]]:
+    """
+    Move row filters as early as it is safe to do so.
+
+    Filters keep their relative order; each one bubbles up past row-local
+    rules that do not write any column it reads. Returns the reordered rules
+    and a list of {'rule', 'before'} moves.
+    """
+    ordered: List[Any] = []
+    moves = []
+    for rule in rules:
+        position = len(ordered)
+        if is_row_filter(rule):
+            while position > 0 and can_push_before(rule, ordered[position - 1]):
+                position -= 1
+        if position < len(ordered):
+            moves.append({'rule': rule.name, 'before': ordered[position].name})
+        ordered.insert(position, rule)
+    return ordered, moves
+
+
+def required_source_columns(rules: List[Any], output_columns: Optional[List[str]] = None) -> Optional[List[str]]:
+    """
+    Work out which source columns the rules need to produce their output.
+
+    Walks the rules backwards from the wanted output columns (all columns
+    when output_columns is None). Returns a sorted column list, or None if
+    every source column is needed.
+    """
+    needed: Optional[Set[str]] = set(output_columns) if output_columns is not None else None
+
+    for rule in reversed(rules):
+        rule_type = rule.rule_type
+        config = rule.config
+
+        if rule_type == 'select_columns':
+            selected = set(config.get('columns', []))
+            needed = selected if needed is None else needed & selected
+            continue
+        if needed is None:
+            continue
+
+        if rule_type == 'rename_column':
+            mapping = config.get('mapping', {})
+            renamed_from = {new: old for old, new in mapping.items()}
+            needed = {renamed_from.get(col, col) for col in needed if col not in mapping or col in renamed_from}
+            continue
+        if rule_type in COLUMNWISE_TYPES:
+            # A column rewritten from itself is only needed if it is needed later
+            continue
+        if rule_type in ('extract_pattern', 'lookup_map') and config.get('new_column'):
+            needed = needed - {config.get('new_column')}
+
+        reads, _ = rule_columns(rule)
+        if reads is None:
+            needed = None
+        else:
+            needed |= reads
+
+    return sorted(needed) if needed is not None else None
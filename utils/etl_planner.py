@@ -0,0 +1,345 @@
+"""
+ETL Planner - compiles pipeline rules into an optimized physical plan
+"""
+import pandas as pd
+from typing import Dict, List, Any, Optional
+
+from utils.column_kernels import CASE_FUNCTIONS, apply_column_ops, describe_op, with_columns
+from utils.etl_optimizer import pushdown_filters, can_hoist_past
+from utils.filter_expr import validate_expression
+
+
+# Rule types whose work is independent per column and can be fused
+FUSABLE_RULE_TYPES = {'trim_strings', 'normalize_text', 'replace_values', 'convert_type', 'fill_missing'}
+
+KNOWN_RULE_TYPES = {
+    'remove_duplicates', 'fill_missing', 'drop_missing', 'convert_type',
+    'rename_column', 'filter_rows', 'trim_strings', 'replace_values',
+    'normalize_text', 'extract_pattern', 'select_columns', 'filter_expr',
+    'lookup_map',
+}
+
+FILTER_OPERATORS = {'==', '!=', '>', '<', '>=', '<=', 'contains', 'not_contains'}
+CONVERT_TARGETS = {'string', 'integer', 'float', 'datetime', 'boolean'}
+
+# fill_missing methods whose value for a row depends on later rows
+WHOLE_COLUMN_FILL_METHODS = {'mean', 'median', 'mode', 'backward'}
+
+
+# Formats convert_type inferred, by (source, column); shared by every run
+# over the same source so a re-run skips inference
+_source_datetime_formats: Dict[tuple, Optional[str]] = {}
+
+
+def datetime_format_cache(source: Optional[str] = None) -> Dict[tuple, Optional[str]]:
+    """Format cache for one run: shared across runs of a named source, private to the run otherwise"""
+    return _source_datetime_formats if source is not None else {}
+
+
+class RuleContext:
+    """
+    State of one rule application, kept off the (shared) rule object.
+
+    metrics collects the counters the rule reports, e.g. lookup_map
+    unmatched. datetime_formats maps (source, column) to the format
+    convert_type inferred; one run passes the same dict to all its
+    contexts (see datetime_format_cache), so later chunks reuse it.
+    """
+
+    def __init__(self, datetime_formats: Optional[Dict[tuple, Optional[str]]] = None,
+                 source: Optional[str] = None):
+        self.metrics: Dict[str, Any] = {}
+        self.source = source
+        self.datetime_formats = datetime_formats if datetime_formats is not None else datetime_format_cache(source)
+
+
+def column_ops(rule) -> Optional[Dict[str, List[tuple]]]:
+    """Decompose a fusable rule into per-column ops, or None if it cannot be fused"""
+    config = rule.config
+    arrow = config.get('string_engine', 'python') == 'arrow'
+    if rule.rule_type == 'trim_strings':
+        # Default columns depend on the data's dtypes, so they are unknown here
+        if 'columns' not in config:
+            return None
+        op = ('arrow_strip',) if arrow else ('strip',)
+        return {col: [op] for col in config['columns']}
+    if rule.rule_type == 'normalize_text':
+        case = config.get('case', 'lower')
+        op = ('arrow_case', case) if arrow else ('case', case)
+        return {col: [op] for col in config.get('columns', [])}
+    if rule.rule_type == 'replace_values':
+        mapping = config.get('mapping', {})
+        if any(not isinstance(key, str) for key in mapping):
+            return None
+        return {config.get('column'): [('replace', dict(mapping))]}
+    if rule.rule_type == 'convert_type':
+        target_type = config.get('target_type', 'string')
+        if target_type == 'datetime':
+            # Runs as a rule so it keeps its inferred formats and reports parse failures
+            return None
+        return {col: [('convert', target_type)] for col in config.get('columns', [])}
+    if rule.rule_type == 'fill_missing':
+        if 'columns' not in config:
+            return None
+        method = config.get('method', 'constant')
+        value = config.get('value', '')
+        return {col: [('fill', method, value)] for col in config['columns']}
+    return None
+
+
+def is_prefix_safe(rule) -> bool:
+    """Whether a rule's output on the first rows of a frame is the start of its output on the whole frame"""
+    if rule.rule_type == 'remove_duplicates':
+        # The first occurrence of a row is always within the prefix that contains it
+        return rule.config.get('keep', 'first') == 'first'
+    if rule.rule_type == 'fill_missing':
+        return rule.config.get('method', 'constant') not in WHOLE_COLUMN_FILL_METHODS
+    return True
+
+
+def noop_reason(rule, previous=None) -> Optional[str]:
+    """Return why a rule cannot change the data, or None if it may"""
+    config = rule.config
+    rule_type = rule.rule_type
+
+    if not rule.enabled:
+        return 'disabled'
+    if rule_type not in KNOWN_RULE_TYPES:
+        return f"unknown rule type '{rule_type}'"
+
+    if rule_type in ('convert_type', 'normalize_text') and not config.get('columns'):
+        return 'no columns'
+    if rule_type in ('fill_missing', 'trim_strings') and 'columns' in config and not config['columns']:
+        return 'no columns'
+    if rule_type == 'normalize_text' and config.get('case', 'lower') not in CASE_FUNCTIONS:
+        return f"unknown case '{config.get('case')}'"
+    if rule_type == 'convert_type' and config.get('target_type', 'string') not in CONVERT_TARGETS:
+        return f"unknown target type '{config.get('target_type')}'"
+    if rule_type == 'rename_column':
+        mapping = config.get('mapping', {})
+        if all(old == new for old, new in mapping.items()):
+            return 'identity mapping' if mapping else 'empty mapping'
+    if rule_type == 'replace_values':
+        mapping = config.get('mapping', {})
+        if not config.get('column'):
+            return 'no column'
+        if all(old == new for old, new in mapping.items()):
+            return 'identity mapping' if mapping else 'empty mapping'
+    if rule_type == 'filter_rows':
+        if not config.get('column'):
+            return 'no column'
+        if config.get('operator', '==') not in FILTER_OPERATORS:
+            return f"unknown operator '{config.get('operator')}'"
+    if rule_type == 'filter_expr':
+        if not config.get('expression'):
+            return 'no expression'
+        error = validate_expression(config['expression'])
+        if error:
+            return f"invalid expression: {error}"
+    if rule_type == 'extract_pattern':
+        if not (config.get('column') and config.get('pattern') and config.get('new_column')):
+            return 'incomplete config'
+    if rule_type == 'lookup_map':
+        if not config.get('column'):
+            return 'no column'
+        if not config.get('mapping_file') and not config.get('mapping'):
+            return 'empty mapping'
+    if (rule_type == 'remove_duplicates' and previous is not None
+            and previous.rule_type == rule_type and previous.config == config):
+        # Dropping duplicates is idempotent for every keep mode
+        return f"repeats '{previous.name}'"
+
+    return None
+
+
+class RuleStep:
+    """Plan step that applies a single rule as-is"""
+
+    kind = 'rule'
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.rules = [rule]
+        self.name = rule.name
+        self.rule_type = rule.rule_type
+
+    def apply(self, df: pd.DataFrame, context: Optional[RuleContext] = None) -> pd.DataFrame:
+        return self.rule.apply(df, context)
+
+    def describe(self) -> List[str]:
+        return [f"{self.rule_type} '{self.name}'"]
+
+
+class FusedColumnStep:
+    """Plan step that runs column-wise rules as independent per-column chains"""
+
+    kind = 'fused_column'
+
+    def __init__(self, rules: List[Any], chains: Dict[str, List[tuple]], scheduler=None):
+        self.rules = rules
+        self.chains = chains
+        self.scheduler = scheduler
+        self.rule_type = 'fused_column'
+
+    @property
+    def name(self) -> str:
+        return '+'.join(r.name for r in self.rules)
+
+    def add_rule(self, rule, ops: Dict[str, List[tuple]]):
+        self.rules.append(rule)
+        for col, col_ops in ops.items():
+            self.chains.setdefault(col, []).extend(col_ops)
+
+    def apply(self, df: pd.DataFrame, context: Optional[RuleContext] = None) -> pd.DataFrame:
+        chains = {col: ops for col, ops in self.chains.items() if col in df.columns}
+        if self.scheduler is not None:
+            results = self.scheduler.run(df, chains)
+        else:
+            results = {}
+            for col, ops in chains.items():
+                try:
+                    results[col] = apply_column_ops(df[col], ops)
+                except Exception as e:
+                    results[col] = e
+
+        updates = {}
+        for col, ops in chains.items():
+            result = results[col]
+            if isinstance(result, Exception):
+                print(f"Error applying fused step on {col}: {result}")
+                result = self._apply_unfused(df[col], ops)
+            updates[col] = result
+        return with_columns(df, updates)
+
+    @staticmethod
+    def _apply_unfused(series: pd.Series, ops: List[tuple]) -> pd.Series:
+        """Apply ops one at a time, skipping the failing ones like rule.apply does"""
+        for op in ops:
+            try:
+                series = apply_column_ops(series, [op])
+            except Exception as e:
+                print(f"Error applying {op[0]} on {series.name}: {e}")
+        return series
+
+    def describe(self) -> List[str]:
+        lines = [f"fused_column [{', '.join(r.name for r in self.rules)}]"]
+        for col, ops in self.chains.items():
+            lines.append(f"{col}: " + ' -> '.join(describe_op(op) for op in ops))
+        return lines
+
+
+class ExecutionPlan:
+    """Physical plan produced by PlanCompiler"""
+
+    def __init__(self, pipeline_name: str, source_rules: List[Any]):
+        self.pipeline_name = pipeline_name
+        self.source_rules = source_rules
+        self.steps: List[Any] = []
+        self.dropped: List[Dict[str, str]] = []
+        self.reordered: List[Dict[str, str]] = []
+
+    def explain(self) -> str:
+        """Human-readable description of the plan"""
+        lines = [
+            f"Execution plan for pipeline '{self.pipeline_name}': "
+            f"{len(self.source_rules)} rules -> {len(self.steps)} steps"
+        ]
+        for i, step in enumerate(self.steps, start=1):
+            description = step.describe()
+            lines.append(f"  {i}. {description[0]}")
+            lines.extend(f"       {line}" for line in description[1:])
+        if self.reordered:
+            lines.append("Reordered:")
+            for move in self.reordered:
+                lines.append(f"  - '{move['rule']}' pushed before '{move['before']}'")
+        if self.dropped:
+            lines.append("Dropped:")
+            for entry in self.dropped:
+                lines.append(f"  - '{entry['rule']}' ({entry['reason']})")
+        return '\n'.join(lines)
+
+    def prefix_safe_start(self) -> int:
+        """Index of the first step from which on every step is prefix-safe (see is_prefix_safe)"""
+        for i in range(len(self.steps), 0, -1):
+            if not all(is_prefix_safe(rule) for rule in self.steps[i - 1].rules):
+                return i
+        return 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'pipeline': self.pipeline_name,
+            'steps': [
+                {
+                    'kind': step.kind,
+                    'rules': [r.name for r in step.rules],
+                    'description': step.describe(),
+                }
+                for step in self.steps
+            ],
+            'dropped': list(self.dropped),
+            'reordered': list(self.reordered),
+        }
+
+
+class PlanCompiler:
+    """Compile a list of TransformRules into an ExecutionPlan"""
+
+    def __init__(self, fuse: bool = True, optimize: bool = True, scheduler=None, chunked: bool = False):
+        """
+        Args:
+            fuse: Group column-wise rules into per-column chains
+            optimize: Push row filters down before fusing
+            scheduler: ColumnScheduler used to run fused chains in parallel
+            chunked: Plan for chunk-at-a-time execution, keeping fills that
+                need the whole column as separate rule steps
+        """
+        self.fuse = fuse
+        self.optimize = optimize
+        self.scheduler = scheduler
+        self.chunked = chunked
+
+    def _fusable(self, rule) -> bool:
+        if not self.fuse or rule.rule_type not in FUSABLE_RULE_TYPES:
+            return False
+        if self.chunked and rule.rule_type == 'fill_missing':
+            return rule.config.get('method', 'constant') == 'constant'
+        return True
+
+    def compile(self, rules: List[Any], pipeline_name: str = '') -> ExecutionPlan:
+        plan = ExecutionPlan(pipeline_name, list(rules))
+
+        live_rules = []
+        for rule in rules:
+            reason = noop_reason(rule, live_rules[-1] if live_rules else None)
+            if reason:
+                plan.dropped.append({'rule': rule.name, 'reason': reason})
+            else:
+                live_rules.append(rule)
+
+        if self.optimize:
+            live_rules, plan.reordered = pushdown_filters(live_rules)
+
+        open_step: Optional[FusedColumnStep] = None
+        since_open: List[Any] = []
+
+        for rule in live_rules:
+            ops = column_ops(rule) if self._fusable(rule) else None
+            if ops is None:
+                plan.steps.append(RuleStep(rule))
+                since_open.append(rule)
+                continue
+
+            # Column chains commute with rules on other columns that keep the
+            # rows as they are, so the rule can join the last fused step
+            if open_step is not None and all(can_hoist_past(rule, other) for other in since_open):
+                if since_open:
+                    plan.reordered.append({'rule': rule.name, 'before': since_open[0].name})
+                open_step.add_rule(rule, ops)
+                continue
+
+            open_step = FusedColumnStep([], {}, self.scheduler)
+            open_step.add_rule(rule, ops)
+            plan.steps.append(open_step)
+            since_open = []
+
+        return plan
@@ -0,0 +1,131 @@
+"""
+ETL Scheduler - runs independent per-column chains of a plan step in parallel
+"""
+import multiprocessing
+import os
+import threading
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Any, Optional
+
+from utils.column_kernels import apply_column_ops, is_python_heavy
+from utils.performance_optimizer import MultiThreadExecutor
+
+
+class ColumnScheduler:
+    """
+    Schedule per-column op chains over worker threads and processes.
+
+    Chains whose work is vectorized pandas/numpy (conversions, fills,
+    replace) release the GIL and run on MultiThreadExecutor threads. Chains
+    dominated by per-element Python string work are sent to a process pool
+    once the data is big enough to pay for pickling the columns.
+
+    The pool is started on first use and kept until shutdown(). Its
+    workers come from a fork server (spawned where there is none), never
+    forked from this process: steps run on worker threads, and forking a
+    process that has threads can deadlock the child.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, mode: str = 'auto',
+                 parallel_threshold: int = 200_000, process_threshold: int = 2_000_000):
+        """
+        Args:
+            max_workers: Worker count for threads and processes (default: CPU count)
+            mode: 'auto', 'thread', 'process' or 'serial'
+            parallel_threshold: Minimum cells (rows x columns) before going parallel
+            process_threshold: Minimum cells of Python-heavy chains before using processes
+        """
+        if mode not in ('auto', 'thread', 'process', 'serial'):
+            raise ValueError(f"Unknown scheduler mode: {mode}")
+        self.max_workers = max_workers or os.cpu_count() or 4
+        self.mode = mode
+        self.parallel_threshold = parallel_threshold
+        self.process_threshold = process_threshold
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context(method))
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Drop a pool whose worker died, so the next step starts a new one"""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def shutdown(self):
+        """Stop the worker processes; a later run starts a new pool"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def assign(self, n_rows: int, chains: Dict[str, List[tuple]]) -> Dict[str, str]:
+        """Decide where each column chain runs: 'inline', 'thread' or 'process'"""
+        if (self.mode == 'serial' or self.max_workers < 2 or len(chains) < 2
+                or n_rows * len(chains) < self.parallel_threshold):
+            return {col: 'inline' for col in chains}
+        if self.mode == 'thread':
+            return {col: 'thread' for col in chains}
+        if self.mode == 'process':
+            return {col: 'process' for col in chains}
+
+        heavy = [col for col, ops in chains.items() if is_python_heavy(ops)]
+        use_processes = len(heavy) > 1 and n_rows * len(heavy) >= self.process_threshold
+        return {
+            col: 'process' if use_processes and col in heavy else 'thread'
+            for col in chains
+        }
+
+    def run(self, df: pd.DataFrame, chains: Dict[str, List[tuple]]) -> Dict[str, Any]:
+        """
+        Run every chain on its column of df.
+
+        Returns a dict of column -> new Series, or column -> Exception for
+        chains that failed. df itself is not modified.
+        """
+        placement = self.assign(len(df), chains)
+        results: Dict[str, Any] = {}
+
+        process_cols = [col for col, where in placement.items() if where == 'process']
+        thread_cols = [col for col, where in placement.items() if where == 'thread']
+
+        process_futures = {}
+        pool = self._process_pool() if process_cols else None
+        for col in process_cols:
+            try:
+                process_futures[col] = pool.submit(apply_column_ops, df[col], chains[col])
+            except BrokenProcessPool as e:
+                results[col] = e
+
+        if thread_cols:
+            executor = MultiThreadExecutor(max_workers=min(self.max_workers, len(thread_cols)))
+            outputs = executor.map_parallel(lambda col: apply_column_ops(df[col], chains[col]), thread_cols)
+            results.update(zip(thread_cols, outputs))
+
+        for col, where in placement.items():
+            if where != 'inline':
+                continue
+            try:
+                results[col] = apply_column_ops(df[col], chains[col])
+            except Exception as e:
+                results[col] = e
+
+        for col, future in process_futures.items():
+            try:
+                results[col] = future.result()
+            except Exception as e:
+                results[col] = e
+        if any(isinstance(results[col], BrokenProcessPool) for col in process_cols):
+            # Failed chains are redone inline by the caller
+            self._discard_pool(pool)
+
+        return results
@@ -0,0 +1,436 @@
+"""
+ETL Stream - constant-memory, chunk-at-a-time pipeline execution
+"""
+import os
+import time
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Any, Callable, Iterator, Optional
+from datetime import datetime
+
+from utils.column_kernels import with_columns
+from utils.dedup import PartitionedDeduplicator, PositionFilter, duplicate_mask, row_hashes
+from utils.etl_planner import RuleContext, datetime_format_cache
+from utils.etl_profiler import frame_bytes
+from utils.lazy_loader import LazyDataLoader
+from utils.performance_optimizer import CancellationToken, ChunkProcessor
+
+
+# fill_missing methods that need statistics over the whole column
+AGGREGATE_FILL_METHODS = {'mean', 'median', 'mode'}
+
+# Values per column a median fill keeps exactly; beyond that the median is
+# estimated with a t-digest so the pre-pass stays within constant memory
+MEDIAN_EXACT_VALUES = 1_000_000
+
+
+def chunk_source(source: Any, chunk_processor: Optional[ChunkProcessor] = None) -> Callable[[], Iterator[pd.DataFrame]]:
+    """
+    Normalize a stream source into a factory of chunk iterators.
+
+    Accepts a LazyDataLoader, a file path (read through ChunkProcessor),
+    a callable returning an iterator of chunks, or a one-shot iterable.
+    """
+    if isinstance(source, LazyDataLoader):
+        return source.get_chunks
+    if isinstance(source, (str, os.PathLike)):
+        processor = chunk_processor or ChunkProcessor()
+        return lambda: processor.iter_chunks(str(source))
+    if callable(source):
+        return source
+
+    consumed = []
+
+    def once():
+        if consumed:
+            raise ValueError("Stream source is a one-shot iterable and cannot be read twice")
+        consumed.append(True)
+        return iter(source)
+
+    once.one_shot = True
+    return once
+
+
+def source_name(source: Any) -> Optional[str]:
+    """Absolute path of a file-backed stream source, None for other sources"""
+    if isinstance(source, LazyDataLoader):
+        source = source.file_path
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.abspath(source)
+    return None
+
+
+class CsvChunkSink:
+    """Append chunks to a CSV file, writing the header once"""
+
+    def __init__(self, file_path: str, encoding: str = 'utf-8'):
+        self.file_path = file_path
+        self.encoding = encoding
+        self._header_written = False
+
+    def write(self, chunk: pd.DataFrame):
+        mode = 'a' if self._header_written else 'w'
+        chunk.to_csv(self.file_path, mode=mode, header=not self._header_written,
+                     index=False, encoding=self.encoding)
+        self._header_written = True
+
+    def close(self):
+        if not self._header_written:
+            open(self.file_path, 'w', encoding=self.encoding).close()
+
+
+class JsonLinesChunkSink:
+    """Append chunks to a JSON Lines file"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, 'w', encoding='utf-8')
+
+    def write(self, chunk: pd.DataFrame):
+        if len(chunk):
+            chunk.to_json(self._file, orient='records', lines=True, force_ascii=False)
+            self._file.write('\n')
+
+    def close(self):
+        self._file.close()
+
+
+class CallbackChunkSink:
+    """Hand each chunk to a callable"""
+
+    def __init__(self, callback: Callable[[pd.DataFrame], Any]):
+        self.callback = callback
+
+    def write(self, chunk: pd.DataFrame):
+        self.callback(chunk)
+
+    def close(self):
+        pass
+
+
+def make_sink(sink: Any):
+    """Build a chunk sink from a file path, a callable, or a sink object"""
+    if isinstance(sink, (str, os.PathLike)):
+        path = str(sink)
+        if path.lower().endswith(('.jsonl', '.ndjson')):
+            return JsonLinesChunkSink(path)
+        return CsvChunkSink(path)
+    if hasattr(sink, 'write'):
+        return sink
+    if callable(sink):
+        return CallbackChunkSink(sink)
+    raise ValueError(f"Unsupported stream sink: {sink!r}")
+
+
+def is_partitioned_dedup(rule, one_shot: bool = False) -> bool:
+    """
+    Whether a remove_duplicates rule is streamed through an on-disk pre-pass.
+
+    The pre-pass keeps memory flat and settles hash collisions on values;
+    keep='first' over a one-shot source (or config 'partitioned': False)
+    falls back to a single pass with an in-memory set of row hashes.
+    """
+    if rule.rule_type != 'remove_duplicates':
+        return False
+    if rule.config.get('keep', 'first') != 'first':
+        return True
+    return rule.config.get('partitioned', not one_shot)
+
+
+class StreamingDeduplicator:
+    """remove_duplicates (keep='first') across chunks, backed by a sorted array of seen row hashes"""
+
+    def __init__(self, rule):
+        self.subset = rule.config.get('columns', None)
+        self.seen = np.array([], dtype=np.uint64)
+
+    def __call__(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        keys = chunk[self.subset] if self.subset else chunk
+        hashes = row_hashes(keys)
+        # Within the chunk values settle collisions; across chunks the 64-bit hash decides
+        mask = ~duplicate_mask(keys, keep='first')
+        if len(self.seen):
+            mask &= ~np.isin(hashes, self.seen)
+        # Both runs are sorted, so the stable sort merges them in linear time
+        self.seen = np.sort(np.concatenate([self.seen, np.unique(hashes[mask])]), kind='stable')
+        return chunk[mask]
+
+
+class FillAggregator:
+    """Accumulate the column statistics a fill_missing rule needs over all chunks"""
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.method = rule.config.get('method', 'constant')
+        self.columns = rule.config.get('columns', None)
+        self._sums: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._values: Dict[str, List[np.ndarray]] = {}
+        self._digests: Dict[str, Any] = {}
+        self._value_counts: Dict[str, pd.Series] = {}
+        self._failed = set()
+
+    def update(self, chunk: pd.DataFrame):
+        for col in self.columns if self.columns is not None else chunk.columns:
+            if col not in chunk.columns or col in self._failed:
+                continue
+            series = chunk[col]
+            try:
+                if self.method == 'mean':
+                    self._sums[col] = self._sums.get(col, 0) + series.sum()
+                    self._counts[col] = self._counts.get(col, 0) + int(series.count())
+                elif self.method == 'median':
+                    self._add_median_values(col, pd.to_numeric(series.dropna(), errors='raise').to_numpy())
+                elif self.method == 'mode':
+                    counts = series.value_counts()
+                    previous = self._value_counts.get(col)
+                    self._value_counts[col] = counts if previous is None else previous.add(counts, fill_value=0)
+            except Exception as e:
+                print(f"Error aggregating {col} for rule {self.rule.name}: {e}")
+                self._failed.add(col)
+
+    def _add_median_values(self, col: str, values: np.ndarray):
+        digest = self._digests.get(col)
+        if digest is not None:
+            digest.update(values)
+            return
+        self._values.setdefault(col, []).append(values)
+        self._counts[col] = self._counts.get(col, 0) + len(values)
+        if self._counts[col] > MEDIAN_EXACT_VALUES:
+            # Imported here: utils.sketch_profiler reads its sources through this module
+            from utils.sketch_profiler import TDigest
+            digest = self._digests[col] = TDigest()
+            for part in self._values.pop(col):
+                digest.update(part)
+
+    def finalize(self) -> Dict[str, Any]:
+        """Return the fill value for each column"""
+        fallback = self.rule.config.get('value', '')
+        values = {}
+        if self.method == 'mean':
+            for col, total in self._sums.items():
+                values[col] = total / self._counts[col] if self._counts[col] else np.nan
+        elif self.method == 'median':
+            for col, parts in self._values.items():
+                if col not in self._failed:
+                    values[col] = pd.Series(np.concatenate(parts)).median()
+            for col, digest in self._digests.items():
+                if col not in self._failed:
+                    values[col] = digest.quantile(0.5)
+        elif self.method == 'mode':
+            for col, counts in self._value_counts.items():
+                if counts.empty:
+                    values[col] = fallback
+                    continue
+                modes = counts[counts == counts.max()].index
+                values[col] = pd.Series(modes).sort_values().iloc[0]
+        return values
+
+    def close(self):
+        """Nothing to release; pre-pass accumulators share PartitionedDeduplicator's interface"""
+
+
+class ResolvedFill:
+    """fill_missing with its aggregate values already computed by a pre-pass"""
+
+    def __init__(self, values: Dict[str, Any]):
+        self.values = values
+
+    def __call__(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        return with_columns(chunk, {
+            col: chunk[col].fillna(value) for col, value in self.values.items() if col in chunk.columns
+        })
+
+
+class StreamingForwardFill:
+    """Forward fill that carries the last valid value into the next chunk"""
+
+    def __init__(self, rule):
+        self.columns = rule.config.get('columns', None)
+        self.carry: Dict[str, Any] = {}
+
+    def __call__(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        updates = {}
+        for col in self.columns if self.columns is not None else chunk.columns:
+            if col not in chunk.columns:
+                continue
+            filled = chunk[col].ffill()
+            if col in self.carry:
+                filled = filled.fillna(self.carry[col])
+            last_valid = filled.last_valid_index()
+            if last_valid is not None:
+                self.carry[col] = filled.loc[last_valid]
+            updates[col] = filled
+        return with_columns(chunk, updates)
+
+
+def needs_prepass(step, one_shot: bool = False) -> bool:
+    """Whether a plan step needs a full pass over its input before streaming"""
+    rule = getattr(step, 'rule', None)
+    if rule is None:
+        return False
+    if rule.rule_type == 'fill_missing':
+        return rule.config.get('method', 'constant') in AGGREGATE_FILL_METHODS
+    return is_partitioned_dedup(rule, one_shot)
+
+
+def make_prepass(step):
+    """Return the update()/finalize()/close() accumulator for a step that needs a pre-pass"""
+    rule = step.rule
+    if rule.rule_type == 'remove_duplicates':
+        return PartitionedDeduplicator(rule.config.get('columns', None), rule.config.get('keep', 'first'))
+    return FillAggregator(rule)
+
+
+def make_stream_op(step, resolved: Optional[Any] = None,
+                   one_shot: bool = False) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    """Return a chunk -> chunk callable with cross-chunk semantics for a plan step"""
+    rule = getattr(step, 'rule', None)
+    if rule is None:
+        return step.apply
+
+    if rule.rule_type == 'remove_duplicates':
+        if is_partitioned_dedup(rule, one_shot):
+            return PositionFilter(resolved if resolved is not None else np.array([], dtype=np.int64))
+        return StreamingDeduplicator(rule)
+    if rule.rule_type == 'fill_missing':
+        method = rule.config.get('method', 'constant')
+        if method in AGGREGATE_FILL_METHODS:
+            return ResolvedFill(resolved or {})
+        if method == 'forward':
+            return StreamingForwardFill(rule)
+        if method == 'backward':
+            raise ValueError(f"Rule {rule.name}: backward fill cannot be streamed")
+    return step.apply
+
+
+class StreamExecutor:
+    """Run a compiled plan over a chunk source into a sink"""
+
+    def __init__(self, plan, source_factory: Callable[[], Iterator[pd.DataFrame]],
+                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 cancellation_token: Optional[CancellationToken] = None,
+                 source_name: Optional[str] = None):
+        self.plan = plan
+        self.source_factory = source_factory
+        self.progress_callback = progress_callback
+        self.cancellation_token = cancellation_token
+        self.one_shot = getattr(source_factory, 'one_shot', False)
+        self.source_name = source_name
+
+    def _chunks(self, phase: str, pass_number: int) -> Iterator[pd.DataFrame]:
+        """Source chunks with a cancellation check before and a progress report after each one"""
+        rows = 0
+        chunks = self.source_factory()
+        try:
+            for n, chunk in enumerate(chunks, start=1):
+                if self.cancellation_token is not None:
+                    self.cancellation_token.raise_if_cancelled(f"Stream cancelled in {phase} pass at chunk {n}")
+                yield chunk
+                rows += len(chunk)
+                if self.progress_callback is not None:
+                    self.progress_callback({'phase': phase, 'pass': pass_number, 'chunk': n, 'rows': rows})
+        finally:
+            # Release the source's file handle when the pass stops early
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+    def _build_ops(self, steps: List[Any], resolved: Dict[int, Any]) -> List[Callable]:
+        # Fresh state on every pass: dedup and forward fill restart with the source
+        return [make_stream_op(step, resolved.get(i), self.one_shot) for i, step in enumerate(steps)]
+
+    def run(self, sink: Any) -> Dict[str, Any]:
+        steps = self.plan.steps
+        stats = {
+            'start_time': datetime.now(),
+            'mode': 'stream',
+            'rules_applied': [
+                {
+                    'rule': step.name,
+                    'type': step.rule_type,
+                    'rules': [r.name for r in step.rules],
+                    'rows_before': 0,
+                    'rows_after': 0,
+                    'rows_changed': 0,
+                    'wall_time': 0.0,
+                    'cpu_time': 0.0,
+                    'bytes_in': 0
+                }
+                for step in steps
+            ],
+            'rules_skipped': self.plan.dropped,
+            'errors': [],
+            'passes': 1,
+            'chunks': 0,
+            'initial_rows': 0,
+            'initial_columns': 0,
+            'final_rows': 0,
+            'final_columns': 0
+        }
+
+        # Validate streamability up front so nothing is written on failure
+        self._build_ops(steps, {})
+
+        resolved: Dict[int, Any] = {}
+        for i, step in enumerate(steps):
+            if not needs_prepass(step, self.one_shot):
+                continue
+            ops = self._build_ops(steps[:i], resolved)
+            aggregator = make_prepass(step)
+            try:
+                for chunk in self._chunks('prepass', stats['passes']):
+                    for op in ops:
+                        chunk = op(chunk)
+                    aggregator.update(chunk)
+                resolved[i] = aggregator.finalize()
+            finally:
+                aggregator.close()
+            stats['passes'] += 1
+
+        ops = self._build_ops(steps, resolved)
+        # Plain steps report counters through a context; cross-chunk ops keep their own state
+        takes_context = [op == step.apply for op, step in zip(ops, steps)]
+        datetime_formats = datetime_format_cache(self.source_name)
+        sink = make_sink(sink)
+        try:
+            for chunk in self._chunks('stream', stats['passes']):
+                stats['chunks'] += 1
+                stats['initial_rows'] += len(chunk)
+                stats['initial_columns'] = len(chunk.columns)
+                for entry, op, with_context in zip(stats['rules_applied'], ops, takes_context):
+                    before_rows = len(chunk)
+                    before_bytes = frame_bytes(chunk)
+                    context = RuleContext(datetime_formats, self.source_name)
+                    wall, cpu = time.perf_counter(), time.process_time()
+                    try:
+                        chunk = op(chunk, context) if with_context else op(chunk)
+                    except Exception as e:
+                        stats['errors'].append({'rule': entry['rule'], 'chunk': stats['chunks'], 'error': str(e)})
+                    entry['wall_time'] += time.perf_counter() - wall
+                    entry['cpu_time'] += time.process_time() - cpu
+                    entry['bytes_in'] += before_bytes
+                    entry['rows_before'] += before_rows
+                    entry['rows_after'] += len(chunk)
+                    entry['rows_changed'] = entry['rows_after'] - entry['rows_before']
+                    for key, value in context.metrics.items():
+                        # Counts add up over chunks; rates are recomputed from them below
+                        if isinstance(value, int):
+                            entry[key] = entry.get(key, 0) + value
+                stats['final_rows'] += len(chunk)
+                stats['final_columns'] = len(chunk.columns)
+                sink.write(chunk)
+        finally:
+            sink.close()
+
+        for entry in stats['rules_applied']:
+            wall = entry['wall_time']
+            bytes_in = entry.pop('bytes_in')
+            entry['rows_per_sec'] = round(entry['rows_before'] / wall, 1) if wall > 0 else None
+            entry['bytes_per_sec'] = round(bytes_in / wall, 1) if wall > 0 else None
+            if entry.get('parse_values'):
+                entry['parse_failure_rate'] = round(entry['parse_failures'] / entry['parse_values'], 4)
+
+        stats['end_time'] = datetime.now()
+        stats['duration'] = (stats['end_time'] - stats['start_time']).total_seconds()
+        return stats
@@ -0,0 +1,248 @@
+"""
+Filter Expressions - compound row filters evaluated into a single boolean mask
+
+An expression is a tree of dicts:
+    {'and': [expr, ...]}
+    {'or': [expr, ...]}
+    {'not': expr}
+    {'column': 'age', 'op': '>=', 'value': 18}
+
+Leaf ops: ==, !=, >, <, >=, <=, in, not_in, between (value [low, high],
+inclusive), is_null, not_null, contains (literal substring) and regex.
+Missing values never satisfy a comparison, contains or regex predicate.
+"""
+import re
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional, Set
+
+from utils import arrow_strings
+from utils.column_kernels import transform_text
+
+try:
+    import numexpr
+    HAS_NUMEXPR = True
+except ImportError:
+    numexpr = None
+    HAS_NUMEXPR = False
+
+
+COMPARISON_OPS = {'==', '!=', '>', '<', '>=', '<='}
+TEXT_OPS = {'contains', 'regex'}
+LEAF_OPS = COMPARISON_OPS | TEXT_OPS | {'in', 'not_in', 'between', 'is_null', 'not_null'}
+
+# Rough per-row cost of each predicate; cheaper ones are evaluated first
+OP_COSTS = {
+    '==': 1, '!=': 1, '>': 1, '<': 1, '>=': 1, '<=': 1,
+    'is_null': 1, 'not_null': 1, 'between': 2, 'in': 3, 'not_in': 3,
+    'contains': 20, 'regex': 40,
+}
+
+# Below this many rows numexpr's setup costs more than it saves
+NUMEXPR_MIN_ROWS = 50_000
+
+
+def validate_expression(expr: Any) -> Optional[str]:
+    """Return what is wrong with an expression, or None if it is well formed"""
+    if not isinstance(expr, dict):
+        return f"expected an object, got {type(expr).__name__}"
+    if 'and' in expr or 'or' in expr:
+        children = expr.get('and', expr.get('or'))
+        if not isinstance(children, list) or not children:
+            return "'and'/'or' need a non-empty list"
+        for child in children:
+            error = validate_expression(child)
+            if error:
+                return error
+        return None
+    if 'not' in expr:
+        return validate_expression(expr['not'])
+
+    op = expr.get('op', '==')
+    if not expr.get('column'):
+        return 'predicate without column'
+    if op not in LEAF_OPS:
+        return f"unknown operator '{op}'"
+    value = expr.get('value')
+    if op in ('in', 'not_in') and not isinstance(value, (list, tuple, set)):
+        return f"'{op}' needs a list value"
+    if op == 'between' and not (isinstance(value, (list, tuple)) and len(value) == 2):
+        return "'between' needs a [low, high] value"
+    if op in TEXT_OPS and value is None:
+        return f"'{op}' needs a value"
+    if op == 'regex':
+        try:
+            re.compile(str(value))
+        except re.error as e:
+            return f"bad regex: {e}"
+    return None
+
+
+def expression_columns(expr: Dict[str, Any]) -> Set[str]:
+    """Columns read by an expression"""
+    if 'and' in expr or 'or' in expr:
+        columns = set()
+        for child in expr.get('and', expr.get('or')):
+            columns |= expression_columns(child)
+        return columns
+    if 'not' in expr:
+        return expression_columns(expr['not'])
+    return {expr['column']}
+
+
+def expression_cost(expr: Dict[str, Any]) -> int:
+    """Estimated per-row cost of evaluating an expression in full"""
+    if 'and' in expr or 'or' in expr:
+        return sum(expression_cost(child) for child in expr.get('and', expr.get('or')))
+    if 'not' in expr:
+        return expression_cost(expr['not'])
+    return OP_COSTS[expr.get('op', '==')]
+
+
+def _to_mask(result) -> np.ndarray:
+    if isinstance(result, pd.Series):
+        return result.to_numpy(dtype=bool, na_value=False)
+    return np.asarray(result, dtype=bool)
+
+
+def _text_mask(series: pd.Series, op: str, value: Any, string_engine: str) -> np.ndarray:
+    pattern = str(value)
+    if string_engine == 'arrow':
+        if op == 'contains':
+            pattern = re.escape(pattern)
+        return _to_mask(arrow_strings.contains(series, pattern))
+    regex = op == 'regex'
+    matches = transform_text(series, lambda text: text.str.contains(pattern, regex=regex))
+    return _to_mask(matches) & series.notna().to_numpy()
+
+
+def _leaf_mask(series: pd.Series, op: str, value: Any, string_engine: str) -> np.ndarray:
+    if op == '==':
+        return _to_mask(series == value)
+    if op == '!=':
+        return _to_mask(series != value) & series.notna().to_numpy()
+    if op == '>':
+        return _to_mask(series > value)
+    if op == '<':
+        return _to_mask(series < value)
+    if op == '>=':
+        return _to_mask(series >= value)
+    if op == '<=':
+        return _to_mask(series <= value)
+    if op == 'in':
+        return _to_mask(series.isin(list(value)))
+    if op == 'not_in':
+        return ~_to_mask(series.isin(list(value))) & series.notna().to_numpy()
+    if op == 'between':
+        return _to_mask(series.between(value[0], value[1]))
+    if op == 'is_null':
+        return _to_mask(series.isna())
+    if op == 'not_null':
+        return _to_mask(series.notna())
+    return _text_mask(series, op, value, string_engine)
+
+
+def _numexpr_ready(df: pd.DataFrame, expr: Dict[str, Any]) -> bool:
+    """Whether a leaf is a plain numeric comparison numexpr can evaluate"""
+    if 'column' not in expr or expr.get('op', '==') not in COMPARISON_OPS:
+        return False
+    value = expr.get('value')
+    column = expr['column']
+    return (column in df.columns
+            and isinstance(value, (int, float)) and not isinstance(value, bool)
+            and df[column].dtype.kind in 'iuf')
+
+
+def _numexpr_mask(df: pd.DataFrame, leaves: List[Dict[str, Any]], joiner: str) -> np.ndarray:
+    """Evaluate numeric comparisons as one numexpr expression joined by & or |"""
+    terms = []
+    local_dict = {}
+    for i, leaf in enumerate(leaves):
+        local_dict[f"c{i}"] = df[leaf['column']].to_numpy()
+        local_dict[f"v{i}"] = leaf['value']
+        op = leaf.get('op', '==')
+        term = f"(c{i} {op} v{i})"
+        if op == '!=':
+            # NaN != x is true in numexpr; missing values never match here
+            term = f"({term} & (c{i} == c{i}))"
+        terms.append(term)
+    return numexpr.evaluate(f" {joiner} ".join(terms), local_dict=local_dict)
+
+
+class _Evaluator:
+    """Evaluates an expression tree with short-circuiting over rows"""
+
+    def __init__(self, df: pd.DataFrame, string_engine: str = 'python'):
+        self.df = df
+        self.string_engine = string_engine
+
+    def evaluate(self, expr: Dict[str, Any], rows: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Mask of rows satisfying expr.
+
+        rows, when given, marks the rows whose result still matters; values
+        elsewhere are unspecified and are ignored by the caller.
+        """
+        if 'and' in expr:
+            return self._and(expr['and'], rows)
+        if 'or' in expr:
+            return self._or(expr['or'], rows)
+        if 'not' in expr:
+            return ~self.evaluate(expr['not'], rows)
+        return self._leaf(expr, rows)
+
+    def _groups(self, children: List[Dict[str, Any]], joiner: str) -> List[Any]:
+        """Children in cost order, with numeric comparisons batched for numexpr"""
+        children = sorted(children, key=expression_cost)
+        if not HAS_NUMEXPR or len(self.df) < NUMEXPR_MIN_ROWS:
+            return children
+        numeric = [child for child in children if _numexpr_ready(self.df, child)]
+        if len(numeric) < 2:
+            return children
+        return [('numexpr', numeric, joiner)] + [child for child in children if child not in numeric]
+
+    def _child(self, child: Any, rows: Optional[np.ndarray]) -> np.ndarray:
+        if isinstance(child, tuple):
+            return _numexpr_mask(self.df, child[1], child[2])
+        return self.evaluate(child, rows)
+
+    def _and(self, children: List[Dict[str, Any]], rows: Optional[np.ndarray]) -> np.ndarray:
+        mask = np.ones(len(self.df), dtype=bool) if rows is None else rows.copy()
+        for child in self._groups(children, '&'):
+            if not mask.any():
+                break
+            mask &= self._child(child, mask)
+        return mask
+
+    def _or(self, children: List[Dict[str, Any]], rows: Optional[np.ndarray]) -> np.ndarray:
+        mask = np.zeros(len(self.df), dtype=bool)
+        undecided = np.ones(len(self.df), dtype=bool) if rows is None else rows.copy()
+        for child in self._groups(children, '|'):
+            if not undecided.any():
+                break
+            matched = self._child(child, undecided) & undecided
+            mask |= matched
+            undecided &= ~matched
+        return mask
+
+    def _leaf(self, expr: Dict[str, Any], rows: Optional[np.ndarray]) -> np.ndarray:
+        column = expr['column']
+        if column not in self.df.columns:
+            raise KeyError(f"Column '{column}' not found")
+        op = expr.get('op', '==')
+        series = self.df[column]
+
+        # Expensive text predicates only look at rows that are still undecided
+        if op in TEXT_OPS and rows is not None and not rows.all():
+            mask = np.zeros(len(series), dtype=bool)
+            mask[rows] = _leaf_mask(series[rows], op, expr.get('value'), self.string_engine)
+            return mask
+        return _leaf_mask(series, op, expr.get('value'), self.string_engine)
+
+
+def evaluate_expression(df: pd.DataFrame, expr: Dict[str, Any], string_engine: str = 'python') -> np.ndarray:
+    """Evaluate an expression into one boolean mask over df's rows"""
+    error = validate_expression(expr)
+    if error:
+        raise ValueError(f"Invalid filter expression: {error}")
+    return _Evaluator(df, string_engine).evaluate(expr, None)
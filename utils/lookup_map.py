@@ -0,0 +1,168 @@
+"""
+Lookup Map - hash-indexed value translation for the lookup_map rule
+
+A LookupTable indexes the mapping keys once (a pandas hash Index) and maps
+a whole column with one get_indexer probe plus a take, instead of the
+per-key passes Series.replace makes. Categorical columns only probe their
+categories and keep their codes. Keys match by exact value, or with
+match='text' both sides are compared as str, so the number 7 matches the
+key '7' read from a mapping file.
+
+Tables loaded from a CSV file or SQLite table, and inline mappings, are
+cached per process and rebuilt only when the file or mapping changes: runs in the GUI, and the files one
+batch worker processes, reuse the compiled table; a new process compiles
+it once. CSV keys and values are read as text, so a code such as 007
+keeps its leading zeros.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+MATCH_MODES = {'exact', 'text'}
+
+# Compiled tables kept for reuse across rule applications and pipeline runs
+TABLE_CACHE_SIZE = 8
+
+_table_cache: 'OrderedDict[tuple, LookupTable]' = OrderedDict()
+_table_cache_lock = threading.Lock()
+
+
+class LookupTable:
+    """Mapping compiled to a hash index over its keys and an array of its values"""
+
+    def __init__(self, keys: pd.Series, values: pd.Series, match: str = 'exact'):
+        if match not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode '{match}'")
+        self.match = match
+        keys = keys.reset_index(drop=True)
+        values = values.reset_index(drop=True)
+        if match == 'text':
+            keys = keys.astype(str)
+        # Later entries win, as in a dict
+        keep = ~keys.duplicated(keep='last').to_numpy()
+        self.index = pd.Index(keys[keep])
+        self.values = values[keep].reset_index(drop=True)
+
+    @classmethod
+    def from_dict(cls, mapping: Dict[Any, Any], match: str = 'exact') -> 'LookupTable':
+        return cls(pd.Series(list(mapping.keys()), dtype=object), pd.Series(list(mapping.values())), match)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _positions(self, values: Any) -> np.ndarray:
+        if self.match == 'text':
+            values = pd.Series(values, dtype=object).astype(str)
+        return self.index.get_indexer(values)
+
+    def map(self, series: pd.Series, keep_unmatched: bool = True,
+            default: Any = None) -> Tuple[pd.Series, int]:
+        """
+        Translate a column; returns (mapped column, number of unmatched non-missing values).
+
+        Unmatched values are kept as they are, or replaced by default when
+        keep_unmatched is False. Missing values stay missing.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return self._map_categorical(series, keep_unmatched, default)
+
+        positions = self._positions(series) if len(self) else np.full(len(series), -1)
+        matched = positions != -1
+        # Only unmatched rows need telling apart from missing values
+        present = np.ones(len(series), dtype=bool)
+        present[~matched] = series[~matched].notna().to_numpy()
+        unmatched = int(np.count_nonzero(~matched & present))
+        if not matched.any():
+            result = pd.Series(np.nan, index=series.index, name=series.name, dtype=object)
+        else:
+            taken = self.values.take(np.where(matched, positions, 0))
+            result = pd.Series(taken.array, index=series.index, name=series.name)
+
+        if matched.all():
+            return result, unmatched
+        if keep_unmatched:
+            return result.where(matched, series), unmatched
+        fallback = np.nan if default is None else default
+        return result.where(matched, fallback).mask(~matched & ~present), unmatched
+
+    def _map_categorical(self, series: pd.Series, keep_unmatched: bool,
+                         default: Any) -> Tuple[pd.Series, int]:
+        categories = pd.Series(series.cat.categories, dtype=series.cat.categories.dtype)
+        mapped, _ = self.map(categories, keep_unmatched, default)
+        codes = series.cat.codes.to_numpy()
+        matched_categories = self._positions(categories) != -1
+        unmatched = int(np.count_nonzero((codes != -1) & ~matched_categories[codes]))
+
+        result_codes, result_categories = pd.factorize(mapped)
+        # code -1 (missing) keeps picking missing
+        gathered = np.append(result_codes, -1)[codes]
+        result = pd.Categorical.from_codes(gathered, categories=result_categories)
+        return pd.Series(result, index=series.index, name=series.name), unmatched
+
+
+def _read_mapping_file(path: str, key_column: str, value_column: str,
+                       table: Optional[str], match: str = 'exact') -> pd.DataFrame:
+    if table or os.path.splitext(path)[1].lower() in ('.db', '.sqlite', '.sqlite3'):
+        if not table:
+            raise ValueError(f"mapping_table is required for SQLite mapping {path}")
+        quote = lambda name: '"' + str(name).replace('"', '""') + '"'
+        key = quote(key_column)
+        if match == 'text':
+            # SQLite's own text form, so a TEXT key '007' and an INTEGER key 7 both survive as stored
+            key = f"CAST({key} AS TEXT) AS {key}"
+        conn = sqlite3.connect(path)
+        try:
+            return pd.read_sql_query(
+                f"SELECT {key}, {quote(value_column)} FROM {quote(table)}", conn)
+        finally:
+            conn.close()
+    # As text: inferred dtypes would turn codes such as 007 into the number 7
+    return pd.read_csv(path, usecols=[key_column, value_column], dtype=str, keep_default_na=False)
+
+
+def _cached_table(cache_key: tuple, build) -> LookupTable:
+    with _table_cache_lock:
+        if cache_key in _table_cache:
+            _table_cache.move_to_end(cache_key)
+            return _table_cache[cache_key]
+
+    # Built outside the lock; two threads missing at once both build, the last one is kept
+    lookup = build()
+    with _table_cache_lock:
+        _table_cache[cache_key] = lookup
+        while len(_table_cache) > TABLE_CACHE_SIZE:
+            _table_cache.popitem(last=False)
+    return lookup
+
+
+def load_table(path: str, key_column: str, value_column: str, table: Optional[str] = None,
+               match: str = 'exact') -> LookupTable:
+    """Compiled LookupTable for a CSV file or SQLite table, cached until the file changes"""
+    stat = os.stat(path)
+    cache_key = (os.path.abspath(path), table, key_column, value_column, match,
+                 stat.st_size, stat.st_mtime_ns)
+
+    def build():
+        frame = _read_mapping_file(path, key_column, value_column, table, match)
+        return LookupTable(frame[key_column], frame[value_column], match)
+
+    return _cached_table(cache_key, build)
+
+
+def inline_table(mapping: Dict[Any, Any], match: str = 'exact') -> LookupTable:
+    """Compiled LookupTable for an inline mapping, cached until the mapping changes"""
+    # Pickled items, not str(): the key 1 and the key '1' are different mappings
+    digest = hashlib.sha1(pickle.dumps(list(mapping.items()), protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+    return _cached_table(('inline', match, digest), lambda: LookupTable.from_dict(mapping, match))
+
+
+def clear_table_cache():
+    with _table_cache_lock:
+        _table_cache.clear()
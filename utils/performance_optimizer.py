@@ -12,7 +12,7 @@ import time
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Callable, List, Optional, Any, Dict
+from typing import Callable, Iterator, List, Optional, Any, Dict
 from dataclasses import dataclass
 
 import pandas as pd
@@ -23,6 +23,10 @@ import psutil
 # Cancellation Support
 # ============================================================================
 
+class OperationCancelledError(Exception):
+    """Raised when an operation stops because its CancellationToken was cancelled."""
+
+
 class CancellationToken:
     """Token for cancelling long-running operations."""
     
@@ -39,6 +43,11 @@ class CancellationToken:
         """Check if cancellation has been requested."""
         with self._lock:
             return self._cancelled
+    
+    def raise_if_cancelled(self, message: str = "Operation cancelled"):
+        """Raise OperationCancelledError if cancellation has been requested."""
+        if self.is_cancelled():
+            raise OperationCancelledError(message)
 
 
 # ============================================================================
@@ -88,55 +97,17 @@ class ChunkProcessor:
         # Estimate number of chunks for progress tracking
         total_chunks = self.estimate_chunk_count(str(file_path))
         
-        # Determine file type and read in chunks
-        file_extension = file_path.suffix.lower()
-        
         processed_chunks = []
         chunk_index = 0
         
-        if file_extension == '.csv':
-            # Process CSV in chunks
-            for chunk in pd.read_csv(file_path, chunksize=self._calculate_row_chunksize(file_path)):
-                processed_chunk = processor_func(chunk)
-                processed_chunks.append(processed_chunk)
-                
-                chunk_index += 1
-                if progress_callback:
-                    progress = chunk_index / total_chunks
-                    progress_callback(progress)
-        
-        elif file_extension in ['.xlsx', '.xls']:
-            # Excel files - read entire file but process in chunks
-            df = pd.read_excel(file_path)
-            row_chunksize = self._calculate_row_chunksize(file_path)
-            
-            for i in range(0, len(df), row_chunksize):
-                chunk = df.iloc[i:i + row_chunksize]
-                processed_chunk = processor_func(chunk)
-                processed_chunks.append(processed_chunk)
-                
-                chunk_index += 1
-                if progress_callback:
-                    progress = chunk_index / total_chunks
-                    progress_callback(progress)
-        
-        elif file_extension == '.json':
-            # JSON files - read and process in chunks
-            df = pd.read_json(file_path)
-            row_chunksize = self._calculate_row_chunksize(file_path)
+        for chunk in self.iter_chunks(str(file_path)):
+            processed_chunk = processor_func(chunk)
+            processed_chunks.append(processed_chunk)
             
-            for i in range(0, len(df), row_chunksize):
-                chunk = df.iloc[i:i + row_chunksize]
-                processed_chunk = processor_func(chunk)
-                processed_chunks.append(processed_chunk)
-                
-                chunk_index += 1
-                if progress_callback:
-                    progress = chunk_index / total_chunks
-                    progress_callback(progress)
-        
-        else:
-            raise ValueError(f"Unsupported file format: {file_extension}")
+            chunk_index += 1
+            if progress_callback:
+                progress = chunk_index / total_chunks
+                progress_callback(progress)
         
         # Combine all processed chunks
         if processed_chunks:
@@ -150,6 +121,44 @@ class ChunkProcessor:
         else:
             return pd.DataFrame()
     
+    def iter_chunks(self, file_path: str) -> Iterator[pd.DataFrame]:
+        """
+        Yield a file's rows as DataFrame chunks without combining them.
+        
+        Args:
+            file_path: Path to the file to read
+        
+        Yields:
+            DataFrame chunks of at most the calculated row chunksize
+        
+        Requirements: 1.1
+        """
+        file_path = Path(file_path)
+        
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        # Determine file type and read in chunks
+        file_extension = file_path.suffix.lower()
+        row_chunksize = self._calculate_row_chunksize(file_path)
+        
+        if file_extension == '.csv':
+            # CSV is streamed from disk chunk by chunk
+            yield from pd.read_csv(file_path, chunksize=row_chunksize)
+        
+        elif file_extension in ['.xlsx', '.xls', '.json']:
+            # Excel and JSON files - read entire file but yield in chunks
+            if file_extension == '.json':
+                df = pd.read_json(file_path)
+            else:
+                df = pd.read_excel(file_path)
+            
+            for i in range(0, len(df), row_chunksize):
+                yield df.iloc[i:i + row_chunksize].copy()
+        
+        else:
+            raise ValueError(f"Unsupported file format: {file_extension}")
+    
     def estimate_chunk_count(self, file_path: str) -> int:
         """
         Estimate number of chunks for progress tracking.
@@ -328,7 +337,19 @@ class MemoryMonitor:
         Requirements: 1.5
         """
         return self.get_memory_usage() >= self.threshold
-    
+
+    def get_memory_budget(self) -> int:
+        """
+        Get how much more memory can be used before reaching the threshold.
+
+        Returns:
+            Budget in bytes (0 when usage is already at or above the threshold)
+
+        Requirements: 1.5
+        """
+        memory = psutil.virtual_memory()
+        return max(0, int(memory.total * self.threshold) - memory.used)
+
     def start_monitoring(self, callback: Callable[[float], None], interval: float = 1.0):
         """
         Start background memory monitoring.
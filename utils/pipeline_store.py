@@ -0,0 +1,47 @@
+"""
+Pipeline Store - saved pipeline definitions, journal included
+
+PipelineManager appends changes to one pipeline to <config_file>.journal
+and only folds them into the config file now and then, so the config
+file alone can be stale. read_pipeline_data replays the journal over it
+with the standard library only, so tools such as `headless.py list` see
+the pipelines PipelineManager would load without importing pandas.
+"""
+import json
+from typing import Any, Dict, Tuple
+
+
+def journal_path(config_file: str) -> str:
+    return config_file + '.journal'
+
+
+def read_pipeline_data(config_file: str) -> Tuple[Dict[str, Dict[str, Any]], int]:
+    """Serialized pipelines by name, journal replayed, and the number of journal entries read"""
+    pipelines: Dict[str, Dict[str, Any]] = {}
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            for data in json.load(f).get('pipelines', []):
+                pipelines[data['name']] = data
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading pipelines: {e}")
+
+    entries = 0
+    try:
+        with open(journal_path(config_file), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Line cut short by an interrupted write
+                if entry['op'] == 'put':
+                    pipelines[entry['pipeline']['name']] = entry['pipeline']
+                else:
+                    pipelines.pop(entry['name'], None)
+                entries += 1
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading pipelines journal: {e}")
+    return pipelines, entries
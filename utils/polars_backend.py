@@ -0,0 +1,409 @@
+"""
+Polars Backend - runs pipelines as one Polars lazy query
+
+Every rule of a compiled plan becomes an operation on a polars LazyFrame,
+so the whole chain is optimized together (projection and predicate
+pushdown, common subplans) and collected once on Polars' multithreaded
+engine. Files are scanned lazily; output files are written with the
+streaming sinks. Results stay polars DataFrames; callers convert to pandas
+only where they need it (e.g. DataBridge for its preview).
+
+Text rules follow string_engine='arrow' semantics: missing values stay
+missing instead of becoming the text 'nan'. Patterns use the Rust regex
+syntax (no look-around or backreferences). Rules that cannot be expressed
+(lookup_map tables whose keys mix types, fill values of another type)
+raise ValueError before anything runs.
+"""
+import os
+import time
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.filter_expr import expression_columns
+
+try:
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    pl = None
+    HAS_POLARS = False
+
+
+POLARS_RULE_TYPES = {
+    'filter_rows', 'filter_expr', 'remove_duplicates', 'fill_missing', 'drop_missing', 'convert_type',
+    'rename_column', 'trim_strings', 'normalize_text', 'replace_values', 'extract_pattern',
+    'select_columns', 'lookup_map',
+}
+
+_SCANNERS = {
+    '.csv': 'scan_csv', '.tsv': 'scan_csv', '.txt': 'scan_csv',
+    '.parquet': 'scan_parquet',
+    '.jsonl': 'scan_ndjson', '.ndjson': 'scan_ndjson',
+    '.arrow': 'scan_ipc', '.feather': 'scan_ipc',
+}
+
+
+def _is_numeric(dtype) -> bool:
+    return dtype.is_numeric()
+
+
+def _is_text(dtype) -> bool:
+    return dtype == pl.String
+
+
+def _fits(value: Any, dtype) -> bool:
+    """Whether a config value can be compared with or stored in a column of dtype"""
+    if value is None:
+        return True
+    if isinstance(value, bool):
+        return dtype == pl.Boolean
+    if isinstance(value, (int, float)):
+        return _is_numeric(dtype)
+    # Text compares with dates and timestamps, as in pandas
+    return _is_text(dtype) or dtype.is_temporal()
+
+
+def scan_source(source: Any):
+    """LazyFrame over a file path (or glob), a pandas DataFrame or a polars frame"""
+    if isinstance(source, pl.LazyFrame):
+        return source
+    if isinstance(source, pl.DataFrame):
+        return source.lazy()
+    if isinstance(source, pd.DataFrame):
+        return pl.from_pandas(source).lazy()
+    extension = os.path.splitext(str(source))[1].lower()
+    if extension not in _SCANNERS:
+        raise ValueError(f"Unsupported file format: {extension}")
+    return getattr(pl, _SCANNERS[extension])(str(source))
+
+
+def _counts_from_metadata(source: Any) -> bool:
+    """Whether source's row count is known without scanning it (in memory, or Parquet/IPC footers)"""
+    if not isinstance(source, (str, os.PathLike)):
+        return True
+    return _SCANNERS.get(os.path.splitext(str(source))[1].lower()) in ('scan_parquet', 'scan_ipc')
+
+
+def to_pandas(frame: Any) -> pd.DataFrame:
+    """A result as a pandas DataFrame (pandas results are returned as they are)"""
+    if HAS_POLARS and isinstance(frame, (pl.DataFrame, pl.LazyFrame)):
+        if isinstance(frame, pl.LazyFrame):
+            frame = frame.collect()
+        result = frame.to_pandas()
+        for name, dtype in frame.schema.items():
+            column = frame.get_column(name)
+            if dtype.is_integer() and column.null_count():
+                # Keep integers with missing values integral (pandas' nullable Int64), not float
+                values = column.fill_null(0).to_numpy()
+                result[name] = pd.arrays.IntegerArray(values, column.is_null().to_numpy())
+        return result
+    return frame
+
+
+def _leaf_expression(expr: Dict[str, Any]):
+    """filter_expr predicate; missing values never satisfy it, so NOT of it holds for them"""
+    col = pl.col(expr['column'])
+    op = expr.get('op', '==')
+    value = expr.get('value')
+    if op == 'is_null':
+        return col.is_null()
+    if op == 'not_null':
+        return col.is_not_null()
+    if op in ('==', '!=', '>', '<', '>=', '<='):
+        predicate = {
+            '==': col == value, '!=': col != value, '>': col > value,
+            '<': col < value, '>=': col >= value, '<=': col <= value,
+        }[op]
+    elif op in ('in', 'not_in'):
+        predicate = col.is_in(list(value))
+        if op == 'not_in':
+            predicate = ~predicate
+    elif op == 'between':
+        predicate = col.is_between(value[0], value[1])
+    else:
+        predicate = col.cast(pl.String).str.contains(str(value), literal=op == 'contains')
+    return predicate.fill_null(False) & col.is_not_null()
+
+
+def filter_expression(expr: Dict[str, Any]):
+    """filter_expr tree as one polars boolean expression"""
+    if 'and' in expr:
+        return pl.all_horizontal([filter_expression(child) for child in expr['and']])
+    if 'or' in expr:
+        return pl.any_horizontal([filter_expression(child) for child in expr['or']])
+    if 'not' in expr:
+        return ~filter_expression(expr['not'])
+    return _leaf_expression(expr)
+
+
+class LazyTranslator:
+    """Chains the operations for a list of rules onto a LazyFrame"""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.schema = dict(frame.collect_schema())
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.schema)
+
+    def add(self, rule):
+        """Append rule to the query; raises ValueError if it has no polars translation"""
+        if rule.rule_type not in POLARS_RULE_TYPES:
+            raise ValueError(f"Rule {rule.name}: {rule.rule_type} has no polars translation")
+        frame = getattr(self, f"_{rule.rule_type}")(rule, rule.config)
+        if frame is None:
+            return
+        self.frame = frame
+        self.schema = dict(frame.collect_schema())
+
+    def _with(self, exprs: Dict[str, Any]):
+        """Replace existing columns in place and append new ones"""
+        if not exprs:
+            return None
+        return self.frame.with_columns([expr.alias(col) for col, expr in exprs.items()])
+
+    def _present(self, columns: Any) -> List[str]:
+        if isinstance(columns, str):
+            columns = [columns]
+        return [col for col in columns if col in self.schema]
+
+    def _filter_rows(self, rule, config):
+        column, operator, value = config.get('column'), config.get('operator', '=='), config.get('value')
+        if column not in self.schema:
+            return None
+        col = pl.col(column)
+        if operator in ('contains', 'not_contains'):
+            match = col.cast(pl.String).str.contains(str(value)).fill_null(False)
+            return self.frame.filter(match if operator == 'contains' else ~match)
+        if operator not in ('==', '!=', '>', '<', '>=', '<='):
+            return None
+        if not _fits(value, self.schema[column]):
+            raise ValueError(f"Rule {rule.name}: {value!r} cannot be compared with {column}")
+        if operator == '!=':
+            # Missing values differ from every value, as with pandas' !=
+            return self.frame.filter(col.ne_missing(value))
+        predicate = {'==': col == value, '>': col > value, '<': col < value,
+                     '>=': col >= value, '<=': col <= value}[operator]
+        return self.frame.filter(predicate)
+
+    def _filter_expr(self, rule, config):
+        expression = config.get('expression')
+        if not expression:
+            return None
+        missing = expression_columns(expression) - set(self.schema)
+        if missing:
+            # The pandas rule fails on unknown columns and leaves the data as it is
+            return None
+        return self.frame.filter(filter_expression(expression))
+
+    def _remove_duplicates(self, rule, config):
+        subset = config.get('columns')
+        if subset is not None and len(self._present(subset)) < len([subset] if isinstance(subset, str) else subset):
+            return None
+        keep = config.get('keep', 'first')
+        keep = 'none' if keep is False else keep
+        return self.frame.unique(subset=self._present(subset) if subset is not None else None,
+                                 keep=keep, maintain_order=True)
+
+    def _fill_missing(self, rule, config):
+        method = config.get('method', 'constant')
+        value = config.get('value', '')
+        exprs = {}
+        for column in self._present(config.get('columns', self.columns)):
+            col, dtype = pl.col(column), self.schema[column]
+            if method == 'constant':
+                if not _fits(value, dtype):
+                    raise ValueError(f"Rule {rule.name}: fill value {value!r} does not fit {column} ({dtype})")
+                exprs[column] = col.fill_null(value)
+            elif method in ('mean', 'median'):
+                if not _is_numeric(dtype):
+                    raise ValueError(f"Rule {rule.name}: {method} fill needs a numeric column, {column} is {dtype}")
+                exprs[column] = col.fill_null(col.mean() if method == 'mean' else col.median())
+            elif method == 'mode':
+                # Ties go to the smallest value, as Series.mode() sorts them
+                filled = col.fill_null(col.drop_nulls().mode().min())
+                exprs[column] = filled.fill_null(value) if _fits(value, dtype) else filled
+            elif method == 'forward':
+                exprs[column] = col.forward_fill()
+            elif method == 'backward':
+                exprs[column] = col.backward_fill()
+        return self._with(exprs)
+
+    def _drop_missing(self, rule, config):
+        subset = config.get('columns')
+        columns = self.columns if subset is None else self._present(subset)
+        if not columns:
+            return None
+        threshold = config.get('threshold')
+        if threshold is not None:
+            present = pl.sum_horizontal([pl.col(col).is_not_null().cast(pl.Int32) for col in columns])
+            return self.frame.filter(present >= int(threshold))
+        if config.get('how', 'any') == 'any':
+            return self.frame.drop_nulls(columns)
+        return self.frame.filter(~pl.all_horizontal([pl.col(col).is_null() for col in columns]))
+
+    def _convert_type(self, rule, config):
+        target_type = config.get('target_type', 'string')
+        exprs = {}
+        for column in self._present(config.get('columns', [])):
+            col, dtype = pl.col(column), self.schema[column]
+            if target_type == 'string':
+                if dtype == pl.Boolean:
+                    exprs[column] = pl.when(col).then(pl.lit('True')).when(~col).then(pl.lit('False'))
+                else:
+                    exprs[column] = col.cast(pl.String)
+            elif target_type == 'integer':
+                exprs[column] = col.cast(pl.Int64, strict=False)
+            elif target_type == 'float' and not _is_numeric(dtype):
+                # pd.to_numeric leaves numeric columns as they are
+                exprs[column] = col.cast(pl.Float64, strict=False)
+            elif target_type == 'datetime':
+                if _is_text(dtype):
+                    exprs[column] = col.str.to_datetime(config.get('format'), strict=False)
+                elif not dtype.is_temporal() or dtype == pl.Date:
+                    exprs[column] = col.cast(pl.Datetime, strict=False)
+            elif target_type == 'boolean':
+                # astype(bool): zero and empty text are False, everything else (missing too) is True
+                falsy = '' if _is_text(dtype) else (False if dtype == pl.Boolean else 0)
+                exprs[column] = (col != falsy).fill_null(True)
+        return self._with(exprs)
+
+    def _rename_column(self, rule, config):
+        mapping = {old: new for old, new in config.get('mapping', {}).items() if old in self.schema}
+        return self.frame.rename(mapping) if mapping else None
+
+    def _trim_strings(self, rule, config):
+        default = [col for col in self.columns if _is_text(self.schema[col])]
+        return self._with({
+            column: pl.col(column).cast(pl.String).str.strip_chars()
+            for column in self._present(config.get('columns', default))
+        })
+
+    def _normalize_text(self, rule, config):
+        case = config.get('case', 'lower')
+        if case not in ('lower', 'upper', 'title'):
+            return None
+        return self._with({
+            column: getattr(pl.col(column).cast(pl.String).str, f"to_{case}case")()
+            for column in self._present(config.get('columns', []))
+        })
+
+    def _replace_values(self, rule, config):
+        column = config.get('column')
+        if column not in self.schema:
+            return None
+        col, dtype = pl.col(column), self.schema[column]
+        # Keys of another type never equal a value of the column, as in Series.replace
+        mapping = {old: new for old, new in config.get('mapping', {}).items() if _fits(old, dtype)}
+        if not mapping:
+            return None
+        replaced = col.replace({old: new for old, new in mapping.items() if old is not None})
+        if None in mapping:
+            replaced = replaced.fill_null(mapping[None])
+        return self._with({column: replaced})
+
+    def _extract_pattern(self, rule, config):
+        column, pattern, new_column = config.get('column'), config.get('pattern'), config.get('new_column')
+        if column not in self.schema or not pattern or not new_column:
+            return None
+        return self._with({new_column: pl.col(column).cast(pl.String).str.extract(pattern, 1)})
+
+    def _select_columns(self, rule, config):
+        return self.frame.select(self._present(config.get('columns', [])))
+
+    def _lookup_map(self, rule, config):
+        column = config.get('column')
+        if column not in self.schema:
+            return None
+        table = rule._lookup_table()
+        if not len(table):
+            return None
+        try:
+            keys = pl.Series(table.index.to_numpy(), strict=True)
+            values = pl.Series(table.values.to_numpy(), strict=True)
+        except (TypeError, ValueError, pl.exceptions.PolarsError):
+            keys = values = None
+        if keys is None or pl.Object in (keys.dtype, values.dtype):
+            raise ValueError(f"Rule {rule.name}: mapping keys or values mix types")
+
+        col = pl.col(column)
+        probe = col.cast(pl.String) if table.match == 'text' else col
+        matched = probe.is_in(keys).fill_null(False)
+        mapped = probe.replace_strict(keys, values, default=None, return_dtype=values.dtype)
+        if config.get('keep_unmatched', True):
+            unmatched = col
+        else:
+            default = config.get('default')
+            unmatched = pl.when(col.is_null()).then(None).otherwise(pl.lit(default))
+        return self._with({config.get('new_column') or column: pl.when(matched).then(mapped).otherwise(unmatched)})
+
+
+class PolarsExecutor:
+    """Runs a compiled plan as one polars lazy query"""
+
+    def __init__(self, plan, streaming: bool = False, count_input_rows: bool = False):
+        if not HAS_POLARS:
+            raise ImportError("polars is required for the polars backend")
+        self.plan = plan
+        self.rules = [rule for step in plan.steps for rule in step.rules]
+        self.streaming = streaming
+        self.count_input_rows = count_input_rows
+
+    def translate(self, frame) -> LazyTranslator:
+        translator = LazyTranslator(frame)
+        for rule in self.rules:
+            translator.add(rule)
+        return translator
+
+    def explain(self, source: Any) -> str:
+        """Polars' optimized plan for running the pipeline over source"""
+        return self.translate(scan_source(source)).frame.explain()
+
+    def run(self, source: Any, output_path: Optional[str] = None) -> Tuple[Optional[Any], Dict[str, Any]]:
+        """
+        Run the plan over source; returns (polars DataFrame, stats).
+
+        With output_path (.parquet, .csv, .jsonl or .arrow) the result is
+        streamed to the file and None is returned in its place; its row
+        count is collected in the same pass. stats['initial_rows'] comes
+        from Parquet/IPC metadata or an in-memory source; counting a CSV or
+        JSON source takes a second scan, so it is None unless
+        count_input_rows is set.
+        """
+        stats = {
+            'start_time': datetime.now(),
+            'mode': 'polars',
+            'rules_applied': [{'rule': rule.name, 'type': rule.rule_type, 'rules': [rule.name]}
+                              for rule in self.rules],
+            'rules_skipped': self.plan.dropped,
+            'errors': [],
+        }
+        source_frame = scan_source(source)
+        translator = self.translate(source_frame)
+        stats['initial_columns'] = len(source_frame.collect_schema())
+        counts = [source_frame.select(pl.len())] if self.count_input_rows or _counts_from_metadata(source) else []
+
+        started = time.perf_counter()
+        engine = 'streaming' if self.streaming or output_path else 'auto'
+        if output_path is None:
+            *counts, result = pl.collect_all(counts + [translator.frame], engine=engine)
+            stats['final_rows'] = result.height
+        else:
+            extension = os.path.splitext(output_path)[1].lower()
+            sinks = {'.parquet': 'sink_parquet', '.csv': 'sink_csv', '.jsonl': 'sink_ndjson', '.arrow': 'sink_ipc'}
+            if extension not in sinks:
+                raise ValueError(f"Unsupported output format: {extension}")
+            sink = getattr(translator.frame, sinks[extension])(output_path, lazy=True)
+            # The sink and the output count share one cached run of the query
+            *counts, _, final = pl.collect_all(counts + [sink, translator.frame.select(pl.len())], engine=engine)
+            result = None
+            stats['final_rows'] = final.item()
+        stats['initial_rows'] = counts[0].item() if counts else None
+        stats['query_time'] = round(time.perf_counter() - started, 4)
+        stats['final_columns'] = len(translator.columns)
+
+        stats['end_time'] = datetime.now()
+        stats['duration'] = (stats['end_time'] - stats['start_time']).total_seconds()
+        return result, stats
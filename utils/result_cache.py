@@ -0,0 +1,216 @@
+"""
+Result Cache - persistent, content-addressed cache of pipeline outputs
+
+A result is keyed by the fingerprint of the source file (size, mtime and a
+hash of sampled blocks) plus the pipeline's serialized rules and the
+fingerprints of files they read (lookup_map mapping files), so the same
+saved pipeline re-run on the same file - in another session or after a
+restart - loads its output instead of recomputing it.
+
+Results are stored as uncompressed Arrow IPC files and memory-mapped on
+load; numeric columns without missing values become read-only views of
+the mapped file instead of copies, so loading costs little more than
+opening it. Enable pandas Copy-on-Write before writing into a loaded
+result in place. Without pyarrow results are pickled instead (no memory
+mapping). The least recently used results are evicted once the cache
+exceeds its quota.
+"""
+import hashlib
+import json
+import os
+import pickle
+import time
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    pa = None
+    HAS_PYARROW = False
+
+
+SAMPLE_BLOCK_BYTES = 64 * 1024
+SAMPLE_BLOCKS = 8
+
+
+def file_fingerprint(path: str) -> str:
+    """Hash of a file's size, mtime and evenly spaced sample blocks (head and tail included)"""
+    stat = os.stat(path)
+    digest = hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8'))
+    last_block = max(0, stat.st_size - SAMPLE_BLOCK_BYTES)
+    offsets = sorted({last_block * i // (SAMPLE_BLOCKS - 1) for i in range(SAMPLE_BLOCKS)})
+    with open(path, 'rb') as f:
+        for offset in offsets:
+            f.seek(offset)
+            digest.update(f.read(SAMPLE_BLOCK_BYTES))
+    return digest.hexdigest()
+
+
+def input_fingerprints(paths: List[str]) -> Dict[str, str]:
+    """file_fingerprint of each path ('missing' for files that cannot be read)"""
+    fingerprints = {}
+    for path in paths:
+        try:
+            fingerprints[path] = file_fingerprint(path)
+        except OSError:
+            fingerprints[path] = 'missing'
+    return fingerprints
+
+
+def pipeline_signature(pipeline) -> str:
+    """
+    Serialized rules of a pipeline plus fingerprints of the files they read
+    (its name and run history do not affect the output)
+    """
+    return json.dumps({'rules': pipeline.to_dict()['rules'],
+                       'inputs': input_fingerprints(pipeline.external_inputs())},
+                      sort_keys=True, default=str)
+
+
+def result_key(source_fingerprint: str, pipeline, *extra: Any) -> str:
+    """Cache key for running pipeline on a source; extra distinguishes reads of one file (e.g. a table)"""
+    digest = hashlib.sha256(source_fingerprint.encode('utf-8'))
+    digest.update(pipeline_signature(pipeline).encode('utf-8'))
+    for part in extra:
+        digest.update(repr(part).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk LRU cache of pipeline results bounded by a disk quota.
+
+    Each entry is <key>.arrow (or <key>.pkl without pyarrow) plus <key>.json
+    holding the run's stats. Hits touch the entry's mtime, which is the LRU
+    order, so several processes can share one cache directory.
+    """
+
+    def __init__(self, cache_dir: str, quota_mb: float = 2048):
+        self.cache_dir = cache_dir
+        self.quota = int(quota_mb * 1024 * 1024)
+        self.extension = '.arrow' if HAS_PYARROW else '.pkl'
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def _stats_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key)) and os.path.exists(self._stats_path(key))
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Return (result DataFrame, stats of the run that produced it), or None on a miss"""
+        path = self._path(key)
+        if key not in self:
+            self.stats['misses'] += 1
+            return None
+        try:
+            if HAS_PYARROW:
+                with pa.memory_map(path, 'r') as source:
+                    # One block per column lets pandas keep the mapped buffers instead of consolidating them
+                    df = pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True, self_destruct=True)
+            else:
+                with open(path, 'rb') as f:
+                    df = pickle.load(f)
+            with open(self._stats_path(key), 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+            os.utime(path)
+        except Exception as e:
+            print(f"Error loading cached result: {e}")
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return df, stats
+
+    def put(self, key: str, df: pd.DataFrame, stats: Dict[str, Any]) -> bool:
+        """Store a result, then evict old entries over the quota; False if df cannot be stored"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            if HAS_PYARROW:
+                table = pa.Table.from_pandas(df, preserve_index=None)
+                with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            else:
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(self._stats_path(key), 'w', encoding='utf-8') as f:
+                json.dump(stats, f, ensure_ascii=False, default=str)
+            # Readers only ever see complete files
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error caching result: {e}")
+            for leftover in (tmp_path, self._stats_path(key)):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            return False
+        self.evict(keep=key)
+        return True
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """(key, size in bytes, last use) of every entry, least recently used first"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.extension):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((name[:-len(self.extension)], stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda entry: entry[2])
+        return entries
+
+    def disk_usage(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep: Optional[str] = None):
+        """Remove least recently used entries until the cache fits its quota"""
+        entries = self.entries()
+        used = sum(size for _, size, _ in entries)
+        for key, size, _ in entries:
+            if used <= self.quota:
+                break
+            if key == keep:
+                continue
+            self.remove(key)
+            used -= size
+            self.stats['evictions'] += 1
+
+    def remove(self, key: str):
+        for path in (self._path(key), self._stats_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove every cached result"""
+        for key, _, _ in self.entries():
+            self.remove(key)
+
+
+def execute_cached(pipeline, path: str, read: Callable[[str], pd.DataFrame], cache: ResultCache,
+                   *key_extra: Any, **execute_kwargs) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Run pipeline on the file at path, or load the result of an identical earlier run.
+
+    read(path) loads the source and is only called on a miss. stats['result_cache']
+    is 'hit' or 'miss'; runs that reported errors are not cached.
+    """
+    started = time.perf_counter()
+    key = result_key(file_fingerprint(path), pipeline, *key_extra)
+    cached = cache.get(key)
+    if cached is not None:
+        df, stats = cached
+        stats['result_cache'] = 'hit'
+        stats['load_time'] = round(time.perf_counter() - started, 4)
+        return df, stats
+
+    df, stats = pipeline.execute(read(path), **execute_kwargs)
+    if not stats['errors']:
+        cache.put(key, df, stats)
+    stats['result_cache'] = 'miss'
+    return df, stats
@@ -0,0 +1,182 @@
+"""
+Run History - persistent store of pipeline run stats with rolling aggregates
+
+Each recorded run is one row in a SQLite database (mode, duration, row
+counts, error count) plus one row per rule with its wall time, so a
+long-lived process only keeps its last few runs in memory
+(ETLPipeline.execution_log) while the history stays on disk. A step that
+ran several fused rules has its time split evenly between them, so the
+per-rule numbers do not depend on how the planner grouped the rules.
+Aggregates - p50/p95 duration per pipeline and per rule - are computed
+over the most recent runs, and the oldest runs of a pipeline are pruned
+past max_runs.
+
+Every call opens its own connection, so runs finishing on worker threads
+(execute_async) or in other processes can record into the same file.
+"""
+import sqlite3
+import threading
+import numpy as np
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+# Runs the aggregates are computed over
+HISTORY_WINDOW = 100
+
+# Runs kept per pipeline
+MAX_RUNS = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pipeline TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    started TEXT,
+    duration REAL,
+    initial_rows INTEGER,
+    final_rows INTEGER,
+    errors INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_pipeline ON runs (pipeline, id);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL,
+    pipeline TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    type TEXT,
+    wall_time REAL,
+    rows_before INTEGER,
+    rows_after INTEGER,
+    cached INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS steps_run ON steps (pipeline, run_id);
+"""
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """p50 and p95 of values (None when there are none)"""
+    if not values:
+        return {'p50': None, 'p95': None}
+    p50, p95 = np.percentile(np.asarray(values, dtype=float), [50, 95])
+    return {'p50': float(p50), 'p95': float(p95)}
+
+
+def _timestamp(value: Any) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _rule_rows(run_id: int, pipeline: str, stats: Dict[str, Any], rule_types: Dict[str, str]) -> List[tuple]:
+    """One steps row per rule; a fused step's wall time is split evenly between its rules"""
+    rows = []
+    for entry in stats.get('rules_applied', []):
+        names = entry.get('rules') or [entry['rule']]
+        wall_time = entry.get('wall_time')
+        share = wall_time / len(names) if wall_time is not None else None
+        for name in names:
+            rule_type = rule_types.get(name, entry.get('type') if len(names) == 1 else None)
+            rows.append((run_id, pipeline, name, rule_type, share, entry.get('rows_before'),
+                         entry.get('rows_after'), int(bool(entry.get('cached')))))
+    return rows
+
+
+class RunHistory:
+    """SQLite-backed history of the runs of any number of pipelines"""
+
+    def __init__(self, path: str, max_runs: int = MAX_RUNS):
+        self.path = path
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._initialized = True
+        return conn
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def record(self, pipeline: str, stats: Dict[str, Any], rule_types: Optional[Dict[str, str]] = None) -> int:
+        """
+        Store one run's stats (as returned by execute and the other runners); returns its id.
+
+        rule_types maps rule names to their types, for the rules of fused steps.
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    run_id = conn.execute(
+                        "INSERT INTO runs (pipeline, mode, started, duration, initial_rows, final_rows, errors) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (pipeline, stats.get('mode', 'memory'), _timestamp(stats.get('start_time')),
+                         stats.get('duration'), stats.get('initial_rows'), stats.get('final_rows'),
+                         len(stats.get('errors', [])))).lastrowid
+                    conn.executemany("INSERT INTO steps VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                     _rule_rows(run_id, pipeline, stats, rule_types or {}))
+                    self._prune(conn, pipeline)
+            finally:
+                conn.close()
+        return run_id
+
+    def _prune(self, conn: sqlite3.Connection, pipeline: str):
+        cutoff = conn.execute("SELECT id FROM runs WHERE pipeline = ? ORDER BY id DESC LIMIT 1 OFFSET ?",
+                              (pipeline, self.max_runs)).fetchone()
+        if cutoff is not None:
+            conn.execute("DELETE FROM runs WHERE pipeline = ? AND id <= ?", (pipeline, cutoff[0]))
+            conn.execute("DELETE FROM steps WHERE pipeline = ? AND run_id <= ?", (pipeline, cutoff[0]))
+
+    def runs(self, pipeline: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """The pipeline's most recent runs, newest first"""
+        rows = self._query(
+            "SELECT id, mode, started, duration, initial_rows, final_rows, errors FROM runs "
+            "WHERE pipeline = ? ORDER BY id DESC LIMIT ?", (pipeline, limit))
+        columns = ('id', 'mode', 'started', 'duration', 'initial_rows', 'final_rows', 'errors')
+        return [dict(zip(columns, row)) for row in rows]
+
+    def summary(self, pipeline: str, window: int = HISTORY_WINDOW) -> Dict[str, Any]:
+        """Run count, p50/p95 duration and failed runs over the pipeline's last window runs"""
+        rows = self._query("SELECT duration, errors, started FROM runs WHERE pipeline = ? "
+                           "ORDER BY id DESC LIMIT ?", (pipeline, window))
+        return {
+            'runs': len(rows),
+            'failed_runs': sum(1 for _, errors, _ in rows if errors),
+            'last_run': rows[0][2] if rows else None,
+            'duration': percentiles([duration for duration, _, _ in rows if duration is not None])
+        }
+
+    def rule_summary(self, pipeline: str, window: int = HISTORY_WINDOW) -> List[Dict[str, Any]]:
+        """p50/p95 wall time per rule over the pipeline's last window runs, slowest p95 first"""
+        rows = self._query(
+            "SELECT rule, type, wall_time FROM steps WHERE pipeline = ? AND cached = 0 "
+            "AND wall_time IS NOT NULL AND run_id >= (SELECT coalesce(min(id), 0) FROM "
+            "(SELECT id FROM runs WHERE pipeline = ? ORDER BY id DESC LIMIT ?))",
+            (pipeline, pipeline, window))
+        times: Dict[tuple, List[float]] = {}
+        for rule, rule_type, wall_time in rows:
+            times.setdefault((rule, rule_type), []).append(wall_time)
+        summary = [{'rule': rule, 'type': rule_type, 'runs': len(values), 'wall_time': percentiles(values)}
+                   for (rule, rule_type), values in times.items()]
+        return sorted(summary, key=lambda entry: -entry['wall_time']['p95'])
+
+    def clear(self, pipeline: Optional[str] = None):
+        """Forget the runs of one pipeline, or of all of them"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    if pipeline is None:
+                        conn.execute("DELETE FROM runs")
+                        conn.execute("DELETE FROM steps")
+                    else:
+                        conn.execute("DELETE FROM runs WHERE pipeline = ?", (pipeline,))
+                        conn.execute("DELETE FROM steps WHERE pipeline = ?", (pipeline,))
+            finally:
+                conn.close()
@@ -0,0 +1,447 @@
+"""
+Sketch Profiler - approximate data quality profiles of inputs too large to load
+
+Chunks are read one at a time and summarized per column with small,
+mergeable sketches: a HyperLogLog for the distinct count, a t-digest for
+quantiles, a running count/mean/variance (Welford, merged with Chan's
+formula), null counts and min/max lengths of text. Partial profiles of
+different chunks merge into the profile of their union, so chunks can be
+profiled in parallel and combined.
+
+SketchProfile.profile() has the layout of DataQualityChecker.profile_data
+and SketchProfile.anomalies() that of detect_anomalies; distinct counts,
+medians, outlier and duplicate counts are estimates. Memory use depends
+on the number of columns, not rows (about 16 KB per column and
+precision 14).
+"""
+import math
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.column_profile import profile_column
+from utils.dedup import row_hashes
+from utils.etl_stream import chunk_source
+from utils.performance_optimizer import ChunkProcessor
+
+
+# HyperLogLog registers: 2**precision, relative error about 1.04 / sqrt(2**precision)
+HLL_PRECISION = 14
+
+# t-digest compression: about compression / 2 centroids per column
+TDIGEST_COMPRESSION = 200
+
+# Centroids buffered by a t-digest before they are merged into its own
+TDIGEST_BUFFER_SIZE = 5_000
+
+
+class HyperLogLog:
+    """Mergeable distinct count of 64-bit hashes"""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be in [4, 18], got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # Position of the first 1 bit of the remaining bits (bits + 1 when they are all zero)
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (bits + 1 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'HyperLogLog'):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> float:
+        """Estimated distinct count (Ertl's improved estimator, unbiased over the whole range)"""
+        m = len(self.registers)
+        bits = 64 - self.precision
+        histogram = np.bincount(self.registers, minlength=bits + 2)
+        if histogram[0] == m:
+            return 0.0
+        z = m * _tau(1 - histogram[bits + 1] / m)
+        for k in range(bits, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * _sigma(histogram[0] / m)
+        return m * m / (2 * math.log(2) * z)
+
+
+def _sigma(x: float) -> float:
+    if x == 1:
+        return math.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x: float) -> float:
+    if x == 0 or x == 1:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = math.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
+
+
+class TDigest:
+    """
+    Mergeable quantile sketch (merging t-digest, arcsine scale function).
+
+    Centroids are small near the extremes and larger towards the median,
+    so tail quantiles stay accurate. Up to compression points are kept
+    exactly, so small inputs give exact quantiles.
+    """
+
+    def __init__(self, compression: int = TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[np.ndarray] = []
+        self._buffer_weights: List[np.ndarray] = []
+        self._buffered = 0
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum()) + self._buffered
+
+    def update(self, values: np.ndarray):
+        """Add values (no NaN)"""
+        if len(values) == 0:
+            return
+        values = np.sort(np.asarray(values, dtype=np.float64))
+        self.min = min(self.min, float(values[0]))
+        self.max = max(self.max, float(values[-1]))
+        self._add(*self._cluster(values, np.ones(len(values))))
+
+    def merge(self, other: 'TDigest'):
+        other._compress()
+        if len(other.means):
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._add(other.means, other.weights)
+
+    def _add(self, means: np.ndarray, weights: np.ndarray):
+        self._buffer.append(means)
+        self._buffer_weights.append(weights)
+        self._buffered += len(means)
+        if self._buffered >= TDIGEST_BUFFER_SIZE:
+            self._compress()
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means] + self._buffer)
+        weights = np.concatenate([self.weights] + self._buffer_weights)
+        self._buffer, self._buffer_weights, self._buffered = [], [], 0
+        order = np.argsort(means, kind='stable')
+        self.means, self.weights = self._cluster(means[order], weights[order])
+
+    def _cluster(self, means: np.ndarray, weights: np.ndarray):
+        """Merge sorted points into centroids"""
+        if len(means) <= self.compression:
+            return means, weights
+        # Centroid of each point: the unit interval of the scale function its midpoint falls in
+        cumulative = np.cumsum(weights)
+        quantiles = (cumulative - weights / 2) / cumulative[-1]
+        scale = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * quantiles - 1))
+        starts = np.flatnonzero(np.r_[True, scale[1:] != scale[:-1]])
+        clustered = np.add.reduceat(weights, starts)
+        return np.add.reduceat(means * weights, starts) / clustered, clustered
+
+    def _centers(self):
+        self._compress()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return centers, float(self.weights.sum())
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated q-quantile, None when empty"""
+        centers, total = self._centers()
+        if total == 0:
+            return None
+        return float(np.interp(q * total, np.r_[0.0, centers, total], np.r_[self.min, self.means, self.max]))
+
+    def cdf(self, x: float) -> float:
+        """Estimated fraction of values not above x"""
+        centers, total = self._centers()
+        if total == 0:
+            return 0.0
+        return float(np.interp(x, np.r_[self.min, self.means, self.max], np.r_[0.0, centers, total]) / total)
+
+
+def _is_text(series: pd.Series) -> bool:
+    return pd.api.types.is_string_dtype(series) or series.dtype == 'object'
+
+
+def _common_dtype(first: Optional[str], second: str, numeric: bool) -> str:
+    """dtype a column read with both dtypes would have, as far as it matters for profiling"""
+    if first is None or first == second:
+        return second
+    try:
+        common = np.result_type(np.dtype(first), np.dtype(second))
+    except TypeError:
+        # Extension dtypes (Int64, string, category) mixed across chunks
+        return 'float64' if numeric else 'object'
+    return str(common) if common.kind in 'biuf' else 'object'
+
+
+class ColumnSketch:
+    """Mergeable statistics of one column"""
+
+    def __init__(self, precision: int = HLL_PRECISION, compression: int = TDIGEST_COMPRESSION):
+        self.dtype: Optional[str] = None
+        self.dtypes: List[str] = []
+        # Whether every chunk with values had a numeric dtype
+        self.numeric: Optional[bool] = None
+        # dtype of the first chunk, reported while no chunk had values
+        self.empty_dtype: Optional[str] = None
+        self.empty_numeric = False
+        self.rows = 0
+        self.missing = 0
+        self.memory_bytes = 0
+        self.distinct = HyperLogLog(precision)
+        self.digest = TDigest(compression)
+        # Welford: count, mean and sum of squared deviations of the numeric values
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        # Text lengths (of str(value), as profile_data counts them)
+        self.text_rows = 0
+        self.length_total = 0.0
+        self.min_length: Optional[int] = None
+        self.max_length: Optional[int] = None
+
+    @property
+    def is_text(self) -> bool:
+        return self.text_rows > 0
+
+    def update(self, series: pd.Series):
+        missing = series.isna().to_numpy()
+        self.rows += len(series)
+        missing_count = int(np.count_nonzero(missing))
+        self.missing += missing_count
+        is_numeric = pd.api.types.is_numeric_dtype(series)
+        if missing_count < len(series):
+            # Chunks with no values say nothing of the column's type
+            self._add_dtype(str(series.dtype), is_numeric)
+        elif self.empty_dtype is None:
+            self.empty_dtype, self.empty_numeric = str(series.dtype), is_numeric
+
+        if is_numeric:
+            self.memory_bytes += int(series.memory_usage(index=False, deep=True))
+            self.distinct.add(row_hashes(series.to_frame())[~missing])
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)[~missing]
+            if len(values):
+                self._add_moments(len(values), float(values.mean()), float(((values - values.mean()) ** 2).sum()))
+                self.digest.update(values)
+            return
+
+        # One factorization gives the lengths and deep memory; only distinct values are hashed
+        col_profile, memory = profile_column(series)
+        self.memory_bytes += memory
+        self.distinct.add(row_hashes(pd.Series(pd.unique(series[~missing])).to_frame()))
+        if _is_text(series) and len(series):
+            self.text_rows += len(series)
+            self.length_total += col_profile['avg_length'] * len(series)
+            self._add_lengths(col_profile['min_length'], col_profile['max_length'])
+
+    def merge(self, other: 'ColumnSketch'):
+        for dtype in other.dtypes:
+            self._add_dtype(dtype, other.numeric)
+        if self.empty_dtype is None:
+            self.empty_dtype, self.empty_numeric = other.empty_dtype, other.empty_numeric
+        self.rows += other.rows
+        self.missing += other.missing
+        self.memory_bytes += other.memory_bytes
+        self.distinct.merge(other.distinct)
+        self.digest.merge(other.digest)
+        if other.count:
+            self._add_moments(other.count, other.mean, other.m2)
+        if other.text_rows:
+            self.text_rows += other.text_rows
+            self.length_total += other.length_total
+            self._add_lengths(other.min_length, other.max_length)
+
+    def _add_dtype(self, dtype: str, numeric: bool):
+        self.numeric = numeric if self.numeric is None else self.numeric and numeric
+        if dtype not in self.dtypes:
+            self.dtypes.append(dtype)
+            self.dtype = _common_dtype(self.dtype, dtype, self.numeric)
+
+    def _add_moments(self, count: int, mean: float, m2: float):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def _add_lengths(self, shortest: int, longest: int):
+        self.min_length = shortest if self.min_length is None else min(self.min_length, shortest)
+        self.max_length = longest if self.max_length is None else max(self.max_length, longest)
+
+    def unique_count(self) -> int:
+        return min(int(round(self.distinct.count())), self.rows - self.missing)
+
+    def profile(self) -> Dict[str, Any]:
+        """Entry of the column in profile_data's layout"""
+        percent = (lambda count: float(count / self.rows * 100)) if self.rows else (lambda count: 0.0)
+        unique = self.unique_count()
+        col_profile = {
+            'dtype': self.dtype or self.empty_dtype or 'object',
+            'missing_count': self.missing,
+            'missing_percent': percent(self.missing),
+            'unique_count': unique,
+            'unique_percent': percent(unique),
+        }
+        if self.is_text:
+            col_profile.update({
+                'avg_length': self.length_total / self.text_rows,
+                'max_length': self.max_length,
+                'min_length': self.min_length,
+            })
+        elif self.numeric or (self.numeric is None and self.empty_numeric):
+            col_profile.update({
+                'min': self.digest.min if self.count else None,
+                'max': self.digest.max if self.count else None,
+                'mean': self.mean if self.count else None,
+                'median': self.digest.quantile(0.5),
+                'std': math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else (math.nan if self.count else None),
+            })
+        return col_profile
+
+
+class SketchProfile:
+    """Mergeable approximate profile of a stream of chunks"""
+
+    def __init__(self, precision: int = HLL_PRECISION, compression: int = TDIGEST_COMPRESSION):
+        self.precision = precision
+        self.compression = compression
+        self.rows = 0
+        self.columns: Dict[Any, ColumnSketch] = {}
+        self.row_distinct = HyperLogLog(precision)
+
+    def _column(self, name) -> ColumnSketch:
+        if name not in self.columns:
+            self.columns[name] = ColumnSketch(self.precision, self.compression)
+        return self.columns[name]
+
+    def update(self, chunk: pd.DataFrame) -> 'SketchProfile':
+        self.rows += len(chunk)
+        for i, col in enumerate(chunk.columns):
+            self._column(col).update(chunk.iloc[:, i])
+        self.row_distinct.add(row_hashes(chunk))
+        return self
+
+    def merge(self, other: 'SketchProfile') -> 'SketchProfile':
+        self.rows += other.rows
+        for col, sketch in other.columns.items():
+            self._column(col).merge(sketch)
+        self.row_distinct.merge(other.row_distinct)
+        return self
+
+    def duplicate_rows(self) -> int:
+        """Estimated duplicate rows; 0 when within the distinct count's error"""
+        duplicates = self.rows - self.row_distinct.count()
+        if duplicates <= 3 * self.row_distinct.relative_error * self.rows:
+            return 0
+        return int(round(duplicates))
+
+    def profile(self) -> Dict[str, Any]:
+        """Approximate DataQualityChecker.profile_data of all chunks read"""
+        return {
+            'total_rows': self.rows,
+            'total_columns': len(self.columns),
+            'memory_usage': sum(sketch.memory_bytes for sketch in self.columns.values()) / 1024**2,  # MB
+            'columns': {col: sketch.profile() for col, sketch in self.columns.items()},
+            'approximate': True,
+        }
+
+    def anomalies(self) -> Dict[str, List[str]]:
+        """Approximate DataQualityChecker.detect_anomalies of all chunks read"""
+        issues = {
+            'high_missing': [],
+            'low_variance': [],
+            'potential_duplicates': [],
+            'outliers': [],
+            'inconsistent_types': []
+        }
+        for col, sketch in self.columns.items():
+            missing_pct = sketch.missing / self.rows * 100 if self.rows else 0.0
+            if missing_pct > 50:
+                issues['high_missing'].append(f"{col} ({missing_pct:.1f}% missing)")
+
+            if sketch.unique_count() == 1:
+                issues['low_variance'].append(f"{col} (constant value)")
+
+            if sketch.count and not sketch.is_text:
+                q1, q3 = sketch.digest.quantile(0.25), sketch.digest.quantile(0.75)
+                iqr = q3 - q1
+                low, high = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+                if sketch.digest.min < low or sketch.digest.max > high:
+                    share = sketch.digest.cdf(low) + 1 - sketch.digest.cdf(high)
+                    outliers = max(1, int(round(share * sketch.count)))
+                    issues['outliers'].append(f"{col} (~{outliers} outliers)")
+
+            if len(sketch.dtypes) > 1 and not sketch.numeric:
+                issues['inconsistent_types'].append(f"{col} ({', '.join(sketch.dtypes)} across chunks)")
+
+        dup_count = self.duplicate_rows()
+        if dup_count > 0:
+            issues['potential_duplicates'].append(f"~{dup_count} duplicate rows found")
+        return issues
+
+
+def profile_stream(source: Any, chunk_processor: Optional[ChunkProcessor] = None, max_workers: int = 1,
+                   precision: int = HLL_PRECISION, compression: int = TDIGEST_COMPRESSION) -> SketchProfile:
+    """
+    Profile a stream source (see utils.etl_stream.chunk_source) one chunk at a time.
+
+    With max_workers > 1 chunks are profiled in a thread pool, at most
+    2 * max_workers at a time, and their partial profiles merged.
+    """
+    chunks: Iterable[pd.DataFrame] = chunk_source(source, chunk_processor)()
+    total = SketchProfile(precision, compression)
+    if max_workers <= 1:
+        for chunk in chunks:
+            total.update(chunk)
+        return total
+
+    def profile_chunk(chunk: pd.DataFrame) -> SketchProfile:
+        return SketchProfile(precision, compression).update(chunk)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = set()
+        for chunk in chunks:
+            if len(running) >= 2 * max_workers:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    total.merge(future.result())
+            running.add(pool.submit(profile_chunk, chunk))
+        for future in running:
+            total.merge(future.result())
+    return total